@@ -1,3 +1,4 @@
+from utils.logger import get_logger
 from .db_usstocks import (
     get_accounts,
     get_current_ask_price,
@@ -8,4 +9,6 @@ from .db_usstocks import (
     is_us_market_open,  # ✅ 이 줄 추가
 _get_token
 )
-print("[api] ✅ DB 미국주식 API 사용 중")
+
+log = get_logger(__name__)
+log.info("[api] ✅ DB 미국주식 API 사용 중")
@@ -3,10 +3,13 @@
 import requests
 from api.auth import generate_jwt_token
 import config
+from utils.logger import get_logger
+
+log = get_logger(__name__)
 
 
 def get_accounts():
-    print("[account.py] get_accounts() 실행됨")
+    log.info("[account.py] get_accounts() 실행됨")
 
     headers = {
         'Authorization': generate_jwt_token()
@@ -15,8 +18,8 @@ def get_accounts():
     response = requests.get(f"{config.SERVER_URL}/v1/accounts", headers=headers)
 
     if response.status_code == 200:
-        print("[account.py] 계좌 조회 성공")
+        log.info("[account.py] 계좌 조회 성공")
         return response.json()
     else:
-        print("[account.py] 계좌 조회 실패")
+        log.warning("[account.py] 계좌 조회 실패")
         raise Exception(f"[Upbit API] 계좌 조회 실패: {response.status_code} - {response.text}")
@@ -0,0 +1,172 @@
+# api/account_snapshot.py
+
+import os
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+load_dotenv()
+
+# 잔고 스냅샷 유효시간(초) – 메인 루프 1틱 동안 모든 호출이 같은 잔고를 공유
+ACCOUNT_SNAPSHOT_TTL = float(os.getenv("DB_ACCOUNT_SNAPSHOT_TTL", "1.0"))
+
+# 보관하는 포지션 변경 이벤트 수
+EVENT_HISTORY = 1000
+
+_QTY_EPS = 1e-8
+
+
+@dataclass(slots=True)
+class PositionEvent:
+    """
+    잔고 변경 이벤트
+    kind: "new" (신규 보유) | "changed" (수량/평단 변경) | "flattened" (전량 정리)
+    """
+    seq: int
+    kind: str
+    market: str
+    old_qty: float
+    new_qty: float
+    old_avg: float
+    new_avg: float
+    at: float
+
+
+def _qty(pos: dict) -> float:
+    return float(pos.get("balance", 0) or 0) + float(pos.get("locked", 0) or 0)
+
+
+def _avg(pos: dict) -> float:
+    return float(pos.get("avg_buy_price", 0) or 0)
+
+
+def diff_positions(old: dict, new: dict) -> list:
+    """이전/현재 잔고 비교 → [(kind, market, old_pos, new_pos)]"""
+    changes = []
+    for market, pos in new.items():
+        prev = old.get(market)
+        if prev is None or _qty(prev) <= _QTY_EPS:
+            if _qty(pos) > _QTY_EPS:
+                changes.append(("new", market, prev or {}, pos))
+        elif abs(_qty(prev) - _qty(pos)) > _QTY_EPS or abs(_avg(prev) - _avg(pos)) > _QTY_EPS:
+            kind = "flattened" if _qty(pos) <= _QTY_EPS else "changed"
+            changes.append((kind, market, prev, pos))
+
+    for market, prev in old.items():
+        if market not in new and _qty(prev) > _QTY_EPS:
+            changes.append(("flattened", market, prev, {}))
+
+    return changes
+
+
+class AccountSnapshot:
+    """
+    잔고 스냅샷 서비스
+    - 틱(TTL) 안에서는 잔고 조회 1회 결과를 모든 호출이 공유 (복사본 반환)
+    - 새로 받을 때마다 이전 스냅샷과 비교해 포지션 변경 이벤트 생성
+      (new / changed / flattened)
+    - 주문·취소·체결 후에는 invalidate() 또는 get(force=True)로 즉시 재조회
+    - 이벤트는 소비자(consumer) × 종목별 커서로 읽음 → 종목별 워커끼리 서로 소비하지 않음
+
+    fetcher: () -> holdings dict (get_accounts 형식)
+    """
+
+    def __init__(self, fetcher, ttl: float = ACCOUNT_SNAPSHOT_TTL):
+        self._fetcher = fetcher
+        self.ttl = ttl
+        self._lock = threading.RLock()
+
+        self._holdings = None
+        self._fetched_at = None
+        self._seq = 0
+        self._events = deque(maxlen=EVENT_HISTORY)
+        self._cursors = {}
+
+        self.fetches = 0
+        self.hits = 0
+
+    # ------------------------------------------
+    # 조회 / 갱신
+    # ------------------------------------------
+    def _is_fresh(self) -> bool:
+        return (
+            self._holdings is not None
+            and self._fetched_at is not None
+            and time.monotonic() - self._fetched_at < self.ttl
+        )
+
+    def _apply(self, holdings: dict):
+        now = time.monotonic()
+        if self._holdings is not None:
+            for kind, market, prev, pos in diff_positions(self._holdings, holdings):
+                self._seq += 1
+                event = PositionEvent(
+                    self._seq, kind, market, _qty(prev), _qty(pos), _avg(prev), _avg(pos), now
+                )
+                self._events.append(event)
+                log.info(f"[account_snapshot] {kind}: {market} 수량 {event.old_qty} → {event.new_qty}")
+
+        self._holdings = holdings
+        self._fetched_at = now
+
+    def get(self, force: bool = False) -> dict:
+        """잔고 (TTL 이내 재호출은 캐시). 호출 측 수정이 캐시에 새지 않도록 복사본 반환"""
+        with self._lock:
+            if force or not self._is_fresh():
+                self._apply(self._fetcher())
+                self.fetches += 1
+            else:
+                self.hits += 1
+            return {market: dict(pos) for market, pos in self._holdings.items()}
+
+    def prime(self, holdings: dict):
+        """이미 받아 둔 잔고 반영 (async 선조회)"""
+        with self._lock:
+            self._apply(holdings)
+            self.fetches += 1
+
+    def invalidate(self):
+        """주문/취소 직후 호출 → 다음 get()에서 재조회"""
+        with self._lock:
+            self._fetched_at = None
+
+    # ------------------------------------------
+    # 이벤트
+    # ------------------------------------------
+    def events(self, consumer: str, markets: list = None, kinds: tuple = None) -> list:
+        """
+        소비자별로 아직 안 읽은 이벤트 반환 (읽은 만큼 커서 이동)
+        - markets 지정 시 해당 종목 이벤트만 읽고, 다른 종목 커서는 그대로
+        """
+        with self._lock:
+            result = []
+            seen_markets = set()
+            for event in self._events:
+                if markets is not None and event.market not in markets:
+                    continue
+                if event.seq <= self._cursors.get((consumer, event.market), 0):
+                    continue
+                seen_markets.add(event.market)
+                if kinds is None or event.kind in kinds:
+                    result.append(event)
+
+            for market in seen_markets:
+                self._cursors[(consumer, market)] = self._seq
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.fetches + self.hits
+            return {
+                "ttl_sec": self.ttl,
+                "positions": len(self._holdings or {}),
+                "fetches": self.fetches,
+                "hits": self.hits,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "events": self._seq,
+            }
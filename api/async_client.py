@@ -0,0 +1,209 @@
+# api/async_client.py
+
+import os
+import json
+import time
+import asyncio
+import requests
+from dotenv import load_dotenv
+
+from api import db_usstocks as db
+from api.http_client import DEFAULT_HEADERS, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_POOL_MAXSIZE
+from utils.logger import get_logger
+
+# 선택 의존성: aiohttp (pip install aiohttp)
+#  - 있으면 이벤트 루프에서 직접 HTTP 호출
+#  - 없으면 스레드 풀에서 기존 공용 세션(_post) 사용 (동작은 같고 스레드만 더 씀)
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+log = get_logger(__name__)
+
+load_dotenv()
+
+# 동시에 날리는 요청 수 상한 (기본: 호스트당 커넥션 수와 동일)
+ASYNC_MAX_CONCURRENCY = int(os.getenv("DB_ASYNC_MAX_CONCURRENCY", str(HTTP_POOL_MAXSIZE)))
+
+# 초당 거래건수 초과(IGW00201 / HTTP 429) 응답 재시도 횟수 / 대기(초, 시도마다 배수로 증가)
+ASYNC_RATE_LIMIT_RETRIES = int(os.getenv("DB_ASYNC_RATE_LIMIT_RETRIES", "2"))
+ASYNC_RATE_LIMIT_BACKOFF_SEC = float(os.getenv("DB_ASYNC_RATE_LIMIT_BACKOFF_SEC", "0.5"))
+
+RSP_RATE_LIMITED = "IGW00201"   # 초당 거래건수 초과
+
+
+class _AsyncResponse:
+    """aiohttp 응답 → requests.Response와 같은 방식으로 쓰는 최소 래퍼"""
+
+    def __init__(self, url: str, status_code: int, headers: dict, content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content or b"{}")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+def _rsp(res) -> tuple:
+    """응답 JSON의 (rsp_cd, rsp_msg). JSON이 아니면 빈 값"""
+    try:
+        data = res.json()
+    except ValueError:
+        return "", ""
+    if not isinstance(data, dict):
+        return "", ""
+    return str(data.get("rsp_cd") or "").strip(), str(data.get("rsp_msg") or "").strip()
+
+
+def _is_rate_limited(status_code: int, code: str) -> bool:
+    return status_code == 429 or code == RSP_RATE_LIMITED
+
+
+def _check_market_closed(code: str, msg: str):
+    """DB 폐장 코드면 동기 경로와 같은 형식으로 MARKET_CLOSED 전파 (캐시에 채우지 않음)"""
+    from manager.order_executor import DB_MARKET_CLOSED_CODES
+
+    if code in DB_MARKET_CLOSED_CODES:
+        raise RuntimeError(f"MARKET_CLOSED: {code} {msg}")
+
+
+class AsyncDbClient:
+    """
+    DB증권 REST API 비동기 클라이언트
+    - 종목별 호가 / 잔고 / 체결내역 조회를 동시에 날림
+    - aiohttp 경로도 동기 경로와 같은 게이트웨이(BrokerGateway)를 거침
+      · 토큰 / 계열별 rate-limit (대기만 asyncio.sleep) / 동시 호출 수 / 엔드포인트 계측
+      · 조회 계열은 같은 single-flight로 동시 중복 요청을 합침 (주문은 합치지 않음)
+    - aiohttp가 없으면 asyncio.to_thread로 기존 공용 세션(_post) 호출
+    - 두 경로 모두: 초당 거래건수 초과 응답은 잠시 후 재시도, 폐장 코드는 MARKET_CLOSED
+    """
+
+    def __init__(self, base_url: str = db.BASE,
+                 max_concurrency: int = ASYNC_MAX_CONCURRENCY):
+        self.base_url = base_url.rstrip("/")
+        self.mode = "aiohttp" if aiohttp is not None else "thread"
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session = None
+
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self._latency_total = 0.0
+
+        if aiohttp is None:
+            log.info("[async_client] aiohttp 미설치 → 스레드 풀 모드 (pip install aiohttp 시 aiohttp 모드)")
+
+    async def _get_session(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                headers=DEFAULT_HEADERS,
+                connector=aiohttp.TCPConnector(limit=HTTP_POOL_MAXSIZE),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=HTTP_CONNECT_TIMEOUT, sock_read=HTTP_READ_TIMEOUT
+                ),
+            )
+        return self._session
+
+    # ------------------------------------------
+    # 요청
+    # ------------------------------------------
+    async def post(self, path: str, body: dict):
+        """
+        공용 POST (db_usstocks._post의 비동기판)
+        반환: requests.Response 호환 객체 (status_code / headers / content / json())
+        """
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                for attempt in range(ASYNC_RATE_LIMIT_RETRIES + 1):
+                    res = await self._send(path, body)
+                    code, msg = _rsp(res)
+                    if not _is_rate_limited(res.status_code, code) or attempt == ASYNC_RATE_LIMIT_RETRIES:
+                        break
+
+                    self.rate_limited += 1
+                    backoff = ASYNC_RATE_LIMIT_BACKOFF_SEC * (attempt + 1)
+                    log.warning(f"⚠️ [async_client] 초당 거래건수 초과 ({path}) → {backoff:.1f}초 후 재시도")
+                    await asyncio.sleep(backoff)
+
+                _check_market_closed(code, msg)
+            except Exception:
+                self.requests += 1
+                self.errors += 1
+                raise
+
+            self.requests += 1
+            self._latency_total += time.perf_counter() - start
+            if res.status_code >= 400:
+                self.errors += 1
+            return res
+
+    async def _send(self, path: str, body: dict):
+        if self.mode == "thread":
+            return await asyncio.to_thread(db._post, path, body)
+
+        family = db._path_family(path)
+        if family == "order":
+            return await self._post_aiohttp(path, body)
+
+        key = db._single_flight.make_key(path, body, {})
+        return await db._single_flight.do_async(key, lambda: self._post_aiohttp(path, body), family)
+
+    async def _post_aiohttp(self, path: str, body: dict) -> _AsyncResponse:
+        url = self.base_url + path
+        session = await self._get_session()
+
+        async def send(token: str) -> _AsyncResponse:
+            async with session.post(
+                url,
+                data=json.dumps(body),
+                headers={"authorization": f"Bearer {token}"},
+            ) as res:
+                content = await res.read()
+                return _AsyncResponse(url, res.status, dict(res.headers), content)
+
+        return await db.get_gateway().post_async(path, send)
+
+    # ------------------------------------------
+    # 조회 (응답은 동기 경로 캐시에 채워 넣음)
+    # ------------------------------------------
+    async def fetch_orderbook(self, market: str, market_code: str) -> dict:
+        res = await self.post(db.PATH_ORDERBOOK, db.orderbook_body(market.strip().upper(), market_code))
+        res.raise_for_status()
+        data = res.json()
+        db.prime_orderbook(market, market_code, data)
+        return data
+
+    async def fetch_accounts(self) -> dict:
+        res = await self.post(db.PATH_BALANCE, db.BALANCE_BODY)
+        res.raise_for_status()
+        holdings = db.parse_accounts(res.json())
+        db.prime_accounts(holdings)
+        return holdings
+
+    async def refresh_order_history(self):
+        """체결/미체결 추적기는 연속조회 + 상태를 갖고 있어서 스레드에서 갱신"""
+        await asyncio.to_thread(db.refresh_order_history)
+
+    # ------------------------------------------
+    # 통계 / 종료
+    # ------------------------------------------
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "requests": self.requests,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "avg_latency_ms": round(self._latency_total / self.requests * 1000, 2) if self.requests else 0.0,
+        }
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
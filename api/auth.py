@@ -3,10 +3,13 @@
 import uuid
 import jwt  # PyJWT
 import config
+from utils.logger import get_logger
+
+log = get_logger(__name__)
 
 
 def generate_jwt_token(query: dict = None) -> str:
-    print("[auth.py] generate_jwt_token() 호출됨")
+    log.info("[auth.py] generate_jwt_token() 호출됨")
 
     payload = {
         'access_key': config.ACCESS_KEY,
@@ -25,5 +28,5 @@ def generate_jwt_token(query: dict = None) -> str:
         payload['query_hash_alg'] = 'SHA512'
 
     jwt_token = jwt.encode(payload, config.SECRET_KEY)
-    print("[auth.py] JWT 토큰 생성 완료")
+    log.info("[auth.py] JWT 토큰 생성 완료")
     return f'Bearer {jwt_token}'
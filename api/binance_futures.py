@@ -8,6 +8,9 @@ import requests
 import os
 from typing import Dict, List, Optional
 from utils.price_utils import adjust_price_and_qty_for_binance
+from utils.logger import get_logger
+
+log = get_logger(__name__)
 
 # ============================
 # ✅ 환경변수 (키는 .env에 저장)
@@ -103,7 +106,7 @@ def get_position_mode() -> bool:
         data = _request("GET", "/fapi/v1/positionSide/dual", signed=True)
         return data.get("dualSidePosition", False)
     except Exception as e:
-        print(f"⚠️ Position mode 조회 실패: {e}")
+        log.warning(f"⚠️ Position mode 조회 실패: {e}")
         return False
 
 
@@ -123,9 +126,9 @@ def set_hedge_mode(enable: bool = True):
             params={"dualSidePosition": mode},
             signed=True,
         )
-        print(f"✅ Hedge Mode 설정 완료 → {data}")
+        log.info(f"✅ Hedge Mode 설정 완료 → {data}")
     except Exception as e:
-        print(f"❌ Hedge Mode 설정 실패: {e}")
+        log.error(f"❌ Hedge Mode 설정 실패: {e}")
 
 
 # ============================
@@ -237,8 +240,8 @@ def send_order(
 
         quantity = buy_amount / ref_price
 
-    print("[DEBUG] send_order 내부 final price:", price)
-    print("[DEBUG] send_order 내부 final qty:", quantity)
+    log.debug("[DEBUG] send_order 내부 final price: %s", price)
+    log.debug("[DEBUG] send_order 내부 final qty: %s", quantity)
 
     # 6) Binance 내부 주문 호출
     return _binance_send_order(
@@ -344,7 +347,7 @@ def _binance_send_order(
     # STEP: reduceOnly 재검증 (보정 후 qty가 balance보다 커졌는지 확인)
     # Hedge Mode 강제: reduceOnly 파라미터 삭제
     if reduce_only:
-        print("⚠ Hedge Mode에서는 reduceOnly를 지원하지 않습니다. → 자동 무시합니다.")
+        log.warning("⚠ Hedge Mode에서는 reduceOnly를 지원하지 않습니다. → 자동 무시합니다.")
         reduce_only = False
 
     # ----------------------------------------------------------
@@ -381,11 +384,11 @@ def _binance_send_order(
     # ----------------------------------------------------------
     # 5) Binance API 호출
     # ----------------------------------------------------------
-    print("[DEBUG] biance_send_order 내부 final price:", price)
-    print("[DEBUG] biance_send_order 내부 final qty:", quantity)
+    log.debug("[DEBUG] biance_send_order 내부 final price: %s", price)
+    log.debug("[DEBUG] biance_send_order 내부 final qty: %s", quantity)
     response = _request("POST", "/fapi/v1/order", params=params, signed=True)
 
-    print(f"📌 [{market}] {ot} 주문 완료 | side={side}, qty={quantity}, price={price}, stop={stop_price}, reduce={reduce_only}")
+    log.info(f"📌 [{market}] {ot} 주문 완료 | side={side}, qty={quantity}, price={price}, stop={stop_price}, reduce={reduce_only}")
 
     return {
         "uuid": client_uuid,
@@ -427,7 +430,7 @@ def get_order_results_by_uuids(uuid_list: list, market: str) -> dict:
                 results[uuid] = "cancel"
 
         except Exception as e:
-            print(f"⚠️ get_order_results_by_uuids 실패: {uuid} → {e}")
+            log.warning(f"⚠️ get_order_results_by_uuids 실패: {uuid} → {e}")
 
     return results
 
@@ -520,9 +523,9 @@ def cancel_and_new_order(
             params={"symbol": market, "origClientOrderId": prev_order_uuid},
             signed=True,
         )
-        print(f"✅ 기존 주문 취소 성공: {prev_order_uuid}")
+        log.info(f"✅ 기존 주문 취소 성공: {prev_order_uuid}")
     except Exception as e:
-        print(f"⚠️ 기존 주문 취소 실패 또는 없는 주문: {e}")
+        log.warning(f"⚠️ 기존 주문 취소 실패 또는 없는 주문: {e}")
 
     # 2) 새 주문 client uuid 생성
     new_uuid = str(uuid4())[:15]
@@ -536,22 +539,22 @@ def cancel_and_new_order(
     )
 
     # ----- DEBUG START -----
-    print("====== [DEBUG reduceOnly 조건 검사] ======")
-    print(f"market: {market}")
-    print(f"side: {side}, positionSide: {position_side}")
-    print(f"current balance: {float(holdings.get('balance', 0)) if holdings else 'N/A'}")
-    print(f"order qty(adj_qty): {adj_qty}")
-    print(f"order price(adj_price): {adj_price}")
+    log.info("====== [DEBUG reduceOnly 조건 검사] ======")
+    log.info(f"market: {market}")
+    log.info(f"side: {side}, positionSide: {position_side}")
+    log.info(f"current balance: {float(holdings.get('balance', 0)) if holdings else 'N/A'}")
+    log.info(f"order qty(adj_qty): {adj_qty}")
+    log.info(f"order price(adj_price): {adj_price}")
 
     # case1: 수량이 0으로 보정된 상태
     if adj_qty == 0:
-        print("❗ adj_qty == 0 → 바이낸스가 reduceOnly 주문을 거절할 수 있음")
+        log.info("❗ adj_qty == 0 → 바이낸스가 reduceOnly 주문을 거절할 수 있음")
 
     # case2: 포지션 없음
     if adj_qty > 0 and holdings and float(holdings.get("balance", 0)) == 0:
-        print("❗ balance == 0 → 포지션이 없는데 reduceOnly 주문이 들어옴")
+        log.info("❗ balance == 0 → 포지션이 없는데 reduceOnly 주문이 들어옴")
 
-    print("========================================")
+    log.info("========================================")
     # ----- DEBUG END -----
 
     # 신규 주문 생성
@@ -569,7 +572,7 @@ def cancel_and_new_order(
 
     res = _request("POST", "/fapi/v1/order", params=params, signed=True)
 
-    print(
+    log.info(
         f"🆕 신규 {side} 주문 생성 완료: {new_uuid}, qty={adj_qty}, price={adj_price}, pos={position_side}"
     )
 
@@ -586,5 +589,5 @@ def set_leverage(symbol: str, leverage: int):
 
     params = {"symbol": symbol, "leverage": leverage}
     res = _request("POST", "/fapi/v1/leverage", params=params, signed=True)
-    print(f"✅ 레버리지 설정 완료 → {symbol}: {leverage}배 (maxNotional={res.get('maxNotionalValue')})")
+    log.info(f"✅ 레버리지 설정 완료 → {symbol}: {leverage}배 (maxNotional={res.get('maxNotionalValue')})")
     return res
@@ -3,9 +3,20 @@
 import os
 import time
 import json
-import requests
 from dotenv import load_dotenv
 
+from api.http_client import HttpClient
+from api.gateway import BrokerGateway
+from api.rate_limiter import get_rate_limiter
+from api.quote_cache import QuoteCache
+from api.order_history import OrderHistoryTracker
+from api.account_snapshot import AccountSnapshot
+from api.single_flight import SingleFlight
+from utils.metrics import count_order
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
 load_dotenv()
 
 # ==========================================
@@ -14,15 +25,22 @@ load_dotenv()
 APP_KEY = os.getenv("DB_APP_KEY", "")
 APP_SECRET = os.getenv("DB_APP_SECRET", "")
 
-BASE = "https://openapi.dbsec.co.kr:8443"
+DEFAULT_BASE = "https://openapi.dbsec.co.kr:8443"
+
+# 모의 서버(api/mock_broker.py) 등으로 바꿀 때만 설정 (예: http://127.0.0.1:18443)
+BASE = os.getenv("DB_API_BASE", DEFAULT_BASE).strip().rstrip("/") or DEFAULT_BASE
 PATH_TOKEN = "/oauth2/token"
 
-TOKEN_FILE = "db_token.json"
+# 실서버 토큰 파일을 모의 서버 토큰으로 덮어쓰지 않도록 분리
+TOKEN_FILE = os.getenv("DB_TOKEN_FILE", "db_token.json" if BASE == DEFAULT_BASE else "db_token.mock.json")
 
 # 메모리 토큰 캐싱
 _TOKEN = None
 _TOKEN_EXPIRES_AT = 0
 
+# 공용 HTTP 세션 (keep-alive 커넥션 풀)
+_client = HttpClient(BASE)
+
 
 # ==========================================
 # 내부 유틸
@@ -71,7 +89,7 @@ def _get_token(force: bool = False) -> str:
         if saved_token and _now() < saved_exp - 120:
             _TOKEN = saved_token
             _TOKEN_EXPIRES_AT = saved_exp
-            print("🔑 [DB] 저장된 토큰 사용")
+            log.info("🔑 [DB] 저장된 토큰 사용")
             return _TOKEN
 
     # ----------------------------
@@ -83,10 +101,9 @@ def _get_token(force: bool = False) -> str:
     # ----------------------------
     # 3) DB증권 토큰 신규 발급
     # ----------------------------
-    url = f"{BASE}{PATH_TOKEN}"
-
     headers = {
-        "Content-Type": "application/x-www-form-urlencoded"
+        "Content-Type": "application/x-www-form-urlencoded",
+        "authorization": None,  # 세션에 캐싱된 이전 토큰은 보내지 않음
     }
 
     body = {
@@ -97,10 +114,9 @@ def _get_token(force: bool = False) -> str:
     }
 
     try:
-        res = requests.post(url, headers=headers, data=body)
+        res = _client.post(PATH_TOKEN, headers=headers, data=body)
         res.raise_for_status()
         data = res.json()
-        time.sleep(0.2)
     except Exception as e:
         raise RuntimeError(f"❌ [DB] 접근토큰 발급 실패: {e}")
 
@@ -121,56 +137,96 @@ def _get_token(force: bool = False) -> str:
     # 파일 저장
     save_token(token, expires_at)
 
-    print(f"🔑 [DB] 새 토큰 발급 완료 (유효 {expires_in/3600:.1f}시간)")
+    log.info(f"🔑 [DB] 새 토큰 발급 완료 (유효 {expires_in/3600:.1f}시간)")
 
     return token
 
 
-# ================================================
-# 🇺🇸 DB증권 해외주식 잔고 조회
-# 함수명은 반드시 get_accounts 유지 (KIS 호환)
-# ================================================
-
-import requests
-import json
-import os
+def _path_family(path: str) -> str:
+    """
+    rate-limit 계열 구분
+    - /quote/...  → quote   (호가/현재가)
+    - .../order   → order   (주문/취소)
+    - 그 외       → inquiry (잔고/체결내역)
+    """
+    if "/quote/" in path:
+        return "quote"
+    if path.endswith("/order"):
+        return "order"
+    return "inquiry"
 
-BASE = "https://openapi.dbsec.co.kr:8443"
-PATH_BALANCE = "/api/v1/trading/overseas-stock/inquiry/balance-margin"
 
-def get_accounts() -> dict:
+def _post(path: str, body: dict, cont_yn: str = "N", cont_key: str = ""):
     """
-    DB증권 해외주식 잔고 조회
-    - 반환값은 기존 KIS 구조와 동일하게 매핑
+    DB증권 공용 POST
+    - 공용 세션(_client)으로 요청 → 커넥션 재사용
+    - authorization 헤더는 세션에 캐싱, 토큰이 바뀔 때만 갱신
+    - 연속조회(cont_yn/cont_key)일 때만 헤더 덮어씀
+    - 엔드포인트 계열별 토큰 버킷으로 호출 속도 제한 (예산 초과 시에만 대기)
+    - 실제 호출은 스레드 공용 게이트웨이(_gateway)가 담당
+    - 조회 계열(quote/inquiry)은 동시에 들어온 같은 요청을 1회 호출로 합침
     """
+    headers = None
+    if cont_yn != "N" or cont_key:
+        headers = {"cont_yn": cont_yn, "cont_key": cont_key}
 
-    url = BASE + PATH_BALANCE
+    family = _path_family(path)
+    if family == "order":
+        return _gateway.post(path, body, headers=headers)
 
-    headers = {
-        "Content-Type": "application/json; charset=utf-8",
-        "authorization": f"Bearer {_get_token()}",
-        "cont_yn": "N",
-        "cont_key": "",
-    }
+    key = _single_flight.make_key(path, body, headers or {})
+    return _single_flight.do(key, lambda: _gateway.post(path, body, headers=headers), family)
 
-    body = {
-        "In": {
-            "WonFcurrTpCode": "2",
-            "TrxTpCode": "2",
-            "CmsnTpCode": "2",
-            "DpntBalTpCode": "1"
-        }
-    }
 
-    try:
-        res = requests.post(url, headers=headers, data=json.dumps(body))
-        res.raise_for_status()
-        data = res.json()
-        time.sleep(0.2)
+# 세션 / rate limiter / 토큰을 소유하는 스레드 공용 게이트웨이
+_gateway = BrokerGateway(_client, _get_token, _path_family)
 
-    except Exception as e:
-        raise RuntimeError(f"❌ [DB] 해외주식 잔고 조회 실패: {e}")
+# 동시 중복 조회 합치기 (응답 객체는 읽기 전용으로만 쓰므로 그대로 공유)
+_single_flight = SingleFlight()
+
+
+def get_gateway() -> BrokerGateway:
+    return _gateway
 
+
+def get_gateway_stats() -> dict:
+    """동시 호출 수 + 커넥션 + rate-limit 통계"""
+    return _gateway.stats()
+
+
+def get_single_flight_stats() -> dict:
+    """동시 중복 조회 합치기 통계"""
+    return _single_flight.stats()
+
+
+def get_connection_stats() -> dict:
+    """공용 세션 커넥션 재사용 통계"""
+    return _client.connection_stats()
+
+
+def get_rate_limit_stats() -> dict:
+    """계열별 rate-limit 대기 통계"""
+    return get_rate_limiter().stats()
+
+
+# ================================================
+# 🇺🇸 DB증권 해외주식 잔고 조회
+# 함수명은 반드시 get_accounts 유지 (KIS 호환)
+# ================================================
+
+PATH_BALANCE = "/api/v1/trading/overseas-stock/inquiry/balance-margin"
+
+BALANCE_BODY = {
+    "In": {
+        "WonFcurrTpCode": "2",
+        "TrxTpCode": "2",
+        "CmsnTpCode": "2",
+        "DpntBalTpCode": "1"
+    }
+}
+
+def parse_accounts(data: dict) -> dict:
+    """잔고 조회 응답 → 기존 KIS 구조 holdings"""
     out2 = data.get("Out2") or []
 
     holdings = {}
@@ -195,6 +251,46 @@ def get_accounts() -> dict:
 
     return holdings
 
+
+def _fetch_accounts() -> dict:
+    try:
+        res = _post(PATH_BALANCE, BALANCE_BODY)
+        res.raise_for_status()
+        data = res.json()
+
+    except Exception as e:
+        raise RuntimeError(f"❌ [DB] 해외주식 잔고 조회 실패: {e}")
+
+    return parse_accounts(data)
+
+
+# 틱 단위 잔고 스냅샷 (중복 조회 제거 + 포지션 변경 이벤트)
+_account_snapshot = AccountSnapshot(_fetch_accounts)
+
+
+def get_accounts(force: bool = False) -> dict:
+    """
+    DB증권 해외주식 잔고 조회
+    - 반환값은 기존 KIS 구조와 동일하게 매핑
+    - 같은 틱(DB_ACCOUNT_SNAPSHOT_TTL) 안에서는 1회 조회 결과를 공유
+    - force=True → 체결 직후 등 즉시 재조회
+    """
+    return _account_snapshot.get(force=force)
+
+
+def get_account_snapshot() -> AccountSnapshot:
+    return _account_snapshot
+
+
+def prime_accounts(holdings: dict):
+    """미리 받아 둔 잔고를 스냅샷으로 저장 (async 선조회)"""
+    _account_snapshot.prime(holdings)
+
+
+def invalidate_accounts():
+    """주문/취소 시 호출 → 다음 get_accounts()에서 재조회"""
+    _account_snapshot.invalidate()
+
 # ================================================
 # 🇺🇸 DB증권 해외주식 현재가 조회 (Last Price)
 # 함수명: get_current_last_price (신규)
@@ -209,15 +305,6 @@ def get_current_last_price(market: str, market_code: str) -> float:
     """
     symbol = market.strip().upper()
 
-    url = BASE + PATH_PRICE
-
-    headers = {
-        "Content-Type": "application/json; charset=utf-8",
-        "authorization": f"Bearer {_get_token()}",
-        "cont_yn": "N",
-        "cont_key": "",
-    }
-
     body = {
         "In": {
             "InputIscd1": symbol,
@@ -226,10 +313,9 @@ def get_current_last_price(market: str, market_code: str) -> float:
     }
 
     try:
-        res = requests.post(url, headers=headers, data=json.dumps(body))
+        res = _post(PATH_PRICE, body)
         res.raise_for_status()
         data = res.json()
-        time.sleep(0.2)
     except Exception as e:
         raise RuntimeError(f"❌ [DB] 해외주식 현재가 조회 실패: {e}")
 
@@ -246,12 +332,58 @@ def get_current_last_price(market: str, market_code: str) -> float:
 
 
 # ================================================
-# 🇺🇸 DB증권 해외주식 호가조회
-# 함수명은 반드시 get_current_ask_price 유지 (KIS 호환)
+# 🇺🇸 DB증권 해외주식 호가 스냅샷 (공용)
+# - 매수호가/매도호가/스프레드/개장여부 모두 이 스냅샷을 공유
+# - 같은 틱 안에서는 종목당 orderbook 1회만 호출
 # ================================================
 
 PATH_ORDERBOOK = "/api/v1/quote/overseas-stock/inquiry/orderbook"
 
+_quote_cache = QuoteCache()
+
+
+def orderbook_body(symbol: str, market_code: str) -> dict:
+    return {
+        "In": {
+            "InputCondMrktDivCode": market_code,
+            "InputIscd1": symbol,
+        }
+    }
+
+
+def _fetch_orderbook(symbol: str, market_code: str) -> dict:
+    res = _post(PATH_ORDERBOOK, orderbook_body(symbol, market_code))
+    res.raise_for_status()
+    return res.json()
+
+
+def get_orderbook(market: str, market_code: str) -> dict:
+    """
+    호가조회 응답 전체(Out 포함)를 반환
+    - QUOTE_CACHE_TTL 이내 재호출 시 캐시된 스냅샷 사용
+    """
+    symbol = market.strip().upper()
+    return _quote_cache.get_or_load(
+        symbol, market_code,
+        lambda: _fetch_orderbook(symbol, market_code),
+    )
+
+
+def prime_orderbook(market: str, market_code: str, data: dict):
+    """미리 받아 둔 호가 응답을 캐시에 저장 (같은 틱의 get_orderbook이 재사용)"""
+    _quote_cache.put(market.strip().upper(), market_code, data)
+
+
+def get_quote_cache_stats() -> dict:
+    """호가 캐시 hit/miss 통계"""
+    return _quote_cache.stats()
+
+
+# ================================================
+# 🇺🇸 DB증권 해외주식 호가조회
+# 함수명은 반드시 get_current_ask_price 유지 (KIS 호환)
+# ================================================
+
 def get_current_ask_price(market: str, market_code: str) -> float:
     """
     DB증권 해외주식 호가조회 (KIS 동일 함수명)
@@ -259,35 +391,13 @@ def get_current_ask_price(market: str, market_code: str) -> float:
     - 매도호가1(Askp1)을 현재가로 사용
     """
 
-    symbol = market.strip().upper()
-
     # 심볼 → 거래시장 분류 필요
     # NYSE = FY
     # NASDAQ = FN
     # AMEX = FA
     # 기본은 나스닥(FN)로 설정 (KIS 기본 NAS)
-    url = BASE + PATH_ORDERBOOK
-
-    headers = {
-        "Content-Type": "application/json; charset=utf-8",
-        "authorization": f"Bearer {_get_token()}",
-        "cont_yn": "N",
-        "cont_key": "",
-    }
-
-    body = {
-        "In": {
-            "InputCondMrktDivCode": market_code,
-            "InputIscd1": symbol,
-        }
-    }
-
     try:
-        res = requests.post(url, headers=headers, data=json.dumps(body))
-        res.raise_for_status()
-        data = res.json()
-        time.sleep(0.2)
-
+        data = get_orderbook(market, market_code)
     except Exception as e:
         raise RuntimeError(f"❌ [DB] 해외주식 호가 조회 실패: {e}")
 
@@ -311,8 +421,6 @@ def get_current_ask_price(market: str, market_code: str) -> float:
 # 함수명: get_current_bid_price
 # ================================================
 
-PATH_ORDERBOOK = "/api/v1/quote/overseas-stock/inquiry/orderbook"
-
 def get_current_bid_price(market: str, market_code: str) -> float:
     """
     DB증권 해외주식 호가조회
@@ -320,28 +428,8 @@ def get_current_bid_price(market: str, market_code: str) -> float:
     - 시장 참여자들이 실제로 사려는 가격을 기준으로 판단하기 위함
     """
 
-    symbol = market.strip().upper()
-    url = BASE + PATH_ORDERBOOK
-
-    headers = {
-        "Content-Type": "application/json; charset=utf-8",
-        "authorization": f"Bearer {_get_token()}",
-        "cont_yn": "N",
-        "cont_key": "",
-    }
-
-    body = {
-        "In": {
-            "InputCondMrktDivCode": market_code,
-            "InputIscd1": symbol,
-        }
-    }
-
     try:
-        res = requests.post(url, headers=headers, data=json.dumps(body))
-        res.raise_for_status()
-        data = res.json()
-        time.sleep(0.2)
+        data = get_orderbook(market, market_code)
     except Exception as e:
         raise RuntimeError(f"❌ [DB] 해외주식 호가 조회 실패: {e}")
 
@@ -401,15 +489,6 @@ def send_order(market: str, side: str, ord_type: str,
 
     qty = float(volume)
 
-    url = BASE + PATH_ORDER
-
-    headers = {
-        "Content-Type": "application/json; charset=utf-8",
-        "authorization": f"Bearer {_get_token()}",
-        "cont_yn": "N",
-        "cont_key": "",
-    }
-
     body = {
         "In": {
             "AstkIsuNo": symbol,
@@ -424,14 +503,17 @@ def send_order(market: str, side: str, ord_type: str,
     }
 
     try:
-        res = requests.post(url, headers=headers, data=json.dumps(body))
+        res = _post(PATH_ORDER, body)
         res.raise_for_status()
         data = res.json()
-        time.sleep(0.2)
 
     except Exception as e:
         raise RuntimeError(f"❌ [DB] 해외주식 주문 실패: {e}")
 
+    # 신규 주문 → 체결/미체결 / 잔고 스냅샷 갱신 필요
+    _order_history.invalidate()
+    invalidate_accounts()
+
     out = data.get("Out") or {}
     uuid = str(out.get("OrdNo"))
 
@@ -457,15 +539,6 @@ def cancel_orders_by_uuids(uuid_list: list, market: str) -> dict:
     - KIS와 동일한 반환 구조 유지
     """
 
-    url = BASE + PATH_ORDER  # 주문 API와 동일
-
-    headers = {
-        "Content-Type": "application/json; charset=utf-8",
-        "authorization": f"Bearer {_get_token()}",
-        "cont_yn": "N",
-        "cont_key": "",
-    }
-
     success_list = []
     fail_list = []
 
@@ -486,10 +559,9 @@ def cancel_orders_by_uuids(uuid_list: list, market: str) -> dict:
         }
 
         try:
-            res = requests.post(url, headers=headers, data=json.dumps(body))
+            res = _post(PATH_ORDER, body)
             res.raise_for_status()
             data = res.json()
-            time.sleep(0.2)
 
             if data.get("Out", {}).get("OrdNo") in (None, "", 0):
                 fail_list.append({
@@ -503,6 +575,18 @@ def cancel_orders_by_uuids(uuid_list: list, market: str) -> dict:
         except Exception as e:
             fail_list.append({"uuid": uuid, "error": str(e)})
 
+    if success_list:
+        _order_history.mark_cancelled([item["uuid"] for item in success_list], market)
+        _order_history.invalidate()
+        invalidate_accounts()
+        # 취소 API는 매수/매도 구분 없이 주문번호만 받음 → side="any"
+        count_order("any", "cancelled", len(success_list))
+
+    # 브로커가 거부한 취소(정정취소 불가 등) → 추적기 미체결 스냅샷에서 제외
+    rejected = [item["uuid"] for item in fail_list if item.get("rsp_cd")]
+    if rejected:
+        _order_history.mark_not_open(rejected)
+
     return {
         "success": success_list,
         "failed": fail_list
@@ -517,35 +601,35 @@ def cancel_orders_by_uuids(uuid_list: list, market: str) -> dict:
 PATH_EXECUTION = "/api/v1/trading/overseas-stock/inquiry/transaction-history"
 
 
-def get_order_results_by_uuids(uuid_list: list, market: str) -> dict:
+def _fetch_transaction_history(open_only: bool = False, symbol: str = "", executed_only: bool = False) -> tuple:
     """
-    DB증권 체결/미체결 전체 내역 조회 + uuid 매칭
-    CAZCQ00100 : 해외주식 체결/미체결 조회 API 사용
+    DB증권 체결/미체결 내역 조회 (CAZCQ00100)
+    - symbol="" → 계좌 전체, 지정 시 해당 종목만 (AstkIsuNo)
+    - open_only=True → 미체결만 (OrdxctTpCode=2)
+    - executed_only=True → 체결분만 (OrdxctTpCode=1)
+    - 둘 다 False → 체결+미체결 전체 (OrdxctTpCode=0)
+    - 조회 기간은 어제~오늘 (미국장은 한국 시간 자정을 넘기므로 전일 주문 포함)
+    - cont_yn/cont_key 연속조회로 모든 페이지 수집
+    반환: (row 리스트, 응답 바이트 수)
     """
-
-    url = BASE + PATH_EXECUTION  # 동일 endpoint 사용 (CAZCQ00100)
     today = time.strftime("%Y%m%d")
     yesterday = time.strftime("%Y%m%d", time.localtime(time.time() - 86400))
 
+    ordxct = "2" if open_only else ("1" if executed_only else "0")
+
     all_rows = []
+    nbytes = 0
     cont_yn = "N"
     cont_key = ""
 
     while True:
-        headers = {
-            "Content-Type": "application/json; charset=utf-8",
-            "authorization": f"Bearer {_get_token()}",
-            "cont_yn": cont_yn,
-            "cont_key": cont_key,
-        }
-
         body = {
             "In": {
                 "QrySrtDt": yesterday,
                 "QryEndDt": today,
-                "AstkIsuNo": market.upper(),
+                "AstkIsuNo": symbol.strip().upper(),  # "" = 전체 종목
                 "AstkBnsTpCode": "0",   # 전체
-                "OrdxctTpCode": "0",    # 체결 + 미체결 전체
+                "OrdxctTpCode": ordxct,  # 0=전체, 1=체결, 2=미체결
                 "StnlnTpCode": "1",
                 "QryTpCode": "1",
                 "OnlineYn": "0",
@@ -555,152 +639,63 @@ def get_order_results_by_uuids(uuid_list: list, market: str) -> dict:
         }
 
         try:
-            res = requests.post(url, headers=headers, data=json.dumps(body))
+            res = _post(PATH_EXECUTION, body, cont_yn=cont_yn, cont_key=cont_key)
             res.raise_for_status()
             data = res.json()
-            time.sleep(0.2)
         except Exception as e:
             raise RuntimeError(f"❌ DB 체결/미체결 조회 실패: {e}")
 
+        nbytes += len(res.content or b"")
         rows = data.get("Out") or []
         all_rows.extend(rows)
 
-        header_cont_yn = res.headers.get("cont_yn", "N")
-        next_key = res.headers.get("cont_key", "")
-
-        if header_cont_yn != "Y":
+        if res.headers.get("cont_yn", "N") != "Y":
             break
 
         cont_yn = "Y"
-        cont_key = next_key
-
-    # ================================================
-    # uuid → 주문 데이터 매핑
-    # ================================================
-    execution_map = {str(r["OrdNo"]): r for r in all_rows if r.get("OrdNo")}
-
-    result = {}
-
-    for uuid in uuid_list:
-        u = str(uuid).strip()
-
-        if u not in execution_map:
-            result[u] = "wait"
-            continue
-
-        row = execution_map[u]
-        stat = str(row.get("AstkOrdStatCode", "")).strip()
-
-        qty = float(row.get("AstkOrdQty", 0))  # 총 주문량
-        exec_qty = float(row.get("AstkExecQty", 0))  # 체결량
-        rm_qty = float(row.get("AstkOrdRmqty", 0))  # 잔량
-
-        # ================================
-        # 상태 판별
-        # ================================
-        if stat == "7":
-            result[u] = "done"
-        elif stat == "6":
-            result[u] = "cancel"
-        else:
-            # 체결 없음 + 잔량 있음 → 미체결
-            if exec_qty == 0 and rm_qty > 0:
-                result[u] = "wait"
-            # 부분체결 → wait
-            elif 0 < exec_qty < qty:
-                result[u] = "wait"
-            else:
-                result[u] = "wait"
-
-    return result
-
-
-def get_all_open_buy_orders(market: str) -> dict:
-    """
-    market의 전체 주문(체결/미체결)을 조회한 뒤,
-    미체결(wait) 상태의 uuid만 반환하는 함수.
-    반환 예시: {"12345": "wait", "12346": "wait"}
-    """
-
-    url = BASE + PATH_EXECUTION
-    today = time.strftime("%Y%m%d")
-    yesterday = time.strftime("%Y%m%d", time.localtime(time.time() - 86400))
+        cont_key = res.headers.get("cont_key", "")
 
-    all_rows = []
-    cont_yn = "N"
-    cont_key = ""
+    return all_rows, nbytes
 
-    while True:
-        headers = {
-            "Content-Type": "application/json; charset=utf-8",
-            "authorization": f"Bearer {_get_token()}",
-            "cont_yn": cont_yn,
-            "cont_key": cont_key,
-        }
 
-        body = {
-            "In": {
-                "QrySrtDt": yesterday,
-                "QryEndDt": today,
-                "AstkIsuNo": market.upper(),  # 특정 종목만 조회
-                "AstkBnsTpCode": "0",         # 전체
-                "OrdxctTpCode": "0",          # 체결 + 미체결
-                "StnlnTpCode": "1",
-                "QryTpCode": "1",
-                "OnlineYn": "0",
-                "CvrgOrdYn": "0",
-                "WonFcurrTpCode": "2",
-            }
-        }
+_order_history = OrderHistoryTracker(_fetch_transaction_history)
 
-        res = requests.post(url, headers=headers, data=json.dumps(body))
-        time.sleep(0.2)
-        res.raise_for_status()
-        data = res.json()
-        rows = data.get("Out") or []
-        all_rows.extend(rows)
 
-        if res.headers.get("cont_yn", "N") != "Y":
-            break
+def set_order_history_throttle(throttle):
+    """체결/미체결 추적기 갱신 제한 연결 (manager.poll_scheduler.install_history_throttle)"""
+    _order_history.set_throttle(throttle)
 
-        cont_yn = "Y"
-        cont_key = res.headers.get("cont_key", "")
 
-    # 주문 상태 매핑
-    uuid_map = {}
+def invalidate_order_history():
+    """다음 상태 조회 때 체결/미체결 내역을 새로 받도록 스냅샷 무효화"""
+    _order_history.invalidate()
 
-    for row in all_rows:
-        uuid = str(row.get("OrdNo", "")).strip()
-        if not uuid:
-            continue
 
-        qty = float(row.get("AstkOrdQty", 0))
-        exec_qty = float(row.get("AstkExecQty", 0))
-        rm_qty = float(row.get("AstkOrdRmqty", 0))
-        stat = str(row.get("AstkOrdStatCode", "")).strip()
+def refresh_order_history(force: bool = False):
+    """체결/미체결 스냅샷 선갱신 (TTL 이내면 재조회 안 함)"""
+    _order_history.refresh(force=force)
 
-        # 상태 계산
-        if stat == "7":
-            state = "done"
-        elif stat == "6":
-            state = "cancel"
-        else:
-            # 체결 없음 + 잔량 있음 → 미체결
-            if exec_qty == 0 and rm_qty > 0:
-                state = "wait"
-            # 부분체결도 미체결로 간주
-            elif 0 < exec_qty < qty:
-                state = "wait"
-            else:
-                state = "wait"
 
-        uuid_map[uuid] = state
+def get_order_history_stats() -> dict:
+    return _order_history.stats()
 
-    # wait 상태만 반환
-    return {u: s for u, s in uuid_map.items() if s == "wait"}
 
+def get_order_results_by_uuids(uuid_list: list, market: str) -> dict:
+    """
+    DB증권 체결/미체결 내역 + uuid 매칭
+    - 계좌 전체 증분 추적기에서 상태를 찾음 (틱당 미체결 목록 1회 조회)
+    - 스냅샷에 없는 uuid는 market 종목 내역만 재확인
+    """
+    return _order_history.states_for(uuid_list, market)
 
 
+def get_all_open_buy_orders(market: str) -> dict:
+    """
+    market의 미체결(wait) 상태 uuid만 반환하는 함수.
+    - 계좌 전체 증분 추적기의 미체결 목록에서 종목 기준으로 추림
+    반환 예시: {"12345": "wait", "12346": "wait"}
+    """
+    return _order_history.open_orders(market)
 
 
 # api/db_usstocks.py
@@ -719,10 +714,10 @@ def cancel_and_new_order(prev_order_uuid: str, market: str, price: float, quanti
     # -------------------------------------------
     last_price = _last_order_price.get(market)
     if last_price and abs(last_price - price) < 0.0000001:
-        print(f"🚫 [cancel_and_new_order] 동일 가격 정정 차단 → {price}")
+        log.info(f"🚫 [cancel_and_new_order] 동일 가격 정정 차단 → {price}")
         return {"new_order_uuid": None, "raw": None}
 
-    print(f"[cancel_and_new_order] 기존 주문 취소 → 신규 주문 실행 (market={market}, price={price})")
+    log.info(f"[cancel_and_new_order] 기존 주문 취소 → 신규 주문 실행 (market={market}, price={price})")
 
     # -------------------------------------------
     # 3) 취소 후 딜레이
@@ -761,30 +756,11 @@ def is_us_market_open(market: str, exchange: str = "FN") -> bool:
     - Askp1 또는 Bidp1이 없으면 시장 비개장으로 판단
     """
 
-    url = f"{BASE}/api/v1/quote/overseas-stock/inquiry/orderbook"
-
-    headers = {
-        "Content-Type": "application/json; charset=utf-8",
-        "authorization": f"Bearer {_get_token()}",
-        "cont_yn": "N",
-        "cont_key": "",
-    }
-
-    body = {
-        "In": {
-            "InputIscd1": market.upper(),      # 예: TQQQ
-            "InputCondMrktDivCode": exchange,  # FN=나스닥, FY=뉴욕, FA=아멕스
-        }
-    }
-
     try:
-        res = requests.post(url, headers=headers, data=json.dumps(body))
-        res.raise_for_status()
-        data = res.json()
-        time.sleep(0.2)
-
+        # exchange: FN=나스닥, FY=뉴욕, FA=아멕스
+        data = get_orderbook(market, exchange)
     except Exception as e:
-        print(f"❌ [is_us_market_open] API 오류 → 시장 닫힘 간주: {e}")
+        log.error(f"❌ [is_us_market_open] API 오류 → 시장 닫힘 간주: {e}")
         return False
 
     out = data.get("Out") or {}
@@ -809,27 +785,7 @@ def is_us_market_open(market: str, exchange: str = "FN") -> bool:
 # api/db_usstocks.py 안
 
 def get_bid_ask(market: str, market_code: str) -> tuple[float, float]:
-    symbol = market.strip().upper()
-    url = BASE + PATH_ORDERBOOK
-
-    headers = {
-        "Content-Type": "application/json; charset=utf-8",
-        "authorization": f"Bearer {_get_token()}",
-        "cont_yn": "N",
-        "cont_key": "",
-    }
-
-    body = {
-        "In": {
-            "InputCondMrktDivCode": market_code,
-            "InputIscd1": symbol,
-        }
-    }
-
-    res = requests.post(url, headers=headers, data=json.dumps(body))
-    res.raise_for_status()
-    data = res.json()
-    time.sleep(0.2)
+    data = get_orderbook(market, market_code)
 
     out = data.get("Out") or {}
     bid = out.get("Bidp1")
@@ -841,6 +797,25 @@ def get_bid_ask(market: str, market_code: str) -> tuple[float, float]:
     return float(bid), float(ask)
 
 
+def peek_bid_ask(market: str, market_code: str):
+    """
+    이번 틱에 이미 받아 둔 호가 스냅샷의 (bid, ask) – 네트워크 조회 없음
+    스냅샷이 없거나 호가가 비어 있으면 None
+    """
+    data = _quote_cache.peek(market.strip().upper(), market_code)
+    if not data:
+        return None
+
+    out = data.get("Out") or {}
+    try:
+        bid, ask = float(out.get("Bidp1") or 0), float(out.get("Askp1") or 0)
+    except (TypeError, ValueError):
+        return None
+    if bid <= 0 or ask <= 0:
+        return None
+    return bid, ask
+
+
 def is_spread_too_wide(market: str, market_code: str,
                        max_spread_pct: float = 0.04) -> tuple[bool, float, float, float]:
     """
@@ -848,28 +823,28 @@ def is_spread_too_wide(market: str, market_code: str,
     - max_spread_pct: 0.05 → 5%
     반환: (너무넓음 여부, spread_pct, bid, ask)
     """
-    print(f"\n[spread-check] ▶ {market} / market_code={market_code}")
+    log.info(f"[spread-check] ▶ {market} / market_code={market_code}")
 
     bid, ask = get_bid_ask(market, market_code)
-    print(f" - bid: {bid}, ask: {ask}")
+    log.info(f" - bid: {bid}, ask: {ask}")
 
     if not bid or not ask or bid in ("", "0", 0, None) or ask in ("", "0", 0, None):
-        print(" ❗ 비정상 호가응답 → 스프레드 체크 불가")
+        log.info(" ❗ 비정상 호가응답 → 스프레드 체크 불가")
         return True, 1.0, bid, ask  # 비정상 응답 시 '너무 넓음' 처리로 방어
 
     mid = (bid + ask) / 2
     spread_pct = (ask - bid) / mid if mid > 0 else 1.0
 
-    print(f" - mid price: {mid:.4f}")
-    print(f" - spread: {ask - bid:.4f} ({spread_pct * 100:.2f}%)")
-    print(f" - threshold: {max_spread_pct * 100:.2f}%")
+    log.info(f" - mid price: {mid:.4f}")
+    log.info(f" - spread: {ask - bid:.4f} ({spread_pct * 100:.2f}%)")
+    log.info(f" - threshold: {max_spread_pct * 100:.2f}%")
 
     is_wide = spread_pct >= max_spread_pct
 
     if is_wide:
-        print(" 🚫 스프레드 너무 큼 → 거래 중단")
+        log.info(" 🚫 스프레드 너무 큼 → 거래 중단")
     else:
-        print(" 🟢 스프레드 정상 → 거래 가능")
+        log.info(" 🟢 스프레드 정상 → 거래 가능")
 
     return is_wide, spread_pct, bid, ask
 
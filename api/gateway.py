@@ -0,0 +1,96 @@
+# api/gateway.py
+
+import time
+import asyncio
+import threading
+
+from api.rate_limiter import get_rate_limiter
+from utils.instrumentation import record_call
+
+
+class BrokerGateway:
+    """
+    스레드 공용 증권사 게이트웨이
+    - HTTP 세션(HttpClient) / rate limiter / 접근 토큰을 한 곳에서 소유
+    - 종목별 워커 스레드가 동시에 호출해도 안전
+      · 토큰 발급/재발급은 락으로 1회만 (동시에 만료돼도 중복 발급 X)
+      · 호출 속도는 계열별 토큰 버킷으로 공정하게 분배
+      · 커넥션 수는 세션 풀(pool_maxsize, pool_block)로 제한
+    """
+
+    def __init__(self, client, token_loader, family_of, limiter=None):
+        self._client = client
+        self._token_loader = token_loader
+        self._family_of = family_of
+        self._limiter = limiter
+
+        self._token_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+
+    @property
+    def limiter(self):
+        return self._limiter or get_rate_limiter()
+
+    def token(self, force: bool = False) -> str:
+        with self._token_lock:
+            return self._token_loader(force)
+
+    def _enter(self) -> float:
+        with self._lock:
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        return time.perf_counter()
+
+    def _exit(self, path: str, start: float, ok: bool):
+        # 엔드포인트별 지연 + 현재 단계의 호출 수 (rate-limit 대기 제외)
+        record_call(path, (time.perf_counter() - start) * 1000, ok)
+        with self._lock:
+            self._in_flight -= 1
+
+    def post(self, path: str, body: dict = None, headers: dict = None):
+        """인증 헤더 갱신 → 계열별 rate-limit 대기 → 공용 세션으로 POST"""
+        self._client.set_bearer_token(self.token())
+        self.limiter.acquire(self._family_of(path))
+
+        start = self._enter()
+        ok = False
+        try:
+            res = self._client.post(path, body, headers=headers)
+            ok = res.status_code < 400
+            return res
+        finally:
+            self._exit(path, start, ok)
+
+    async def post_async(self, path: str, send):
+        """
+        비동기 HTTP(aiohttp) 경로 – 토큰 / rate-limit / 동시 호출 수 / 계측은 post()와 공용
+        - 토큰 발급(동기 HTTP + 락)은 워커 스레드에서
+        - rate-limit 대기는 asyncio.sleep (이벤트 루프를 막지 않음)
+        send: async (token) -> 응답 (status_code 속성)
+        """
+        token = await asyncio.to_thread(self.token)
+        wait = self.limiter.reserve(self._family_of(path))
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        start = self._enter()
+        ok = False
+        try:
+            res = await send(token)
+            ok = res.status_code < 400
+            return res
+        finally:
+            self._exit(path, start, ok)
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+            peak = self._peak_in_flight
+        return {
+            "in_flight": in_flight,
+            "peak_in_flight": peak,
+            "connection": self._client.connection_stats(),
+            "rate_limit": self.limiter.stats(),
+        }
@@ -0,0 +1,182 @@
+# api/http_client.py
+
+import os
+import time
+import json
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ==========================================
+# 환경 변수 (커넥션 풀 / 타임아웃)
+# ==========================================
+HTTP_CONNECT_TIMEOUT = float(os.getenv("DB_HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_READ_TIMEOUT = float(os.getenv("DB_HTTP_READ_TIMEOUT", "10"))
+
+# 호스트 풀 개수 / 호스트당 최대 커넥션 수
+HTTP_POOL_CONNECTIONS = int(os.getenv("DB_HTTP_POOL_CONNECTIONS", "4"))
+HTTP_POOL_MAXSIZE = int(os.getenv("DB_HTTP_POOL_MAXSIZE", "8"))
+
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json; charset=utf-8",
+    "cont_yn": "N",
+    "cont_key": "",
+}
+
+
+class _ConnectionCounter:
+    """
+    urllib3 커넥션 풀에서 '새 커넥션 생성' 횟수를 센다.
+    - 전체 요청 수 - 새 커넥션 수 = keep-alive 재사용 횟수
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.new_connections = 0
+
+    def incr(self):
+        with self._lock:
+            self.new_connections += 1
+
+
+class _CountingAdapter(HTTPAdapter):
+    """
+    호스트별 커넥션 수 제한(pool_maxsize) + 신규 커넥션 카운트용 어댑터
+    """
+
+    def __init__(self, counter: _ConnectionCounter, **kwargs):
+        self._counter = counter
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        counter = self._counter
+
+        class _CountingHTTPPool(HTTPConnectionPool):
+            def _new_conn(self):
+                counter.incr()
+                return super()._new_conn()
+
+        class _CountingHTTPSPool(HTTPSConnectionPool):
+            def _new_conn(self):
+                counter.incr()
+                return super()._new_conn()
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPPool,
+            "https": _CountingHTTPSPool,
+        }
+
+
+class HttpClient:
+    """
+    증권사 REST API 공용 HTTP 클라이언트
+    - requests.Session 하나를 프로세스 전체에서 재사용 (TCP/TLS keep-alive)
+    - 호스트당 커넥션 수 제한 + 기본 타임아웃
+    - 기본 헤더(Content-Type, authorization 등)는 세션에 캐싱
+    """
+
+    def __init__(self, base_url: str,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+                 read_timeout: float = HTTP_READ_TIMEOUT,
+                 pool_connections: int = HTTP_POOL_CONNECTIONS,
+                 pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                 default_headers: dict = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+
+        self._counter = _ConnectionCounter()
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._latency_total = 0.0
+        self._bearer_token = None
+
+        self.session = requests.Session()
+        adapter = _CountingAdapter(
+            self._counter,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,  # 호스트당 커넥션 상한 초과 시 대기
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(default_headers or DEFAULT_HEADERS)
+
+    # ------------------------------------------
+    # 인증 헤더 캐싱
+    # ------------------------------------------
+    def set_bearer_token(self, token: str):
+        """토큰이 바뀐 경우에만 세션 기본 헤더 갱신"""
+        if token and token != self._bearer_token:
+            self.session.headers["authorization"] = f"Bearer {token}"
+            self._bearer_token = token
+
+    # ------------------------------------------
+    # 요청
+    # ------------------------------------------
+    def post(self, path: str, body: dict = None, *, data=None,
+             headers: dict = None, timeout=None) -> requests.Response:
+        """
+        POST 요청
+        - body(dict)는 JSON 직렬화해서 전송
+        - data는 그대로 전송 (form 등)
+        - headers는 세션 기본 헤더 위에 덮어씀 (None 값이면 해당 헤더 제거)
+        """
+        url = self.base_url + path
+        payload = json.dumps(body) if body is not None else data
+
+        start = time.perf_counter()
+        try:
+            res = self.session.post(
+                url,
+                headers=headers,
+                data=payload,
+                timeout=timeout or self.timeout,
+            )
+        except Exception:
+            with self._lock:
+                self._requests += 1
+                self._errors += 1
+            raise
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._requests += 1
+            self._latency_total += elapsed
+            if res.status_code >= 400:
+                self._errors += 1
+
+        return res
+
+    # ------------------------------------------
+    # 통계
+    # ------------------------------------------
+    def connection_stats(self) -> dict:
+        """
+        커넥션 재사용 통계
+        반환 예: {"requests": 120, "new_connections": 2, "reused_connections": 118, ...}
+        """
+        with self._lock:
+            requests_cnt = self._requests
+            errors = self._errors
+            latency_total = self._latency_total
+
+        new_conn = self._counter.new_connections
+        reused = max(requests_cnt - new_conn, 0)
+
+        return {
+            "requests": requests_cnt,
+            "errors": errors,
+            "new_connections": new_conn,
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / requests_cnt, 4) if requests_cnt else 0.0,
+            "avg_latency_ms": round(latency_total / requests_cnt * 1000, 2) if requests_cnt else 0.0,
+        }
+
+    def close(self):
+        self.session.close()
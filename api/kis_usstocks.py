@@ -5,6 +5,7 @@ Binance API 대체 호환 버전으로 프로젝트 내 시그니처 동일.
 """
 
 import os
+import copy
 import time
 import math
 import json
@@ -15,6 +16,11 @@ import pytz
 from dotenv import load_dotenv
 
 from utils.kis_utils import normalize_uuid
+from api.single_flight import SingleFlight
+from utils.instrumentation import record_call
+from utils.logger import get_logger
+
+log = get_logger(__name__)
 
 load_dotenv()  # ✅ .env 파일 자동 로드
 
@@ -108,7 +114,7 @@ def _get_token(force: bool = False) -> str:
         if saved_token and _now() < saved_exp - 120:
             _TOKEN = saved_token
             _TOKEN_EXPIRES_AT = saved_exp
-            print("🔑 [KIS] 저장된 토큰 불러오기 성공")
+            log.info("🔑 [KIS] 저장된 토큰 불러오기 성공")
             return _TOKEN
 
     # 2) 메모리 캐싱 체크
@@ -132,7 +138,7 @@ def _get_token(force: bool = False) -> str:
 
     # 4) 파일에도 저장
     save_token(_TOKEN, _TOKEN_EXPIRES_AT)
-    print(f"🔑 [KIS] 토큰 새로 발급 + 파일 저장 완료 (유효 {expires_in/3600:.1f}시간)")
+    log.info(f"🔑 [KIS] 토큰 새로 발급 + 파일 저장 완료 (유효 {expires_in/3600:.1f}시간)")
 
     return _TOKEN
 
@@ -158,28 +164,56 @@ def _request(method: str, path: str, *, params=None, json=None, tr_id: Optional[
     return _send_request(method, url, headers=headers, params=params, data=json)
 
 
+# 동시 중복 GET 조회 합치기 (대기자는 응답 dict 복사본을 받음)
+_single_flight = SingleFlight(share=copy.deepcopy)
+
+
+def get_single_flight_stats() -> dict:
+    return _single_flight.stats()
+
+
 def _send_request(method, url, headers=None, params=None, data=None, retry=True):
+    """
+    공용 요청
+    - GET(조회)은 동시에 들어온 같은 요청(url + params + tr_id)을 1회 호출로 합침
+    - 주문(POST)은 항상 개별 호출
+    """
+    if str(method).upper() != "GET":
+        return _send_request_once(method, url, headers=headers, params=params, data=data, retry=retry)
+
+    tr_id = (headers or {}).get("tr_id", "")
+    key = _single_flight.make_key(method.upper(), url, tr_id, params or {}, data or {})
+    return _single_flight.do(
+        key,
+        lambda: _send_request_once(method, url, headers=headers, params=params, data=data, retry=retry),
+        "inquiry",
+    )
+
+
+def _send_request_once(method, url, headers=None, params=None, data=None, retry=True):
     try:
+        start = time.perf_counter()
         response = requests.request(method, url, headers=headers, params=params, data=data, timeout=10)
+        record_call(url.replace(BASE, ""), (time.perf_counter() - start) * 1000, response.status_code < 400)
         response.raise_for_status()
         data = response.json()
     except requests.exceptions.RequestException as e:
         # ✅ 네트워크 오류 시 5초 후 재시도 1회
         if retry:
-            print(f"⚠️ [KIS] 네트워크 예외 발생, 5초 후 재시도: {e}")
+            log.warning(f"⚠️ [KIS] 네트워크 예외 발생, 5초 후 재시도: {e}")
             time.sleep(5)
-            return _send_request(method, url, headers=headers, params=params, data=data, retry=False)
+            return _send_request_once(method, url, headers=headers, params=params, data=data, retry=False)
         else:
             raise RuntimeError(f"[KIS] 네트워크 요청 실패: {e}")
 
     # ✅ 토큰 만료 감지
     msg_code = str(data.get("msg_cd", "")).upper()
     if msg_code in ("EGW00123", "EGW00115", "EGW00114") or "INVALID TOKEN" in str(data).upper():
-        print("🔄 [KIS] 액세스 토큰 만료 감지 → 자동 재발급 시도")
+        log.info("🔄 [KIS] 액세스 토큰 만료 감지 → 자동 재발급 시도")
         if retry:
             _get_token(force=True)
             headers["authorization"] = f"Bearer {_TOKEN}"
-            return _send_request(method, url, headers=headers, params=params, data=data, retry=False)
+            return _send_request_once(method, url, headers=headers, params=params, data=data, retry=False)
         else:
             raise RuntimeError("❌ [KIS] 토큰 재발급 실패 (2회 연속)")
 
@@ -238,7 +272,7 @@ def get_current_ask_price(market: str) -> float:
         price = float(last_price)
         return price
     except Exception as e:
-        print(f"❌ [DEBUG][PRICE] price parse 실패: {e}")
+        log.debug(f"❌ [DEBUG][PRICE] price parse 실패: {e}")
         raise MarketClosedError(f"quote parse failed: {data}")
 
 
@@ -601,7 +635,7 @@ def is_us_market_open(symbol="AAPL", exchange="NAS"):
             tr_id=TRID_PRICE_DETAIL
         )
     except Exception as e:
-        print(f"[is_us_market_open] API 조회 실패 → 시장 닫힘으로 간주: {e}")
+        log.warning(f"[is_us_market_open] API 조회 실패 → 시장 닫힘으로 간주: {e}")
         return False
 
     output = data.get("output") or {}
@@ -613,18 +647,18 @@ def is_us_market_open(symbol="AAPL", exchange="NAS"):
 
     # 장이 완전히 닫혀 있으면 last/volume이 공백 또는 0
     if not last or last in ("", "0", 0, None):
-        print("🔴 last 없음 또는 0 → 시장 비개장")
+        log.info("🔴 last 없음 또는 0 → 시장 비개장")
         return False
 
     # 프리/애프터에서 거래량이 거의 없을 수도 있으나 last는 존재함
     try:
         last_f = float(last)
     except:
-        print("🔴 last 파싱 불가 → 시장 비개장")
+        log.info("🔴 last 파싱 불가 → 시장 비개장")
         return False
 
     # 정상적인 가격이 들어오면 개장으로 판단
-    print(f"🟢 미국 시장 개장 감지 (last={last_f})")
+    log.info(f"🟢 미국 시장 개장 감지 (last={last_f})")
     return True
 
 
@@ -0,0 +1,589 @@
+# api/mock_broker.py
+
+import os
+import json
+import math
+import time
+import random
+import threading
+from urllib.parse import parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from dotenv import load_dotenv
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+load_dotenv()
+
+# ==========================================
+# 환경 변수 (모의 DB증권 서버)
+# ==========================================
+MOCK_BROKER_HOST = os.getenv("MOCK_BROKER_HOST", "127.0.0.1")
+MOCK_BROKER_PORT = int(os.getenv("MOCK_BROKER_PORT", "18443"))
+
+# 응답 지연 = 기본 지연 + [0, jitter] 균등분포 (ms)
+MOCK_LATENCY_MS = float(os.getenv("MOCK_LATENCY_MS", "20"))
+MOCK_JITTER_MS = float(os.getenv("MOCK_JITTER_MS", "10"))
+
+# 계열별(quote/order/inquiry) 초당 허용 호출 수 – 초과 시 429 거절 (0 = 제한 없음)
+MOCK_RATE_LIMIT_PER_SEC = float(os.getenv("MOCK_RATE_LIMIT_PER_SEC", "0"))
+
+# 가격 모델: 실제 1초당 시뮬레이션 시간(초), 초당 변동성, 스프레드(bps)
+MOCK_TIME_SCALE = float(os.getenv("MOCK_TIME_SCALE", "1.0"))
+MOCK_VOLATILITY = float(os.getenv("MOCK_VOLATILITY", "0.0005"))
+MOCK_SPREAD_BPS = float(os.getenv("MOCK_SPREAD_BPS", "5"))
+MOCK_SEED = int(os.getenv("MOCK_SEED", "42"))
+
+# 체결/미체결 조회 1페이지 행 수 (cont_yn/cont_key 연속조회 확인용)
+MOCK_PAGE_SIZE = int(os.getenv("MOCK_PAGE_SIZE", "20"))
+
+# 서버 시작 후 N초 뒤 장마감 (0 = 계속 개장)
+MOCK_CLOSE_AFTER_SEC = float(os.getenv("MOCK_CLOSE_AFTER_SEC", "0"))
+
+# 초기 가격 "TQQQ:50,SOXL:20" (없는 종목은 100에서 시작)
+MOCK_PRICES = os.getenv("MOCK_PRICES", "")
+
+# 초기 예수금 (USD)
+MOCK_CASH = float(os.getenv("MOCK_CASH", "1000000"))
+
+
+# DB증권 응답 코드
+RSP_OK = "00000"
+RSP_MARKET_CLOSED = "2611"        # 장시작 전 또는 장마감
+RSP_AFTER_CLOSE = "3590"          # 장마감 후
+RSP_NOT_CANCELABLE = "8819"       # 정정취소 불가
+RSP_INSUFFICIENT = "2714"         # 주문가능수량/금액 부족
+RSP_RATE_LIMITED = "IGW00201"     # 초당 거래건수 초과
+RSP_UNAUTHORIZED = "IGW00121"     # 유효하지 않은 토큰
+
+# 주문 상태 코드 (order_history.row_state 기준)
+STAT_OPEN = "1"
+STAT_CANCELED = "6"
+STAT_FILLED = "7"
+
+
+def _parse_prices(spec: str) -> dict:
+    prices = {}
+    for item in spec.split(","):
+        if ":" in item:
+            symbol, price = item.split(":", 1)
+            prices[symbol.strip().upper()] = float(price)
+    return prices
+
+
+def _family(path: str) -> str:
+    """db_usstocks._path_family와 같은 계열 구분"""
+    if "/quote/" in path:
+        return "quote"
+    if path.endswith("/order"):
+        return "order"
+    return "inquiry"
+
+
+class _Symbol:
+    __slots__ = ("mid", "updated_at")
+
+    def __init__(self, mid: float, now: float):
+        self.mid = mid
+        self.updated_at = now
+
+
+class _Order:
+    __slots__ = ("ord_no", "symbol", "side", "price_code", "price", "qty",
+                 "exec_qty", "exec_price", "stat", "created_at")
+
+    def __init__(self, ord_no, symbol, side, price_code, price, qty, created_at):
+        self.ord_no = ord_no
+        self.symbol = symbol
+        self.side = side              # "2" 매수, "1" 매도
+        self.price_code = price_code  # "1" 지정가, "2" 시장가
+        self.price = price
+        self.qty = qty
+        self.exec_qty = 0.0
+        self.exec_price = 0.0
+        self.stat = STAT_OPEN
+        self.created_at = created_at
+
+    def to_row(self) -> dict:
+        return {
+            "OrdNo": self.ord_no,
+            "AstkIsuNo": self.symbol,
+            "AstkBnsTpCode": self.side,
+            "AstkOrdStatCode": self.stat,
+            "AstkOrdQty": self.qty,
+            "AstkOrdPrc": self.price,
+            "AstkExecQty": self.exec_qty,
+            "AstkExecPrc": self.exec_price,
+        }
+
+
+class MockBroker:
+    """
+    모의 DB증권 해외주식 엔진 (HTTP와 무관한 순수 로직)
+    - db_usstocks.py가 쓰는 엔드포인트를 같은 요청/응답 형식으로 처리
+      · /oauth2/token, balance-margin, orderbook, price, order(신규/취소),
+        transaction-history (cont_yn/cont_key 연속조회)
+    - 가격: 종목별 랜덤워크 (MOCK_TIME_SCALE배 빠르게 진행)
+    - 매칭: 지정가 매수는 ask ≤ 주문가, 매도는 bid ≥ 주문가가 되면 전량 체결 / 시장가는 즉시 체결
+    - 장마감: close_market() 또는 MOCK_CLOSE_AFTER_SEC → 호가 0, 주문은 2611 거절
+    - 계열별 초당 호출 수 초과 시 429 거절
+    - handle()은 (HTTP 상태코드, 응답 헤더, 응답 JSON) 반환 → HTTP 서버 / 인프로세스 어댑터 공용
+    """
+
+    def __init__(self, prices: dict = None, latency_ms: float = MOCK_LATENCY_MS,
+                 jitter_ms: float = MOCK_JITTER_MS,
+                 rate_limit_per_sec: float = MOCK_RATE_LIMIT_PER_SEC,
+                 time_scale: float = MOCK_TIME_SCALE, volatility: float = MOCK_VOLATILITY,
+                 spread_bps: float = MOCK_SPREAD_BPS, page_size: int = MOCK_PAGE_SIZE,
+                 close_after_sec: float = MOCK_CLOSE_AFTER_SEC, cash: float = MOCK_CASH,
+                 seed: int = MOCK_SEED, clock=time.monotonic):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit_per_sec = rate_limit_per_sec
+        self.time_scale = time_scale
+        self.volatility = volatility
+        self.spread_bps = spread_bps
+        self.page_size = page_size
+        self.close_after_sec = close_after_sec
+        self._clock = clock
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+
+        now = clock()
+        self._started_at = now
+        self._open = True
+        self._token = None
+        self._symbols = {s: _Symbol(p, now) for s, p in (prices or _parse_prices(MOCK_PRICES)).items()}
+        self._orders = {}           # OrdNo → _Order
+        self._positions = {}        # symbol → [qty, avg_price]
+        self.cash = cash
+        self._next_ord_no = 1000
+
+        self._buckets = {}          # family → [tokens, 갱신 시각]
+        self.counters = {"requests": 0, "rejected_rate": 0, "rejected_closed": 0,
+                         "orders": 0, "cancels": 0, "fills": 0}
+        self._by_path = {}
+
+    # ------------------------------------------
+    # 시장 상태 / 가격
+    # ------------------------------------------
+    def is_open(self) -> bool:
+        if self.close_after_sec > 0 and self._clock() - self._started_at >= self.close_after_sec:
+            return False
+        return self._open
+
+    def open_market(self):
+        with self._lock:
+            self._open = True
+            self.close_after_sec = 0
+
+    def close_market(self):
+        with self._lock:
+            self._open = False
+
+    def set_price(self, symbol: str, mid: float):
+        """테스트용: 가격 고정 이동 후 바로 매칭"""
+        with self._lock:
+            sym = self._symbol(symbol)
+            sym.mid = float(mid)
+            sym.updated_at = self._clock()
+            self._match(symbol)
+
+    def _symbol(self, symbol: str) -> _Symbol:
+        sym = self._symbols.get(symbol)
+        if sym is None:
+            sym = self._symbols[symbol] = _Symbol(100.0, self._clock())
+        return sym
+
+    def _advance(self, symbol: str):
+        """마지막 갱신 이후 경과 시간만큼 랜덤워크 진행"""
+        sym = self._symbol(symbol)
+        now = self._clock()
+        dt = (now - sym.updated_at) * self.time_scale
+        sym.updated_at = now
+        if dt > 0 and self.volatility > 0:
+            shock = self._rng.gauss(0.0, self.volatility * math.sqrt(dt))
+            sym.mid = max(0.01, sym.mid * math.exp(shock))
+        return sym
+
+    def quote(self, symbol: str) -> tuple:
+        """(bid, ask) – 센트 단위 반올림, 최소 1센트 스프레드"""
+        sym = self._symbol(symbol)
+        half = max(sym.mid * self.spread_bps / 20000, 0.005)
+        bid = math.floor((sym.mid - half) * 100) / 100
+        ask = math.ceil((sym.mid + half) * 100) / 100
+        if ask - bid < 0.01:
+            ask = bid + 0.01
+        return round(max(bid, 0.01), 2), round(ask, 2)
+
+    # ------------------------------------------
+    # 매칭
+    # ------------------------------------------
+    def _fill(self, order: _Order, price: float):
+        order.exec_qty = order.qty
+        order.exec_price = price
+        order.stat = STAT_FILLED
+
+        qty, avg = self._positions.get(order.symbol, [0.0, 0.0])
+        if order.side == "2":
+            new_qty = qty + order.qty
+            avg = (qty * avg + order.qty * price) / new_qty if new_qty else 0.0
+            self.cash -= order.qty * price
+        else:
+            new_qty = qty - order.qty
+            self.cash += order.qty * price
+        if new_qty > 1e-9:
+            self._positions[order.symbol] = [new_qty, avg]
+        else:
+            self._positions.pop(order.symbol, None)
+
+        self.counters["fills"] += 1
+
+    def _match(self, symbol: str):
+        if not self.is_open():
+            return
+        bid, ask = self.quote(symbol)
+        for order in list(self._orders.values()):
+            if order.symbol != symbol or order.stat != STAT_OPEN:
+                continue
+            if order.price_code == "2":
+                self._fill(order, ask if order.side == "2" else bid)
+            elif order.side == "2" and ask <= order.price:
+                self._fill(order, order.price)
+            elif order.side == "1" and bid >= order.price:
+                self._fill(order, order.price)
+
+    def _match_all(self):
+        for symbol in {o.symbol for o in self._orders.values() if o.stat == STAT_OPEN}:
+            self._advance(symbol)
+            self._match(symbol)
+
+    # ------------------------------------------
+    # rate limit / 지연
+    # ------------------------------------------
+    def _allow(self, family: str) -> bool:
+        if self.rate_limit_per_sec <= 0:
+            return True
+        now = self._clock()
+        tokens, at = self._buckets.get(family, (self.rate_limit_per_sec, now))
+        tokens = min(self.rate_limit_per_sec, tokens + (now - at) * self.rate_limit_per_sec)
+        if tokens < 1:
+            self._buckets[family] = (tokens, now)
+            return False
+        self._buckets[family] = (tokens - 1, now)
+        return True
+
+    def latency(self) -> float:
+        """이번 응답 지연(초)"""
+        with self._lock:
+            jitter = self._rng.uniform(0, self.jitter_ms) if self.jitter_ms > 0 else 0.0
+        return max(self.latency_ms + jitter, 0.0) / 1000
+
+    # ------------------------------------------
+    # 요청 처리
+    # ------------------------------------------
+    def handle(self, path: str, headers: dict, body: bytes):
+        """(status, 응답 헤더, 응답 JSON)"""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        path = path.split("?", 1)[0]
+
+        with self._lock:
+            self.counters["requests"] += 1
+            self._by_path[path] = self._by_path.get(path, 0) + 1
+
+            if path == "/oauth2/token":
+                return self._token_response()
+
+            if path.startswith("/mock/"):
+                return self._control(path, _json_body(body))
+
+            auth = str(headers.get("authorization") or "")
+            if not auth.startswith("Bearer ") or len(auth) <= len("Bearer "):
+                return 401, {}, _error(RSP_UNAUTHORIZED, "유효하지 않은 token 입니다.")
+
+            if not self._allow(_family(path)):
+                self.counters["rejected_rate"] += 1
+                return 429, {}, _error(RSP_RATE_LIMITED, "초당 거래건수를 초과하였습니다.")
+
+            req = (_json_body(body).get("In") or {})
+
+            if path.endswith("/inquiry/orderbook"):
+                return self._orderbook(req)
+            if path.endswith("/inquiry/price"):
+                return self._price(req)
+            if path.endswith("/inquiry/balance-margin"):
+                return self._balance()
+            if path.endswith("/overseas-stock/order"):
+                return self._order(req)
+            if path.endswith("/inquiry/transaction-history"):
+                return self._history(req, headers)
+
+            return 404, {}, _error("404", f"unknown path: {path}")
+
+    def _token_response(self):
+        self._token = f"mock-{self._rng.getrandbits(64):016x}"
+        return 200, {}, {"access_token": self._token, "token_type": "Bearer", "expires_in": 86400}
+
+    def _orderbook(self, req: dict):
+        symbol = str(req.get("InputIscd1", "")).strip().upper()
+        if not self.is_open():
+            return 200, {}, {"rsp_cd": RSP_OK, "Out": {"Askp1": "0", "Bidp1": "0"}}
+
+        self._advance(symbol)
+        self._match(symbol)
+        bid, ask = self.quote(symbol)
+        out = {"Askp1": f"{ask:.2f}", "Bidp1": f"{bid:.2f}"}
+        for level in range(2, 6):
+            out[f"Askp{level}"] = f"{ask + 0.01 * (level - 1):.2f}"
+            out[f"Bidp{level}"] = f"{max(bid - 0.01 * (level - 1), 0.01):.2f}"
+        return 200, {}, {"rsp_cd": RSP_OK, "Out": out}
+
+    def _price(self, req: dict):
+        symbol = str(req.get("InputIscd1", "")).strip().upper()
+        if not self.is_open():
+            return 200, {}, {"rsp_cd": RSP_OK, "Out": {"Prpr": "0"}}
+
+        sym = self._advance(symbol)
+        self._match(symbol)
+        return 200, {}, {"rsp_cd": RSP_OK, "Out": {"Prpr": f"{round(sym.mid, 2):.2f}"}}
+
+    def _balance(self):
+        self._match_all()
+        rows = [
+            {"SymCode": symbol, "AstkExecBaseQty": f"{qty:g}", "AstkAvrPchsPrc": f"{avg:.4f}"}
+            for symbol, (qty, avg) in self._positions.items()
+        ]
+        return 200, {}, {"rsp_cd": RSP_OK, "Out1": {"Dps": f"{self.cash:.2f}"}, "Out2": rows}
+
+    def _order(self, req: dict):
+        if not self.is_open():
+            self.counters["rejected_closed"] += 1
+            code, msg = (RSP_AFTER_CLOSE, "장마감 후 입니다.") if self._open else \
+                (RSP_MARKET_CLOSED, "장시작 전 또는 장마감 되었습니다.")
+            return 200, {}, _error(code, msg)
+
+        if str(req.get("OrdTrdTpCode", "0")) == "2":
+            return self._cancel(str(req.get("OrgOrdNo", "")))
+
+        symbol = str(req.get("AstkIsuNo", "")).strip().upper()
+        side = str(req.get("AstkBnsTpCode", ""))
+        price_code = str(req.get("AstkOrdprcPtnCode", "1"))
+        qty = float(req.get("AstkOrdQty", 0) or 0)
+        price = float(req.get("AstkOrdPrc", 0) or 0)
+
+        if side not in ("1", "2") or qty <= 0 or (price_code == "1" and price <= 0):
+            return 200, {}, _error("1001", "주문 입력값 오류")
+
+        if side == "1":
+            held = self._positions.get(symbol, [0.0, 0.0])[0]
+            locked = sum(
+                o.qty for o in self._orders.values()
+                if o.symbol == symbol and o.side == "1" and o.stat == STAT_OPEN
+            )
+            if qty > held - locked + 1e-9:
+                return 200, {}, _error(RSP_INSUFFICIENT, "주문가능수량이 부족합니다.")
+
+        self._next_ord_no += 1
+        order = _Order(self._next_ord_no, symbol, side, price_code, price, qty, self._clock())
+        self._orders[order.ord_no] = order
+        self.counters["orders"] += 1
+
+        self._advance(symbol)
+        self._match(symbol)
+        return 200, {}, {"rsp_cd": RSP_OK, "rsp_msg": "주문이 완료 되었습니다.", "Out": {"OrdNo": order.ord_no}}
+
+    def _cancel(self, org_no: str):
+        try:
+            order = self._orders.get(int(org_no))
+        except ValueError:
+            order = None
+
+        if order is None or order.stat != STAT_OPEN:
+            return 200, {}, _error(RSP_NOT_CANCELABLE, "정정취소 가능한 주문이 아닙니다.")
+
+        order.stat = STAT_CANCELED
+        self.counters["cancels"] += 1
+        self._next_ord_no += 1
+        return 200, {}, {"rsp_cd": RSP_OK, "rsp_msg": "취소 완료", "Out": {"OrdNo": self._next_ord_no}}
+
+    def _history(self, req: dict, headers: dict):
+        self._match_all()
+        ordxct = str(req.get("OrdxctTpCode", "0"))  # 0=전체, 1=체결, 2=미체결
+        symbol = str(req.get("AstkIsuNo", "") or "").strip().upper()
+
+        rows = [
+            o.to_row() for o in self._orders.values()
+            if (ordxct != "2" or o.stat == STAT_OPEN)
+            and (ordxct != "1" or o.exec_qty > 0)
+            and (not symbol or o.symbol == symbol)
+        ]
+
+        start = 0
+        if headers.get("cont_yn") == "Y":
+            try:
+                start = int(headers.get("cont_key") or 0)
+            except ValueError:
+                start = 0
+
+        page = rows[start:start + self.page_size]
+        more = start + self.page_size < len(rows)
+        resp_headers = {"cont_yn": "Y" if more else "N",
+                        "cont_key": str(start + self.page_size) if more else ""}
+        return 200, resp_headers, {"rsp_cd": RSP_OK, "Out": page}
+
+    def _control(self, path: str, req: dict):
+        """/mock/stats, /mock/open, /mock/close, /mock/price {"symbol", "price"}"""
+        if path == "/mock/open":
+            self.open_market()
+        elif path == "/mock/close":
+            self.close_market()
+        elif path == "/mock/price":
+            self.set_price(str(req.get("symbol", "")).upper(), float(req.get("price", 0)))
+        elif path != "/mock/stats":
+            return 404, {}, _error("404", f"unknown path: {path}")
+        return 200, {}, self.stats()
+
+    # ------------------------------------------
+    # 조회 (테스트 / 벤치마크)
+    # ------------------------------------------
+    def positions(self) -> dict:
+        with self._lock:
+            return {s: {"qty": q, "avg_price": a} for s, (q, a) in self._positions.items()}
+
+    def open_orders(self) -> list:
+        with self._lock:
+            return [o.to_row() for o in self._orders.values() if o.stat == STAT_OPEN]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "market_open": self.is_open(),
+                "cash": round(self.cash, 2),
+                "open_orders": sum(1 for o in self._orders.values() if o.stat == STAT_OPEN),
+                "positions": len(self._positions),
+                **self.counters,
+                "by_path": dict(self._by_path),
+            }
+
+
+def _json_body(body: bytes) -> dict:
+    if not body:
+        return {}
+    try:
+        return json.loads(body)
+    except (ValueError, UnicodeDecodeError):
+        # 토큰 발급은 form 형식
+        return {k: v[0] for k, v in parse_qs(body.decode("utf-8", "replace")).items()}
+
+
+def _error(code: str, msg: str) -> dict:
+    return {"rsp_cd": code, "rsp_msg": msg, "Out": {}}
+
+
+# ==========================================
+# 인프로세스 어댑터 (소켓 없이 requests 세션 → 엔진)
+# ==========================================
+class MockBrokerAdapter(HTTPAdapter):
+    """
+    requests 세션에 mount하면 요청을 소켓 없이 MockBroker.handle로 바로 전달
+      session.mount(base_url, MockBrokerAdapter(broker))
+    - with_latency=True면 설정된 지연/지터만큼 sleep (기본은 지연 없이 CPU 비용만 측정)
+    """
+
+    def __init__(self, broker: MockBroker, with_latency: bool = False):
+        super().__init__()
+        self.broker = broker
+        self.with_latency = with_latency
+
+    def send(self, request, **kwargs):
+        if self.with_latency:
+            time.sleep(self.broker.latency())
+
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        path = request.path_url
+
+        status, headers, payload = self.broker.handle(path, dict(request.headers), body)
+
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json; charset=utf-8", **headers})
+        response._content = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.reason = "OK" if status < 400 else "Error"
+        return response
+
+    def close(self):
+        pass
+
+
+# ==========================================
+# HTTP 서버
+# ==========================================
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive (공용 세션 커넥션 재사용 확인용)
+    broker: MockBroker = None
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        time.sleep(self.broker.latency())
+        status, headers, payload = self.broker.handle(self.path, dict(self.headers), body)
+
+        raw = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(raw)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_broker_server(broker: MockBroker = None, host: str = MOCK_BROKER_HOST,
+                             port: int = MOCK_BROKER_PORT):
+    """
+    백그라운드 스레드로 모의 서버 시작 → (server, broker)
+    port=0이면 빈 포트 자동 할당 (server.server_address[1])
+    """
+    broker = broker or MockBroker()
+    handler = type("MockBrokerHandler", (_Handler,), {"broker": broker})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+
+    thread = threading.Thread(target=server.serve_forever, name="mock-broker", daemon=True)
+    thread.start()
+
+    log.info(f"🧪 [mock_broker] 모의 DB증권 서버 시작 → http://{host}:{server.server_address[1]}")
+    return server, broker
+
+
+def run_mock_broker_server():
+    """
+    포그라운드 실행
+      python -m api.mock_broker
+    봇 쪽은 .env에 DB_API_BASE=http://127.0.0.1:18443 설정
+    """
+    server, broker = start_mock_broker_server()
+    try:
+        while True:
+            time.sleep(10)
+            log.info(f"[mock_broker] {broker.stats()}")
+    except KeyboardInterrupt:
+        log.info("[mock_broker] 종료")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    run_mock_broker_server()
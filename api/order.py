@@ -4,12 +4,15 @@ import requests
 from api.auth import generate_jwt_token
 from urllib.parse import urlencode
 import config
+from utils.logger import get_logger
+
+log = get_logger(__name__)
 
 
 def send_order(market: str, side: str, ord_type: str,
                amount_krw: float = None, unit_price: float = None,
                volume: float = None, time_in_force: str = None) -> dict:
-    print(f"[order.py] send_order() 호출됨 - market={market}, side={side}, ord_type={ord_type}")
+    log.info(f"[order.py] send_order() 호출됨 - market={market}, side={side}, ord_type={ord_type}")
 
     params = {
         "market": market,
@@ -40,10 +43,10 @@ def send_order(market: str, side: str, ord_type: str,
     response = requests.post(f"{config.SERVER_URL}/v1/orders", json=params, headers=headers)
 
     if response.status_code == 201:
-        print("[order.py] 주문 성공")
+        log.info("[order.py] 주문 성공")
         return response.json()
     else:
-        print("[order.py] 주문 실패")
+        log.warning("[order.py] 주문 실패")
         raise Exception(f"[주문 실패] {response.status_code} - {response.text}")
 
 
@@ -53,7 +56,7 @@ def get_order_results_by_uuids(uuids: list[str]) -> dict:
     여러 uuid에 대해 주문 상태를 한 번에 조회
     반환: {uuid: 상태} 딕셔너리
     """
-    print(f"[order.py] get_order_results_by_uuids 호출됨 (개수: {len(uuids)})")
+    log.info(f"[order.py] get_order_results_by_uuids 호출됨 (개수: {len(uuids)})")
 
     params = {'uuids[]': uuids}
     headers = {
@@ -75,7 +78,7 @@ def get_order_results_by_uuids(uuids: list[str]) -> dict:
 
 
 def cancel_and_new_order(prev_order_uuid: str, market: str, price: float, amount: float) -> dict:
-    print(f"[order.py] cancel_and_new_order 호출됨 - market={market}, prev_uuid={prev_order_uuid}")
+    log.info(f"[order.py] cancel_and_new_order 호출됨 - market={market}, prev_uuid={prev_order_uuid}")
 
     headers = {
         "Authorization": generate_jwt_token({
@@ -107,7 +110,7 @@ def cancel_and_new_order(prev_order_uuid: str, market: str, price: float, amount
 
 
 def cancel_orders_by_uuids(uuids: list[str]) -> dict:
-    print(f"[order.py] cancel_orders_by_uuids() 호출됨 - 총 {len(uuids)}개")
+    log.info(f"[order.py] cancel_orders_by_uuids() 호출됨 - 총 {len(uuids)}개")
     if not uuids:
         return {}
 
@@ -0,0 +1,315 @@
+# api/order_history.py
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+load_dotenv()
+
+# 체결/미체결 스냅샷 유효시간(초) – 메인 루프 1틱 동안 공유
+ORDER_HISTORY_TTL = float(os.getenv("DB_ORDER_HISTORY_TTL", "1.0"))
+
+# 스냅샷에 없는 uuid 재확인 최소 간격(초)
+#  - 오래된 주문번호가 buy_log에 남아 있어도 매 틱 전체 내역을 받지 않도록 함
+UNKNOWN_RECHECK_SEC = float(os.getenv("DB_ORDER_UNKNOWN_RECHECK_SEC", "30"))
+
+# 확정 주문(done/cancel) 보관 최대 수 – 넘으면 가장 오래 안 쓴 주문번호부터 제거 (LRU)
+#  - 제거된 주문번호가 다시 조회 대상이 되면 내역 조회로 다시 확정 (결과는 같음)
+FINAL_ORDERS_MAX = int(os.getenv("DB_ORDER_HISTORY_FINAL_MAX", "5000"))
+
+
+def row_state(row: dict) -> str:
+    """
+    체결/미체결 조회 row → "wait" | "done" | "cancel"
+    - AstkOrdStatCode 7 = 체결완료, 6 = 취소
+    - 그 외(미체결, 부분체결 포함)는 모두 wait
+    """
+    stat = str(row.get("AstkOrdStatCode", "")).strip()
+
+    if stat == "7":
+        return "done"
+    if stat == "6":
+        return "cancel"
+    return "wait"
+
+
+def row_symbol(row: dict) -> str:
+    """체결/미체결 조회 row의 종목코드 (응답 필드명 차이 방어)"""
+    for key in ("AstkIsuNo", "SymCode", "IsuNo"):
+        value = str(row.get(key, "") or "").strip().upper()
+        if value:
+            return value
+    return ""
+
+
+def _row_ordno(row: dict) -> str:
+    return str(row.get("OrdNo", "") or "").strip()
+
+
+class OrderHistoryTracker:
+    """
+    계좌 전체 체결/미체결 내역 증분 추적기
+    - 최초 1회: 전체 내역(체결+미체결) 조회 → 확정(done/cancel) / 미체결 분리
+    - 이후 틱: 미체결 목록만 조회 (응답 크기 = 현재 열려 있는 주문 수)
+    - 미체결 목록에서 사라진 주문이 있을 때만 해당 종목의 체결 내역(체결분만)을 받아
+      최종 상태를 확정, 체결 내역에도 없으면(취소 등) 그 종목 전체 내역을 한 번 더 조회
+      (계좌 전체 내역을 다시 받지 않음)
+    - 직접 취소한 주문은 mark_cancelled()로 바로 확정 → 사라져도 재조회 안 함
+    - 한 번 확정된 주문번호는 다시 파싱하지 않음 (응답에 섞여 와도 OrdNo만 보고 건너뜀)
+      확정 목록은 최대 final_max개 (LRU) → 오래 실행해도 지나간 주문번호가 쌓이지 않음
+    - 매수 체결 감지, 매도 상태 정리, 외부 주문 정리가 모두 이 추적기를 공유
+
+    fetcher: (open_only: bool, symbol: str = "", executed_only: bool = False)
+             -> (rows: list[dict], nbytes: int)
+      - symbol=""이면 계좌 전체, executed_only=True이면 체결분만
+    throttle: 갱신 제한 (manager.poll_scheduler.PollScheduler, 없으면 TTL마다 갱신)
+      - allow_refresh() -> bool : 스냅샷 만료 시 네트워크 갱신 여부 (False면 직전 스냅샷 사용)
+      - spend_requests(count, refreshed) : 실제로 보낸 요청 수 통보
+    """
+
+    def __init__(self, fetcher, ttl: float = ORDER_HISTORY_TTL,
+                 unknown_recheck_sec: float = UNKNOWN_RECHECK_SEC, throttle=None,
+                 final_max: int = FINAL_ORDERS_MAX):
+        self._fetcher = fetcher
+        self._throttle = throttle
+        self.ttl = ttl
+        self.unknown_recheck_sec = unknown_recheck_sec
+        self.final_max = max(int(final_max), 1)
+        self._lock = threading.RLock()
+
+        self._seeded = False
+        self._fetched_at = None
+        self._open = {}          # OrdNo → row (미체결)
+        self._final = OrderedDict()  # OrdNo → (state, symbol) (확정, 재파싱 안 함, LRU 순서)
+        self._unknown_checked = {}  # OrdNo → 마지막 재확인 시각
+
+        # 틱별/누적 지표
+        self.last_tick = {}
+        self.totals = {"refreshes": 0, "requests": 0, "bytes": 0, "rows": 0, "parsed": 0, "hits": 0,
+                       "throttled": 0, "evicted": 0}
+
+    # ------------------------------------------
+    # 내부: 조회 + 파싱
+    # ------------------------------------------
+    def _fetch(self, open_only: bool, tick: dict, symbol: str = "", executed_only: bool = False) -> list:
+        rows, nbytes = self._fetcher(open_only, symbol=symbol, executed_only=executed_only)
+        tick["requests"] += 1
+        tick["bytes"] += nbytes
+        tick["rows"] += len(rows)
+        return rows
+
+    def _finalize(self, uuid: str, state: str, symbol: str):
+        """확정 상태 기록 (final_max 초과 시 가장 오래 안 쓴 주문번호 제거)"""
+        self._final[uuid] = (state, symbol)
+        self._final.move_to_end(uuid)
+        self._unknown_checked.pop(uuid, None)
+        while len(self._final) > self.final_max:
+            self._final.popitem(last=False)
+            self.totals["evicted"] += 1
+
+    def _absorb(self, rows: list, tick: dict, open_only: bool):
+        """
+        조회 row 반영
+        - 확정된 OrdNo는 건너뜀
+        - open_only 조회는 미체결 목록 전체를 대체 → 사라진 주문 {OrdNo: 종목} 반환
+        """
+        seen_open = {}
+
+        for row in rows:
+            uuid = _row_ordno(row)
+            if not uuid or uuid in self._final:
+                continue
+
+            tick["parsed"] += 1
+            state = row_state(row)
+
+            if state == "wait":
+                seen_open[uuid] = row
+            else:
+                self._finalize(uuid, state, row_symbol(row))
+                self._open.pop(uuid, None)
+
+        if open_only:
+            vanished = {u: row_symbol(row) for u, row in self._open.items() if u not in seen_open}
+            self._open = seen_open
+            return vanished
+
+        self._open.update(seen_open)
+        return {}
+
+    def _resolve(self, pending: dict, tick: dict):
+        """
+        미체결 목록에서 사라졌거나 처음 보는 주문 {OrdNo: 종목} → 최종 상태 확정
+        - 이미 확정된 주문은 조회하지 않음
+        - 종목별로 체결 내역(체결분만) 조회 → 대부분 여기서 done 확정
+        - 체결 내역에 없는 주문만 그 종목 전체 내역으로 재확인 (취소 등)
+        - 종목을 모르면 계좌 전체 내역
+        - 그래도 없으면 그대로 둔다 (다음 기회에 재확인)
+        """
+        # 재확인 간격이 지난 기록은 의미 없음 → 정리 (사라진 주문번호가 쌓이지 않게)
+        now = time.monotonic()
+        for uuid in [u for u, t in self._unknown_checked.items() if now - t >= self.unknown_recheck_sec]:
+            del self._unknown_checked[uuid]
+
+        by_symbol = {}
+        for uuid, symbol in pending.items():
+            if uuid not in self._final:
+                by_symbol.setdefault(symbol, set()).add(uuid)
+
+        for symbol, uuids in sorted(by_symbol.items()):
+            if symbol:
+                rows = self._fetch(False, tick, symbol=symbol, executed_only=True)
+                self._absorb(rows, tick, open_only=False)
+                uuids = {u for u in uuids if u not in self._final}
+
+            if uuids:
+                rows = self._fetch(False, tick, symbol=symbol)
+                self._absorb(rows, tick, open_only=False)
+
+            for uuid in uuids:
+                # 확정됐거나 아직 미체결로 보이면 OK
+                if uuid in self._final or uuid in self._open:
+                    continue
+                self._unknown_checked[uuid] = time.monotonic()
+
+    # ------------------------------------------
+    # 조회 / 갱신
+    # ------------------------------------------
+    def _is_fresh(self) -> bool:
+        return (
+            self._fetched_at is not None
+            and time.monotonic() - self._fetched_at < self.ttl
+        )
+
+    def refresh(self, force: bool = False):
+        """틱 스냅샷이 만료됐거나 force=True이면 증분 갱신"""
+        with self._lock:
+            if not force and self._is_fresh():
+                self.totals["hits"] += 1
+                return
+
+            # 최초 조회 이후에는 throttle이 허락할 때만 네트워크 갱신
+            if not force and self._seeded and self._throttle is not None \
+                    and not self._throttle.allow_refresh():
+                self.totals["throttled"] += 1
+                return
+
+            tick = {"requests": 0, "bytes": 0, "rows": 0, "parsed": 0, "mode": "open"}
+
+            if not self._seeded:
+                tick["mode"] = "full"
+                rows = self._fetch(False, tick)
+                self._absorb(rows, tick, open_only=False)
+                self._seeded = True
+            else:
+                rows = self._fetch(True, tick)
+                vanished = self._absorb(rows, tick, open_only=True)
+
+                # 미체결 목록에서 사라진 주문 → 체결/취소 여부 확정
+                if vanished:
+                    tick["mode"] = "open+resolve"
+                    self._resolve(vanished, tick)
+
+            self._fetched_at = time.monotonic()
+            self._record_tick(tick)
+
+    def _record_tick(self, tick: dict):
+        if self._throttle is not None and tick["requests"]:
+            self._throttle.spend_requests(tick["requests"], refreshed=tick["mode"] != "resolve")
+
+        self.last_tick = tick
+        self.totals["refreshes"] += 1
+        for key in ("requests", "bytes", "rows", "parsed"):
+            self.totals[key] += tick[key]
+
+        log.debug(
+            "[order_history] %s 조회: 요청 %d회 / %dB / %d행 (신규 파싱 %d행)",
+            tick["mode"], tick["requests"], tick["bytes"], tick["rows"], tick["parsed"],
+        )
+
+    def set_throttle(self, throttle):
+        with self._lock:
+            self._throttle = throttle
+
+    def invalidate(self):
+        """주문/취소 직후 호출 → 다음 조회 때 재조회"""
+        with self._lock:
+            self._fetched_at = None
+
+    def mark_cancelled(self, uuid_list: list, symbol: str = ""):
+        """취소 API가 성공한 주문 → cancel로 확정 (미체결 목록에서 사라져도 내역 재조회 안 함)"""
+        with self._lock:
+            for uuid in uuid_list:
+                uuid = str(uuid).strip()
+                row = self._open.pop(uuid, None)
+                self._finalize(uuid, "cancel", row_symbol(row) if row else symbol.strip().upper())
+
+    def mark_not_open(self, uuid_list: list):
+        """
+        취소가 거부된 주문(이미 체결/취소 등) → 직전 미체결 스냅샷에서 제외
+        - 스냅샷 갱신이 늦어져도 같은 주문을 틱마다 다시 취소하지 않음
+        - 최종 상태는 states_for()가 물어볼 때 확정, 아직 미체결이면 다음 갱신 때 다시 들어옴
+        """
+        with self._lock:
+            for uuid in uuid_list:
+                self._open.pop(str(uuid).strip(), None)
+
+    # ------------------------------------------
+    # 상태 조회
+    # ------------------------------------------
+    def states_for(self, uuid_list: list, symbol: str = "") -> dict:
+        """
+        uuid 목록의 상태
+        - 처음 보는 uuid는 UNKNOWN_RECHECK_SEC 간격으로만 내역 재확인
+          (symbol을 주면 그 종목 내역만, 없으면 계좌 전체)
+        - 그래도 없으면 wait (방금 접수된 주문일 수 있음)
+        """
+        with self._lock:
+            self.refresh()
+
+            uuids = [str(u).strip() for u in uuid_list]
+            now = time.monotonic()
+            sym = symbol.strip().upper()
+            unknown = {
+                u: sym for u in uuids
+                if u not in self._open and u not in self._final
+                and now - self._unknown_checked.get(u, -1e9) >= self.unknown_recheck_sec
+            }
+
+            if unknown:
+                tick = {"requests": 0, "bytes": 0, "rows": 0, "parsed": 0, "mode": "resolve"}
+                self._resolve(unknown, tick)
+                self._record_tick(tick)
+
+            result = {}
+            for u in uuids:
+                if u in self._final:
+                    self._final.move_to_end(u)
+                    result[u] = self._final[u][0]
+                else:
+                    result[u] = "wait"
+            return result
+
+    def open_orders(self, symbol: str) -> dict:
+        """해당 종목의 미체결(wait) 주문 {uuid: "wait"}"""
+        with self._lock:
+            self.refresh()
+
+            sym = symbol.strip().upper()
+            return {u: "wait" for u, row in self._open.items() if row_symbol(row) == sym}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ttl_sec": self.ttl,
+                "open_orders": len(self._open),
+                "final_orders": len(self._final),
+                "final_max": self.final_max,
+                "last_tick": dict(self.last_tick),
+                "totals": dict(self.totals),
+            }
@@ -2,10 +2,13 @@
 
 import requests
 from typing import List, Dict, Optional
+from utils.logger import get_logger
+
+log = get_logger(__name__)
 
 
 def get_second_candles(market: str, to: Optional[str] = None, count: int = 1) -> List[Dict]:
-    print(f"[price.py] get_second_candles() 실행됨 - market={market}, count={count}")
+    log.info(f"[price.py] get_second_candles() 실행됨 - market={market}, count={count}")
 
     url = "https://api.upbit.com/v1/candles/seconds"
     headers = {"accept": "application/json"}
@@ -20,10 +23,10 @@ def get_second_candles(market: str, to: Optional[str] = None, count: int = 1) ->
     response = requests.get(url, params=params, headers=headers)
 
     if response.status_code != 200:
-        print("[price.py] 초봉 조회 실패")
+        log.warning("[price.py] 초봉 조회 실패")
         raise Exception(f"초봉 조회 실패: {response.status_code}, {response.text}")
 
-    print(f"[price.py] 초봉 조회 성공 - {len(response.json())}개 데이터")
+    log.info(f"[price.py] 초봉 조회 성공 - {len(response.json())}개 데이터")
     return response.json()
 
 
@@ -31,7 +34,7 @@ def get_current_ask_price(market: str) -> float:
     """
     업비트 호가 정보 중 최우선 매도호가(ask_price)를 반환
     """
-    print(f"[price.py] get_current_ask_price() 실행됨 - market={market}")
+    log.info(f"[price.py] get_current_ask_price() 실행됨 - market={market}")
 
     url = "https://api.upbit.com/v1/orderbook"
     headers = {"accept": "application/json"}
@@ -49,7 +52,7 @@ def get_current_ask_price(market: str) -> float:
         raise Exception("[호가 데이터 없음]")
 
     ask_price = orderbook_units[0]["ask_price"]  # 최우선 매도 호가
-    print(f"[price.py] 매도 호가: {ask_price}")
+    log.info(f"[price.py] 매도 호가: {ask_price}")
     return ask_price
 
 
@@ -63,7 +66,7 @@ def get_minute_candles(market: str, unit: int = 1, to: Optional[str] = None, cou
     :param count: 요청할 캔들 개수 (최대 200)
     :return: 캔들 리스트 (dict)
     """
-    print(f"[price.py] get_minute_candles() 실행됨 - market={market}, unit={unit}, count={count}, to={to}")
+    log.info(f"[price.py] get_minute_candles() 실행됨 - market={market}, unit={unit}, count={count}, to={to}")
 
     url = f"https://api.upbit.com/v1/candles/minutes/{unit}"
     headers = {"accept": "application/json"}
@@ -80,5 +83,5 @@ def get_minute_candles(market: str, unit: int = 1, to: Optional[str] = None, cou
     if response.status_code != 200:
         raise Exception(f"[분봉 조회 실패] {response.status_code} - {response.text}")
 
-    print(f"[price.py] 분봉 캔들 조회 성공 - {len(response.json())}개 데이터")
+    log.info(f"[price.py] 분봉 캔들 조회 성공 - {len(response.json())}개 데이터")
     return response.json()
\ No newline at end of file
@@ -0,0 +1,94 @@
+# api/quote_cache.py
+
+import os
+import time
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 호가 스냅샷 유효시간(초) – 메인 루프 1틱 안에서만 재사용되도록 짧게
+QUOTE_CACHE_TTL = float(os.getenv("DB_QUOTE_CACHE_TTL", "1.0"))
+
+
+class QuoteCache:
+    """
+    (symbol, market_code) → 호가 응답 스냅샷 캐시
+    - 같은 틱 안에서 스프레드 체크 / 매수호가 / 매도호가가
+      모두 하나의 orderbook 응답을 공유하도록 함
+    - TTL이 지나면 자동으로 다시 조회
+    """
+
+    def __init__(self, ttl: float = QUOTE_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(symbol: str, market_code: str):
+        return symbol.strip().upper(), str(market_code).strip().upper()
+
+    def get(self, symbol: str, market_code: str):
+        """유효한 스냅샷이 있으면 반환, 없으면 None"""
+        key = self._key(symbol, market_code)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] < self.ttl:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def peek(self, symbol: str, market_code: str):
+        """유효한 스냅샷만 반환 (조회하지 않음, hit/miss 통계에도 넣지 않음)"""
+        key = self._key(symbol, market_code)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                return entry[1]
+            return None
+
+    def put(self, symbol: str, market_code: str, data: dict):
+        key = self._key(symbol, market_code)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), data)
+
+    def get_or_load(self, symbol: str, market_code: str, loader):
+        """
+        캐시 조회 → 없으면 loader() 호출 결과를 저장 후 반환
+        - loader에서 발생한 예외는 그대로 전파 (실패 응답은 캐싱하지 않음)
+        """
+        data = self.get(symbol, market_code)
+        if data is not None:
+            return data
+
+        data = loader()
+        self.put(symbol, market_code, data)
+        return data
+
+    def invalidate(self, symbol: str = None, market_code: str = None):
+        """특정 종목 또는 전체 스냅샷 무효화"""
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+                return
+            sym = symbol.strip().upper()
+            for key in list(self._entries):
+                if key[0] == sym and (market_code is None or key[1] == str(market_code).strip().upper()):
+                    del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "ttl_sec": self.ttl,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,139 @@
+# api/rate_limiter.py
+
+import os
+import time
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ==========================================
+# 환경 변수 (엔드포인트 계열별 호출 예산)
+#   rate  : 초당 허용 호출 수
+#   burst : 한 번에 몰아서 쓸 수 있는 최대 토큰 수
+# ==========================================
+DEFAULT_BUDGETS = {
+    "quote": (
+        float(os.getenv("DB_RATE_QUOTE_PER_SEC", "10")),
+        float(os.getenv("DB_RATE_QUOTE_BURST", "10")),
+    ),
+    "order": (
+        float(os.getenv("DB_RATE_ORDER_PER_SEC", "5")),
+        float(os.getenv("DB_RATE_ORDER_BURST", "5")),
+    ),
+    "inquiry": (
+        float(os.getenv("DB_RATE_INQUIRY_PER_SEC", "5")),
+        float(os.getenv("DB_RATE_INQUIRY_BURST", "5")),
+    ),
+}
+
+
+class TokenBucket:
+    """
+    토큰 버킷
+    - rate 속도로 토큰이 차오르고, 최대 burst개까지 저장
+    - 토큰이 남아 있으면 즉시 통과, 다 쓴 경우에만 대기
+    - 예약 방식: 토큰을 먼저 차감(음수 허용)하고, 부족분만큼만 기다림
+      → 여러 스레드가 동시에 와도 순서대로 공정하게 분배
+    """
+
+    def __init__(self, rate: float, burst: float):
+        if rate <= 0:
+            raise ValueError(f"❌ rate는 0보다 커야 합니다. given={rate}")
+        self.rate = float(rate)
+        self.burst = max(float(burst), 1.0)
+
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        # 지표
+        self.calls = 0
+        self.waited_calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        토큰을 예약하고, 호출 전에 기다려야 하는 시간(초)을 반환
+        - 0이면 즉시 호출 가능
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+            self.calls += 1
+            if wait > 0:
+                self.waited_calls += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+
+        return wait
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """토큰 확보까지 블로킹, 실제 대기 시간 반환"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "calls": self.calls,
+                "waited_calls": self.waited_calls,
+                "total_wait_sec": round(self.total_wait, 4),
+                "max_wait_sec": round(self.max_wait, 4),
+                "avg_wait_ms": round(self.total_wait / self.calls * 1000, 2) if self.calls else 0.0,
+            }
+
+
+class RateLimiter:
+    """
+    엔드포인트 계열(quote / order / inquiry)별 토큰 버킷 묶음
+    - 프로세스 전체에서 하나만 사용 (get_rate_limiter)
+    """
+
+    def __init__(self, budgets: dict = None):
+        budgets = budgets or DEFAULT_BUDGETS
+        self._buckets = {
+            family: TokenBucket(rate, burst)
+            for family, (rate, burst) in budgets.items()
+        }
+
+    def bucket(self, family: str) -> TokenBucket:
+        if family not in self._buckets:
+            raise KeyError(f"❌ 알 수 없는 rate-limit 계열: {family}")
+        return self._buckets[family]
+
+    def acquire(self, family: str, tokens: float = 1.0) -> float:
+        return self.bucket(family).acquire(tokens)
+
+    def reserve(self, family: str, tokens: float = 1.0) -> float:
+        return self.bucket(family).reserve(tokens)
+
+    def stats(self) -> dict:
+        return {family: b.stats() for family, b in self._buckets.items()}
+
+
+_LIMITER = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """프로세스 전역 RateLimiter (최초 호출 시 환경변수 예산으로 생성)"""
+    global _LIMITER
+    if _LIMITER is None:
+        with _LIMITER_LOCK:
+            if _LIMITER is None:
+                _LIMITER = RateLimiter()
+    return _LIMITER
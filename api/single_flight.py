@@ -0,0 +1,121 @@
+# api/single_flight.py
+
+import json
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    동일 요청 합치기 (single-flight)
+    - 같은 key(엔드포인트 + body)의 요청이 동시에 들어오면 HTTP 호출은 1번만 하고
+      나머지는 그 결과(또는 예외)를 같이 받음
+    - 끝난 요청은 보관하지 않음 → 캐시가 아니라 "동시에 날아가는 중복"만 제거
+    - 조회 계열에만 사용 (주문/취소는 절대 합치면 안 됨)
+
+    share: 대기자에게 넘길 때 결과 가공 (예: dict 복사). 기본은 같은 객체 공유
+    """
+
+    def __init__(self, share=None):
+        self._share = share
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = {}           # key → asyncio.Task (do_async)
+
+        self.executed = 0
+        self.collapsed = 0
+        self._by_family = {}
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """요청 구성요소 → key (dict는 키 정렬 JSON)"""
+        return "|".join(
+            json.dumps(p, sort_keys=True, default=str) if isinstance(p, (dict, list, tuple)) else str(p)
+            for p in parts
+        )
+
+    def do(self, key: str, fn, family: str = "default"):
+        with self._lock:
+            counts = self._by_family.setdefault(family, [0, 0])
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+                self.executed += 1
+                counts[0] += 1
+            else:
+                call.waiters += 1
+                leader = False
+                self.collapsed += 1
+                counts[1] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return self._share(call.result) if self._share else call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def do_async(self, key: str, fn, family: str = "default"):
+        """
+        asyncio 버전 – 같은 이벤트 루프 안에서 동시에 들어온 같은 요청을 1회 호출로 합침
+        fn: 인자 없는 코루틴 함수
+        - 한 호출자가 취소돼도 실제 요청은 계속 (다른 대기자를 위해 shield)
+        """
+        with self._lock:
+            counts = self._by_family.setdefault(family, [0, 0])
+            task = self._tasks.get(key)
+            if task is None:
+                task = asyncio.ensure_future(fn())
+                self._tasks[key] = task
+                task.add_done_callback(lambda _: self._forget_task(key, task))
+                leader = True
+                self.executed += 1
+                counts[0] += 1
+            else:
+                leader = False
+                self.collapsed += 1
+                counts[1] += 1
+
+        result = await asyncio.shield(task)
+        return result if leader or not self._share else self._share(result)
+
+    def _forget_task(self, key: str, task):
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.executed + self.collapsed
+            return {
+                "in_flight": len(self._calls) + len(self._tasks),
+                "executed": self.executed,
+                "collapsed": self.collapsed,
+                "collapse_ratio": round(self.collapsed / total, 4) if total else 0.0,
+                "by_family": {
+                    family: {"executed": c[0], "collapsed": c[1]}
+                    for family, c in self._by_family.items()
+                },
+            }
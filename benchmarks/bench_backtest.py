@@ -0,0 +1,47 @@
+# benchmarks/bench_backtest.py
+
+import os
+import sys
+import argparse
+
+os.environ.setdefault("LOG_CONSOLE", "0")     # 전략 함수 기준 실행의 봉별 로그는 콘솔에 찍지 않음
+sys.path.append(".")
+
+import numpy as np
+
+from manager.backtest_engine import LadderParams, backtest_ladder, backtest_with_strategy
+
+
+def make_candles(n: int, seed: int = 0, vol: float = 0.002, start: float = 50.0):
+    """1분봉 랜덤워크 OHLC"""
+    rng = np.random.default_rng(seed)
+    close = start * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    open_ = np.r_[start, close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n)))
+    return open_, high, low, close
+
+
+def main():
+    parser = argparse.ArgumentParser(description="사다리 백테스트 엔진 vs 전략 함수 기준 실행")
+    parser.add_argument("--candles", type=int, default=390 * 60, help="엔진 봉 수 (기본: 1분봉 약 3개월)")
+    parser.add_argument("--reference-candles", type=int, default=500, help="전략 함수 기준 실행 봉 수")
+    args = parser.parse_args()
+
+    params = LadderParams("TQQQ", 100.0, 0.01, 1, 0.03, 2, 0.02)
+
+    sample = make_candles(args.reference_candles, seed=1)
+    fast = backtest_ladder(*sample, params)
+    slow = backtest_with_strategy(*sample, params)
+    same = fast.trades == slow.trades and np.array_equal(fast.equity, slow.equity)
+
+    full = backtest_ladder(*make_candles(args.candles), params)
+
+    print(f"[bench] 전략 함수 기준 : {slow.summary()['candles_per_sec']:>10,} 봉/s ({args.reference_candles}봉)")
+    print(f"[bench] 백테스트 엔진   : {full.summary()['candles_per_sec']:>10,} 봉/s ({args.candles}봉)")
+    print(f"[bench] 같은 봉 배수     : {slow.elapsed_sec / fast.elapsed_sec:,.0f}x / 결과 동일: {same}")
+    print(f"[bench] 요약: {full.summary()}")
+
+
+if __name__ == "__main__":
+    main()
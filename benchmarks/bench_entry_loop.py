@@ -0,0 +1,356 @@
+# benchmarks/bench_entry_loop.py
+#
+# 메인 루프(run_casino_entry 1틱) 종단간 벤치마크
+#   python benchmarks/bench_entry_loop.py
+#   python benchmarks/bench_entry_loop.py --symbols 8,50 --scenarios crash --ticks 60
+#   python benchmarks/bench_entry_loop.py --baseline benchmarks/results/entry_loop_abc1234.json
+#
+# - 실제 entry 루프 코드(run_open_tick → run_cleanup → _flush_state)를 그대로 실행
+# - 증권사는 api/mock_broker.py 엔진을 인프로세스 어댑터로 연결 (소켓/지연 없음 → 순수 처리 비용)
+# - 시간은 시뮬레이션 시계로 1틱 = 1초씩 진행 (TTL 캐시 / 조회 스케줄러 / 1분 매수 생성 주기 유지)
+# - 코드 안의 sleep(취소 재확인, 정정 텀)은 실제로 자지 않고 시뮬레이션 시계만 진행, 합계는 따로 기록
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+sys.path.append(".")
+
+import api.db_usstocks as db
+import strategy.entry as entry
+import strategy.buy_entry as buy_entry
+import manager.poll_scheduler as poll_scheduler
+from api.mock_broker import MockBroker, MockBrokerAdapter
+from api.quote_cache import QuoteCache
+from api.account_snapshot import AccountSnapshot
+from api.order_history import OrderHistoryTracker
+from api.rate_limiter import RateLimiter
+from data.state_store import init_state_store, get_state_store, DEFAULT_COLUMNS
+
+
+SYMBOL_COUNTS = (8, 25, 50, 100, 200)
+SCENARIOS = ("random_walk", "gap_up", "crash")
+TICKS = 180
+SEED = 7
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# entry.py에서 1틱 동안 호출되는 단계 (모듈 전역 이름 → 측정용 래퍼로 교체)
+PHASES = (
+    "process_sold_out_markets_for_initial",
+    "run_buy_generate_flow",
+    "detect_filled_buy_orders",
+    "handle_buy_fills",
+    "periodic_sell_status_check",
+    "cleanup_untracked_buy_orders",
+    "_flush_state",
+)
+
+
+# ==========================================
+# 시뮬레이션 시계 / 가격 경로
+# ==========================================
+class SimClock:
+    """monotonic 대용 시계 (틱마다 advance)"""
+
+    def __init__(self, start: float = 1_000_000.0):
+        self.now = start
+        self.slept = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, sec: float):
+        self.now += sec
+
+
+class SimTime:
+    """time 모듈 대용: sleep만 시뮬레이션 시계로, 나머지는 원래 time"""
+
+    def __init__(self, clock: SimClock):
+        self._clock = clock
+
+    def sleep(self, sec: float):
+        self._clock.slept += sec
+        self._clock.advance(sec)
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def make_price_paths(scenario: str, n_symbols: int, ticks: int, seed: int = SEED) -> np.ndarray:
+    """
+    (ticks, n_symbols) 중간가 경로
+    - random_walk: 틱당 로그수익률 N(0, 0.2%)
+    - gap_up     : 1/3 지점에서 +6% 갭 상승 (익절 매도 체결)
+    - crash      : 1/3 지점부터 10틱 동안 -1.5%/틱 (small/large flow 매수 체결)
+    """
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(10, 150, n_symbols)
+    rets = rng.normal(0.0, 0.002, (ticks, n_symbols))
+
+    shock_at = ticks // 3
+    if scenario == "gap_up":
+        rets[shock_at] += np.log(1.06)
+    elif scenario == "crash":
+        rets[shock_at:shock_at + 10] += np.log(1 - 0.015)
+    elif scenario != "random_walk":
+        raise ValueError(f"❌ 알 수 없는 시나리오: {scenario}")
+
+    return base * np.exp(np.cumsum(rets, axis=0))
+
+
+def make_setting(n_symbols: int) -> pd.DataFrame:
+    return pd.DataFrame([{
+        "market": f"SYM{i:03d}", "unit_size": 300, "small_flow_pct": 0.04, "small_flow_units": 2,
+        "large_flow_pct": 0.13, "large_flow_units": 7, "take_profit_pct": 0.03, "leverage": 3,
+        "market_code": "FN",
+    } for i in range(n_symbols)])
+
+
+# ==========================================
+# 측정
+# ==========================================
+class PhaseTimer:
+    """entry.py 단계 함수 래퍼 – 틱별 CPU/벽시계 시간 누적"""
+
+    def __init__(self):
+        self.cpu = {}
+        self.wall = {}
+
+    def reset(self):
+        self.cpu = {p: 0.0 for p in PHASES}
+        self.wall = {p: 0.0 for p in PHASES}
+
+    def wrap(self, name: str, func):
+        def timed(*args, **kwargs):
+            cpu0, wall0 = time.process_time(), time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.cpu[name] += time.process_time() - cpu0
+                self.wall[name] += time.perf_counter() - wall0
+        return timed
+
+
+def _pct(values, q) -> float:
+    return round(float(np.percentile(values, q)) * 1000, 3) if len(values) else 0.0
+
+
+def _install(broker: MockBroker, clock: SimClock):
+    """
+    모듈 전역 상태를 실행마다 새로 구성 (캐시/스냅샷/스케줄러는 시뮬레이션 시계 기준)
+    반환: 원래 상태 복구 함수
+    """
+    saved = (db.time, buy_entry.time, poll_scheduler._SCHEDULER, db._gateway._limiter)
+
+    def restore():
+        db.time, buy_entry.time, poll_scheduler._SCHEDULER, db._gateway._limiter = saved
+        db._client.session.adapters.pop(db._client.base_url, None)
+
+    db._client.session.mount(db._client.base_url, MockBrokerAdapter(broker))
+    db._gateway._limiter = RateLimiter({f: (1e9, 1e9) for f in ("quote", "order", "inquiry")})
+    db._TOKEN = None
+    db._quote_cache = QuoteCache()
+    db._account_snapshot = AccountSnapshot(db._fetch_accounts)
+    db._order_history = OrderHistoryTracker(db._fetch_transaction_history)
+    db._last_order_price.clear()
+    poll_scheduler._SCHEDULER = poll_scheduler.PollScheduler(clock=clock)
+
+    sim_time = SimTime(clock)
+    db.time = sim_time
+    buy_entry.time = sim_time
+    return restore
+
+
+def _invalidate_tick_caches():
+    """실제 루프는 1틱 ≈ 1초라 TTL(1초) 캐시가 틱마다 만료됨 → 같은 효과"""
+    db._quote_cache.invalidate()
+    db.invalidate_accounts()
+    db.invalidate_order_history()
+
+
+def run_case(scenario: str, n_symbols: int, ticks: int) -> dict:
+    paths = make_price_paths(scenario, n_symbols, ticks)
+    setting_df = make_setting(n_symbols)
+    markets = list(setting_df["market"])
+
+    clock = SimClock()
+    broker = MockBroker(prices=dict(zip(markets, paths[0])), latency_ms=0, jitter_ms=0,
+                        rate_limit_per_sec=0, volatility=0.0, page_size=50, clock=clock)
+
+    timer = PhaseTimer()
+    restore = lambda: None
+    originals = {name: getattr(entry, name) for name in PHASES}
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            setting_df.to_csv("setting.csv", index=False)
+            for name, columns in DEFAULT_COLUMNS.items():
+                pd.DataFrame(columns=columns).to_csv(name, index=False)
+
+            restore = _install(broker, clock)
+            for name, func in originals.items():
+                setattr(entry, name, timer.wrap(name, func))
+
+            store = init_state_store(DEFAULT_COLUMNS)
+            written = {"bytes": 0}
+            write = store._write
+
+            def counting_write(name, df):
+                write(name, df)
+                written["bytes"] += os.path.getsize(store._paths[name])
+
+            store._write = counting_write
+
+            with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+                state = entry.EntryState()
+                state.last_minute_exec = clock() - 60   # 첫 틱에 1분 매수 생성
+
+                rows = []
+                for t in range(ticks):
+                    clock.advance(1.0)
+                    for market, price in zip(markets, paths[t]):
+                        broker.set_price(market, price)
+                    _invalidate_tick_caches()
+
+                    timer.reset()
+                    calls0 = broker.counters["requests"]
+                    bytes0 = written["bytes"]
+                    slept0 = clock.slept
+                    cpu0, wall0 = time.process_time(), time.perf_counter()
+
+                    try:
+                        entry.run_open_tick(state, clock(), f"T+{t}")
+                        entry.run_cleanup()
+                    except Exception as e:
+                        entry.handle_open_exception(state, e)
+                    finally:
+                        entry._flush_state()
+
+                    rows.append({
+                        "wall": time.perf_counter() - wall0,
+                        "cpu": time.process_time() - cpu0,
+                        "calls": broker.counters["requests"] - calls0,
+                        "bytes": written["bytes"] - bytes0,
+                        "slept": clock.slept - slept0,
+                        "phase_cpu": dict(timer.cpu),
+                        "phase_wall": dict(timer.wall),
+                    })
+        finally:
+            for name, func in originals.items():
+                setattr(entry, name, func)
+            scheduler_stats = poll_scheduler.get_poll_scheduler().stats()
+            restore()
+            os.chdir(cwd)
+
+    walls = [r["wall"] for r in rows]
+    stats = get_state_store().stats()
+    return {
+        "scenario": scenario,
+        "symbols": n_symbols,
+        "ticks": ticks,
+        "loop_ms": {"p50": _pct(walls, 50), "p95": _pct(walls, 95), "p99": _pct(walls, 99),
+                    "max": round(max(walls) * 1000, 3)},
+        "cpu_ms_per_tick": round(sum(r["cpu"] for r in rows) / ticks * 1000, 3),
+        "broker_calls_per_tick": round(sum(r["calls"] for r in rows) / ticks, 2),
+        "broker_calls_max_tick": max(r["calls"] for r in rows),
+        "csv_bytes_per_tick": round(sum(r["bytes"] for r in rows) / ticks, 1),
+        "simulated_sleep_sec": round(sum(r["slept"] for r in rows), 2),
+        "phase_cpu_ms_per_tick": {
+            p: round(sum(r["phase_cpu"][p] for r in rows) / ticks * 1000, 3) for p in PHASES
+        },
+        "phase_wall_ms_per_tick": {
+            p: round(sum(r["phase_wall"][p] for r in rows) / ticks * 1000, 3) for p in PHASES
+        },
+        "broker": {k: v for k, v in broker.stats().items() if k != "by_path"},
+        "broker_calls_per_tick_by_path": {
+            path.rsplit("/", 1)[-1]: round(n / ticks, 2) for path, n in broker.stats()["by_path"].items()
+        },
+        "poll_scheduler": scheduler_stats,
+        "state": {"buy_rows": stats["buy_rows"], "sell_rows": stats["sell_rows"]},
+    }
+
+
+# ==========================================
+# 출력 / 저장
+# ==========================================
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def print_result(r: dict, baseline: dict = None):
+    line = (f"  {r['scenario']:<11} {r['symbols']:>4}종목 | loop p50 {r['loop_ms']['p50']:8.2f} / "
+            f"p95 {r['loop_ms']['p95']:8.2f} / p99 {r['loop_ms']['p99']:8.2f} ms | "
+            f"호출 {r['broker_calls_per_tick']:6.1f}/틱 | CSV {r['csv_bytes_per_tick']:9.0f} B/틱")
+    if baseline:
+        prev = baseline.get((r["scenario"], r["symbols"]))
+        if prev and prev["loop_ms"]["p95"] > 0:
+            line += f" | p95 {r['loop_ms']['p95'] / prev['loop_ms']['p95']:5.2f}x (기준 대비)"
+    print(line)
+
+    top = sorted(r["phase_cpu_ms_per_tick"].items(), key=lambda x: -x[1])[:3]
+    print("      CPU 상위 단계: " + ", ".join(f"{p} {ms:.2f}ms" for p, ms in top))
+
+
+def load_baseline(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {(r["scenario"], r["symbols"]): r for r in data.get("results", [])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="entry 루프 종단간 벤치마크")
+    parser.add_argument("--symbols", default=",".join(map(str, SYMBOL_COUNTS)))
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--ticks", type=int, default=TICKS)
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (기본: benchmarks/results/entry_loop_<commit>.json)")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    counts = [int(x) for x in args.symbols.split(",") if x.strip()]
+    scenarios = [x.strip() for x in args.scenarios.split(",") if x.strip()]
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    commit = _git_commit()
+
+    print(f"[bench] entry 루프: 종목 {counts} / 시나리오 {scenarios} / {args.ticks}틱 (commit {commit})")
+
+    results = []
+    for scenario in scenarios:
+        for n in counts:
+            result = run_case(scenario, n, args.ticks)
+            results.append(result)
+            print_result(result, baseline)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"entry_loop_{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({
+            "commit": commit,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "ticks": args.ticks,
+            "results": results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"[bench] 결과 저장 → {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# benchmarks/bench_portfolio.py
+
+import sys
+import argparse
+
+sys.path.append(".")
+
+import numpy as np
+import pandas as pd
+
+from manager.backtest_engine import LadderParams
+from manager.portfolio_backtest import backtest_portfolio
+
+
+def make_candles(n: int, seed: int, vol: float = 0.002, start: float = 50.0) -> pd.DataFrame:
+    """1분봉 랜덤워크 OHLC"""
+    rng = np.random.default_rng(seed)
+    close = start * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    open_ = np.r_[start, close[:-1]]
+    return pd.DataFrame({
+        "time": pd.date_range("2024-01-02 09:30", periods=n, freq="min"),
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n))),
+        "low": np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n))),
+        "close": close,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="포트폴리오 백테스트 (공유 현금) 속도")
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--candles", type=int, default=390 * 252, help="종목당 봉 수 (기본: 미국장 1분봉 1년)")
+    parser.add_argument("--initial-cash", type=float, default=20_000)
+    args = parser.parse_args()
+
+    candles, params = {}, []
+    for s in range(args.symbols):
+        market = f"SYM{s:02d}"
+        candles[market] = make_candles(args.candles, seed=s)
+        params.append(LadderParams(market, 100.0 + 5 * s, 0.04, 2, 0.13, 7, 0.03))
+
+    result = backtest_portfolio(candles, params, initial_cash=args.initial_cash)
+    summary = result.summary()
+    print(f"[bench] {args.symbols}종목 × {args.candles:,}봉: {summary['elapsed_sec']}s "
+          f"({summary['symbol_steps_per_sec']:,} 종목·봉/s)")
+    print(f"[bench] 요약: {summary}")
+
+
+if __name__ == "__main__":
+    main()
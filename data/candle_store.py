@@ -0,0 +1,350 @@
+# data/candle_store.py
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+load_dotenv()
+
+# 분봉 저장 위치: {CANDLE_STORE_DIR}/{market}/{unit}m/{YYYY-MM-DD}.npy + _coverage.json
+CANDLE_STORE_DIR = os.getenv("CANDLE_STORE_DIR", "candles")
+
+# 업비트 분봉 조회 간격(초) – 요청 제한 회피
+CANDLE_FETCH_SLEEP = float(os.getenv("CANDLE_FETCH_SLEEP", "0.3"))
+
+# 업비트 1회 최대 조회 개수
+FETCH_PAGE = 200
+
+# 시각(ts)은 KST 기준 naive epoch 초 → 일자 파티션도 KST 날짜
+CANDLE_DTYPE = np.dtype([
+    ("ts", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+COVERAGE_FILE = "_coverage.json"
+DAY_SEC = 86400
+
+# CSV 가져오기: 업비트 응답 컬럼 / 시뮬레이터 결과 컬럼 → 저장 컬럼
+_CSV_ALIASES = {
+    "ts": ["ts", "time", "candle_date_time_kst", "시간", "datetime", "date"],
+    "open": ["open", "opening_price", "시가"],
+    "high": ["high", "high_price", "고가"],
+    "low": ["low", "low_price", "저가"],
+    "close": ["close", "trade_price", "종가"],
+    "volume": ["volume", "candle_acc_trade_volume", "거래량"],
+}
+
+
+def to_epoch(value) -> int:
+    """문자열 / Timestamp / datetime → naive(KST) epoch 초"""
+    return int(pd.Timestamp(value).tz_localize(None).value // 10**9)
+
+
+def from_epoch(ts: int) -> pd.Timestamp:
+    return pd.Timestamp(int(ts), unit="s")
+
+
+def merge_intervals(intervals) -> list:
+    """[start, end) 구간 목록 정렬 + 겹치거나 맞닿은 구간 병합"""
+    merged = []
+    for start, end in sorted((int(s), int(e)) for s, e in intervals if e > s):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def subtract_intervals(start: int, end: int, covered) -> list:
+    """[start, end) 중 covered에 없는 구간"""
+    gaps = []
+    cursor = start
+    for s, e in merge_intervals(covered):
+        if e <= cursor:
+            continue
+        if s >= end:
+            break
+        if s > cursor:
+            gaps.append((cursor, s))
+        cursor = max(cursor, e)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def to_records(candles) -> np.ndarray:
+    """업비트 분봉 응답(list[dict]) 또는 DataFrame → CANDLE_DTYPE 배열 (ts 오름차순, 중복은 뒤쪽 우선)"""
+    df = pd.DataFrame(candles)
+    if df.empty:
+        return np.empty(0, dtype=CANDLE_DTYPE)
+
+    columns = {}
+    for field, aliases in _CSV_ALIASES.items():
+        name = next((a for a in aliases if a in df.columns), None)
+        if name is None:
+            if field == "volume":
+                continue
+            raise ValueError(f"[candle_store] '{field}' 컬럼 없음 (가능한 이름: {aliases})")
+        columns[field] = name
+
+    records = np.empty(len(df), dtype=CANDLE_DTYPE)
+    records["ts"] = pd.to_datetime(df[columns["ts"]]).to_numpy(dtype="datetime64[s]").astype("int64")
+    for field in ("open", "high", "low", "close"):
+        records[field] = pd.to_numeric(df[columns[field]], errors="raise").to_numpy(dtype=float)
+    records["volume"] = (
+        pd.to_numeric(df[columns["volume"]], errors="coerce").fillna(0).to_numpy(dtype=float)
+        if "volume" in columns else 0.0
+    )
+    return _dedupe(records)
+
+
+def _dedupe(records: np.ndarray) -> np.ndarray:
+    """ts 오름차순 + 같은 ts는 마지막 값만 (나중에 받은 값이 이김)"""
+    if len(records) <= 1:
+        return records
+    ordered = records[np.argsort(records["ts"], kind="stable")]
+    keep = np.r_[ordered["ts"][1:] != ordered["ts"][:-1], True]
+    return ordered[keep]
+
+
+def find_missing_candles(records: np.ndarray, unit: int) -> list:
+    """
+    저장된 봉 사이 빈 구간 [(start, end)] – 데이터 자체의 구멍 확인용
+    (업비트는 거래 없는 분의 봉을 주지 않으므로, 재조회 대상은 coverage 기준으로 판단)
+    """
+    if len(records) < 2:
+        return []
+    step = unit * 60
+    ts = records["ts"]
+    holes = np.flatnonzero(np.diff(ts) > step)
+    return [(int(ts[i] + step), int(ts[i + 1])) for i in holes]
+
+
+class CandleStore:
+    """
+    market / 분 단위 / 일자별 .npy 파티션 분봉 저장소
+    - load(): 필요한 일자 파일만 memory-map으로 열어 구간만 잘라 합침 → 반복 백테스트는 ms 단위 로드
+    - _coverage.json: 실제로 조회(또는 가져오기)를 끝낸 [start, end) 구간
+      → ensure()는 coverage에 없는 구간만 업비트에서 받아옴 (거래 없는 분은 봉이 없어도 재조회 안 함)
+    - import_csv(): CSV에서 바로 채움 → 네트워크 없이 백테스트
+    """
+
+    def __init__(self, root: str = CANDLE_STORE_DIR, fetcher=None, sleep_sec: float = CANDLE_FETCH_SLEEP):
+        self.root = root
+        self._fetcher = fetcher or self._fetch_upbit_page
+        self.sleep_sec = sleep_sec
+        self._lock = threading.Lock()
+        self.fetch_calls = 0
+
+    # ------------------------------------------
+    # 경로 / coverage
+    # ------------------------------------------
+    def _dir(self, market: str, unit: int) -> str:
+        return os.path.join(self.root, market, f"{int(unit)}m")
+
+    def _day_path(self, market: str, unit: int, day: int) -> str:
+        name = (datetime(1970, 1, 1) + timedelta(days=int(day))).strftime("%Y-%m-%d")
+        return os.path.join(self._dir(market, unit), f"{name}.npy")
+
+    def coverage(self, market: str, unit: int) -> list:
+        path = os.path.join(self._dir(market, unit), COVERAGE_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            return [tuple(iv) for iv in json.load(f).get("intervals", [])]
+
+    def _add_coverage(self, market: str, unit: int, start: int, end: int):
+        folder = self._dir(market, unit)
+        os.makedirs(folder, exist_ok=True)
+        intervals = merge_intervals(self.coverage(market, unit) + [(start, end)])
+        path = os.path.join(folder, COVERAGE_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"intervals": intervals}, f)
+        os.replace(tmp, path)
+
+    def missing_ranges(self, market: str, unit: int, start, end) -> list:
+        """[start, end) 중 아직 조회하지 않은 구간 [(start, end)] (epoch 초)"""
+        return subtract_intervals(to_epoch(start), to_epoch(end), self.coverage(market, unit))
+
+    # ------------------------------------------
+    # 쓰기 / 읽기
+    # ------------------------------------------
+    def write(self, market: str, unit: int, candles, covered: tuple = None) -> int:
+        """
+        봉 저장 (일자 파일별 병합, 같은 ts는 새 값으로 교체) → 저장한 봉 수
+        - covered=(start, end): 이 구간은 조회 완료로 기록
+        """
+        records = candles if isinstance(candles, np.ndarray) else to_records(candles)
+        folder = self._dir(market, unit)
+
+        with self._lock:
+            os.makedirs(folder, exist_ok=True)
+            days = records["ts"] // DAY_SEC
+            for day in np.unique(days):
+                path = self._day_path(market, unit, day)
+                part = records[days == day]
+                if os.path.exists(path):
+                    part = _dedupe(np.concatenate([np.load(path), part]))
+                tmp = path + ".tmp"
+                with open(tmp, "wb") as f:
+                    np.save(f, part)
+                os.replace(tmp, path)
+
+            if covered is not None:
+                self._add_coverage(market, unit, *covered)
+
+        return len(records)
+
+    def load_records(self, market: str, unit: int, start, end) -> np.ndarray:
+        """[start, end) 봉 → CANDLE_DTYPE 배열 (memory-map에서 필요한 구간만 복사)"""
+        s, e = to_epoch(start), to_epoch(end)
+        parts = []
+        for day in range(s // DAY_SEC, (e - 1) // DAY_SEC + 1):
+            path = self._day_path(market, unit, day)
+            if not os.path.exists(path):
+                continue
+            mm = np.load(path, mmap_mode="r")
+            ts = mm["ts"]
+            lo, hi = np.searchsorted(ts, s), np.searchsorted(ts, e)
+            if hi > lo:
+                parts.append(np.array(mm[lo:hi]))
+            del mm, ts
+        if not parts:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return np.concatenate(parts)
+
+    def load(self, market: str, unit: int, start, end) -> pd.DataFrame:
+        """[start, end) 봉 → DataFrame(time, open, high, low, close, volume)"""
+        records = self.load_records(market, unit, start, end)
+        df = pd.DataFrame({name: records[name] for name in CANDLE_DTYPE.names if name != "ts"})
+        df.insert(0, "time", records["ts"].astype("datetime64[s]"))
+        return df
+
+    # ------------------------------------------
+    # 조회 (빈 구간만)
+    # ------------------------------------------
+    @staticmethod
+    def _fetch_upbit_page(market: str, unit: int, to: str, count: int) -> list:
+        from api.price import get_minute_candles
+        return get_minute_candles(market, unit=unit, to=to, count=count)
+
+    def _fetch_range(self, market: str, unit: int, start: int, end: int):
+        """
+        [start, end) 을 뒤에서부터 200개씩 조회 → 받은 만큼 저장 + coverage 기록
+        - 중간에 실패하면 그때까지 받은 구간만 coverage로 남기고 예외 전파
+        """
+        to = end
+        fetched = 0
+        try:
+            while to > start:
+                to_str = from_epoch(to).strftime("%Y-%m-%dT%H:%M:%S") + "+09:00"
+                page = self._fetcher(market, unit, to_str, FETCH_PAGE)
+                self.fetch_calls += 1
+                records = to_records(page)
+                if not len(records):
+                    to = start
+                    break
+
+                oldest = int(records["ts"][0])
+                records = records[(records["ts"] >= start) & (records["ts"] < end)]
+                if len(records):
+                    self.write(market, unit, records)
+                    fetched += len(records)
+
+                if oldest >= to:        # 더 과거로 진행하지 않음 → 무한 루프 방지
+                    break
+                to = oldest
+                if self.sleep_sec and to > start:
+                    time.sleep(self.sleep_sec)
+        finally:
+            if to < end:
+                self._add_coverage(market, unit, max(to, start), end)
+
+        return fetched
+
+    def ensure(self, market: str, unit: int, start, end) -> pd.DataFrame:
+        """[start, end) 중 비어 있는 구간만 조회해 채운 뒤 로드"""
+        s, e = to_epoch(start), to_epoch(end)
+        # 아직 끝나지 않은 현재 봉은 coverage로 남기지 않음 (다음 실행에 다시 받음)
+        now = to_epoch(pd.Timestamp.now(tz="Asia/Seoul")) // (unit * 60) * (unit * 60)
+        gaps = subtract_intervals(s, min(e, now), self.coverage(market, unit))
+
+        for gap_start, gap_end in gaps:
+            log.info(f"[candle_store] {market} {unit}분봉 조회: {from_epoch(gap_start)} ~ {from_epoch(gap_end)}")
+            fetched = self._fetch_range(market, unit, gap_start, gap_end)
+            log.info(f"[candle_store] {market} {unit}분봉 {fetched}개 저장")
+
+        if not gaps:
+            log.info(f"[candle_store] {market} {unit}분봉 로컬 캐시 사용 ({from_epoch(s)} ~ {from_epoch(e)})")
+        return self.load(market, unit, start, end)
+
+    # ------------------------------------------
+    # CSV 가져오기 (오프라인)
+    # ------------------------------------------
+    def import_csv(self, path: str, market: str, unit: int, mark_covered: bool = True) -> int:
+        """
+        CSV → 저장소 (업비트 응답 컬럼, open/high/low/close, 시뮬레이터 결과 컬럼 모두 가능)
+        - mark_covered: 파일의 첫 봉 ~ 마지막 봉 구간을 조회 완료로 기록 → ensure()가 네트워크를 쓰지 않음
+        """
+        records = to_records(pd.read_csv(path))
+        if not len(records):
+            return 0
+        covered = (int(records["ts"][0]), int(records["ts"][-1]) + unit * 60) if mark_covered else None
+        count = self.write(market, unit, records, covered=covered)
+        log.info(f"[candle_store] {path} → {market} {unit}분봉 {count}개 가져오기 완료")
+        return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="분봉 로컬 저장소 (가져오기 / 조회 / 빈 구간 확인)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_import = sub.add_parser("import", help="CSV → 저장소")
+    p_import.add_argument("csv", nargs="+")
+
+    p_fetch = sub.add_parser("fetch", help="빈 구간만 업비트에서 조회")
+    p_gaps = sub.add_parser("gaps", help="조회하지 않은 구간 / 봉 사이 빈 구간 출력")
+    for p in (p_fetch, p_gaps):
+        p.add_argument("--start", required=True)
+        p.add_argument("--end", required=True)
+
+    for p in (p_import, p_fetch, p_gaps):
+        p.add_argument("--market", required=True)
+        p.add_argument("--unit", type=int, default=1)
+        p.add_argument("--root", default=CANDLE_STORE_DIR)
+
+    args = parser.parse_args(argv)
+    store = CandleStore(args.root)
+
+    if args.command == "import":
+        total = sum(store.import_csv(path, args.market, args.unit) for path in args.csv)
+        print(f"✅ [candle_store] {args.market} {args.unit}분봉 {total}개 가져오기 완료 → {store.root}")
+    elif args.command == "fetch":
+        df = store.ensure(args.market, args.unit, args.start, args.end)
+        print(f"✅ [candle_store] {args.market} {args.unit}분봉 {len(df)}개 ({store.fetch_calls}회 조회)")
+    else:
+        for s, e in store.missing_ranges(args.market, args.unit, args.start, args.end):
+            print(f"⬜ 미조회 구간: {from_epoch(s)} ~ {from_epoch(e)}")
+        records = store.load_records(args.market, args.unit, args.start, args.end)
+        for s, e in find_missing_candles(records, args.unit):
+            print(f"· 봉 없음: {from_epoch(s)} ~ {from_epoch(e)}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
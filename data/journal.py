@@ -0,0 +1,370 @@
+# data/journal.py
+
+import os
+import json
+import glob
+from datetime import datetime
+import pandas as pd
+from dotenv import load_dotenv
+
+from data.state_store import (
+    StateStore,
+    DEFAULT_COLUMNS,
+    BUY_LOG_PATH,
+    SELL_LOG_PATH,
+    _UUID_COLUMNS,
+    _STATE_COLUMNS,
+)
+from data.row_diff import diff_rows, row_values, py_value
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+load_dotenv()
+
+STATE_JOURNAL_DIR = os.getenv("STATE_JOURNAL_DIR", "state_journal")
+
+# 마지막 스냅샷 이후 레코드가 이만큼 쌓이면 스냅샷 + 저널 세그먼트 교체
+SNAPSHOT_EVERY = int(os.getenv("STATE_SNAPSHOT_EVERY", "1000"))
+
+_LOGS = {"buy_log.csv": "buy_log", "sell_log.csv": "sell_log"}
+
+SNAPSHOT_FILE = "snapshot.json"
+JOURNAL_FILE = "journal.jsonl"
+ARCHIVE_DIR = "archive"
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _dumps(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+def _fsync_write(path: str, text: str):
+    """tmp 파일에 쓰고 fsync 후 교체 (스냅샷용)"""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_journal(path: str) -> list:
+    """
+    저널 세그먼트 → 레코드 목록
+    - 마지막 줄이 쓰다 만 상태(비정상 종료)면 그 줄만 버림
+    """
+    if not os.path.exists(path):
+        return []
+
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    for i, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            if i == len(lines) - 1:
+                log.warning(f"⚠️ [journal] {path} 마지막 레코드 손상 → 무시")
+                break
+            raise
+    return records
+
+
+def apply_record(state: dict, record: dict):
+    """
+    레코드 1건을 복원 상태에 반영
+    state: {log: {id: {col: value}}} (dict 순서 = row 순서)
+    """
+    op = record["op"]
+    if op == "fill":
+        return
+
+    rows = state[record["log"]]
+    row_id = record["id"]
+
+    if op == "insert":
+        rows[row_id] = dict(record["row"])
+    elif op == "update":
+        rows.setdefault(row_id, {}).update(record["set"])
+    elif op == "delete":
+        rows.pop(row_id, None)
+
+
+class JournalStateStore(StateStore):
+    """
+    StateStore의 append-only 저널 백엔드
+    - flush 때 바뀐 row만 insert / update / delete 레코드로 저널에 추가 (JSON lines)
+      → 틱당 fsync 1번, 파일 전체 재작성 없음
+    - 레코드가 SNAPSHOT_EVERY개 쌓이면 스냅샷 저장 후 저널 세그먼트를 archive/로 옮김 (compaction)
+    - 시작 시 스냅샷 + 이후 저널(tail) 재생으로 복원
+    - archive/ 세그먼트는 지우지 않음 → 상태 변화 전체 이력 (사후 분석용)
+    - 저널/스냅샷이 모두 없으면 기존 CSV에서 최초 1회 가져옴
+    """
+
+    def __init__(self, columns: dict = None, journal_dir: str = STATE_JOURNAL_DIR,
+                 buy_path: str = BUY_LOG_PATH, sell_path: str = SELL_LOG_PATH,
+                 snapshot_every: int = SNAPSHOT_EVERY):
+        columns = columns or DEFAULT_COLUMNS
+
+        self.journal_dir = journal_dir
+        self.snapshot_every = snapshot_every
+        self._snapshot_path = os.path.join(journal_dir, SNAPSHOT_FILE)
+        self._journal_path = os.path.join(journal_dir, JOURNAL_FILE)
+        os.makedirs(os.path.join(journal_dir, ARCHIVE_DIR), exist_ok=True)
+
+        self._seq = 0
+        self._next_id = 1
+        self._since_snapshot = 0
+        self._segment_start = None
+        self._replayed = {}
+        self._persisted = {}
+        self.journal_stats = {"records": 0, "appends": 0, "bytes": 0, "snapshots": 0, "replayed": 0}
+
+        seeded = self._replay(columns)
+        self._journal = open(self._journal_path, "a", encoding="utf-8")
+
+        super().__init__(columns, buy_path, sell_path)
+
+        if not seeded:
+            self._seed_from_csv(buy_path, sell_path)
+
+    # ------------------------------------------
+    # 복원
+    # ------------------------------------------
+    def _replay(self, columns: dict) -> bool:
+        """스냅샷 + 저널 tail 재생 → self._replayed. 복원할 것이 있었으면 True"""
+        state = {table: {} for table in _LOGS.values()}
+        snap_seq = 0
+        found = False
+
+        if os.path.exists(self._snapshot_path):
+            with open(self._snapshot_path, "r", encoding="utf-8") as f:
+                snap = json.load(f)
+            snap_seq = snap["seq"]
+            self._next_id = snap["next_id"]
+            for table, data in snap["logs"].items():
+                cols = data["columns"]
+                state[table] = {
+                    row_id: dict(zip(cols, values))
+                    for row_id, values in zip(data["ids"], data["rows"])
+                }
+            found = True
+
+        self._seq = snap_seq
+        for record in read_journal(self._journal_path):
+            if record["seq"] <= snap_seq:
+                continue
+            apply_record(state, record)
+            self._seq = record["seq"]
+            if "id" in record:
+                self._next_id = max(self._next_id, record["id"] + 1)
+            if self._segment_start is None:
+                self._segment_start = record["seq"]
+            self._since_snapshot += 1
+            self.journal_stats["replayed"] += 1
+            found = True
+
+        self._replayed = {
+            name: state[table] for name, table in _LOGS.items()
+        }
+        if found:
+            log.info(
+                f"🔁 [journal] 복원 완료: 스냅샷 seq={snap_seq}, "
+                f"저널 재생 {self.journal_stats['replayed']}건 → seq={self._seq}"
+            )
+        return found
+
+    def _seed_from_csv(self, buy_path: str, sell_path: str):
+        csv_store = StateStore(
+            {name: self._columns[name] for name in _LOGS}, buy_path, sell_path
+        )
+        self.set_buy_log(csv_store.buy_log())
+        self.set_sell_log(csv_store.sell_log())
+        saved = self.flush()
+        if saved:
+            log.info(f"📥 [journal] CSV → {self.journal_dir} 최초 가져오기 완료")
+
+    # ------------------------------------------
+    # StateStore 백엔드 훅
+    # ------------------------------------------
+    def _file_mtime(self, name: str):
+        # 저널은 외부 수정 감지(CSV 수동 편집) 대상이 아님
+        return None
+
+    def _read(self, name: str) -> pd.DataFrame:
+        columns = self._columns[name]
+        rows = self._replayed.get(name, {})
+        df = pd.DataFrame(
+            [[row.get(c) for c in columns] for row in rows.values()], columns=columns
+        )
+        df[_UUID_COLUMNS[name]] = df[_UUID_COLUMNS[name]].astype(object)
+        return df
+
+    def _load(self, name: str):
+        super()._load(name)
+        ids = list(self._replayed.get(name, {}).keys())
+        self._persisted[name] = list(zip(ids, row_values(self._frame(name))))
+
+    def _write(self, name: str, df: pd.DataFrame):
+        columns = self._columns[name]
+        table = _LOGS[name]
+        new = row_values(df)
+
+        uuid_pos = columns.index(_UUID_COLUMNS[name])
+        ident_pos = [i for i, c in enumerate(columns) if c not in _STATE_COLUMNS[name]]
+        ids_for_new, updates, deletes, inserts = diff_rows(
+            self._persisted[name], new, uuid_pos, ident_pos
+        )
+
+        ts = _now()
+        records = [{"op": "delete", "log": table, "id": row_id} for row_id in deletes]
+
+        for row_id, old_values, new_values in updates:
+            changed = {
+                columns[i]: b for i, (a, b) in enumerate(zip(old_values, new_values)) if a != b
+            }
+            records.append({"op": "update", "log": table, "id": row_id, "set": changed})
+
+        for pos in inserts:
+            ids_for_new[pos] = self._next_id
+            self._next_id += 1
+            records.append({
+                "op": "insert", "log": table, "id": ids_for_new[pos],
+                "row": dict(zip(columns, new[pos])),
+            })
+
+        for record in records:
+            record["ts"] = ts
+        self._append(records)
+
+        self._persisted[name] = list(zip(ids_for_new, new))
+
+    def _append(self, records: list):
+        """레코드 묶음을 저널 끝에 추가하고 fsync 1번"""
+        if not records:
+            return
+
+        lines = []
+        for record in records:
+            self._seq += 1
+            record["seq"] = self._seq
+            lines.append(_dumps(record))
+        if self._segment_start is None:
+            self._segment_start = records[0]["seq"]
+
+        text = "\n".join(lines) + "\n"
+        self._journal.write(text)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+        self._since_snapshot += len(records)
+        self.journal_stats["records"] += len(records)
+        self.journal_stats["appends"] += 1
+        self.journal_stats["bytes"] += len(text.encode("utf-8"))
+
+    def flush(self) -> int:
+        saved = super().flush()
+        with self._lock:
+            if self._since_snapshot >= self.snapshot_every:
+                self.compact()
+        return saved
+
+    # ------------------------------------------
+    # 스냅샷 / compaction
+    # ------------------------------------------
+    def compact(self):
+        """
+        현재 저장 상태를 스냅샷으로 남기고 저널 세그먼트를 archive/로 이동
+        - 스냅샷이 먼저 디스크에 확정된 뒤 세그먼트를 옮기므로 도중에 죽어도 재생 결과는 같음
+        """
+        with self._lock:
+            snap = {"seq": self._seq, "next_id": self._next_id, "ts": _now(), "logs": {}}
+            for name, table in _LOGS.items():
+                persisted = self._persisted[name]
+                snap["logs"][table] = {
+                    "columns": self._columns[name],
+                    "ids": [row_id for row_id, _ in persisted],
+                    "rows": [list(values) for _, values in persisted],
+                }
+            _fsync_write(self._snapshot_path, _dumps(snap))
+
+            self._journal.close()
+            if self._segment_start is not None and os.path.exists(self._journal_path):
+                archived = os.path.join(
+                    self.journal_dir, ARCHIVE_DIR,
+                    f"journal-{self._segment_start:010d}-{self._seq:010d}.jsonl",
+                )
+                os.replace(self._journal_path, archived)
+            self._journal = open(self._journal_path, "a", encoding="utf-8")
+
+            self._segment_start = None
+            self._since_snapshot = 0
+            self.journal_stats["snapshots"] += 1
+            log.info(f"🗜️ [journal] 스냅샷 저장 (seq={self._seq}) + 저널 세그먼트 보관")
+
+    # ------------------------------------------
+    # 체결 이력 / 감사 추적
+    # ------------------------------------------
+    def record_fill(self, side: str, market: str, uuid: str,
+                    price: float = None, units: float = None, order_type: str = ""):
+        """체결 이벤트를 저널에 바로 추가 (복원 상태에는 영향 없음)"""
+        with self._lock:
+            self._append([{
+                "op": "fill", "ts": _now(), "side": side, "market": market,
+                "uuid": str(uuid), "order_type": order_type or "",
+                "price": py_value(price), "units": py_value(units),
+            }])
+        return 1
+
+    def history(self, uuid: str = None, include_archive: bool = True) -> list:
+        """
+        상태 변화 이력 조회 (사후 분석용)
+        - uuid 지정 시 해당 주문번호가 등장하는 레코드 + 같은 row id의 이후 변화
+        """
+        with self._lock:
+            paths = []
+            if include_archive:
+                paths = sorted(glob.glob(os.path.join(self.journal_dir, ARCHIVE_DIR, "journal-*.jsonl")))
+            paths.append(self._journal_path)
+
+            records = []
+            for path in paths:
+                records.extend(read_journal(path))
+
+        if uuid is None:
+            return records
+
+        uuid = str(uuid).strip()
+        ids = set()
+        result = []
+        for record in records:
+            values = {**record.get("row", {}), **record.get("set", {})}
+            hit = record.get("uuid") == uuid or uuid in {
+                str(values.get(col)) for col in _UUID_COLUMNS.values()
+            }
+            key = (record.get("log"), record.get("id"))
+            if hit and "id" in record:
+                ids.add(key)
+            if hit or key in ids:
+                result.append(record)
+        return result
+
+    def stats(self) -> dict:
+        result = super().stats()
+        result["backend"] = "journal"
+        result["journal_dir"] = self.journal_dir
+        result["seq"] = self._seq
+        result["since_snapshot"] = self._since_snapshot
+        result["journal"] = dict(self.journal_stats)
+        return result
+
+    def close(self):
+        with self._lock:
+            self._journal.close()
@@ -0,0 +1,208 @@
+# data/order_records.py
+
+import copy
+import math
+from dataclasses import dataclass, fields, astuple
+from typing import ClassVar
+import pandas as pd
+
+
+# 아직 확정되지 않은(상태 조회 대상) filled 값
+PENDING_STATES = ("", "wait", "update")
+
+
+def _text(value) -> str:
+    """NaN / None → "", 그 외 문자열 strip"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value).strip()
+
+
+def _uuid(value):
+    """uuid 정규화 (31161743.0 → "31161743", 빈 값 → None)"""
+    s = _text(value).replace(".0", "")
+    if s in ("", "nan", "NaN", "None", "null"):
+        return None
+    return s
+
+
+# ==========================================
+# 주문 레코드
+# ==========================================
+@dataclass(slots=True)
+class BuyOrder:
+    """buy_log 1행"""
+    time: object = None
+    market: str = ""
+    target_price: float = math.nan
+    buy_amount: float = math.nan
+    buy_units: float = math.nan
+    buy_type: str = ""
+    buy_uuid: str = None
+    filled: str = ""
+
+    UUID_FIELD: ClassVar[str] = "buy_uuid"
+
+    @property
+    def uuid(self):
+        return self.buy_uuid
+
+    @uuid.setter
+    def uuid(self, value):
+        self.buy_uuid = _uuid(value)
+
+    def is_pending(self) -> bool:
+        return bool(self.buy_uuid) and self.filled in PENDING_STATES
+
+
+@dataclass(slots=True)
+class SellOrder:
+    """sell_log 1행"""
+    market: str = ""
+    avg_buy_price: float = math.nan
+    quantity: float = math.nan
+    target_sell_price: float = math.nan
+    sell_uuid: str = None
+    filled: str = ""
+
+    UUID_FIELD: ClassVar[str] = "sell_uuid"
+
+    @property
+    def uuid(self):
+        return self.sell_uuid
+
+    @uuid.setter
+    def uuid(self, value):
+        self.sell_uuid = _uuid(value)
+
+    def is_pending(self) -> bool:
+        return bool(self.sell_uuid) and self.filled in PENDING_STATES
+
+
+@dataclass(slots=True)
+class FillEvent:
+    """체결 이벤트 (detect_filled_buy_orders 결과 등)"""
+    side: str
+    market: str
+    uuid: str
+    order_type: str = ""
+    amount: float = 0.0
+    units: float = 0.0
+    price: float = 0.0
+    row_index: int = -1
+    detected_at: float = 0.0   # 감지 시각 (time.monotonic) – 체결→매도주문 지연 측정용
+
+
+def _columns(record_cls) -> list:
+    return [f.name for f in fields(record_cls)]
+
+
+def _from_row(record_cls, row: dict):
+    record = record_cls(**{name: row.get(name) for name in _columns(record_cls)})
+    record.uuid = getattr(record, record_cls.UUID_FIELD)
+    record.filled = _text(record.filled)
+    return record
+
+
+# ==========================================
+# 주문 테이블
+# ==========================================
+class OrderTable:
+    """
+    주문 레코드 목록 + 종목 / uuid 인덱스
+    - 루프 안에서는 레코드 속성만 읽고 고침 (pandas row 변환 없음)
+    - DataFrame 변환은 저장(StateStore) / 전략 계산(generate_*) 경계에서만
+    - uuid를 바꿀 때는 set_uuid()로 해야 인덱스가 맞음
+    """
+
+    def __init__(self, record_cls, records=()):
+        self.record_cls = record_cls
+        self._records = list(records)
+        self._reindex()
+
+    @classmethod
+    def from_frame(cls, record_cls, df: pd.DataFrame):
+        if df is None or df.empty:
+            return cls(record_cls)
+        columns = [c for c in _columns(record_cls) if c in df.columns]
+        rows = df[columns].to_dict("records")
+        return cls(record_cls, [_from_row(record_cls, row) for row in rows])
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            [astuple(r) for r in self._records], columns=_columns(self.record_cls)
+        )
+
+    def copy(self):
+        """레코드 단위 복사본 (복사본을 고쳐도 원본 레코드는 그대로)"""
+        return OrderTable(self.record_cls, [copy.copy(r) for r in self._records])
+
+    def _reindex(self):
+        self._by_market = {}
+        self._by_uuid = {}
+        for record in self._records:
+            self._by_market.setdefault(record.market, []).append(record)
+            if record.uuid:
+                self._by_uuid[record.uuid] = record
+
+    # ------------------------------------------
+    # 조회
+    # ------------------------------------------
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(list(self._records))
+
+    def markets(self) -> list:
+        return list(self._by_market)
+
+    def by_market(self, market: str) -> list:
+        return list(self._by_market.get(market, ()))
+
+    def get(self, uuid: str):
+        return self._by_uuid.get(_uuid(uuid))
+
+    def pending(self) -> list:
+        return [r for r in self._records if r.is_pending()]
+
+    def index_of(self, record) -> int:
+        for i, r in enumerate(self._records):
+            if r is record:
+                return i
+        return -1
+
+    # ------------------------------------------
+    # 수정
+    # ------------------------------------------
+    def append(self, record):
+        self._records.append(record)
+        self._by_market.setdefault(record.market, []).append(record)
+        if record.uuid:
+            self._by_uuid[record.uuid] = record
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def set_uuid(self, record, uuid):
+        old = record.uuid
+        if old and self._by_uuid.get(old) is record:
+            del self._by_uuid[old]
+        record.uuid = uuid
+        if record.uuid:
+            self._by_uuid[record.uuid] = record
+
+    def remove(self, records) -> int:
+        """레코드 제거 (객체 기준). 반환: 제거 수"""
+        ids = {id(r) for r in records}
+        before = len(self._records)
+        self._records = [r for r in self._records if id(r) not in ids]
+        self._reindex()
+        return before - len(self._records)
+
+    def remove_market(self, market: str) -> list:
+        removed = self.by_market(market)
+        if removed:
+            self.remove(removed)
+        return removed
@@ -0,0 +1,85 @@
+# data/row_diff.py
+
+from collections import defaultdict
+import pandas as pd
+
+
+def py_value(value):
+    """numpy 스칼라 / NaN → sqlite / JSON에 저장할 수 있는 파이썬 값"""
+    if value is None:
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def row_values(df: pd.DataFrame) -> list:
+    """DataFrame → 비교/저장용 row 튜플 목록"""
+    return [tuple(py_value(v) for v in row) for row in df.itertuples(index=False, name=None)]
+
+
+def diff_rows(old: list, new: list, uuid_pos: int, ident_pos: list):
+    """
+    저장된 row와 새 row 비교 → 최소한의 row 단위 변경 목록
+    old: [(id, values)], new: [values]
+
+    1) 값이 완전히 같은 row → 변경 없음
+    2) uuid가 같은 row → UPDATE (filled 변경 등)
+    3) 식별 컬럼(uuid/filled 제외)이 같은 row → UPDATE (uuid 교체 등)
+    4) 나머지 → DELETE / INSERT
+
+    반환: (ids_for_new, updates[(id, old_values, new_values)], deletes[id], inserts[new_pos])
+    """
+    ids_for_new = [None] * len(new)
+
+    by_values = defaultdict(list)
+    for row_id, values in old:
+        by_values[values].append(row_id)
+
+    used = set()
+    pending = []
+    for pos, values in enumerate(new):
+        ids = by_values.get(values)
+        if ids:
+            row_id = ids.pop(0)
+            ids_for_new[pos] = row_id
+            used.add(row_id)
+        else:
+            pending.append(pos)
+
+    leftover = [(row_id, values) for row_id, values in old if row_id not in used]
+    updates = []
+
+    key_funcs = (
+        lambda v: v[uuid_pos],
+        lambda v: tuple(v[i] for i in ident_pos),
+    )
+    for key_func in key_funcs:
+        if not pending or not leftover:
+            break
+
+        index = defaultdict(list)
+        for row_id, values in leftover:
+            key = key_func(values)
+            if key is not None:
+                index[key].append((row_id, values))
+
+        still_pending = []
+        for pos in pending:
+            key = key_func(new[pos])
+            candidates = index.get(key) if key is not None else None
+            if candidates:
+                row_id, old_values = candidates.pop(0)
+                ids_for_new[pos] = row_id
+                used.add(row_id)
+                updates.append((row_id, old_values, new[pos]))
+            else:
+                still_pending.append(pos)
+
+        pending = still_pending
+        leftover = [(row_id, values) for row_id, values in leftover if row_id not in used]
+
+    deletes = [row_id for row_id, _ in leftover]
+    return ids_for_new, updates, deletes, pending
@@ -0,0 +1,318 @@
+# data/sqlite_store.py
+
+import os
+import sys
+import sqlite3
+import argparse
+from datetime import datetime
+import pandas as pd
+from dotenv import load_dotenv
+
+from data.state_store import (
+    StateStore,
+    DEFAULT_COLUMNS,
+    BUY_LOG_PATH,
+    SELL_LOG_PATH,
+    _UUID_COLUMNS,
+    _NUMERIC_COLUMNS,
+    _STATE_COLUMNS,
+)
+from data.row_diff import diff_rows, row_values, py_value
+from utils.csv_utils import atomic_save
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+load_dotenv()
+
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", "state.db")
+
+_TABLES = {"buy_log.csv": "buy_log", "sell_log.csv": "sell_log"}
+
+_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_buy_log_market_type ON buy_log(market, buy_type)",
+    "CREATE INDEX IF NOT EXISTS idx_buy_log_uuid ON buy_log(buy_uuid)",
+    "CREATE INDEX IF NOT EXISTS idx_sell_log_market ON sell_log(market)",
+    "CREATE INDEX IF NOT EXISTS idx_sell_log_uuid ON sell_log(sell_uuid)",
+    "CREATE INDEX IF NOT EXISTS idx_fill_events_market_ts ON fill_events(market, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_fill_events_uuid ON fill_events(uuid)",
+]
+
+
+# ==========================================
+# 스키마 / 연결
+# ==========================================
+def _connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _create_schema(conn: sqlite3.Connection, columns: dict):
+    """buy_log / sell_log / fill_events 테이블 + 인덱스 생성 (CSV 컬럼 구성 그대로)"""
+    with conn:
+        for name, table in _TABLES.items():
+            # 숫자 컬럼은 타입 선언 없이 저장 → 넣은 값(int/float) 그대로 복원 (100.0이 100으로 바뀌지 않음)
+            defs = [
+                f'"{col}"' if col in _NUMERIC_COLUMNS[name] else f'"{col}" TEXT'
+                for col in columns[name]
+            ]
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                f"(id INTEGER PRIMARY KEY AUTOINCREMENT, {', '.join(defs)})"
+            )
+
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS fill_events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, ts TEXT, side TEXT, market TEXT, "
+            "uuid TEXT, order_type TEXT, price REAL, units REAL, UNIQUE(side, uuid))"
+        )
+
+        for sql in _INDEXES:
+            conn.execute(sql)
+
+
+# ==========================================
+# SQLite 백엔드
+# ==========================================
+class SqliteStateStore(StateStore):
+    """
+    StateStore의 SQLite(WAL) 백엔드
+    - 메모리 상태 / dirty 관리 / 틱 끝 flush 흐름은 CSV 백엔드와 동일
+    - flush 때 파일 전체를 다시 쓰지 않고, 바뀐 row만 INSERT / UPDATE / DELETE
+    - 체결 이벤트는 fill_events 테이블에 누적 (시작 시 로드하지 않음 → 이력이 늘어도 시작 시간 일정)
+    - DB가 비어 있고 CSV가 있으면 최초 1회 CSV에서 가져옴
+    """
+
+    def __init__(self, columns: dict = None, db_path: str = STATE_DB_PATH,
+                 buy_path: str = BUY_LOG_PATH, sell_path: str = SELL_LOG_PATH,
+                 import_if_empty: bool = True):
+        columns = columns or DEFAULT_COLUMNS
+
+        self.db_path = db_path
+        self._conn = _connect(db_path)
+        _create_schema(self._conn, columns)
+
+        self._read_ids = {}
+        self._persisted = {}
+        self.row_ops = {"insert": 0, "update": 0, "delete": 0, "fills": 0}
+
+        if import_if_empty and self._is_empty():
+            imported = import_csv(self._conn, columns, buy_path, sell_path)
+            if any(imported.values()):
+                log.info(f"📥 [sqlite_store] CSV → {db_path} 최초 가져오기: {imported}")
+
+        super().__init__(columns, buy_path, sell_path)
+
+    def _is_empty(self) -> bool:
+        for table in _TABLES.values():
+            if self._conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                return False
+        return True
+
+    # ------------------------------------------
+    # StateStore 백엔드 훅
+    # ------------------------------------------
+    def _file_mtime(self, name: str):
+        # DB는 외부 수정 감지(CSV 수동 편집) 대상이 아님
+        return None
+
+    def _read(self, name: str) -> pd.DataFrame:
+        columns = self._columns[name]
+        quoted = ", ".join(f'"{c}"' for c in columns)
+        rows = self._conn.execute(
+            f"SELECT id, {quoted} FROM {_TABLES[name]} ORDER BY id"
+        ).fetchall()
+
+        self._read_ids[name] = [row[0] for row in rows]
+        df = pd.DataFrame([row[1:] for row in rows], columns=columns)
+        df[_UUID_COLUMNS[name]] = df[_UUID_COLUMNS[name]].astype(object)
+        return df
+
+    def _load(self, name: str):
+        super()._load(name)
+        values = row_values(self._frame(name))
+        self._persisted[name] = list(zip(self._read_ids.pop(name), values))
+
+    def _write(self, name: str, df: pd.DataFrame):
+        columns = self._columns[name]
+        table = _TABLES[name]
+        new = row_values(df)
+
+        uuid_pos = columns.index(_UUID_COLUMNS[name])
+        ident_pos = [i for i, c in enumerate(columns) if c not in _STATE_COLUMNS[name]]
+        ids_for_new, updates, deletes, inserts = diff_rows(
+            self._persisted[name], new, uuid_pos, ident_pos
+        )
+
+        quoted = ", ".join(f'"{c}"' for c in columns)
+        placeholders = ", ".join("?" for _ in columns)
+
+        with self._conn:
+            if deletes:
+                self._conn.executemany(
+                    f"DELETE FROM {table} WHERE id = ?", [(row_id,) for row_id in deletes]
+                )
+
+            for row_id, old_values, new_values in updates:
+                changed = [i for i, (a, b) in enumerate(zip(old_values, new_values)) if a != b]
+                sets = ", ".join(f'"{columns[i]}" = ?' for i in changed)
+                self._conn.execute(
+                    f"UPDATE {table} SET {sets} WHERE id = ?",
+                    [new_values[i] for i in changed] + [row_id],
+                )
+
+            for pos in inserts:
+                cur = self._conn.execute(
+                    f"INSERT INTO {table} ({quoted}) VALUES ({placeholders})", new[pos]
+                )
+                ids_for_new[pos] = cur.lastrowid
+
+        self._persisted[name] = list(zip(ids_for_new, new))
+        self.row_ops["insert"] += len(inserts)
+        self.row_ops["update"] += len(updates)
+        self.row_ops["delete"] += len(deletes)
+
+    # ------------------------------------------
+    # 체결 이력 / 인덱스 조회
+    # ------------------------------------------
+    def record_fill(self, side: str, market: str, uuid: str,
+                    price: float = None, units: float = None, order_type: str = ""):
+        """체결 이벤트 1건 추가 (같은 side/uuid는 한 번만 기록)"""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO fill_events "
+                "(ts, side, market, uuid, order_type, price, units) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    side, market, str(uuid), order_type or "", py_value(price), py_value(units),
+                ),
+            )
+            self.row_ops["fills"] += cur.rowcount
+        return cur.rowcount
+
+    def fill_events(self, market: str = None, limit: int = 100) -> pd.DataFrame:
+        """최근 체결 이벤트 (market 지정 시 (market, ts) 인덱스 사용)"""
+        sql = "SELECT ts, side, market, uuid, order_type, price, units FROM fill_events"
+        params = []
+        if market:
+            sql += " WHERE market = ?"
+            params.append(market)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(int(limit))
+
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def find_by_uuid(self, uuid: str) -> dict:
+        """
+        주문번호로 buy_log / sell_log row 조회 (uuid 인덱스 사용)
+        - 메모리 변경분을 먼저 flush해서 DB와 맞춘 뒤 조회
+        """
+        self.flush()
+        uuid = str(uuid).strip()
+
+        with self._lock:
+            for name, table in _TABLES.items():
+                columns = self._columns[name]
+                quoted = ", ".join(f'"{c}"' for c in columns)
+                row = self._conn.execute(
+                    f'SELECT {quoted} FROM {table} WHERE "{_UUID_COLUMNS[name]}" = ? LIMIT 1',
+                    (uuid,),
+                ).fetchone()
+                if row:
+                    return {"log": table, **dict(zip(columns, row))}
+        return None
+
+    def market_rows(self, market: str, buy_type: str = None) -> pd.DataFrame:
+        """종목(+buy_type)별 buy_log 조회 ((market, buy_type) 인덱스 사용)"""
+        self.flush()
+        columns = self._columns["buy_log.csv"]
+        quoted = ", ".join(f'"{c}"' for c in columns)
+
+        sql = f"SELECT {quoted} FROM buy_log WHERE market = ?"
+        params = [market]
+        if buy_type is not None:
+            sql += " AND buy_type = ?"
+            params.append(buy_type)
+
+        with self._lock:
+            return pd.read_sql_query(sql + " ORDER BY id", self._conn, params=params)
+
+    def stats(self) -> dict:
+        result = super().stats()
+        result["backend"] = "sqlite"
+        result["db_path"] = self.db_path
+        result["row_ops"] = dict(self.row_ops)
+        return result
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ==========================================
+# CSV ↔ SQLite 1회성 변환
+# ==========================================
+def import_csv(conn: sqlite3.Connection, columns: dict = None,
+               buy_path: str = BUY_LOG_PATH, sell_path: str = SELL_LOG_PATH) -> dict:
+    """
+    CSV(buy_log / sell_log) → DB 테이블 (기존 row는 비우고 다시 채움)
+    반환: {테이블: 가져온 row 수}
+    """
+    columns = columns or DEFAULT_COLUMNS
+    csv_store = StateStore(columns, buy_path, sell_path)
+    frames = {"buy_log.csv": csv_store.buy_log(), "sell_log.csv": csv_store.sell_log()}
+
+    counts = {}
+    with conn:
+        for name, table in _TABLES.items():
+            cols = columns[name]
+            quoted = ", ".join(f'"{c}"' for c in cols)
+            placeholders = ", ".join("?" for _ in cols)
+            rows = row_values(frames[name])
+
+            conn.execute(f"DELETE FROM {table}")
+            conn.executemany(f"INSERT INTO {table} ({quoted}) VALUES ({placeholders})", rows)
+            counts[table] = len(rows)
+    return counts
+
+
+def export_csv(db_path: str = STATE_DB_PATH, columns: dict = None,
+               buy_path: str = BUY_LOG_PATH, sell_path: str = SELL_LOG_PATH) -> dict:
+    """DB → CSV (main.REQUIRED_COLUMNS 컬럼 구성 그대로) – CSV 백엔드로 되돌릴 때 사용"""
+    store = SqliteStateStore(columns, db_path, buy_path, sell_path, import_if_empty=False)
+    try:
+        buy_df = store.buy_log()
+        sell_df = store.sell_log()
+        atomic_save(buy_df, buy_path)
+        atomic_save(sell_df, sell_path)
+        return {"buy_log": len(buy_df), "sell_log": len(sell_df)}
+    finally:
+        store.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="buy_log / sell_log CSV ↔ SQLite 변환")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("--db", default=STATE_DB_PATH)
+    parser.add_argument("--buy", default=BUY_LOG_PATH)
+    parser.add_argument("--sell", default=SELL_LOG_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        conn = _connect(args.db)
+        try:
+            _create_schema(conn, DEFAULT_COLUMNS)
+            counts = import_csv(conn, DEFAULT_COLUMNS, args.buy, args.sell)
+        finally:
+            conn.close()
+        print(f"✅ [sqlite_store] CSV → {args.db} 가져오기 완료: {counts}")
+    else:
+        counts = export_csv(args.db, DEFAULT_COLUMNS, args.buy, args.sell)
+        print(f"✅ [sqlite_store] {args.db} → CSV 내보내기 완료: {counts}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+# data/state_store.py
+
+import os
+import atexit
+import threading
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from utils.csv_utils import atomic_save
+from data.order_records import BuyOrder, SellOrder, OrderTable
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+load_dotenv()
+
+# 로그 저장 백엔드: csv(기본) | sqlite | journal
+STATE_BACKEND = os.getenv("STATE_BACKEND", "csv").strip().lower()
+
+BUY_LOG_PATH = "buy_log.csv"
+SELL_LOG_PATH = "sell_log.csv"
+
+DEFAULT_COLUMNS = {
+    "buy_log.csv": [
+        "time", "market", "target_price", "buy_amount",
+        "buy_units", "buy_type", "buy_uuid", "filled"
+    ],
+    "sell_log.csv": [
+        "market", "avg_buy_price", "quantity", "target_sell_price", "sell_uuid", "filled"
+    ],
+}
+
+# CSV를 다시 읽었을 때와 같은 값이 되도록 정규화할 컬럼
+_UUID_COLUMNS = {"buy_log.csv": "buy_uuid", "sell_log.csv": "sell_uuid"}
+_NUMERIC_COLUMNS = {
+    "buy_log.csv": ["target_price", "buy_amount", "buy_units"],
+    "sell_log.csv": ["avg_buy_price", "quantity", "target_sell_price"],
+}
+_EMPTY_VALUES = {"", "nan", "NaN", "None", "null"}
+
+_RECORD_TYPES = {"buy_log.csv": BuyOrder, "sell_log.csv": SellOrder}
+
+# 상태 컬럼(uuid/filled) – 나머지 컬럼이 같으면 같은 주문 row로 봄 (row 단위 저장 백엔드용)
+_STATE_COLUMNS = {"buy_log.csv": {"buy_uuid", "filled"}, "sell_log.csv": {"sell_uuid", "filled"}}
+
+
+def _normalize_uuid_series(s: pd.Series) -> pd.Series:
+    """
+    uuid 컬럼 정규화 (CSV 저장 → dtype=str 재로드와 동일한 결과)
+    - 31161743.0 → "31161743"
+    - 빈 값 → NaN
+    """
+    out = s.astype(object).where(s.notna(), "").astype(str).str.strip()
+    out = out.str.replace(".0", "", regex=False)
+    return out.where(~out.isin(_EMPTY_VALUES), np.nan)
+
+
+class StateStore:
+    """
+    buy_log / sell_log 메모리 상태 저장소
+    - 시작 시 CSV를 1회 로드해 주문 테이블(OrderTable)로 보관, 이후 루프에서는 레코드만 읽고 고침
+    - 변경된(dirty) 로그만 틱 끝에 한 번 CSV로 flush (DataFrame 변환은 flush 때만)
+    - 사용자가 실행 중에 CSV를 직접 고친 경우(수동 주문 등) 파일 변경을 감지해 다시 로드
+
+    읽기: buy_orders() / sell_orders() → 레코드 복사본
+    쓰기: set_buy_orders(table) / set_sell_orders(table) → 메모리 반영 + dirty 표시
+          (넘긴 테이블은 저장소가 그대로 보관 → 이후 고칠 때는 다시 읽어서 고침)
+    DataFrame 경계(generate_* / 장 마감 정리 / 변환 도구): buy_log() / set_buy_log(df) 등
+    """
+
+    def __init__(self, columns: dict = None,
+                 buy_path: str = BUY_LOG_PATH, sell_path: str = SELL_LOG_PATH):
+        columns = columns or DEFAULT_COLUMNS
+        self._paths = {"buy_log.csv": buy_path, "sell_log.csv": sell_path}
+        self._columns = {name: list(columns[name]) for name in self._paths}
+
+        self._lock = threading.RLock()
+        self._scope = threading.local()   # 스레드별 담당 종목 (market_scope)
+        self._tables = {}
+        self._dirty = {name: False for name in self._paths}
+        self._mtime = {name: None for name in self._paths}
+
+        self.loads = 0
+        self.flushes = 0
+
+        for name in self._paths:
+            self._load(name)
+
+    # ------------------------------------------
+    # 로드 / 정규화
+    # ------------------------------------------
+    def _file_mtime(self, name: str):
+        try:
+            return os.stat(self._paths[name]).st_mtime_ns
+        except OSError:
+            return None
+
+    def _read(self, name: str) -> pd.DataFrame:
+        """저장소에서 로그 원본 읽기 (CSV 백엔드)"""
+        path = self._paths[name]
+        if os.path.exists(path):
+            return pd.read_csv(path, dtype={_UUID_COLUMNS[name]: str})
+        return pd.DataFrame(columns=self._columns[name])
+
+    def _write(self, name: str, df: pd.DataFrame):
+        """정규화된 로그를 저장소에 쓰기 (CSV 백엔드 – 파일 전체 atomic 교체)"""
+        atomic_save(df, self._paths[name])
+
+    def _load(self, name: str):
+        normalized = self._normalize(name, self._read(name))
+        self._tables[name] = OrderTable.from_frame(_RECORD_TYPES[name], normalized)
+        self._dirty[name] = False
+        self._mtime[name] = self._file_mtime(name)
+        self.loads += 1
+
+    def _normalize(self, name: str, df: pd.DataFrame) -> pd.DataFrame:
+        """스키마 컬럼만 남기고, CSV 재로드와 같은 형태로 값 정리"""
+        columns = self._columns[name]
+        df = df.copy()
+
+        for col in columns:
+            if col not in df.columns:
+                df[col] = np.nan
+
+        df = df[columns].reset_index(drop=True)
+
+        uuid_col = _UUID_COLUMNS[name]
+        df[uuid_col] = _normalize_uuid_series(df[uuid_col])
+
+        for col in _NUMERIC_COLUMNS[name]:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+        filled = df["filled"].astype(object)
+        df["filled"] = filled.where(filled.notna() & (filled.astype(str).str.strip() != ""), np.nan)
+
+        return df
+
+    def _check_external_change(self, name: str):
+        """CSV가 외부에서 수정됐으면 다시 로드 (메모리 변경분이 없을 때만)"""
+        mtime = self._file_mtime(name)
+        if mtime is None or mtime == self._mtime[name]:
+            return
+
+        if self._dirty[name]:
+            log.warning(f"⚠️ [state_store] {name} 외부 수정 감지 → 메모리 변경분 우선 (다음 flush 때 덮어씀)")
+            self._mtime[name] = mtime
+            return
+
+        log.info(f"🔄 [state_store] {name} 외부 수정 감지 → 다시 로드")
+        self._load(name)
+
+    # ------------------------------------------
+    # 읽기 / 쓰기
+    # ------------------------------------------
+    def _frame(self, name: str) -> pd.DataFrame:
+        """메모리 테이블 → 저장 형태 DataFrame (flush / DataFrame 경계에서만)"""
+        return self._normalize(name, self._tables[name].to_frame())
+
+    def _get(self, name: str) -> OrderTable:
+        with self._lock:
+            self._check_external_change(name)
+            return self._tables[name].copy()
+
+    @contextmanager
+    def market_scope(self, markets):
+        """
+        현재 스레드의 쓰기를 담당 종목 행으로 한정 (종목별 워커 모드)
+        - 범위 안에서 set_*()은 담당 종목 행만 교체하고,
+          다른 종목 행은 저장소의 최신 상태를 유지 (다른 워커 변경분을 덮어쓰지 않음)
+        """
+        prev = getattr(self._scope, "markets", None)
+        self._scope.markets = set(markets)
+        try:
+            yield self
+        finally:
+            self._scope.markets = prev
+
+    def _scoped(self, name: str, table: OrderTable) -> OrderTable:
+        markets = getattr(self._scope, "markets", None)
+        if markets is None:
+            return table
+
+        current = self._tables[name]
+        records = [r for r in current if r.market not in markets]
+        records.extend(r for r in table if r.market in markets)
+        return OrderTable(table.record_cls, records)
+
+    def _put(self, name: str, table: OrderTable) -> OrderTable:
+        with self._lock:
+            stored = self._scoped(name, table)
+            self._tables[name] = stored
+            self._dirty[name] = True
+            return stored
+
+    def _set_frame(self, name: str, df: pd.DataFrame) -> pd.DataFrame:
+        normalized = self._normalize(name, df)
+        with self._lock:
+            self._put(name, OrderTable.from_frame(_RECORD_TYPES[name], normalized))
+            if getattr(self._scope, "markets", None) is not None:
+                return self._frame(name)
+            return normalized
+
+    def buy_log(self) -> pd.DataFrame:
+        with self._lock:
+            self._check_external_change("buy_log.csv")
+            return self._frame("buy_log.csv")
+
+    def sell_log(self) -> pd.DataFrame:
+        with self._lock:
+            self._check_external_change("sell_log.csv")
+            return self._frame("sell_log.csv")
+
+    def set_buy_log(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self._set_frame("buy_log.csv", df)
+
+    def set_sell_log(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self._set_frame("sell_log.csv", df)
+
+    def buy_orders(self) -> OrderTable:
+        """buy_log → BuyOrder 테이블 복사본 (루프 안에서는 레코드로 읽고 고침)"""
+        return self._get("buy_log.csv")
+
+    def sell_orders(self) -> OrderTable:
+        """sell_log → SellOrder 테이블 복사본"""
+        return self._get("sell_log.csv")
+
+    def set_buy_orders(self, table: OrderTable) -> OrderTable:
+        return self._put("buy_log.csv", table)
+
+    def set_sell_orders(self, table: OrderTable) -> OrderTable:
+        return self._put("sell_log.csv", table)
+
+    def record_fill(self, side: str, market: str, uuid: str,
+                    price: float = None, units: float = None, order_type: str = ""):
+        """
+        체결 이벤트 기록
+        - CSV 백엔드는 체결 이력을 따로 남기지 않음 (SQLite 백엔드에서 fill_events에 저장)
+        """
+        return None
+
+    def is_dirty(self) -> bool:
+        with self._lock:
+            return any(self._dirty.values())
+
+    # ------------------------------------------
+    # 저장
+    # ------------------------------------------
+    def flush(self) -> int:
+        """
+        dirty 로그만 CSV로 저장
+        반환: 저장한 파일 수
+        """
+        saved = 0
+        with self._lock:
+            for name, dirty in self._dirty.items():
+                if not dirty:
+                    continue
+                self._write(name, self._frame(name))
+                self._dirty[name] = False
+                self._mtime[name] = self._file_mtime(name)
+                saved += 1
+
+            if saved:
+                self.flushes += 1
+        return saved
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "buy_rows": len(self._tables["buy_log.csv"]),
+                "sell_rows": len(self._tables["sell_log.csv"]),
+                "dirty": dict(self._dirty),
+                "backend": "csv",
+                "loads": self.loads,
+                "flushes": self.flushes,
+            }
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def _flush_on_exit():
+    if _STORE is not None:
+        _STORE.flush()
+
+
+atexit.register(_flush_on_exit)
+
+
+def init_state_store(columns: dict = None) -> StateStore:
+    """
+    main.py 시작 시 1회 호출 – 로그를 메모리로 로드
+    - STATE_BACKEND=sqlite 이면 SQLite(WAL) 백엔드 사용 (data/sqlite_store.py)
+    - STATE_BACKEND=journal 이면 append-only 저널 백엔드 사용 (data/journal.py)
+    - 종료 시(sys.exit 포함) 남은 변경분 자동 flush
+    """
+    global _STORE
+    with _STORE_LOCK:
+        if STATE_BACKEND == "sqlite":
+            from data.sqlite_store import SqliteStateStore
+            _STORE = SqliteStateStore(columns)
+        elif STATE_BACKEND == "journal":
+            from data.journal import JournalStateStore
+            _STORE = JournalStateStore(columns)
+        else:
+            _STORE = StateStore(columns)
+    return _STORE
+
+
+def get_state_store() -> StateStore:
+    """프로세스 전역 StateStore (초기화 전이면 기본 스키마로 생성)"""
+    if _STORE is None:
+        return init_state_store()
+    return _STORE
@@ -3,8 +3,16 @@
 import os
 import sys
 import pandas as pd
+from dotenv import load_dotenv
 from strategy.entry import run_casino_entry
 from api import _get_token
+from data.state_store import init_state_store
+from utils.metrics import maybe_start_metrics_server
+
+load_dotenv()
+
+# 메인 루프 엔진: sync (기존 순차 루프) / async (종목별 조회 동시 실행) / threads (종목별 워커)
+ENTRY_MODE = os.getenv("ENTRY_MODE", "sync").strip().lower()
 
 
 # 필요 열 정의
@@ -49,6 +57,12 @@ def main():
 
     ensure_csv_files()
 
+    # ✅ buy_log / sell_log 메모리 로드 (이후 루프는 메모리 상태만 사용)
+    init_state_store(REQUIRED_COLUMNS)
+
+    # ✅ METRICS_PORT 설정 시 /metrics 엔드포인트 (백그라운드 스레드)
+    maybe_start_metrics_server()
+
     # ✅ setting.csv 불러오기
     setting_df = pd.read_csv("setting.csv")
     # ✅ 토큰 1회 갱신
@@ -59,7 +73,14 @@ def main():
         print(f"❌ [KIS] 토큰 발급 실패: {e}")
         sys.exit(1)
 
-    run_casino_entry()
+    if ENTRY_MODE == "async":
+        from strategy.async_entry import run_casino_entry_async_main
+        run_casino_entry_async_main()
+    elif ENTRY_MODE == "threads":
+        from strategy.threaded_entry import run_casino_entry_threaded
+        run_casino_entry_threaded()
+    else:
+        run_casino_entry()
     print("[main.py] 프로그램 종료")
 
 
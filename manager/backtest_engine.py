@@ -0,0 +1,442 @@
+# manager/backtest_engine.py
+
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from strategy.casino_strategy import generate_buy_orders, generate_sell_orders
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+INITIAL_CASH = 5_000_000
+BUY_FEE = 0.0005
+SELL_FEE = 0.0005
+
+# 주문 칸 상태 (buy_log / sell_log의 filled와 대응, NONE = 행 없음)
+NONE, UPDATE, WAIT, DONE = 0, 1, 2, 3
+
+# 주문 칸 순서 = 전량 매도 후 buy_log에 쌓이는 순서 (initial → small → large)
+SLOT_TYPES = ("initial", "small_flow", "large_flow")
+
+BUY_LOG_COLUMNS = ["time", "market", "target_price", "buy_amount", "buy_units", "buy_type", "buy_uuid", "filled"]
+SELL_LOG_COLUMNS = ["market", "avg_buy_price", "quantity", "target_sell_price", "sell_uuid", "filled"]
+
+
+# ==========================================
+# 체결 모델 (엔진 / 전략 함수 기준 실행 공통)
+# ==========================================
+# - 판단은 봉 종가에서, 그때 낸 주문은 다음 봉부터 고가/저가로 체결 판정
+# - initial은 시장가 → 다음 봉 시가 체결
+# - 지정가 매수: 저가 <= 주문가 → 주문가 (시가가 더 낮게 열리면 시가)
+# - 익절 매도: 고가 >= 주문가 → 주문가 (시가가 더 높게 열리면 시가), 체결되면 같은 봉의 매수 판정은 하지 않음
+#   (전량 매도 → buy_log/sell_log 정리 = clean_buy_and_sell_logs_after_full_sell)
+# - 수수료: 체결 금액 × BUY_FEE / SELL_FEE, 현금이 부족하면 그 봉에서는 미체결
+def _buy_fill_price(order_type: str, target: float, open_: float, low: float):
+    if order_type == "initial":
+        return open_
+    if low <= target:
+        return target if open_ > target else open_
+    return None
+
+
+def _sell_fill_price(target: float, open_: float, high: float):
+    if high >= target:
+        return target if open_ < target else open_
+    return None
+
+
+@dataclass
+class LadderParams:
+    """setting.csv 1행 (백테스트 대상 종목 1개)"""
+    market: str
+    unit_size: float
+    small_flow_pct: float
+    small_flow_units: int
+    large_flow_pct: float
+    large_flow_units: int
+    take_profit_pct: float
+
+    @classmethod
+    def from_setting(cls, row) -> "LadderParams":
+        return cls(**{name: row[name] for name in cls.__dataclass_fields__})
+
+    def to_setting_df(self) -> pd.DataFrame:
+        return pd.DataFrame([dict(vars(self))])
+
+
+@dataclass
+class Trade:
+    index: int          # 체결 봉 위치
+    side: str           # "buy" | "sell"
+    order_type: str     # initial / small_flow / large_flow / take_profit
+    price: float
+    qty: int
+
+
+@dataclass
+class BacktestResult:
+    """봉별 배열은 그 봉 종가 판단까지 끝난 뒤의 값"""
+    trades: list
+    cash: np.ndarray
+    position: np.ndarray
+    avg_price: np.ndarray
+    cost_basis: np.ndarray
+    realized_pnl: np.ndarray
+    cum_fee: np.ndarray
+    equity: np.ndarray
+    elapsed_sec: float = 0.0
+    extra: dict = field(default_factory=dict)
+
+    @property
+    def candles(self) -> int:
+        return len(self.equity)
+
+    def summary(self) -> dict:
+        n = self.candles
+        buys = sum(1 for t in self.trades if t.side == "buy")
+        return {
+            "candles": n,
+            "buys": buys,
+            "sells": len(self.trades) - buys,
+            "final_equity": round(float(self.equity[-1]), 2) if n else 0.0,
+            "realized_pnl": round(float(self.realized_pnl[-1]), 2) if n else 0.0,
+            "total_fee": round(float(self.cum_fee[-1]), 2) if n else 0.0,
+            "elapsed_sec": round(self.elapsed_sec, 4),
+            "candles_per_sec": round(n / self.elapsed_sec) if self.elapsed_sec > 0 else None,
+        }
+
+
+def _as_lists(open_, high, low, close) -> tuple:
+    arrays = [np.asarray(a, dtype=float) for a in (open_, high, low, close)]
+    if len({len(a) for a in arrays}) != 1:
+        raise ValueError("open/high/low/close 길이가 다릅니다")
+    return tuple(a.tolist() for a in arrays)
+
+
+# ==========================================
+# 고속 엔진 (상태 머신)
+# ==========================================
+class LadderState:
+    """
+    종목 1개 사다리 상태 – 주문 칸 3개(initial/small/large) + 익절 매도 1개
+    - 현금은 밖에서 관리 (단일 종목 엔진 / 포트폴리오 엔진이 같은 상태 머신을 공유)
+    - 봉마다: fill_sell → (매도 안 됐으면) fill_buys → decide(종가)
+    """
+    __slots__ = ("market", "pcts", "amounts", "take_profit", "buy_fee", "sell_fee",
+                 "state", "target", "qty", "sell_state", "sell_avg", "sell_quantity", "sell_target",
+                 "sell_qty", "pos", "cost", "realized", "cum_fee", "trades", "cash_skips")
+
+    def __init__(self, params: LadderParams, buy_fee: float = BUY_FEE, sell_fee: float = SELL_FEE):
+        self.market = params.market
+        self.pcts = (0.0, float(params.small_flow_pct), float(params.large_flow_pct))
+        self.amounts = (
+            params.unit_size,
+            params.unit_size * params.small_flow_units,
+            params.unit_size * params.large_flow_units,
+        )
+        self.take_profit = params.take_profit_pct
+        self.buy_fee = buy_fee
+        self.sell_fee = sell_fee
+
+        self.state = [NONE, NONE, NONE]
+        self.target = [0.0, 0.0, 0.0]
+        self.qty = [0, 0, 0]
+
+        self.sell_state = NONE
+        self.sell_avg = self.sell_quantity = self.sell_target = 0.0
+        self.sell_qty = 0
+
+        self.pos = 0
+        self.cost = 0.0
+        self.realized = 0.0
+        self.cum_fee = 0.0
+        self.trades = []
+        self.cash_skips = 0     # 현금 부족으로 미체결된 매수 판정 횟수
+
+    # --------------------------------------
+    # 1) 직전 봉까지 낸 주문 체결
+    # --------------------------------------
+    def fill_sell(self, i: int, o: float, high: float):
+        """익절 체결 시 매도 대금(수수료 차감) 반환, 아니면 None"""
+        if self.sell_state != WAIT:
+            return None
+        px = _sell_fill_price(self.sell_target, o, high)
+        if px is None:
+            return None
+        qty = self.sell_qty
+        avg = self.cost / self.pos
+        gross = qty * px
+        fee = gross * self.sell_fee
+        self.realized += (px - avg) * qty - fee
+        self.cum_fee += fee
+        self.pos = 0
+        self.cost = 0.0
+        self.trades.append(Trade(i, "sell", "take_profit", px, qty))
+        self.state = [NONE, NONE, NONE]
+        self.sell_state = NONE
+        return gross - fee
+
+    def fill_buys(self, i: int, o: float, low: float, cash: float) -> float:
+        """대기 매수 체결 → 남은 현금 반환, 현금이 부족한 칸은 그 봉에서 미체결"""
+        state = self.state
+        for k in range(3):
+            if state[k] != WAIT:
+                continue
+            px = _buy_fill_price(SLOT_TYPES[k], self.target[k], o, low)
+            if px is None:
+                continue
+            qty = self.qty[k]
+            gross = qty * px
+            fee = gross * self.buy_fee
+            if cash < gross + fee:
+                self.cash_skips += 1
+                continue
+            cash -= gross + fee
+            self.cum_fee += fee
+            self.pos += qty
+            self.cost += gross
+            state[k] = DONE
+            self.trades.append(Trade(i, "buy", SLOT_TYPES[k], px, qty))
+        return cash
+
+    # --------------------------------------
+    # 2) 종가 기준 매수 판단 (generate_buy_orders) + 3) 익절 매도 판단 (generate_sell_orders)
+    # --------------------------------------
+    def decide(self, c: float):
+        state, target, pcts = self.state, self.target, self.pcts
+
+        if self.pos == 0 and state[0] == NONE:
+            state[0] = UPDATE
+            target[0] = c
+
+        if state[1] == NONE and state[2] == NONE:
+            for k in (1, 2):
+                state[k] = UPDATE
+                target[k] = round(c * (1 - pcts[k]), 2)
+        elif state[0] != NONE:
+            # 처리 전 스냅샷 기준 판단 → 급락 칸이 있으면 그 칸까지는 현재가 기준 재설정
+            moves = [None, None, None]
+            last_crash = 0
+            for k in (1, 2):
+                pct = pcts[k]
+                if state[k] == WAIT:
+                    trigger = target[k] / (1 - pct) * (1 + pct / 2)
+                    if c > trigger:
+                        moves[k] = round(trigger * (1 - pct), 2)
+                elif state[k] == DONE:
+                    next_price = round(target[k] * (1 - pct), 2)
+                    if c >= next_price:
+                        moves[k] = next_price
+                    else:
+                        last_crash = k
+                else:
+                    raise ValueError(
+                        f"[❌ 에러] {self.market} - {SLOT_TYPES[k]} 주문의 filled 상태가 예외적입니다: 'update'"
+                    )
+
+            for k in (1, 2):
+                if moves[k] is not None and k > last_crash:
+                    target[k] = moves[k]
+                    state[k] = UPDATE
+                elif last_crash:
+                    target[k] = round(c * (1 - pcts[k]), 2)
+                    state[k] = UPDATE
+
+        # 주문 실행 (execute_buy_orders: 정수 주식, 0주면 접수 안 됨)
+        for k in range(3):
+            if state[k] == UPDATE:
+                volume = int(self.amounts[k] // target[k])
+                if volume > 0:
+                    self.qty[k] = volume
+                    state[k] = WAIT
+
+        pos = self.pos
+        if pos > 0:
+            avg8 = round(self.cost / pos, 8)
+            quantity = round(pos, 8)
+            sell_price = round(avg8 * (1 + self.take_profit), 2)
+            if c > sell_price:
+                sell_price = round(c, 2)
+
+            same = (
+                self.sell_state != NONE
+                and round(self.sell_avg, 8) == avg8
+                and round(self.sell_quantity, 8) == quantity
+                and round(self.sell_target, 2) == sell_price
+            )
+            if not same:
+                self.sell_avg, self.sell_quantity, self.sell_target = avg8, quantity, sell_price
+                self.sell_qty = int(pos)
+                self.sell_state = WAIT
+
+
+def backtest_ladder(open_, high, low, close, params: LadderParams,
+                    initial_cash: float = INITIAL_CASH,
+                    buy_fee: float = BUY_FEE, sell_fee: float = SELL_FEE) -> BacktestResult:
+    """
+    카지노 사다리 백테스트 – generate_buy_orders / generate_sell_orders와 같은 판단을
+    종목 1개 주문 칸 3개(initial/small/large) + 매도 1개의 상태 머신(LadderState)으로 계산
+    - 봉마다 DataFrame을 만들지 않음 → 전략 함수 기준 실행(backtest_with_strategy)과 같은 결과, 수백 배 빠름
+    - 판단 규칙:
+      * 보유 0 & initial 없음 → initial 1U (현재가)
+      * flow 없음 → small/large를 현재가 × (1 - pct)에 생성
+      * initial 있음: wait → 가격이 (주문가 / (1-pct)) × (1 + pct/2) 초과 시 재조정,
+                      done → 한 칸 아래, 현재가가 그보다 낮으면(급락) 현재가 기준으로 전체 재설정
+      * 보유 > 0 → 평단 × (1 + take_profit_pct) 익절, 현재가가 더 높으면(갭 상승) 현재가
+    """
+    opens, highs, lows, closes = _as_lists(open_, high, low, close)
+    n = len(closes)
+    started = time.perf_counter()
+
+    ladder = LadderState(params, buy_fee, sell_fee)
+    cash = float(initial_cash)
+
+    out_cash = np.empty(n)
+    out_pos = np.empty(n)
+    out_avg = np.empty(n)
+    out_cost = np.empty(n)
+    out_realized = np.empty(n)
+    out_fee = np.empty(n)
+    out_equity = np.empty(n)
+
+    for i in range(n):
+        o = opens[i]
+        proceeds = ladder.fill_sell(i, o, highs[i])
+        if proceeds is None:
+            cash = ladder.fill_buys(i, o, lows[i], cash)
+        else:
+            cash += proceeds
+
+        c = closes[i]
+        ladder.decide(c)
+
+        pos = ladder.pos
+        out_cash[i] = cash
+        out_pos[i] = pos
+        out_avg[i] = ladder.cost / pos if pos else 0.0
+        out_cost[i] = ladder.cost
+        out_realized[i] = ladder.realized
+        out_fee[i] = ladder.cum_fee
+        out_equity[i] = cash + pos * c
+
+    return BacktestResult(
+        trades=ladder.trades, cash=out_cash, position=out_pos, avg_price=out_avg, cost_basis=out_cost,
+        realized_pnl=out_realized, cum_fee=out_fee, equity=out_equity,
+        elapsed_sec=time.perf_counter() - started,
+    )
+
+
+# ==========================================
+# 기준 실행 (전략 함수 그대로, 검증/비교용 – 느림)
+# ==========================================
+def backtest_with_strategy(open_, high, low, close, params: LadderParams,
+                           initial_cash: float = INITIAL_CASH,
+                           buy_fee: float = BUY_FEE, sell_fee: float = SELL_FEE) -> BacktestResult:
+    """
+    봉마다 실제 generate_buy_orders / generate_sell_orders를 호출하는 백테스트
+    - 체결 모델은 backtest_ladder와 동일 → 두 결과가 같아야 함 (엔진 검증 기준)
+    - 주문 실행은 execute_buy_orders / execute_sell_orders와 같은 규칙으로 filled만 전환 (네트워크 없음)
+    """
+    opens, highs, lows, closes = _as_lists(open_, high, low, close)
+    n = len(closes)
+    started = time.perf_counter()
+
+    market = params.market
+    setting_df = params.to_setting_df()
+    buy_log_df = pd.DataFrame(columns=BUY_LOG_COLUMNS)
+    sell_log_df = pd.DataFrame(columns=SELL_LOG_COLUMNS)
+    order_qty = {}      # buy_log index → 접수 수량
+    sell_qty = 0
+
+    cash = float(initial_cash)
+    pos = 0
+    cost = 0.0
+    realized = 0.0
+    cum_fee = 0.0
+    trades = []
+    columns = {name: np.empty(n) for name in ("cash", "position", "avg_price", "cost_basis",
+                                              "realized_pnl", "cum_fee", "equity")}
+    next_uuid = 0
+
+    for i in range(n):
+        o = opens[i]
+
+        # 1) 체결
+        sold = False
+        if len(sell_log_df) and sell_log_df["filled"].iloc[0] == "wait":
+            px = _sell_fill_price(float(sell_log_df["target_sell_price"].iloc[0]), o, highs[i])
+            if px is not None:
+                avg = cost / pos
+                gross = sell_qty * px
+                fee = gross * sell_fee
+                cash += gross - fee
+                realized += (px - avg) * sell_qty - fee
+                cum_fee += fee
+                pos = 0
+                cost = 0.0
+                trades.append(Trade(i, "sell", "take_profit", px, sell_qty))
+                buy_log_df = pd.DataFrame(columns=BUY_LOG_COLUMNS)
+                sell_log_df = pd.DataFrame(columns=SELL_LOG_COLUMNS)
+                order_qty = {}
+                sold = True
+
+        if not sold:
+            for idx in buy_log_df.index:
+                row = buy_log_df.loc[idx]
+                if row["filled"] != "wait":
+                    continue
+                px = _buy_fill_price(row["buy_type"], float(row["target_price"]), o, lows[i])
+                if px is None:
+                    continue
+                volume = order_qty[idx]
+                gross = volume * px
+                fee = gross * buy_fee
+                if cash < gross + fee:
+                    continue
+                cash -= gross + fee
+                cum_fee += fee
+                pos += volume
+                cost += gross
+                buy_log_df.at[idx, "filled"] = "done"
+                trades.append(Trade(i, "buy", row["buy_type"], px, volume))
+
+        # 2) 매수 판단
+        c = closes[i]
+        prices = {market: c}
+        if pos == 0:
+            buy_log_df = generate_buy_orders(setting_df, buy_log_df, prices, mode="initial_only")
+        buy_log_df = generate_buy_orders(setting_df, buy_log_df, prices)
+
+        for idx in buy_log_df.index:
+            row = buy_log_df.loc[idx]
+            if row["filled"] != "update":
+                continue
+            volume = int(float(row["buy_amount"]) // float(row["target_price"]))
+            if volume <= 0:
+                continue
+            order_qty[idx] = volume
+            if pd.isna(row["buy_uuid"]):
+                next_uuid += 1
+                buy_log_df.at[idx, "buy_uuid"] = f"BT{next_uuid}"
+            buy_log_df.at[idx, "filled"] = "wait"
+
+        # 3) 매도 판단
+        if pos > 0:
+            holdings = {market: {"balance": pos, "locked": 0, "avg_price": cost / pos}}
+            sell_log_df = generate_sell_orders(setting_df, holdings, sell_log_df, current_prices=prices)
+            for idx in sell_log_df.index[sell_log_df["filled"] == "update"]:
+                sell_qty = int(pos)
+                sell_log_df.at[idx, "filled"] = "wait"
+
+        columns["cash"][i] = cash
+        columns["position"][i] = pos
+        columns["avg_price"][i] = cost / pos if pos else 0.0
+        columns["cost_basis"][i] = cost
+        columns["realized_pnl"][i] = realized
+        columns["cum_fee"][i] = cum_fee
+        columns["equity"][i] = cash + pos * c
+
+    return BacktestResult(trades=trades, elapsed_sec=time.perf_counter() - started, **columns)
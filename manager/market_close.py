@@ -1,8 +1,11 @@
 # manager/market_close.py
 
 import pandas as pd
-import os
 from api import get_accounts
+from data.state_store import get_state_store
+from utils.logger import get_logger
+
+log = get_logger(__name__)
 
 def close_market_cleanup():
     """
@@ -13,16 +16,18 @@ def close_market_cleanup():
     - 보유하지 않은 종목:
         → 해당 market 모든 로그 삭제
     """
-    print("🕛 [폐장 처리 시작] buy_log 정리 중...")
+    log.info("🕛 [폐장 처리 시작] buy_log 정리 중...")
 
-    if not os.path.exists("buy_log.csv"):
-        print("❌ buy_log.csv 없음 → 종료")
-        return
+    store = get_state_store()
 
     try:
-        buy_log_df = pd.read_csv("buy_log.csv", dtype={"buy_uuid": str})
+        buy_log_df = store.buy_log()
     except Exception as e:
-        print(f"❌ buy_log.csv 읽기 실패: {e}")
+        log.error(f"❌ buy_log 읽기 실패: {e}")
+        return
+
+    if buy_log_df.empty:
+        log.error("❌ buy_log 비어 있음 → 종료")
         return
 
     accounts = get_accounts()
@@ -36,7 +41,7 @@ def close_market_cleanup():
 
         # 보유하지 않은 종목
         if market not in holdings:
-            print(f"🗑️ [{market}] 보유하지 않음 → 모든 로그 삭제")
+            log.info(f"🗑️ [{market}] 보유하지 않음 → 모든 로그 삭제")
             continue
 
         # 보유 중인 종목 → initial 유지, flow reset
@@ -52,8 +57,7 @@ def close_market_cleanup():
 
     # 재구성 & 저장
     new_df = pd.DataFrame(cleaned_rows) if cleaned_rows else pd.DataFrame(columns=buy_log_df.columns)
-    tmp = "buy_log.csv.tmp"
-    new_df.to_csv(tmp, index=False)
-    os.replace(tmp, "buy_log.csv")
+    store.set_buy_log(new_df)
+    store.flush()
 
-    print("🎉 폐장 처리 완료 → buy_log.csv 업데이트 완료")
+    log.info("🎉 폐장 처리 완료 → buy_log.csv 업데이트 완료")
@@ -0,0 +1,335 @@
+# manager/optimizer.py
+
+import os
+import sys
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from datetime import datetime
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from data.candle_store import CandleStore, CANDLE_STORE_DIR
+from manager.backtest_engine import LadderParams, backtest_ladder, INITIAL_CASH, BUY_FEE, SELL_FEE
+from utils.csv_utils import atomic_save
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+load_dotenv()
+
+# 병렬 워커 수 (0 또는 미설정 → 전체 코어)
+OPTIMIZER_WORKERS = int(os.getenv("OPTIMIZER_WORKERS", "0")) or os.cpu_count() or 1
+
+# 워커 1회 작업당 설정 개수 (너무 작으면 프로세스 간 왕복 비용, 너무 크면 코어별 편차)
+OPTIMIZER_CHUNK = int(os.getenv("OPTIMIZER_CHUNK", "16"))
+
+# 최대 낙폭이 이보다 작아도 이 값으로 나눔 (낙폭 0 설정이 점수 1위를 독차지하지 않게)
+DRAWDOWN_FLOOR = 0.01
+
+# 탐색 대상 = setting.csv에서 손으로 고르던 컬럼
+SEARCH_FIELDS = ("small_flow_pct", "small_flow_units", "large_flow_pct", "large_flow_units", "take_profit_pct")
+INT_FIELDS = ("small_flow_units", "large_flow_units")
+
+# 그리드 탐색 기본 후보 (large_flow_pct <= small_flow_pct 조합은 제외)
+DEFAULT_GRID = {
+    "small_flow_pct": [0.01, 0.02, 0.03, 0.04, 0.05],
+    "small_flow_units": [1, 2, 3],
+    "large_flow_pct": [0.07, 0.10, 0.13, 0.16],
+    "large_flow_units": [3, 5, 7, 9],
+    "take_profit_pct": [0.01, 0.02, 0.03, 0.05],
+}
+
+# 랜덤 탐색 기본 범위 (실수 = 균등 분포, 정수 = 양끝 포함)
+DEFAULT_RANDOM = {
+    "small_flow_pct": (0.005, 0.06),
+    "small_flow_units": (1, 4),
+    "large_flow_pct": (0.05, 0.20),
+    "large_flow_units": (2, 10),
+    "take_profit_pct": (0.005, 0.06),
+}
+
+# setting.csv 컬럼 순서
+SETTING_COLUMNS = ["market", "unit_size", *SEARCH_FIELDS, "leverage", "market_code"]
+
+# evaluate 결과 컬럼 (설정이 0개여도 같은 컬럼의 빈 DataFrame)
+RESULT_COLUMNS = [*SEARCH_FIELDS, "total_return", "max_drawdown", "capital_at_risk", "max_capital", "score",
+                  "buys", "sells", "realized_pnl", "total_fee", "final_equity"]
+
+
+# ==========================================
+# 탐색 공간
+# ==========================================
+def _valid(config: dict) -> bool:
+    return config["large_flow_pct"] > config["small_flow_pct"]
+
+
+def grid_configs(space: dict = None) -> list:
+    """후보 값 전체 조합"""
+    space = space or DEFAULT_GRID
+    names = list(space)
+    configs = [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+    return [c for c in configs if _valid(c)]
+
+
+def random_configs(n: int, space: dict = None, seed: int = None) -> list:
+    """범위에서 n개 무작위 추출 (pct는 소수 4자리, 중복 제거)"""
+    space = space or DEFAULT_RANDOM
+    rng = np.random.default_rng(seed)
+    seen = set()
+    configs = []
+    attempts = 0
+    while len(configs) < n and attempts < n * 20:
+        attempts += 1
+        config = {}
+        for name, bounds in space.items():
+            if isinstance(bounds, list):
+                config[name] = bounds[rng.integers(len(bounds))]
+            elif name in INT_FIELDS:
+                config[name] = int(rng.integers(bounds[0], bounds[1] + 1))
+            else:
+                config[name] = round(float(rng.uniform(*bounds)), 4)
+        key = tuple(config.values())
+        if key in seen or not _valid(config):
+            continue
+        seen.add(key)
+        configs.append(config)
+    return configs
+
+
+# ==========================================
+# 1개 설정 평가
+# ==========================================
+def evaluate(ohlc: np.ndarray, params: LadderParams, initial_cash: float = INITIAL_CASH,
+             buy_fee: float = BUY_FEE, sell_fee: float = SELL_FEE) -> dict:
+    """
+    backtest_ladder 1회 → 순위 지표
+    - total_return: 마지막 포트폴리오 가치 / 시작 현금 - 1
+    - max_drawdown: 포트폴리오 가치의 고점 대비 최대 낙폭 비율
+    - capital_at_risk: 한 번에 물려 있던 최대 매수금 / 시작 현금
+    """
+    result = backtest_ladder(ohlc[0], ohlc[1], ohlc[2], ohlc[3], params,
+                             initial_cash=initial_cash, buy_fee=buy_fee, sell_fee=sell_fee)
+    equity = result.equity
+    summary = result.summary()
+    if len(equity):
+        peak = np.maximum.accumulate(equity)
+        max_drawdown = float(np.max((peak - equity) / peak))
+        total_return = float(equity[-1] / initial_cash - 1)
+        max_capital = float(result.cost_basis.max())
+    else:
+        max_drawdown = total_return = max_capital = 0.0
+
+    return {
+        **{name: getattr(params, name) for name in SEARCH_FIELDS},
+        "total_return": round(total_return, 6),
+        "max_drawdown": round(max_drawdown, 6),
+        "capital_at_risk": round(max_capital / initial_cash, 6),
+        "max_capital": round(max_capital, 2),
+        "score": round(total_return / max(max_drawdown, DRAWDOWN_FLOOR), 6),
+        "buys": summary["buys"],
+        "sells": summary["sells"],
+        "realized_pnl": summary["realized_pnl"],
+        "total_fee": summary["total_fee"],
+        "final_equity": summary["final_equity"],
+    }
+
+
+# ==========================================
+# 공유 메모리 (분봉은 1번만 올리고 워커는 이름으로 붙음)
+# ==========================================
+class SharedCandles:
+    """OHLC를 4×n float64 한 덩어리로 공유 메모리에 올림 → 워커마다 DataFrame을 pickle하지 않음"""
+
+    def __init__(self, open_, high, low, close):
+        ohlc = np.vstack([np.asarray(a, dtype=np.float64) for a in (open_, high, low, close)])
+        self.shape = ohlc.shape
+        self.shm = shared_memory.SharedMemory(create=True, size=max(ohlc.nbytes, 1))
+        np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf)[:] = ohlc
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# 워커 프로세스 전역 (initializer에서 1번 채움)
+_worker = {}
+
+
+def _init_worker(name: str, shape: tuple, base: LadderParams, initial_cash: float,
+                 buy_fee: float, sell_fee: float):
+    shm = shared_memory.SharedMemory(name=name)
+    _worker.update(
+        shm=shm,    # 핸들을 잡아 둬야 뷰가 유지됨
+        ohlc=np.ndarray(shape, dtype=np.float64, buffer=shm.buf),
+        base=base, initial_cash=initial_cash, buy_fee=buy_fee, sell_fee=sell_fee,
+    )
+
+
+def _run_chunk(configs: list) -> list:
+    w = _worker
+    return [
+        evaluate(w["ohlc"], replace(w["base"], **config), w["initial_cash"], w["buy_fee"], w["sell_fee"])
+        for config in configs
+    ]
+
+
+# ==========================================
+# 스윕 실행
+# ==========================================
+def run_sweep(open_, high, low, close, base: LadderParams, configs: list,
+              workers: int = OPTIMIZER_WORKERS, chunk: int = OPTIMIZER_CHUNK,
+              initial_cash: float = INITIAL_CASH,
+              buy_fee: float = BUY_FEE, sell_fee: float = SELL_FEE) -> pd.DataFrame:
+    """
+    설정 목록 전체 백테스트 → 결과 DataFrame (configs 순서 그대로)
+    - workers > 1: 프로세스 풀 + 공유 메모리, workers == 1: 현재 프로세스에서 순차 실행
+    """
+    started = time.perf_counter()
+    chunks = [configs[i:i + chunk] for i in range(0, len(configs), chunk)]
+    workers = max(1, min(workers, len(chunks)))
+    log.info(f"[optimizer] 🔍 {base.market} 설정 {len(configs)}개 × 봉 {len(np.asarray(close))}개 "
+             f"(워커 {workers}, 묶음 {len(chunks)})")
+
+    if workers == 1:
+        ohlc = np.vstack([np.asarray(a, dtype=np.float64) for a in (open_, high, low, close)])
+        rows = [evaluate(ohlc, replace(base, **c), initial_cash, buy_fee, sell_fee) for c in configs]
+    else:
+        results = [None] * len(chunks)
+        with SharedCandles(open_, high, low, close) as shared:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker,
+                initargs=(shared.name, shared.shape, base, initial_cash, buy_fee, sell_fee),
+            ) as pool:
+                futures = {pool.submit(_run_chunk, c): i for i, c in enumerate(chunks)}
+                step = max(1, len(chunks) // 10)
+                for done, future in enumerate(as_completed(futures), 1):
+                    results[futures[future]] = future.result()
+                    if done % step == 0 or done == len(chunks):
+                        log.info(f"[optimizer] 진행 {done}/{len(chunks)} 묶음 "
+                                 f"({time.perf_counter() - started:.1f}s)")
+        rows = [row for chunk_rows in results for row in chunk_rows]
+
+    elapsed = time.perf_counter() - started
+    log.info(f"[optimizer] ✅ {len(rows)}개 완료 {elapsed:.1f}s "
+             f"({len(rows) / elapsed if elapsed > 0 else 0:,.1f} 설정/s)")
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def rank_results(results: pd.DataFrame, max_capital_at_risk: float = None,
+                 min_sells: int = 1) -> pd.DataFrame:
+    """
+    순위: score(수익률 / 최대 낙폭) ↓ → capital_at_risk ↑ → total_return ↓
+    - max_capital_at_risk: 최대 매수금 비율이 이보다 큰 설정 제외
+    - min_sells: 익절이 이보다 적은 설정 제외 (한 번도 안 판 설정은 평가 불가)
+    """
+    ranked = results[results["sells"] >= min_sells]
+    if max_capital_at_risk is not None:
+        ranked = ranked[ranked["capital_at_risk"] <= max_capital_at_risk]
+    ranked = ranked.sort_values(["score", "capital_at_risk", "total_return"],
+                                ascending=[False, True, False], kind="stable")
+    ranked = ranked.reset_index(drop=True)
+    ranked.insert(0, "rank", ranked.index + 1)
+    return ranked
+
+
+def to_setting_rows(ranked: pd.DataFrame, base_row: dict, top: int = 10) -> pd.DataFrame:
+    """상위 top개 → setting.csv 형식 행 (unit_size/leverage/market_code는 기존 행 값 유지)"""
+    rows = []
+    for r in ranked.head(top).to_dict("records"):
+        row = {name: base_row.get(name, "") for name in SETTING_COLUMNS}
+        for name in SEARCH_FIELDS:
+            row[name] = int(r[name]) if name in INT_FIELDS else float(r[name])
+        rows.append(row)
+    return pd.DataFrame(rows, columns=SETTING_COLUMNS)
+
+
+def load_base_row(market: str, setting_path: str = "setting.csv") -> dict:
+    """setting.csv에서 market 행 (없으면 현재 기본값)"""
+    if os.path.exists(setting_path):
+        setting_df = pd.read_csv(setting_path)
+        matched = setting_df[setting_df["market"] == market]
+        if not matched.empty:
+            return matched.iloc[0].to_dict()
+    log.warning(f"[optimizer] ⚠️ {setting_path}에 {market} 없음 → 기본 설정 기준")
+    return {"market": market, "unit_size": 100, "small_flow_pct": 0.04, "small_flow_units": 2,
+            "large_flow_pct": 0.13, "large_flow_units": 7, "take_profit_pct": 0.03,
+            "leverage": "", "market_code": ""}
+
+
+# ==========================================
+# CLI
+# ==========================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="카지노 사다리 설정 그리드/랜덤 탐색 (병렬 백테스트)")
+    parser.add_argument("--market", required=True)
+    parser.add_argument("--start", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--unit", type=int, default=1)
+    parser.add_argument("--random", type=int, default=0, help="랜덤 탐색 개수 (0 = 기본 그리드)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=OPTIMIZER_WORKERS)
+    parser.add_argument("--chunk", type=int, default=OPTIMIZER_CHUNK)
+    parser.add_argument("--initial-cash", type=float, default=INITIAL_CASH)
+    parser.add_argument("--unit-size", type=float, default=None, help="미지정 시 setting.csv 값")
+    parser.add_argument("--max-capital-at-risk", type=float, default=None)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--setting", default="setting.csv")
+    parser.add_argument("--root", default=CANDLE_STORE_DIR)
+    parser.add_argument("--out-dir", default=".")
+    args = parser.parse_args(argv)
+
+    candles = CandleStore(args.root).ensure(args.market, args.unit, args.start, args.end)
+    if candles.empty:
+        log.error(f"[optimizer] ❌ {args.market} {args.start} ~ {args.end} 분봉 데이터 없음")
+        return 1
+
+    base_row = load_base_row(args.market, args.setting)
+    if args.unit_size is not None:
+        base_row["unit_size"] = args.unit_size
+    base = LadderParams.from_setting(base_row)
+
+    configs = random_configs(args.random, seed=args.seed) if args.random else grid_configs()
+    if not configs:
+        log.error("[optimizer] ❌ 탐색할 설정이 없습니다 (large_flow_pct > small_flow_pct 조합 없음)")
+        return 1
+    results = run_sweep(
+        candles["open"], candles["high"], candles["low"], candles["close"], base, configs,
+        workers=args.workers, chunk=args.chunk, initial_cash=args.initial_cash,
+    )
+    ranked = rank_results(results, max_capital_at_risk=args.max_capital_at_risk)
+    if ranked.empty:
+        log.error(f"[optimizer] ❌ 조건을 만족하는 설정 없음 (설정 {len(results)}개 모두 익절 없음 또는 "
+                  f"최대매수금 비율 > {args.max_capital_at_risk})")
+        return 1
+
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    results_path = os.path.join(args.out_dir, f"optimizer_results_{args.market}_{stamp}.csv")
+    setting_path = os.path.join(args.out_dir, f"setting_candidates_{args.market}_{stamp}.csv")
+    atomic_save(ranked, results_path)
+    atomic_save(to_setting_rows(ranked, base_row, args.top), setting_path)
+
+    for r in ranked.head(args.top).to_dict("records"):
+        log.info(f"[optimizer] #{r['rank']} score={r['score']:.3f} 수익률={r['total_return']:.2%} "
+                 f"낙폭={r['max_drawdown']:.2%} 최대매수금={r['capital_at_risk']:.2%} | "
+                 + ", ".join(f"{name}={r[name]}" for name in SEARCH_FIELDS))
+    log.info(f"[optimizer] ✅ 결과 {results_path} / 후보 setting {setting_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,12 @@
 # manager/order_executor.py
 
-import pandas as pd
 from api import send_order, cancel_and_new_order
 from utils.kis_utils import normalize_uuid
+from data.order_records import BuyOrder, SellOrder, OrderTable
+from utils.metrics import count_order
+from utils.logger import get_logger
+
+log = get_logger(__name__)
 
 # manager/order_executor.py
 # 반드시 이 파일 안에서 check_market_closed를 아래로 교체해라
@@ -45,13 +49,13 @@ def detect_market_closed_from_exception(e: Exception):
     # 1) DB 폐장 코드 감지
     for code in DB_MARKET_CLOSED_CODES:
         if code in msg:
-            print(f"⛔ [detect] DB 폐장 코드 감지({code}) → MARKET_CLOSED 전파")
+            log.warning(f"⛔ [detect] DB 폐장 코드 감지({code}) → MARKET_CLOSED 전파")
             raise RuntimeError("MARKET_CLOSED")
 
     # 2) DB 폐장 키워드 감지
     for kw in DB_MARKET_CLOSED_KEYWORDS:
         if kw in msg:
-            print(f"⛔ [detect] DB 폐장 키워드 감지({kw}) → MARKET_CLOSED 전파")
+            log.warning(f"⛔ [detect] DB 폐장 키워드 감지({kw}) → MARKET_CLOSED 전파")
             raise RuntimeError("MARKET_CLOSED")
 
 
@@ -92,30 +96,43 @@ def check_market_closed(response: dict):
 
 
 
-def execute_buy_orders(buy_log_df: pd.DataFrame) -> pd.DataFrame:
-    print("[order_executor.py] 매수 주문 실행 시작")
+def _as_table(orders, record_cls):
+    """DataFrame이면 주문 테이블로 변환 (호출 측에는 받은 형태 그대로 돌려줌)"""
+    if isinstance(orders, OrderTable):
+        return orders, False
+    return OrderTable.from_frame(record_cls, orders), True
+
+
+def execute_buy_orders(buy_log):
+    """
+    filled=update 매수 주문 실행 (신규 / 정정)
+    buy_log: OrderTable[BuyOrder] 또는 DataFrame → 같은 형태로 반환
+    """
+    log.info("[order_executor.py] 매수 주문 실행 시작")
     all_success = True
 
-    for idx, row in buy_log_df.iterrows():
-        filled = str(row.get("filled", "")).strip()
-        uuid = row.get("buy_uuid", None)
+    table, from_frame = _as_table(buy_log, BuyOrder)
+
+    for order in table:
+        filled = order.filled
+        uuid = order.buy_uuid
 
         if filled == "done":
             continue
 
-        market = row["market"]
-        amount = float(row["buy_amount"])
-        price = float(row["target_price"])
+        market = order.market
+        amount = float(order.buy_amount)
+        price = float(order.target_price)
 
         # 정수 주식 단위 계산
         volume = int(amount // price)
         if volume <= 0:
-            print(f"⚠️ {market}: 현재가 {price:.2f}$ → {amount}$으로 매수 불가 (스킵)")
+            log.warning(f"⚠️ {market}: 현재가 {price:.2f}$ → {amount}$으로 매수 불가 (스킵)")
             continue
 
         # 정정 주문
-        if filled == "update" and pd.notna(uuid):
-            print(f"🔁 정정 매수 주문: {market}, uuid={uuid}, {volume}주 @ {price:.2f}$")
+        if filled == "update" and uuid is not None:
+            log.info(f"🔁 정정 매수 주문: {market}, uuid={uuid}, {volume}주 @ {price:.2f}$")
             try:
                 response = cancel_and_new_order(
                     prev_order_uuid=uuid,
@@ -129,21 +146,23 @@ def execute_buy_orders(buy_log_df: pd.DataFrame) -> pd.DataFrame:
 
                 new_uuid = normalize_uuid(response.get("new_order_uuid", ""))
                 if new_uuid:
-                    buy_log_df.at[idx, "buy_uuid"] = str(new_uuid)
-                    buy_log_df.at[idx, "filled"] = "wait"
+                    table.set_uuid(order, str(new_uuid))
+                    order.filled = "wait"
+                    count_order("buy", "replaced")
                 else:
                     raise ValueError("정정 매수 주문 new_uuid 없음")
             except Exception as e:
                 detect_market_closed_from_exception(e)
 
-                print(f"❌ 정정 매수 주문 실패: {e}")
+                log.error(f"❌ 정정 매수 주문 실패: {e}")
+                count_order("buy", "failed")
                 all_success = False
 
         # 신규 주문
-        elif filled == "update" and pd.isna(uuid):
-            print(f"🆕 신규 매수 주문: {market}, {volume}주 @ {price:.2f}$")
+        elif filled == "update" and uuid is None:
+            log.info(f"🆕 신규 매수 주문: {market}, {volume}주 @ {price:.2f}$")
             try:
-                buy_type = row.get("buy_type", "")
+                buy_type = order.buy_type
 
                 # -----------------------------
                 # INITIAL → MARKET 주문 시도
@@ -151,7 +170,7 @@ def execute_buy_orders(buy_log_df: pd.DataFrame) -> pd.DataFrame:
                 # -----------------------------
                 if buy_type == "initial":
                     try:
-                        print(f"⚡ INITIAL 주문 → 우선 시장가(MARKET)로 시도: {market}")
+                        log.info(f"⚡ INITIAL 주문 → 우선 시장가(MARKET)로 시도: {market}")
                         response = send_order(
                             market=market,
                             side="BUY",
@@ -165,7 +184,7 @@ def execute_buy_orders(buy_log_df: pd.DataFrame) -> pd.DataFrame:
                             raise Exception(f"시장가 주문 실패: {response}")
 
                     except Exception as e:
-                        print(f"⚠️ 시장가 주문 실패 → 지정가로 재시도: {e}")
+                        log.warning(f"⚠️ 시장가 주문 실패 → 지정가로 재시도: {e}")
                         # fallback → 지정가 주문
                         response = send_order(
                             market=market,
@@ -190,48 +209,56 @@ def execute_buy_orders(buy_log_df: pd.DataFrame) -> pd.DataFrame:
 
                 new_uuid = normalize_uuid(response.get("uuid", ""))
                 if new_uuid:
-                    buy_log_df.at[idx, "buy_uuid"] = str(new_uuid)
-                    buy_log_df.at[idx, "filled"] = "wait"
+                    table.set_uuid(order, str(new_uuid))
+                    order.filled = "wait"
+                    count_order("buy", "sent")
                 else:
                     raise ValueError("신규 매수 주문 uuid 없음")
             except Exception as e:
                 detect_market_closed_from_exception(e)
 
-                print(f"❌ 신규 매수 주문 실패: {e}")
+                log.error(f"❌ 신규 매수 주문 실패: {e}")
+                count_order("buy", "failed")
                 all_success = False
 
-    print("[order_executor.py] 매수 주문 실행 완료")
+    log.info("[order_executor.py] 매수 주문 실행 완료")
 
     if not all_success:
         raise RuntimeError("일부 매수 주문 실패")
 
-    return buy_log_df
+    return table.to_frame() if from_frame else table
 
 
-def execute_sell_orders(sell_log_df: pd.DataFrame, holdings: dict) -> pd.DataFrame:
-    print("[order_executor.py] 매도 주문 실행 시작")
+def execute_sell_orders(sell_log, holdings: dict):
+    """
+    filled=update 매도 주문 실행 (신규 / 정정)
+    sell_log: OrderTable[SellOrder] 또는 DataFrame → 같은 형태로 반환
+    """
+    log.info("[order_executor.py] 매도 주문 실행 시작")
     all_success = True
 
-    for idx, row in sell_log_df.iterrows():
-        filled = str(row.get("filled", "")).strip()
-        uuid = row.get("sell_uuid", None)
+    table, from_frame = _as_table(sell_log, SellOrder)
+
+    for order in table:
+        filled = order.filled
+        uuid = order.sell_uuid
 
         if filled == "done":
             continue  # 이미 완료된 주문은 스킵
 
-        market = row["market"]
-        price = float(row["target_sell_price"])
+        market = order.market
+        price = float(order.target_sell_price)
 
         # 보유 수량 확인 (정수 주식 단위)
         volume = int(float(holdings.get(market, {}).get("balance", 0)))
         if volume <= 0:
-            print(f"⚠️ {market} 매도할 수량이 0 → 스킵 (filled=done 처리)")
-            sell_log_df.at[idx, "filled"] = "done"
+            log.warning(f"⚠️ {market} 매도할 수량이 0 → 스킵 (filled=done 처리)")
+            order.filled = "done"
             continue
 
         # 정정 매도 주문
-        if filled == "update" and pd.notna(uuid):
-            print(f"🔁 정정 매도 주문: {market}, uuid={uuid}, {volume}주 @ {price:.2f}$")
+        if filled == "update" and uuid is not None:
+            log.info(f"🔁 정정 매도 주문: {market}, uuid={uuid}, {volume}주 @ {price:.2f}$")
             try:
                 response = cancel_and_new_order(
                     prev_order_uuid=uuid,
@@ -245,8 +272,9 @@ def execute_sell_orders(sell_log_df: pd.DataFrame, holdings: dict) -> pd.DataFra
 
                 new_uuid = normalize_uuid(response.get("new_order_uuid", ""))
                 if new_uuid:
-                    sell_log_df.at[idx, "sell_uuid"] = str(new_uuid)
-                    sell_log_df.at[idx, "filled"] = "wait"
+                    table.set_uuid(order, str(new_uuid))
+                    order.filled = "wait"
+                    count_order("sell", "replaced")
                 else:
                     raise ValueError("정정 매도 주문 new_uuid 없음")
 
@@ -261,7 +289,7 @@ def execute_sell_orders(sell_log_df: pd.DataFrame, holdings: dict) -> pd.DataFra
 
                 # 정정취소 불가(rsp_cd=8819) → 신규 매도 대체
                 if ("8819" in err) or ("정정취소" in err):
-                    print(f"⚠️ {market} 정정 취소 불가 → 신규 매도 주문으로 대체 진행")
+                    log.warning(f"⚠️ {market} 정정 취소 불가 → 신규 매도 주문으로 대체 진행")
 
                     try:
                         # -----------------------------
@@ -279,18 +307,21 @@ def execute_sell_orders(sell_log_df: pd.DataFrame, holdings: dict) -> pd.DataFra
                         new_uuid = response.get("uuid", "")
 
                         if new_uuid:
-                            print(f"🟢 신규 매도 주문 성공 → uuid={new_uuid}")
-                            sell_log_df.at[idx, "sell_uuid"] = new_uuid
-                            sell_log_df.at[idx, "filled"] = "wait"
+                            log.info(f"🟢 신규 매도 주문 성공 → uuid={new_uuid}")
+                            table.set_uuid(order, new_uuid)
+                            order.filled = "wait"
+                            count_order("sell", "sent")
                         else:
                             raise ValueError("❌ 신규 매도 uuid 없음 (정정 실패 후 대체 주문 실패)")
 
                     except Exception as new_e:
-                        print(f"❌ 신규 매도 주문 실패(대체 실패): {new_e}")
+                        log.error(f"❌ 신규 매도 주문 실패(대체 실패): {new_e}")
+                        count_order("sell", "failed")
                         detect_market_closed_from_exception(new_e)
 
                 else:
-                    print(f"❌ 정정 매도 주문 실패: {e}")
+                    log.error(f"❌ 정정 매도 주문 실패: {e}")
+                    count_order("sell", "failed")
                     all_success = False
 
                     # 기존 예외 처리 유지
@@ -299,8 +330,8 @@ def execute_sell_orders(sell_log_df: pd.DataFrame, holdings: dict) -> pd.DataFra
 
 
         # 신규 매도 주문
-        elif filled == "update" and pd.isna(uuid):
-            print(f"🆕 신규 매도 주문: {market}, {volume}주 @ {price:.2f}$")
+        elif filled == "update" and uuid is None:
+            log.info(f"🆕 신규 매도 주문: {market}, {volume}주 @ {price:.2f}$")
             try:
                 response = send_order(
                     market=market,
@@ -314,19 +345,21 @@ def execute_sell_orders(sell_log_df: pd.DataFrame, holdings: dict) -> pd.DataFra
 
                 new_uuid = normalize_uuid(response.get("uuid", ""))
                 if new_uuid:
-                    sell_log_df.at[idx, "sell_uuid"] = str(new_uuid)
-                    sell_log_df.at[idx, "filled"] = "wait"
+                    table.set_uuid(order, str(new_uuid))
+                    order.filled = "wait"
+                    count_order("sell", "sent")
                 else:
                     raise ValueError("신규 매도 주문 uuid 없음")
             except Exception as e:
                 detect_market_closed_from_exception(e)
 
-                print(f"❌ 신규 매도 주문 실패: {e}")
+                log.error(f"❌ 신규 매도 주문 실패: {e}")
+                count_order("sell", "failed")
                 all_success = False
 
-    print("[order_executor.py] 매도 주문 실행 완료")
+    log.info("[order_executor.py] 매도 주문 실행 완료")
 
     if not all_success:
         raise RuntimeError("일부 매도 주문 실패")
 
-    return sell_log_df
+    return table.to_frame() if from_frame else table
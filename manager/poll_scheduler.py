@@ -0,0 +1,366 @@
+# manager/poll_scheduler.py
+
+import os
+import math
+import time
+import threading
+from collections import deque
+from dotenv import load_dotenv
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+load_dotenv()
+
+# ==========================================
+# 환경 변수
+# ==========================================
+POLL_SCHEDULER_ENABLED = os.getenv("POLL_SCHEDULER_ENABLED", "1").strip() not in ("0", "false", "False")
+
+# 주문별 상태 조회 간격 범위(초)
+POLL_MIN_SEC = float(os.getenv("POLL_MIN_SEC", "1.0"))
+POLL_MAX_SEC = float(os.getenv("POLL_MAX_SEC", "30.0"))
+
+# 조회 간격 = 가격이 주문가까지 POLL_SIGMA 표준편차만큼 움직이는 데 걸리는 시간
+POLL_SIGMA = float(os.getenv("POLL_SIGMA", "3.0"))
+
+# 변동성 관측이 부족할 때 쓰는 기본값 (초당 sqrt 기준 수익률 표준편차, 보수적으로 크게)
+POLL_DEFAULT_VOL = float(os.getenv("POLL_DEFAULT_VOL", "0.0005"))
+
+# 변동성 하한 – 호가가 잠깐 멈춰 있어도 간격이 과도하게 늘지 않도록
+POLL_MIN_VOL = float(os.getenv("POLL_MIN_VOL", "0.0002"))
+
+# 체결/미체결 내역 조회 예산 (초당 HTTP 요청 수, 연속조회 페이지 / 체결 확정 조회 포함)
+#  - 예산이 바닥나면 추적기 갱신을 건너뛰고 직전 스냅샷 사용, 조회 대상 주문은 다음 틱으로 미룸
+POLL_BUDGET_PER_SEC = float(os.getenv("POLL_BUDGET_PER_SEC", "1.0"))
+POLL_BUDGET_BURST = float(os.getenv("POLL_BUDGET_BURST", "3"))
+
+# 거리 계산용 호가 재사용 시간(초)
+#  - 호가는 이번 틱 호가 캐시 스냅샷을 우선 사용 (네트워크 호출 없음)
+#  - 스냅샷이 없으면 요청 예산에 여유가 있을 때만 직접 조회하고 예산에서 1회 차감
+POLL_QUOTE_REFRESH_SEC = float(os.getenv("POLL_QUOTE_REFRESH_SEC", "2.0"))
+
+# 변동성 추정에 쓰는 최근 중간가 수
+VOL_WINDOW = 60
+
+
+def _default_snapshot_fn(market: str, market_code: str):
+    from api.db_usstocks import peek_bid_ask
+    return peek_bid_ask(market, market_code)
+
+
+def _default_quote_fn(market: str, market_code: str):
+    from api.db_usstocks import get_bid_ask
+    return get_bid_ask(market, market_code)
+
+
+class PollScheduler:
+    """
+    주문 상태 조회 스케줄러
+    - 주문가와 현재 호가의 거리 / 최근 변동성으로 주문별 조회 간격을 정함
+      · 매수(지정가): 매도호가(ask)가 주문가까지 내려와야 체결 → 거리 = (ask - 주문가) / ask
+      · 매도(지정가): 매수호가(bid)가 주문가까지 올라와야 체결 → 거리 = (주문가 - bid) / bid
+      · 간격 = (거리 / (POLL_SIGMA × σ))²  → [POLL_MIN_SEC, POLL_MAX_SEC]
+    - 호가 근처 주문은 매 틱, 멀리 있는 large_flow 주문은 최대 POLL_MAX_SEC마다
+    - 처음 보는 주문 / 이미 닿은 주문 / 호가를 모르는 종목은 최소 간격(POLL_MIN_SEC)으로 조회
+    - 호가: 이번 틱 호가 캐시 스냅샷이 있으면 간격 재계산, 없으면 직전에 계산한 간격 유지
+      → 조회 시점이 된 주문이 있는 종목만 예산 안에서 직접 조회 (예산 1회 차감)
+
+    실제 네트워크 호출(체결/미체결 추적기 갱신)도 이 스케줄러가 제한
+    - 추적기는 틱마다 계좌 전체 미체결 목록을 받으므로, 주문을 골라내는 것만으로는 요청이 줄지 않음
+    - 조회할 주문이 있는 틱(또는 request_refresh())에만 갱신, 아니면 직전 스냅샷 재사용
+    - 조회 대상이 없어도 POLL_MAX_SEC마다 한 번은 갱신 (외부 주문 정리용)
+    - 예산은 HTTP 요청 수 기준 (POLL_BUDGET_PER_SEC, 최대 POLL_BUDGET_BURST개 적립)
+    """
+
+    def __init__(self, min_interval: float = POLL_MIN_SEC, max_interval: float = POLL_MAX_SEC,
+                 sigma: float = POLL_SIGMA, default_vol: float = POLL_DEFAULT_VOL,
+                 min_vol: float = POLL_MIN_VOL,
+                 budget_per_sec: float = POLL_BUDGET_PER_SEC, budget_burst: float = POLL_BUDGET_BURST,
+                 quote_refresh_sec: float = POLL_QUOTE_REFRESH_SEC,
+                 quote_fn=None, snapshot_fn=None, clock=time.monotonic):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.sigma = sigma
+        self.default_vol = default_vol
+        self.min_vol = min_vol
+        self.budget_per_sec = budget_per_sec
+        self.budget_burst = max(budget_burst, 1.0)
+        self.quote_refresh_sec = quote_refresh_sec
+        self._quote_fn = quote_fn or _default_quote_fn
+        self._snapshot_fn = snapshot_fn or _default_snapshot_fn
+        self._clock = clock
+
+        self._lock = threading.RLock()
+        self._market_codes = {}
+        self._quotes = {}          # market → (시각, bid, ask)
+        self._mids = {}            # market → deque[(시각, mid)]
+        self._last_polled = {}     # uuid → 시각
+        self._intervals = {}       # uuid → 마지막으로 계산한 조회 간격
+        self._budget = self.budget_burst
+        self._budget_at = clock()
+        self._demand = False       # 이번 틱에 조회할 주문이 있음 → 추적기 갱신 필요
+        self._refreshed_at = None  # 마지막 추적기 갱신 시각
+
+        self.selected = 0
+        self.skipped = 0
+        self.deferred = 0
+        self.refreshes = 0
+        self.requests = 0
+        self.quote_requests = 0
+        self.throttled = 0
+
+    # ------------------------------------------
+    # 호가 / 변동성
+    # ------------------------------------------
+    def set_market_codes(self, codes: dict):
+        """setting.csv market → market_code (호가 조회용)"""
+        with self._lock:
+            self._market_codes = {str(m).strip().upper(): c for m, c in codes.items()}
+
+    def observe_quote(self, market: str, bid: float, ask: float, now: float = None):
+        now = self._clock() if now is None else now
+        with self._lock:
+            self._quotes[market] = (now, float(bid), float(ask))
+            mids = self._mids.setdefault(market, deque(maxlen=VOL_WINDOW))
+            mids.append((now, (float(bid) + float(ask)) / 2))
+
+    def volatility(self, market: str) -> float:
+        """최근 중간가 로그수익률 표준편차 (초당 sqrt 기준). 관측 부족 시 기본값"""
+        with self._lock:
+            mids = list(self._mids.get(market, ()))
+
+        scaled = []
+        for (t0, p0), (t1, p1) in zip(mids, mids[1:]):
+            dt = t1 - t0
+            if dt <= 0 or p0 <= 0 or p1 <= 0:
+                continue
+            scaled.append(math.log(p1 / p0) / math.sqrt(dt))
+
+        if len(scaled) < 5:
+            return self.default_vol
+
+        mean = sum(scaled) / len(scaled)
+        var = sum((x - mean) ** 2 for x in scaled) / (len(scaled) - 1)
+        return max(math.sqrt(var), self.min_vol)
+
+    def _quote(self, market: str, now: float, fetch: bool = False):
+        """
+        거리 계산용 (bid, ask). 모르면 None
+        1) POLL_QUOTE_REFRESH_SEC 안에 본 호가
+        2) 이번 틱 호가 캐시 스냅샷 (네트워크 호출 없음)
+        3) fetch=True이고 추적기 갱신 1회분을 남기고도 예산이 있으면 직접 조회 → 예산 1회 차감
+        """
+        with self._lock:
+            cached = self._quotes.get(market)
+            code = self._market_codes.get(market)
+
+        if cached and now - cached[0] < self.quote_refresh_sec:
+            return cached[1], cached[2]
+        if code is None:
+            return None
+
+        try:
+            quote = self._snapshot_fn(market, code)
+        except Exception:
+            quote = None
+
+        if quote is None:
+            if not fetch:
+                return None
+            with self._lock:
+                self._refill(now)
+                if self._budget < 2:
+                    return None
+                self._budget -= 1
+                self.quote_requests += 1
+
+            try:
+                quote = self._quote_fn(market, code)
+            except Exception as e:
+                log.warning(f"⚠️ [poll_scheduler] {market} 호가 조회 실패 → 최소 간격으로 조회: {e}")
+                return None
+
+        bid, ask = quote
+        self.observe_quote(market, bid, ask, now)
+        return bid, ask
+
+    # ------------------------------------------
+    # 간격 계산
+    # ------------------------------------------
+    @staticmethod
+    def distance(side: str, price: float, bid: float, ask: float) -> float:
+        """체결까지 남은 가격 거리 (비율, 0 이하 = 이미 닿음)"""
+        if side == "buy":
+            return (ask - price) / ask if ask > 0 else 0.0
+        return (price - bid) / bid if bid > 0 else 0.0
+
+    def interval_for(self, distance: float, vol: float) -> float:
+        if distance <= 0 or not math.isfinite(distance):
+            return self.min_interval
+        interval = (distance / (self.sigma * max(vol, 1e-9))) ** 2
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _refill(self, now: float):
+        elapsed = now - self._budget_at
+        if elapsed > 0:
+            self._budget = min(self.budget_burst, self._budget + elapsed * self.budget_per_sec)
+            self._budget_at = now
+
+    # ------------------------------------------
+    # 선택
+    # ------------------------------------------
+    def select(self, orders: list, side: str) -> list:
+        """
+        이번 틱에 상태 조회할 주문만 골라 반환 (선택된 주문은 조회한 것으로 기록)
+        - 조회 간격이 지난 주문은 전부 선택 (우선순위 없음)
+          추적기 갱신 1회(계좌 전체 미체결 + 사라진 주문 확정)가 대상 주문 상태를 한꺼번에 정하므로
+          주문 수를 줄여도 요청 수는 그대로 → 예산은 주문이 아니라 갱신 단위로 적용
+        - 요청 예산이 바닥났으면 추적기 갱신이 불가 → 전부 다음 틱으로 미룸
+        orders: BuyOrder / SellOrder 레코드 (uuid 있음)
+        """
+        now = self._clock()
+        by_market = {}
+        for order in orders:
+            by_market.setdefault(order.market, []).append(order)
+
+        due = []
+        intervals = {}
+        for market, market_orders in by_market.items():
+            with self._lock:
+                last = {o.uuid: self._last_polled.get(o.uuid) for o in market_orders}
+                known = {o.uuid: self._intervals.get(o.uuid, self.min_interval) for o in market_orders}
+
+            # 직전 간격 기준으로 조회 시점이 된 주문이 있을 때만 호가 직접 조회 허용
+            expired = any(last[o.uuid] is None or now - last[o.uuid] >= known[o.uuid] for o in market_orders)
+            quote = self._quote(market, now, fetch=expired)
+
+            for order in market_orders:
+                price = order.target_price if side == "buy" else order.target_sell_price
+                if quote is None:
+                    interval = known[order.uuid]
+                elif price is None or not math.isfinite(float(price)):
+                    interval = self.min_interval
+                else:
+                    dist = self.distance(side, float(price), *quote)
+                    interval = self.interval_for(dist, self.volatility(market))
+
+                intervals[order.uuid] = interval
+                if last[order.uuid] is None or now - last[order.uuid] >= interval:
+                    due.append(order)
+
+        with self._lock:
+            self._refill(now)
+            chosen = due if self._budget >= 1 else []
+            for order in chosen:
+                self._last_polled[order.uuid] = now
+            for uuid, interval in intervals.items():
+                if uuid in self._last_polled:
+                    self._intervals[uuid] = interval
+            if chosen:
+                self._demand = True
+
+            self.selected += len(chosen)
+            self.skipped += len(orders) - len(due)
+            self.deferred += len(due) - len(chosen)
+
+        if len(chosen) < len(orders):
+            log.debug("[poll_scheduler] %s 상태 조회 %d/%d건 (대기 %d건, 예산 초과 %d건)",
+                      side, len(chosen), len(orders), len(orders) - len(due), len(due) - len(chosen))
+        return chosen
+
+    # ------------------------------------------
+    # 추적기 갱신 제한 (OrderHistoryTracker throttle)
+    # ------------------------------------------
+    def request_refresh(self):
+        """스케줄과 무관하게 다음 추적기 갱신 요청 (잔고 변경 이벤트 등)"""
+        with self._lock:
+            self._demand = True
+
+    def allow_refresh(self) -> bool:
+        """
+        추적기 스냅샷이 만료됐을 때 네트워크 갱신 여부
+        - 예산 부족 → 불가
+        - 조회할 주문이 있거나 마지막 갱신 후 POLL_MAX_SEC 경과 → 갱신
+        """
+        now = self._clock()
+        with self._lock:
+            self._refill(now)
+            stale = self._refreshed_at is None or now - self._refreshed_at >= self.max_interval
+            if self._budget >= 1 and (self._demand or stale):
+                return True
+            self.throttled += 1
+            return False
+
+    def spend_requests(self, count: int, refreshed: bool = True):
+        """추적기가 실제로 보낸 HTTP 요청 수만큼 예산 차감 (음수 허용 → 다음 갱신이 그만큼 늦어짐)"""
+        now = self._clock()
+        with self._lock:
+            self._refill(now)
+            self._budget -= count
+            self.requests += count
+            if refreshed:
+                self.refreshes += 1
+                self._refreshed_at = now
+                self._demand = False
+
+    def forget(self, uuids):
+        """체결/취소로 끝난 주문 정리"""
+        with self._lock:
+            for uuid in uuids:
+                self._last_polled.pop(uuid, None)
+                self._intervals.pop(uuid, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.selected + self.skipped + self.deferred
+            return {
+                "tracked_orders": len(self._last_polled),
+                "selected": self.selected,
+                "skipped": self.skipped,
+                "deferred": self.deferred,
+                "skip_ratio": round(self.skipped / total, 4) if total else 0.0,
+                "refreshes": self.refreshes,
+                "requests": self.requests,
+                "quote_requests": self.quote_requests,
+                "throttled_refreshes": self.throttled,
+                "budget": round(self._budget, 3),
+            }
+
+
+_SCHEDULER = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_poll_scheduler() -> PollScheduler:
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        with _SCHEDULER_LOCK:
+            if _SCHEDULER is None:
+                _SCHEDULER = PollScheduler()
+    return _SCHEDULER
+
+
+def select_for_poll(orders: list, side: str) -> list:
+    """스케줄러 사용 설정이면 이번 틱 조회 대상만, 아니면 전체"""
+    if not POLL_SCHEDULER_ENABLED or not orders:
+        return orders
+    return get_poll_scheduler().select(orders, side)
+
+
+def request_refresh():
+    """다음 틱 스케줄과 무관하게 체결/미체결 내역 갱신 요청"""
+    if POLL_SCHEDULER_ENABLED:
+        get_poll_scheduler().request_refresh()
+
+
+def install_history_throttle():
+    """스케줄러 사용 설정이면 체결/미체결 추적기 갱신을 스케줄러 요청 예산으로 제한"""
+    if POLL_SCHEDULER_ENABLED:
+        from api.db_usstocks import set_order_history_throttle
+        set_order_history_throttle(get_poll_scheduler())
+
+
+def forget_polled(uuids):
+    if POLL_SCHEDULER_ENABLED:
+        get_poll_scheduler().forget(uuids)
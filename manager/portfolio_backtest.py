@@ -0,0 +1,270 @@
+# manager/portfolio_backtest.py
+
+import os
+import sys
+import time
+import argparse
+from dataclasses import dataclass, field
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from data.candle_store import CandleStore, CANDLE_STORE_DIR
+from manager.backtest_engine import LadderParams, LadderState, INITIAL_CASH, BUY_FEE, SELL_FEE
+from utils.csv_utils import atomic_save
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+
+@dataclass
+class PortfolioResult:
+    """공통 시간축 기준 계좌 1개 결과 (봉별 배열은 그 봉 종가 판단까지 끝난 뒤의 값)"""
+    markets: list
+    time: np.ndarray            # 공통 시간축 (datetime64)
+    trades: dict                # market → [Trade] (Trade.index = 공통 시간축 위치)
+    cash: np.ndarray
+    exposure: np.ndarray        # 전 종목 누적 매수금 합 (물려 있는 원금)
+    market_value: np.ndarray    # 전 종목 평가금액 합 (봉이 없는 종목은 마지막 종가)
+    equity: np.ndarray
+    holding: np.ndarray         # 보유 종목 수
+    realized_pnl: np.ndarray
+    cum_fee: np.ndarray
+    initial_cash: float
+    per_market: list = field(default_factory=list)
+    elapsed_sec: float = 0.0
+
+    @property
+    def steps(self) -> int:
+        return len(self.equity)
+
+    def utilization(self) -> np.ndarray:
+        """자금 사용률 = 물려 있는 원금 / (현금 + 물려 있는 원금) – 평가손익과 무관하게 매수 여력 중 쓴 비율"""
+        capital = self.cash + self.exposure
+        return np.divide(self.exposure, capital, out=np.zeros(self.steps), where=capital > 0)
+
+    def by_market(self) -> pd.DataFrame:
+        return pd.DataFrame(self.per_market)
+
+    def summary(self) -> dict:
+        n = self.steps
+        if not n:
+            return {"steps": 0, "markets": len(self.markets)}
+        peak = np.maximum.accumulate(self.equity)
+        usage = self.utilization()
+        buys = sum(m["buys"] for m in self.per_market)
+        symbol_steps = sum(m["candles"] for m in self.per_market)
+        return {
+            "steps": n,
+            "markets": len(self.markets),
+            "final_equity": round(float(self.equity[-1]), 2),
+            "total_return": round(float(self.equity[-1] / self.initial_cash - 1), 6),
+            "max_drawdown": round(float(np.max((peak - self.equity) / peak)), 6),
+            "realized_pnl": round(float(self.realized_pnl[-1]), 2),
+            "total_fee": round(float(self.cum_fee[-1]), 2),
+            "buys": buys,
+            "sells": sum(m["sells"] for m in self.per_market),
+            "cash_skips": sum(m["cash_skips"] for m in self.per_market),
+            "min_cash": round(float(self.cash.min()), 2),
+            "avg_utilization": round(float(usage.mean()), 6),
+            "peak_utilization": round(float(usage.max()), 6),
+            "peak_exposure": round(float(self.exposure.max()), 2),
+            "peak_holding": int(self.holding.max()),
+            "elapsed_sec": round(self.elapsed_sec, 4),
+            "symbol_steps_per_sec": round(symbol_steps / self.elapsed_sec) if self.elapsed_sec > 0 else None,
+        }
+
+
+def align_candles(candles: dict, markets: list) -> tuple:
+    """
+    종목별 분봉 → 공통 시간축 (전 종목 시각 합집합)
+    - 반환: (시간축, 종목별 (open, high, low, close) 리스트) – 봉이 없는 시각은 NaN
+    """
+    stamps = {}
+    for market in markets:
+        df = candles[market]
+        stamps[market] = pd.to_datetime(df["time"]).to_numpy().astype("datetime64[s]")
+    times = np.unique(np.concatenate([stamps[m] for m in markets])) if markets else np.array([], "datetime64[s]")
+
+    columns = []
+    for market in markets:
+        df = candles[market]
+        ts = stamps[market]
+        if len(np.unique(ts)) != len(ts):
+            raise ValueError(f"[portfolio] {market} 분봉 시각 중복")
+        pos = np.searchsorted(times, ts)
+        arrays = []
+        for name in ("open", "high", "low", "close"):
+            full = np.full(len(times), np.nan)
+            full[pos] = df[name].to_numpy(dtype=float)
+            arrays.append(full.tolist())
+        columns.append(tuple(arrays))
+    return times, columns
+
+
+# ==========================================
+# 포트폴리오 엔진 (종목별 LadderState + 공유 현금)
+# ==========================================
+def backtest_portfolio(candles: dict, params: list, initial_cash: float = INITIAL_CASH,
+                       buy_fee: float = BUY_FEE, sell_fee: float = SELL_FEE) -> PortfolioResult:
+    """
+    여러 종목 카지노 사다리를 계좌 1개(공유 현금)로 백테스트
+    - candles: market → DataFrame(time, open, high, low, close), params: setting.csv 순서의 LadderParams
+    - 종목별 판단/체결 규칙은 backtest_ladder와 같은 LadderState, unit_size도 종목별 값 그대로
+    - 한 시각 안의 순서: 전 종목 익절 체결(현금 회수) → setting 순서대로 매수 체결(현금 부족 시 그 봉 미체결)
+      → 종목별 종가 판단
+    - 그 시각에 봉이 없는 종목은 체결/판단 없이 마지막 종가로 평가
+    """
+    markets = [p.market for p in params]
+    if len(set(markets)) != len(markets):
+        raise ValueError("[portfolio] setting에 같은 market이 두 번 있습니다")
+
+    times, columns = align_candles(candles, markets)
+    n = len(times)
+    k = len(markets)
+    started = time.perf_counter()
+
+    ladders = [LadderState(p, buy_fee, sell_fee) for p in params]
+    opens = [col[0] for col in columns]
+    highs = [col[1] for col in columns]
+    lows = [col[2] for col in columns]
+    closes = [col[3] for col in columns]
+
+    cash = float(initial_cash)
+    last_close = [0.0] * k
+    peak_cost = [0.0] * k
+    counted = [0] * k
+    skip = [True] * k
+    symbols = range(k)
+
+    out_cash = np.empty(n)
+    out_exposure = np.empty(n)
+    out_value = np.empty(n)
+    out_equity = np.empty(n)
+    out_holding = np.empty(n, dtype=np.int64)
+    out_realized = np.empty(n)
+    out_fee = np.empty(n)
+
+    for i in range(n):
+        # 1) 익절 체결 먼저 – 매도 대금이 같은 시각 다른 종목의 매수 여력이 됨
+        for j in symbols:
+            o = opens[j][i]
+            if o != o:
+                skip[j] = True
+                continue
+            counted[j] += 1
+            proceeds = ladders[j].fill_sell(i, o, highs[j][i])
+            if proceeds is None:
+                skip[j] = False
+            else:
+                cash += proceeds
+                skip[j] = True
+
+        # 2) 매수 체결 – setting 순서대로 공유 현금 소진
+        for j in symbols:
+            if skip[j]:
+                continue
+            ladder = ladders[j]
+            cash = ladder.fill_buys(i, opens[j][i], lows[j][i], cash)
+            if ladder.cost > peak_cost[j]:
+                peak_cost[j] = ladder.cost
+
+        # 3) 종가 판단 + 평가
+        exposure = value = realized = fee = 0.0
+        holding = 0
+        for j in symbols:
+            ladder = ladders[j]
+            c = closes[j][i]
+            if c == c:
+                ladder.decide(c)
+                last_close[j] = c
+            if ladder.pos:
+                holding += 1
+                exposure += ladder.cost
+                value += ladder.pos * last_close[j]
+            realized += ladder.realized
+            fee += ladder.cum_fee
+
+        out_cash[i] = cash
+        out_exposure[i] = exposure
+        out_value[i] = value
+        out_equity[i] = cash + value
+        out_holding[i] = holding
+        out_realized[i] = realized
+        out_fee[i] = fee
+
+    per_market = []
+    for j, ladder in enumerate(ladders):
+        buys = sum(1 for t in ladder.trades if t.side == "buy")
+        per_market.append({
+            "market": markets[j],
+            "unit_size": params[j].unit_size,
+            "candles": counted[j],
+            "buys": buys,
+            "sells": len(ladder.trades) - buys,
+            "realized_pnl": round(ladder.realized, 2),
+            "total_fee": round(ladder.cum_fee, 2),
+            "peak_cost_basis": round(peak_cost[j], 2),
+            "cash_skips": ladder.cash_skips,
+            "position": ladder.pos,
+        })
+
+    return PortfolioResult(
+        markets=markets, time=times, trades={m: l.trades for m, l in zip(markets, ladders)},
+        cash=out_cash, exposure=out_exposure, market_value=out_value, equity=out_equity,
+        holding=out_holding, realized_pnl=out_realized, cum_fee=out_fee,
+        initial_cash=float(initial_cash), per_market=per_market,
+        elapsed_sec=time.perf_counter() - started,
+    )
+
+
+# ==========================================
+# CLI
+# ==========================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="setting.csv 전 종목 포트폴리오 백테스트 (공유 현금)")
+    parser.add_argument("--start", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--unit", type=int, default=1)
+    parser.add_argument("--setting", default="setting.csv")
+    parser.add_argument("--initial-cash", type=float, default=INITIAL_CASH)
+    parser.add_argument("--offline", action="store_true", help="저장소에 있는 분봉만 사용 (조회 안 함)")
+    parser.add_argument("--root", default=CANDLE_STORE_DIR)
+    parser.add_argument("--out-dir", default=".")
+    args = parser.parse_args(argv)
+
+    setting_df = pd.read_csv(args.setting)
+    store = CandleStore(args.root)
+    params, candles = [], {}
+    for _, row in setting_df.iterrows():
+        market = row["market"]
+        load = store.load if args.offline else store.ensure
+        df = load(market, args.unit, args.start, args.end)
+        if df.empty:
+            log.warning(f"[portfolio] ⚠️ {market} 분봉 없음 → 제외")
+            continue
+        params.append(LadderParams.from_setting(row))
+        candles[market] = df
+
+    if not params:
+        log.error(f"[portfolio] ❌ {args.start} ~ {args.end} 분봉 있는 종목 없음")
+        return 1
+
+    result = backtest_portfolio(candles, params, initial_cash=args.initial_cash)
+    log.info(f"[portfolio] 백테스트 {result.summary()}")
+
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timeline_path = os.path.join(args.out_dir, f"portfolio_timeline_{stamp}.csv")
+    markets_path = os.path.join(args.out_dir, f"portfolio_markets_{stamp}.csv")
+    atomic_save(pd.DataFrame({
+        "time": result.time, "cash": result.cash, "exposure": result.exposure,
+        "market_value": result.market_value, "equity": result.equity, "holding": result.holding,
+        "utilization": result.utilization(), "realized_pnl": result.realized_pnl, "cum_fee": result.cum_fee,
+    }), timeline_path)
+    atomic_save(result.by_market(), markets_path)
+    log.info(f"[portfolio] ✅ 결과 저장: {timeline_path} / {markets_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# strategy/async_entry.py
+
+import os
+import time
+import asyncio
+from dotenv import load_dotenv
+
+from api.async_client import AsyncDbClient
+from strategy.entry import (
+    EntryState,
+    run_open_tick,
+    run_cleanup,
+    handle_open_exception,
+    check_market_open,
+    log_loop_start,
+    _flush_state,
+)
+from utils.instrumentation import phase
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+load_dotenv()
+
+# 목표 틱 주기(초) – 작업 시간을 포함한 한 바퀴 전체 기준
+ENTRY_TICK_SEC = float(os.getenv("ENTRY_TICK_SEC", "1.0"))
+
+
+async def prefetch_tick(client: AsyncDbClient, setting_df) -> dict:
+    """
+    틱 시작 시 종목별 호가 + 잔고 + 체결/미체결 내역을 동시에 조회해 캐시에 채움
+    - 이후 동기 전략 코드는 같은 틱 안에서 캐시를 그대로 사용 (종목 수만큼 순차 호출 X)
+    - 개별 조회 실패는 로그만 남김 → 동기 코드가 캐시 miss로 다시 조회하면서 기존대로 예외 처리
+    """
+    tasks = {"accounts": client.fetch_accounts(), "history": client.refresh_order_history()}
+
+    for _, row in setting_df.iterrows():
+        market = str(row["market"]).strip().upper()
+        tasks[f"quote:{market}"] = client.fetch_orderbook(market, row["market_code"])
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    failed = {
+        name: result for name, result in zip(tasks, results)
+        if isinstance(result, Exception)
+    }
+    for name, e in failed.items():
+        log.warning(f"⚠️ [async_entry] 선조회 실패 ({name}): {e}")
+
+    log.info(f"[async_entry] 선조회 {len(tasks)}건 동시 완료 ({elapsed_ms:.1f}ms, 실패 {len(failed)}건)")
+    return {"requests": len(tasks), "failed": len(failed), "elapsed_ms": round(elapsed_ms, 2)}
+
+
+async def run_casino_entry_async(tick_sec: float = ENTRY_TICK_SEC):
+    """
+    asyncio 메인 루프 (ENTRY_MODE=async)
+    - 틱 시작: 호가/잔고/체결내역을 종목 전체에 대해 동시 조회 (rate-limit 예산 내)
+    - 전략 단계(run_open_tick)는 기존 동기 코드를 워커 스레드에서 실행
+    - 고정 sleep(1) 대신 남은 시간만큼만 대기 → 실제 틱 주기 = tick_sec
+    """
+    log.info(f"[async_entry.py] ▶ 카지노 매매 시스템 시작 (async, 틱 {tick_sec}s)")
+
+    state = EntryState()
+    client = AsyncDbClient()
+
+    log.info(f"[async_entry.py] ▶ 초기화 완료. 메인 루프 진입 (HTTP={client.mode})")
+
+    try:
+        while True:
+            loop_start = time.time()
+            now_str = log_loop_start(state, loop_start)
+
+            if state.open_now:
+                try:
+                    # open_tick = 루프 1틱 (동기 루프와 같은 이름 → /metrics loop_duration)
+                    with phase("open_tick"):
+                        with phase("async_prefetch"):
+                            await prefetch_tick(client, state.setting_df)
+                        await asyncio.to_thread(run_open_tick, state, loop_start, now_str)
+                    await asyncio.to_thread(run_cleanup)
+
+                except Exception as e:
+                    closed = await asyncio.to_thread(handle_open_exception, state, e)
+                    if not closed:
+                        await asyncio.sleep(1)
+
+                finally:
+                    _flush_state()
+
+                elapsed = time.time() - loop_start
+                log.debug("[async_entry.py][LOOP] 틱 소요 %.2fs (목표 %ss)", elapsed, tick_sec)
+                await asyncio.sleep(max(0.0, tick_sec - elapsed))
+
+            else:
+                if not await asyncio.to_thread(check_market_open, state):
+                    await asyncio.sleep(60)
+    finally:
+        await client.close()
+
+
+def run_casino_entry_async_main():
+    asyncio.run(run_casino_entry_async())
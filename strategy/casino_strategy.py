@@ -1,5 +1,9 @@
+import numpy as np
 import pandas as pd
 from api import get_accounts, get_current_ask_price
+from utils.logger import get_logger, sample
+
+log = get_logger(__name__)
 
 def get_coin_units(buy_log_df, market):
     """ 특정 코인(market)의 filled == done 인 buy_units 합계를 반환 """
@@ -14,233 +18,273 @@ def get_coin_units(buy_log_df, market):
     return logs["buy_units"].astype(float).sum()
 
 
+FLOW_TYPES = ["small_flow", "large_flow"]
+
+
+# ----------------------------------------------
+# 가격 규칙
+# ----------------------------------------------
+# - 현재가는 호출 측 타입(int / float / np.float64)과 무관하게 float로 한 번 변환
+# - 주문 가격은 항상 파이썬 round(x, 2) (float 값의 10진 기준 반올림)
+#   → 백테스트 엔진(LadderState)과 같은 규칙
+def _price(value) -> float:
+    return float(value)
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    return np.array([round(v, 2) for v in values.tolist()], dtype=float)
+
+
+def _prepare_columns(df: pd.DataFrame):
+    """
+    제자리 수정 전 컬럼 dtype 정규화
+    - target_price: 정수 컬럼이면 float64 (2자리 가격 저장)
+    - filled / buy_uuid: 문자열 컬럼이 아니면(전부 NaN인 float 등) object ("update" / "" / None 저장)
+    """
+    if df["target_price"].dtype.kind in "iub":
+        df["target_price"] = df["target_price"].astype("float64")
+    for col in ("filled", "buy_uuid"):
+        if not pd.api.types.is_string_dtype(df[col].dtype):
+            df[col] = df[col].astype(object)
+
+
+def _new_flow_logs(setting, current_price) -> list:
+    """[상황1] flow 주문이 없는 종목 → small_flow / large_flow 신규 2건"""
+    small_pct = setting["small_flow_pct"]
+    large_pct = setting["large_flow_pct"]
+    current_price = _price(current_price)
+    rows = []
+    for buy_type, pct, units in (
+        ("small_flow", small_pct, setting["small_flow_units"]),
+        ("large_flow", large_pct, setting["large_flow_units"]),
+    ):
+        rows.append({
+            "time": pd.Timestamp.now(),
+            "market": setting["market"],
+            "target_price": round(current_price * (1 - pct), 2),
+            "buy_amount": setting["unit_size"] * units,
+            "buy_units": units,
+            "buy_type": buy_type,
+            "buy_uuid": None,
+            "filled": "update"
+        })
+    return rows
+
+
+def _update_flow_batch(batch: pd.DataFrame, buy_log_df: pd.DataFrame, current_prices: dict) -> list:
+    """
+    종목이 겹치지 않는 setting 묶음 1개 처리
+    - buy_log를 종목 기준으로 한 번만 나누고, flow 주문 상태 전이를 컬럼 연산으로 계산
+    - setting 순서 → buy_log 순서로 처리했을 때 같은 칸에 마지막으로 쓴 값이 남고,
+      판단은 처리 전 스냅샷 기준 (급락 row는 그 종목 small/large 전체를 현재가 기준으로 재설정)
+    - 검사에 걸리는 row가 하나라도 있으면 아무것도 수정하지 않고 ValueError (처리 순서상 첫 row 기준)
+    반환: [상황1] 신규 주문 row 목록 (setting 순서)
+    """
+    new_logs = []
+
+    market_col = buy_log_df["market"]
+    type_col = buy_log_df["buy_type"]
+    in_batch = market_col.isin(batch["market"])
+    flow_mask = in_batch & type_col.isin(FLOW_TYPES)
+    flow_markets = set(market_col[flow_mask])
+    initial_markets = set(market_col[in_batch & (type_col == "initial")])
+
+    setting_pos = {}
+    missing = []
+    for _, setting in batch.iterrows():
+        market = setting["market"]
+        current_price = current_prices.get(market)
+        if current_price is None:
+            missing.append(market)
+            continue
+
+        if market not in flow_markets:
+            new_logs.extend(_new_flow_logs(setting, current_price))
+        elif market in initial_markets:
+            setting_pos[market] = len(setting_pos)
+
+    if missing:
+        log.error(f"❌ 현재 가격 없음 → {missing}")
+
+    if not setting_pos:
+        return new_logs
+
+    log.info(f"📌 {list(setting_pos)} → 수정된 상황2: flow 주문 처리 시작")
+
+    # ----------------------------------------------
+    # 처리 전 스냅샷 (setting 순서 → buy_log 순서)
+    # ----------------------------------------------
+    flow = buy_log_df[flow_mask & market_col.isin(list(setting_pos))]
+    order = np.lexsort((np.arange(len(flow)), flow["market"].map(setting_pos).to_numpy()))
+    flow = flow.iloc[order]
+    n = len(flow)
+    pos = np.arange(n)
+    labels = flow.index
+
+    settings = batch.set_index("market")
+    markets = flow["market"]
+    is_small = (flow["buy_type"] == "small_flow").to_numpy()
+    small_pct = markets.map(settings["small_flow_pct"]).to_numpy(dtype=float)
+    large_pct = markets.map(settings["large_flow_pct"]).to_numpy(dtype=float)
+    pct = np.where(is_small, small_pct, large_pct)
+
+    price = markets.map({m: _price(current_prices[m]) for m in setting_pos}).to_numpy(dtype=float)
+
+    # ----------------------------------------------
+    # 유효성 검사 (수정 전에 전부 확인)
+    # ----------------------------------------------
+    raw_price = flow["target_price"]
+    missing_value = (
+        raw_price.isna() | flow["buy_amount"].isna() | flow["buy_units"].isna()
+    ).to_numpy()
+    target = pd.to_numeric(raw_price, errors="coerce").to_numpy(dtype=float)
+    bad_number = np.isnan(target) & ~missing_value
+
+    filled = flow["filled"].where(flow["filled"].notna(), "").astype(str).str.strip().to_numpy()
+    uuid_na = flow["buy_uuid"].isna().to_numpy()
+
+    reset = uuid_na & (filled == "")
+    wait = ~reset & (filled == "wait")
+    done = ~reset & (filled == "done")
+    cancel = ~reset & (filled == "cancel")
+    manual = ~reset & (filled == "")
+    unknown = ~(reset | wait | done | cancel | manual)
+
+    required = ["market", "target_price", "buy_amount", "buy_units", "buy_type"]
+    manual_blank = manual & np.logical_or.reduce(
+        [flow[col].astype(object).to_numpy() == "" for col in required]
+    )
+
+    error = missing_value | bad_number | manual_blank | unknown
+    if error.any():
+        first = int(np.argmax(error))
+        row = flow.iloc[first]
+        market, buy_type = row["market"], row["buy_type"]
+
+        if missing_value[first]:
+            raise ValueError(f"[❌ 에러] {market} - {buy_type} 주문에 누락된 값이 있습니다. 행: {row.to_dict()}")
+        if bad_number[first]:
+            raise ValueError(f"[❌ 에러] {market} - {buy_type} 주문의 target_price가 숫자가 아닙니다: {row['target_price']!r}")
+        if manual_blank[first]:
+            missing_columns = [col for col in required if pd.isna(row[col]) or row[col] == ""]
+            raise ValueError(f"[❌ 에러] {market} - {buy_type} 수동 주문에 누락된 필드가 있습니다: {missing_columns}")
+        raise ValueError(f"[❌ 에러] {market} - {buy_type} 주문의 filled 상태가 예외적입니다: '{filled[first]}'")
+
+    # ----------------------------------------------
+    # 상태별 새 가격 (컬럼 연산)
+    # ----------------------------------------------
+    with np.errstate(invalid="ignore"):
+        # PATCH 2: 폐장 후 개장 (uuid 없음 & filled="") → 현재가가 더 낮으면 재산출
+        reset_lower = reset & (price < target)
+        reset_price = _round2(price * (1 - pct))
+
+        # case1: wait → 가격 상승 시 재조정
+        rise_trigger = target / (1 - pct) * (1 + pct / 2)
+        wait_up = wait & (price > rise_trigger)
+        wait_price = _round2(rise_trigger * (1 - pct))
+
+        # case2: done → 한 칸 아래 / 급락이면 현재가 기준 small/large 재설정
+        next_price = _round2(target * (1 - pct))
+        done_step = done & (price >= next_price)
+        crash = done & ~done_step
+
+    crash_price = reset_price       # 현재가 × (1 - pct)
+
+    # 급락 row는 해당 종목 small/large 전체를 덮어씀 → 종목별 마지막 급락 위치
+    last_crash = pd.Series(np.where(crash, pos, -1)).groupby(markets.to_numpy()).transform("max").to_numpy()
+    in_crash = last_crash >= 0
+
+    # 각 칸에 남는 값 = 마지막으로 쓴 row의 값
+    self_price = reset_lower | wait_up | done_step
+    self_filled = reset | wait_up | done_step | cancel
+    self_uuid = done | cancel
+
+    use_self_price = self_price & (pos > last_crash)
+    use_self_filled = self_filled & (pos > last_crash)
+    crash_write = in_crash
+
+    new_price = np.select(
+        [use_self_price & reset_lower, use_self_price & wait_up, use_self_price & done_step],
+        [reset_price, wait_price, next_price],
+        default=crash_price,
+    )
+    price_write = use_self_price | (crash_write & ~use_self_price)
+    filled_write = use_self_filled | (crash_write & ~use_self_filled)
+    new_filled = np.where(use_self_filled & cancel, "", "update")
+    uuid_write = self_uuid | crash_write
+
+    counts = {
+        "개장 재산출": int(reset_lower.sum()),
+        "가격 재조정": int(wait_up.sum()),
+        "연속 주문": int(done_step.sum()),
+        "급락 재설정": int(crash.sum()),
+        "cancel 초기화": int(cancel.sum()),
+    }
+    log.info(f"🔁 flow 주문 처리 결과: {counts}")
+
+    # ----------------------------------------------
+    # 반영 (제자리 수정)
+    # ----------------------------------------------
+    _prepare_columns(buy_log_df)
+    buy_log_df.loc[labels[price_write], "target_price"] = new_price[price_write]
+    buy_log_df.loc[labels[filled_write & (new_filled == "update")], "filled"] = "update"
+    buy_log_df.loc[labels[filled_write & (new_filled == "")], "filled"] = ""
+    buy_log_df.loc[labels[uuid_write], "buy_uuid"] = None
+
+    return new_logs
+
+
 def generate_buy_orders(setting_df: pd.DataFrame, buy_log_df: pd.DataFrame, current_prices: dict, mode="normal") -> pd.DataFrame:
     """
     카지노 매매 전략에 따라 상황을 판단하고,
     각 상황에 따른 매수 주문 내역을 buy_log 형태로 생성/수정하여 리턴한다.
+    - buy_log를 종목별로 한 번만 나눠 flow 주문 상태 전이를 컬럼 연산으로 계산
+    - 기존 주문 수정은 buy_log_df 제자리 수정, 신규 주문은 뒤에 붙여서 반환
     """
-    print("[casino_strategy.py] generate_buy_orders() 호출됨")
+    log.info("[casino_strategy.py] generate_buy_orders() 호출됨")
 
     new_logs = []
 
-    for _, setting in setting_df.iterrows():
-        market = setting["market"]
-        unit_size = setting["unit_size"]
-        small_pct = setting["small_flow_pct"]
-        small_units = setting["small_flow_units"]
-        large_pct = setting["large_flow_pct"]
-        large_units = setting["large_flow_units"]
-
-        coin_logs = buy_log_df[buy_log_df["market"] == market]
-        initial_logs = coin_logs[coin_logs["buy_type"] == "initial"]
-        flow_logs = coin_logs[coin_logs["buy_type"].isin(["small_flow", "large_flow"])]
-
-        # -----------------------------
-        # 전량 매도시 즉시 매수
-        # -----------------------------
-        if mode == "initial_only":
-            print(f"🎯 {market} → 전량 매도 후 initial 매수만 생성")
+    # -----------------------------
+    # 전량 매도시 즉시 매수
+    # -----------------------------
+    if mode == "initial_only":
+        initial_markets = set(buy_log_df.loc[buy_log_df["buy_type"] == "initial", "market"])
+
+        for _, setting in setting_df.iterrows():
+            market = setting["market"]
+            log.info(f"🎯 {market} → 전량 매도 후 initial 매수만 생성")
 
             # ⚠️ 이미 initial 주문이 존재하면 신규 생성 금지
-            if not coin_logs.empty:
-                if any(coin_logs["buy_type"] == "initial"):
-                    print(f"⏸ {market} 이미 initial 주문 존재 → 신규 생성 안함")
-                    continue
+            if market in initial_markets:
+                log.info(f"⏸ {market} 이미 initial 주문 존재 → 신규 생성 안함")
+                continue
 
             current_price = current_prices.get(market)
             if current_price is None:
-                print(f"❌ {market} 현재가 없음 → 건너뜀")
+                log.error(f"❌ {market} 현재가 없음 → 건너뜀")
                 continue
 
             new_logs.append({
                 "time": pd.Timestamp.now(),
                 "market": market,
-                "target_price": current_price,
-                "buy_amount": unit_size,
+                "target_price": _price(current_price),
+                "buy_amount": setting["unit_size"],
                 "buy_units": 1,
                 "buy_type": "initial",
                 "buy_uuid": None,
                 "filled": "update"
             })
-            continue
-
-        current_price = current_prices.get(market)
-        if current_price is None:
-            print(f"❌ 현재 가격 없음 → {market}")
-            continue
-
 
-        # 수정된 부분 (generate_buy_orders 내부)
-
-        # ✅ [상황1] 최초 주문 없음
-        if flow_logs.empty:
-
-            # 데이터 2 - small_flow
-            small_price = round(current_price * (1 - small_pct), 2)
-            new_logs.append({
-                "time": pd.Timestamp.now(),
-                "market": market,
-                "target_price": small_price,
-                "buy_amount": unit_size * small_units,
-                "buy_units": small_units,
-                "buy_type": "small_flow",
-                "buy_uuid": None,
-                "filled": "update"  # 수정됨
-            })
-
-            # 데이터 3 - large_flow
-            large_price = round(current_price * (1 - large_pct), 2)
-            new_logs.append({
-                "time": pd.Timestamp.now(),
-                "market": market,
-                "target_price": large_price,
-                "buy_amount": unit_size * large_units,
-                "buy_units": large_units,
-                "buy_type": "large_flow",
-                "buy_uuid": None,
-                "filled": "update"  # 수정됨
-            })
+    else:
+        # 같은 종목이 setting에 두 번 이상 있으면 앞 setting의 수정 결과를 보고 처리해야 하므로 1행씩
+        if setting_df["market"].is_unique:
+            batches = [setting_df]
+        else:
+            batches = [setting_df.iloc[[i]] for i in range(len(setting_df))]
 
-        # ✅ 수정된 상황2: initial filled == done인 코인
-        elif not initial_logs.empty:
-            print(f"📌 {market} → 수정된 상황2: flow 주문 개별 처리 시작")
-
-            for _, row in flow_logs.iterrows():
-                buy_type = row["buy_type"]
-                target_price = row["target_price"]
-                raw_filled = row["filled"]
-                filled = "" if pd.isna(raw_filled) else str(raw_filled).strip()
-                row_index = row.name
-
-                if pd.isna(target_price) or pd.isna(row["buy_amount"]) or pd.isna(row["buy_units"]):
-                    raise ValueError(f"[❌ 에러] {market} - {buy_type} 주문에 누락된 값이 있습니다. 행: {row.to_dict()}")
-
-                target_price = float(target_price)
-                unit_pct = small_pct if buy_type == "small_flow" else large_pct
-
-
-                # ============================================================
-                # ⭐ PATCH 2 — 폐장 후 개장 시 uuid/reset 상태 처리
-                # 조건: uuid=None & filled=""
-                # 로직: 기존 target_price와 현재가격 비교
-                # ============================================================
-                if pd.isna(row["buy_uuid"]) and filled == "":
-                    original = float(target_price)
-
-                    # 1) 현재가격이 기존 target_price보다 낮으면 → 재설정
-                    if current_price < original:
-                        new_target = round(current_price * (1 - unit_pct), 2)
-                        print(f"🌅 {market} {buy_type} → 개장 후 가격 재산출: 기존={original}, 새={new_target}")
-                        buy_log_df.loc[row_index, "target_price"] = new_target
-                        buy_log_df.loc[row_index, "filled"] = "update"
-
-                    # 2) 현재가격이 기존 target_price보다 높으면 → 기존 유지
-                    else:
-                        print(f"🌅 {market} {buy_type} → 기존 가격 유지: 기존={original}, 현재가={current_price}")
-                        # 그래도 filled는 update로 바꿔줘야 매수 주문 들어감
-                        buy_log_df.loc[row_index, "filled"] = "update"
-                    continue
-
-                # case1: wait 상태 → 가격 상향 후 재조정
-                if filled == "wait":
-                    # 가격이 기준 이상으로 상승한 경우 → 매수 기준 재조정
-                    base = target_price / (1 - unit_pct)
-                    rise_trigger = base * (1 + unit_pct / 2)
-
-                    if current_price > rise_trigger:
-                        new_price = round(rise_trigger * (1 - unit_pct), 2)
-                        print(f"↗ {market} {buy_type} 가격 재조정: {target_price} → {new_price}")
-                        buy_log_df.loc[row_index, "target_price"] = new_price
-                        buy_log_df.loc[row_index, "filled"] = "update"
-
-
-                # case2: done 상태 → 동일 비율로 다시 내려서 주문 재생성
-                elif filled == "done":
-                    # 이 칸은 새 주문으로 취급하므로 uuid 초기화
-                    buy_log_df.at[row_index, "buy_uuid"] = None
-
-                    # 1) 기존 로직 기준으로 "다음 한 칸" 가격 N 계산
-                    default_next_price = round(target_price * (1 - unit_pct), 2)
-
-                    # 2) 현재가 P
-                    P = current_price
-                    N = default_next_price
-
-                    # 2-1) 급락이 아니라면 → 기존처럼 이 행만 한 칸 내리기
-                    if P >= N:
-                        new_price = N
-                        print(
-                            f"🔁 {market} {buy_type} 연속 주문(기존 로직): "
-                            f"{target_price} → {new_price}"
-                        )
-                        buy_log_df.loc[row_index, "target_price"] = new_price
-                        buy_log_df.loc[row_index, "filled"] = "update"
-
-                    # 2-2) 급락(P < N) 이라면 → P 를 기준으로 small/large 둘 다 재설계
-                    else:
-                        print(
-                            f"📉 {market} {buy_type} 체결 후 급락 감지 "
-                            f"(N={N}, P={P}) → 현재가 기준으로 small/large 재설정"
-                        )
-
-                        base_price = P
-
-                        # 이 코인에 대한 small / large 행의 인덱스 찾기
-                        small_idx = flow_logs[flow_logs["buy_type"] == "small_flow"].index
-                        large_idx = flow_logs[flow_logs["buy_type"] == "large_flow"].index
-
-                        # P 기준으로 새 small / large 가격 계산
-                        new_small_price = round(base_price * (1 - small_pct), 2)
-                        new_large_price = round(base_price * (1 - large_pct), 2)
-
-                        # small_flow 갱신
-                        if not small_idx.empty:
-                            old_small = buy_log_df.loc[small_idx[0], "target_price"]
-                            print(
-                                f"   ↪ small_flow: {old_small} → {new_small_price}"
-                            )
-                            buy_log_df.loc[small_idx, "target_price"] = new_small_price
-                            buy_log_df.loc[small_idx, "filled"] = "update"
-                            # small 이 방금 체결된 칸일 수도 있으니 uuid 초기화
-                            buy_log_df.loc[small_idx, "buy_uuid"] = None
-
-                        # large_flow 갱신
-                        if not large_idx.empty:
-                            old_large = buy_log_df.loc[large_idx[0], "target_price"]
-                            print(
-                                f"   ↪ large_flow: {old_large} → {new_large_price}"
-                            )
-                            buy_log_df.loc[large_idx, "target_price"] = new_large_price
-                            buy_log_df.loc[large_idx, "filled"] = "update"
-                            # large 가 방금 체결된 칸일 수도 있으니 uuid 초기화
-                            buy_log_df.loc[large_idx, "buy_uuid"] = None
-
-                # case4: cancel 상태 처리
-                elif filled == "cancel":
-                    print(f"🚫 {market} {buy_type} 주문 cancel 처리 → uuid / filled 초기화")
-
-                    buy_log_df.loc[row_index, "buy_uuid"] = None
-                    buy_log_df.loc[row_index, "filled"] = ""
-
-                    continue
-
-                elif pd.isna(filled) or filled == "":
-                    print(f"📝 {market} {buy_type} 수동 주문 → 필드 유효성 검사")
-
-                    # 필수 항목 확인: market, target_price, buy_amount, buy_units, buy_type
-                    required_columns = ["market", "target_price", "buy_amount", "buy_units", "buy_type"]
-                    missing_columns = [col for col in required_columns if pd.isna(row[col]) or row[col] == ""]
-
-                    if missing_columns:
-                        raise ValueError(f"[❌ 에러] {market} - {buy_type} 수동 주문에 누락된 필드가 있습니다: {missing_columns}")
-
-                    # 이상 없으면 update 처리
-                    # buy_log_df.loc[row_index, "filled"] = "update"
-
-
-                # case4: cancel 등 기타 상태 → 예외 처리
-                else:
-                    raise ValueError(f"[❌ 에러] {market} - {buy_type} 주문의 filled 상태가 예외적입니다: '{filled}'")
+        for batch in batches:
+            new_logs.extend(_update_flow_batch(batch, buy_log_df, current_prices))
 
     # 새로운 주문이 있다면 기존 로그와 결합
     if new_logs:
@@ -250,8 +294,13 @@ def generate_buy_orders(setting_df: pd.DataFrame, buy_log_df: pd.DataFrame, curr
     return buy_log_df
 
 
-def generate_sell_orders(setting_df: pd.DataFrame, holdings: dict, sell_log_df: pd.DataFrame) -> pd.DataFrame:
-    print("[casino_strategy.py] generate_sell_orders() 호출됨")
+def generate_sell_orders(setting_df: pd.DataFrame, holdings: dict, sell_log_df: pd.DataFrame,
+                         current_prices: dict = None) -> pd.DataFrame:
+    """
+    보유 종목별 익절 매도 주문을 sell_log 형태로 생성/수정
+    - current_prices: {market: 현재가} – 주어지면 현재가 API를 호출하지 않음 (백테스트)
+    """
+    log.info("[casino_strategy.py] generate_sell_orders() 호출됨")
 
     # 기존 sell_log_df를 복사해서 시작
     updated_df = sell_log_df.copy()
@@ -275,12 +324,15 @@ def generate_sell_orders(setting_df: pd.DataFrame, holdings: dict, sell_log_df:
         target_price = round(avg_buy_price * (1 + take_profit_pct), 2)
 
         # ⭐ 현재가격 조회
-        market_code = row["market_code"]
-        current_price = get_current_ask_price(market=market, market_code=market_code)
+        if current_prices is not None and market in current_prices:
+            current_price = current_prices[market]
+        else:
+            market_code = row["market_code"]
+            current_price = get_current_ask_price(market=market, market_code=market_code)
 
         # ⭐ 갭 상승 체크 로직
         if current_price is not None and current_price > target_price:
-            print(f"🚀 {market} 갭 상승 감지! 목표가 {target_price} → 현재가 {current_price} 로 매도가 변경")
+            log.info(f"🚀 {market} 갭 상승 감지! 목표가 {target_price} → 현재가 {current_price} 로 매도가 변경")
             target_price = round(current_price, 2)
 
         # 기존 sell_log에서 해당 market 데이터 있는지 확인
@@ -297,17 +349,17 @@ def generate_sell_orders(setting_df: pd.DataFrame, holdings: dict, sell_log_df:
             )
 
             if is_same:
-                print(f"✅ {market} → 보유 정보와 동일 → 유지")
+                log.debug("✅ %s → 보유 정보와 동일 → 유지", market, extra=sample("casino_strategy.sell_same"))
                 continue
 
-            print(f"✏️ {market} → 기존과 차이 있음 → 수정")
+            log.info(f"✏️ {market} → 기존과 차이 있음 → 수정")
             updated_df.loc[idx, "avg_buy_price"] = avg_buy_price
             updated_df.loc[idx, "quantity"] = quantity
             updated_df.loc[idx, "target_sell_price"] = target_price
             updated_df.loc[idx, "filled"] = "update"
 
         else:
-            print(f"🆕 {market} → 새로운 sell_log 생성")
+            log.info(f"🆕 {market} → 새로운 sell_log 생성")
             new_row = {
                 "market": market,
                 "avg_buy_price": avg_buy_price,
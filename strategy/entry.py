@@ -11,11 +11,17 @@ from strategy.buy_entry import (
     process_sold_out_markets_for_initial,
 )
 from strategy.sell_entry import (
-    immediate_sell_for_filled_buys,
     periodic_sell_status_check,   # 👉 추가
 )
+from strategy.fill_pipeline import handle_buy_fills
 from manager.market_close import close_market_cleanup   # ⭐ 추가
 from manager.order_cleanup import cleanup_untracked_buy_orders
+from data.state_store import get_state_store
+from manager.poll_scheduler import get_poll_scheduler, install_history_throttle
+from utils.instrumentation import phase, get_instrumentation
+from utils.logger import get_logger
+
+log = get_logger(__name__)
 
 # ⭐ 한국투자증권 해외주식 '장마감/시간외' 오류 패턴
 MARKET_CLOSED_KEYWORDS = [
@@ -27,100 +33,175 @@ MARKET_CLOSED_KEYWORDS = [
     "허용되지 않습니다"
 ]
 
-def run_casino_entry():
-    print("[entry.py] ▶ 카지노 매매 시스템 시작")
+def _flush_state():
+    """틱 끝에 메모리 buy_log / sell_log 변경분을 CSV로 1회 저장 (+ 주기적으로 단계별 계측 덤프)"""
+    try:
+        with phase("flush_state"):
+            saved = get_state_store().flush()
+        if saved:
+            log.info(f"[entry.py][STATE] 변경된 로그 {saved}개 CSV 저장")
+    except Exception as e:
+        log.error(f"[entry.py][STATE][ERROR] 로그 저장 실패 (다음 틱 재시도): {e}")
+
+    get_instrumentation().maybe_dump()
+
+
+def _set_poll_market_codes(setting_df):
+    """상태 조회 스케줄러에 종목별 market_code 등록 (호가 거리 계산용)"""
+    if "market_code" in setting_df.columns:
+        get_poll_scheduler().set_market_codes(
+            dict(zip(setting_df["market"], setting_df["market_code"]))
+        )
+
+
+class EntryState:
+    """메인 루프 상태 (동기 / async 엔진 공용)"""
+
+    def __init__(self):
+        self.open_now = True
+        self.last_minute_exec = time.time()
+        self.market_closed_cleanup_done = False   # ⭐ 추가
+
+        # 최초 setting 로드 (필요하다면 1분마다 갱신해도 됨)
+        self.setting_df = load_setting_data()
+        _set_poll_market_codes(self.setting_df)
+
+        # 체결/미체결 내역 갱신을 상태 조회 스케줄러의 요청 예산으로 제한
+        install_history_throttle()
+
+
+def run_open_tick(state: EntryState, loop_start: float, now_str: str):
+    """장이 열린 상태의 1틱: initial 재진입 → 1분 매수 생성 → 체결 감지/즉시 매도 → 매도 상태 체크"""
+    # 만약 전에 폐장_cleanup이 실행된 상태라면 → 초기화
+    if state.market_closed_cleanup_done:
+        log.info("🔄 개장 감지 → 폐장 cleanup flag 초기화")
+        state.market_closed_cleanup_done = False
+
+    # (1) 전량 매도 후 initial 재진입(초단위)
+    with phase("process_sold_out_markets_for_initial"):
+        process_sold_out_markets_for_initial(state.setting_df)
+
+    # (2) 1분 단위 매수 생성 (small/large 포함)
+    elapsed = loop_start - state.last_minute_exec
+    log.debug("[entry.py][LOOP][OPEN] 1분 경과 체크: elapsed=%.2f", elapsed)
+
+    if elapsed >= 60:
+        log.info("==============================================")
+        log.info(f"[entry.py][1-MIN] 1분 경과 → run_buy_generate_flow() 실행 at {now_str}")
+        log.info("==============================================")
+        with phase("run_buy_generate_flow"):
+            run_buy_generate_flow()
+        state.last_minute_exec = loop_start
+
+    # (3) 초단위 매수 체결 감지 → 즉시 매도
+    with phase("detect_filled_buy_orders"):
+        filled_events = detect_filled_buy_orders()
+    if filled_events:
+        with phase("handle_buy_fills"):
+            handle_buy_fills(state.setting_df, filled_events)
+
+    with phase("periodic_sell_status_check"):
+        periodic_sell_status_check()
+
+
+def run_cleanup():
+    try:
+        with phase("cleanup_untracked_buy_orders"):
+            cleanup_untracked_buy_orders()
+    except Exception as e:
+        log.error(f"[cleanup][ERROR] 외부 주문 정리 실패: {e}")
+
+
+def handle_open_exception(state: EntryState, e: Exception) -> bool:
+    """
+    장중 틱 예외 처리
+    반환: 폐장 감지 여부 (False면 일반 예외 → 호출 측에서 1초 대기)
+    """
+    log.warning(f"[entry.py][OPEN][EXCEPTION] 예외 발생: {e}")
+
+    if "MARKET_CLOSED" in str(e):
+        log.info(f"⏸️ [entry.py][OPEN] 폐장 감지 → open_now=False 전환 ({e})")
+        state.open_now = False
+
+        # ⭐ 여기서 폐장 cleanup 실행 (단 1회)
+        if not state.market_closed_cleanup_done:
+            close_market_cleanup()
+            state.market_closed_cleanup_done = True
+        return True
+
+    log.warning(f"[entry.py][OPEN] ⚠ 일반 예외 → 1초 대기 후 재실행")
+    return False
+
+
+def check_market_open(state: EntryState) -> bool:
+    """
+    장이 닫힌 상태 → 개장 여부 체크
+    반환: 개장 여부 (False면 호출 측에서 60초 대기)
+    """
+    log.info("[entry.py][LOOP][CLOSED] 장 닫힘 상태. 개장 여부 체크.")
+    try:
+        log.info("[entry.py][CLOSED] is_us_market_open() 호출")
+        if is_us_market_open(market="GGLL"):
+            log.info("✅ [entry.py][CLOSED] 미국장 개장 감지 → open_now=True 전환")
+            state.open_now = True
+            # 개장 직후 다시 setting 갱신
+            state.setting_df = load_setting_data()
+            _set_poll_market_codes(state.setting_df)
+            state.last_minute_exec = time.time()
+            return True
+
+        log.info("[entry.py][CLOSED] 아직 미개장 → 60초 대기")
+
+    except Exception as e:
+        log.warning(f"[entry.py][CLOSED][EXCEPTION] 개장 여부 확인 실패: {e}")
+        log.info("[entry.py][CLOSED] 60초 대기 후 재시도")
+
+    return False
+
+
+def log_loop_start(state: EntryState, loop_start: float) -> str:
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    log.debug("[entry.py][LOOP] ===== 루프 시작: %s =====", now_str)
+    log.debug("[entry.py][LOOP] open_now=%s, last_minute_exec=%s, loop_start=%s",
+              state.open_now, state.last_minute_exec, loop_start)
+    return now_str
 
-    open_now = True
-    last_minute_exec = time.time()
-    market_closed_cleanup_done = False   # ⭐ 추가
 
-    # 최초 setting 로드 (필요하다면 1분마다 갱신해도 됨)
-    setting_df = load_setting_data()
+def run_casino_entry():
+    log.info("[entry.py] ▶ 카지노 매매 시스템 시작")
 
-    print("[entry.py] ▶ 초기화 완료. 메인 루프 진입")
-    print(f"[entry.py] ▶ 초기 open_now={open_now}")
+    state = EntryState()
+
+    log.info("[entry.py] ▶ 초기화 완료. 메인 루프 진입")
+    log.info(f"[entry.py] ▶ 초기 open_now={state.open_now}")
 
     while True:
         loop_start = time.time()
-        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"\n[entry.py][LOOP] ===== 루프 시작: {now_str} =====")
-        print(f"[entry.py][LOOP] open_now={open_now}, last_minute_exec={last_minute_exec}, loop_start={loop_start}")
+        now_str = log_loop_start(state, loop_start)
 
         # =====================================================
         # ① 장이 열린 상태
         # =====================================================
-        if open_now:
-            # 만약 전에 폐장_cleanup이 실행된 상태라면 → 초기화
-            if market_closed_cleanup_done:
-                print("🔄 개장 감지 → 폐장 cleanup flag 초기화")
-                market_closed_cleanup_done = False
-
-
+        if state.open_now:
             try:
-                # (1) 전량 매도 후 initial 재진입(초단위)
-                process_sold_out_markets_for_initial(setting_df)
-
-                # (2) 1분 단위 매수 생성 (small/large 포함)
-                elapsed = loop_start - last_minute_exec
-                print(f"[entry.py][LOOP][OPEN] 1분 경과 체크: elapsed={elapsed:.2f}")
-
-                if elapsed >= 60:
-                    print("\n==============================================")
-                    print(f"[entry.py][1-MIN] 1분 경과 → run_buy_generate_flow() 실행 at {now_str}")
-                    print("==============================================")
-                    run_buy_generate_flow()
-                    last_minute_exec = loop_start
-
-                # (3) 초단위 매수 체결 감지 → 즉시 매도
-                filled_events = detect_filled_buy_orders()
-                if filled_events:
-                    immediate_sell_for_filled_buys(setting_df, filled_events)
-
-                periodic_sell_status_check()
+                with phase("open_tick"):
+                    run_open_tick(state, loop_start, now_str)
 
                 # (4) 1초 대기
                 time.sleep(1)
 
-                try:
-                    cleanup_untracked_buy_orders()
-                except Exception as e:
-                    print(f"[cleanup][ERROR] 외부 주문 정리 실패: {e}")
+                run_cleanup()
 
             except Exception as e:
-                print(f"[entry.py][OPEN][EXCEPTION] 예외 발생: {e}")
-
-                if "MARKET_CLOSED" in str(e):
-                    print(f"⏸️ [entry.py][OPEN] 폐장 감지 → open_now=False 전환 ({e})")
-                    open_now = False
-
-                    # ⭐ 여기서 폐장 cleanup 실행 (단 1회)
-                    if not market_closed_cleanup_done:
-                        close_market_cleanup()
-                        market_closed_cleanup_done = True
-
-                else:
-                    print(f"[entry.py][OPEN] ⚠ 일반 예외 → 1초 대기 후 재실행")
+                if not handle_open_exception(state, e):
                     time.sleep(1)
 
+            finally:
+                _flush_state()
+
         # =====================================================
         # ② 장이 닫힌 상태(open_now = False) → 개장 여부 체크
         # =====================================================
         else:
-            print("[entry.py][LOOP][CLOSED] 장 닫힘 상태. 개장 여부 체크.")
-            try:
-                print("[entry.py][CLOSED] is_us_market_open() 호출")
-                if is_us_market_open(market="GGLL"):
-                    print("✅ [entry.py][CLOSED] 미국장 개장 감지 → open_now=True 전환")
-                    open_now = True
-                    # 개장 직후 다시 setting 갱신
-                    setting_df = load_setting_data()
-                    last_minute_exec = time.time()
-                    continue
-                else:
-                    print("[entry.py][CLOSED] 아직 미개장 → 60초 대기")
-                    time.sleep(60)
-
-            except Exception as e:
-                print(f"[entry.py][CLOSED][EXCEPTION] 개장 여부 확인 실패: {e}")
-                print("[entry.py][CLOSED] 60초 대기 후 재시도")
+            if not check_market_open(state):
                 time.sleep(60)
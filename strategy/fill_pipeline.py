@@ -0,0 +1,181 @@
+# strategy/fill_pipeline.py
+
+import os
+import time
+import threading
+from collections import deque
+from dotenv import load_dotenv
+
+from api import get_accounts
+from api.db_usstocks import invalidate_accounts
+from strategy.casino_strategy import generate_sell_orders
+from strategy.sell_entry import immediate_sell_for_filled_buys
+from manager.order_executor import execute_sell_orders
+from data.state_store import get_state_store
+from data.order_records import SellOrder, OrderTable
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+load_dotenv()
+
+# 체결 이벤트 전용 경로 사용 여부 (0이면 기존 immediate_sell_for_filled_buys만 사용)
+FILL_PIPELINE_ENABLED = os.getenv("FILL_PIPELINE_ENABLED", "1").strip() not in ("0", "false", "False")
+
+# 지연 통계에 쓰는 최근 이벤트 수
+LATENCY_WINDOW = 500
+
+
+class FillLatencyTracker:
+    """매수 체결 감지 → 익절 매도 주문 접수까지 지연(ms) 기록"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self._by_market = {}
+        self.handled = 0
+        self.fallbacks = 0
+
+    def record(self, market: str, latency_ms: float):
+        with self._lock:
+            self._samples.append(latency_ms)
+            self._by_market.setdefault(market, deque(maxlen=50)).append(latency_ms)
+            self.handled += 1
+
+    def record_fallback(self, count: int = 1):
+        with self._lock:
+            self.fallbacks += count
+
+    @staticmethod
+    def _summary(samples) -> dict:
+        values = sorted(samples)
+        if not values:
+            return {"count": 0}
+        return {
+            "count": len(values),
+            "p50_ms": round(values[len(values) // 2], 1),
+            "p95_ms": round(values[int(0.95 * (len(values) - 1))], 1),
+            "max_ms": round(values[-1], 1),
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "handled": self.handled,
+                "fallbacks": self.fallbacks,
+                "all": self._summary(self._samples),
+                "by_market": {m: self._summary(s) for m, s in self._by_market.items()},
+            }
+
+
+_tracker = FillLatencyTracker()
+
+
+def get_fill_latency_stats() -> dict:
+    return _tracker.stats()
+
+
+def _holding_for(market: str, accounts: dict):
+    """잔고 1건 → generate_sell_orders holdings 형식 (LONG, 수량 > 0 만)"""
+    pos = accounts.get(market)
+    if not pos or pos.get("side", "LONG") != "LONG":
+        return None
+
+    balance = float(pos.get("balance", 0) or 0)
+    if balance <= 0:
+        return None
+
+    return {
+        "balance": balance,
+        "locked": float(pos.get("locked", 0) or 0),
+        "avg_price": float(pos.get("avg_buy_price", 0) or 0),
+        "side": pos.get("side", "LONG"),
+        "liquidation_price": pos.get("liquidation_price"),
+        "leverage": pos.get("leverage", 1),
+    }
+
+
+def _place_take_profit(setting_df, market: str, holding: dict):
+    """한 종목 익절 매도 주문 생성/정정 → 실행 → sell_log 반영 (해당 종목 행만)"""
+    store = get_state_store()
+    orders = store.sell_orders()
+    market_orders = orders.by_market(market)
+
+    sub_setting = setting_df[setting_df["market"] == market]
+    market_df = OrderTable(SellOrder, market_orders).to_frame()
+
+    # 현재가(갭 상승 체크)는 generate_sell_orders 안에서 호가 캐시로 조회
+    new_df = generate_sell_orders(sub_setting, {market: holding}, market_df)
+    new_orders = execute_sell_orders(OrderTable.from_frame(SellOrder, new_df), {market: holding})
+
+    orders.remove(market_orders)
+    orders.extend(new_orders)
+    store.set_sell_orders(orders)
+
+
+def handle_buy_fills(setting_df, filled_events: list, markets: list = None):
+    """
+    매수 체결 이벤트 전용 경로
+    - 체결 종목만 대상으로 바로 익절 매도 주문 생성/정정 + 실행
+    - 잔고는 체결로 바뀌었으므로 1회만 새로 조회 (보유 종목 전체 현재가 / 매도 상태 재조회 없음)
+    - 현재가는 호가 캐시, setting은 메모리 값 사용
+    - 처리 못 한 종목(잔고 미반영, 주문 실패 등)은 기존 immediate_sell_for_filled_buys로 넘김
+    - 체결 감지 → 매도 주문 접수까지 지연을 기록
+    """
+    if not filled_events:
+        return
+
+    if not FILL_PIPELINE_ENABLED:
+        immediate_sell_for_filled_buys(setting_df, filled_events, markets=markets)
+        return
+
+    log.info("[fill_pipeline.py] ▶ 매수 체결 → 익절 매도 즉시 처리 시작")
+
+    # 종목별 가장 먼저 감지된 이벤트 기준으로 지연 측정
+    first_detected = {}
+    for event in filled_events:
+        if markets is not None and event.market not in markets:
+            continue
+        prev = first_detected.get(event.market)
+        if prev is None or event.detected_at < prev:
+            first_detected[event.market] = event.detected_at
+
+    if not first_detected:
+        return
+
+    setting_markets = set(setting_df["market"])
+
+    invalidate_accounts()
+    accounts = get_accounts()
+
+    fallback = []
+    for market, detected_at in first_detected.items():
+        if market not in setting_markets:
+            log.error(f"❌ [fill_pipeline.py] setting.csv에 {market} 설정 없음 → 매도 불가")
+            continue
+
+        holding = _holding_for(market, accounts)
+        if holding is None:
+            log.warning(f"⚠️ [fill_pipeline.py] {market} 잔고 미반영 → 기존 즉시 매도 플로우로 처리")
+            fallback.append(market)
+            continue
+
+        try:
+            _place_take_profit(setting_df, market, holding)
+        except Exception as e:
+            if "MARKET_CLOSED" in str(e):
+                raise
+            log.warning(f"⚠️ [fill_pipeline.py] {market} 익절 주문 실패 → 기존 즉시 매도 플로우로 처리: {e}")
+            fallback.append(market)
+            continue
+
+        latency_ms = (time.monotonic() - detected_at) * 1000 if detected_at else 0.0
+        _tracker.record(market, latency_ms)
+        log.info(f"⏱️ [fill_pipeline.py] {market} 체결 감지 → 매도 주문 {latency_ms:.1f}ms")
+
+    if fallback:
+        _tracker.record_fallback(len(fallback))
+        events = [e for e in filled_events if e.market in fallback]
+        immediate_sell_for_filled_buys(setting_df, events, markets=fallback)
+
+    log.info("[fill_pipeline.py] ▶ 매수 체결 → 익절 매도 즉시 처리 종료")
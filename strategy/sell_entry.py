@@ -1,14 +1,19 @@
 # strategy/sell_entry.py
 
-import os
-from datetime import time
-
 import pandas as pd
 
 from api import get_accounts, get_current_ask_price, get_order_results_by_uuids
 from strategy.casino_strategy import generate_sell_orders
 from manager.order_executor import execute_sell_orders
 from api import cancel_orders_by_uuids
+from api.db_usstocks import get_account_snapshot
+from data.state_store import get_state_store
+from data.order_records import SellOrder, OrderTable, PENDING_STATES
+from manager.poll_scheduler import select_for_poll, forget_polled, request_refresh
+from utils.metrics import count_fill
+from utils.logger import get_logger
+
+log = get_logger(__name__)
 
 
 SELL_LOG_COLUMNS = [
@@ -21,40 +26,8 @@ SELL_LOG_COLUMNS = [
 ]
 
 
-# ------------------------------------------------------------
-# 공통 유틸
-# ------------------------------------------------------------
-
-def atomic_save(df: pd.DataFrame, path: str, retry: int = 5, delay: float = 0.5):
-    """
-    CSV 저장의 atomic 버전.
-    - 파일 잠김(WinError 5)이면 delay 후 재시도
-    - retry 횟수 초과 시 예외 발생
-    """
-    tmp = path + ".tmp"
-    df.to_csv(tmp, index=False)
-
-    for i in range(retry):
-        try:
-            os.replace(tmp, path)
-            return  # 성공 시 종료
-        except PermissionError as e:
-            # Windows 파일 점유 문제 → 재시도
-            if i < retry - 1:
-                print(f"⚠️ [atomic_save] 파일 잠김 → 재시도 {i+1}/{retry} (대기 {delay}s) → {path}")
-                time.sleep(delay)
-                continue
-            else:
-                print(f"❌ [atomic_save] 재시도 실패 → 저장 불가")
-                raise e
-        except Exception as e:
-            # 다른 예외는 그대로
-            raise e
-
-
-
 def load_setting_data():
-    print("[sell_entry.py] setting.csv 불러오는 중")
+    log.debug("[sell_entry.py] setting.csv 불러오는 중")
     return pd.read_csv("setting.csv")
 
 
@@ -63,45 +36,39 @@ def load_setting_data():
 # ------------------------------------------------------------
 
 def clean_buy_and_sell_logs_after_full_sell(market: str):
-    print(f"[DEBUG][CLEAN_FULL_SELL] 실행됨 → market={market}")
+    log.debug(f"[DEBUG][CLEAN_FULL_SELL] 실행됨 → market={market}")
 
-    # 1) buy_log에서 해당 코인에 걸린 미체결 uuid → cancel 요청 후 삭제
-    if os.path.exists("buy_log.csv"):
-        buy_df = pd.read_csv("buy_log.csv", dtype={"buy_uuid": str})
-        print(f"[DEBUG][CLEAN_FULL_SELL] buy_log 로드 결과 rows={len(buy_df)}")
+    store = get_state_store()
 
-        market_logs = buy_df[buy_df["market"] == market].copy()
-        other_logs = buy_df[buy_df["market"] != market].copy()
+    # 1) buy_log에서 해당 코인에 걸린 미체결 uuid → cancel 요청 후 삭제
+    buy_orders = store.buy_orders()
+    if len(buy_orders):
+        log.debug(f"[DEBUG][CLEAN_FULL_SELL] buy_log 로드 결과 rows={len(buy_orders)}")
 
-        uuids = (
-            market_logs["buy_uuid"]
-            .fillna("")
-            .astype(str)
-            .str.strip()
-        )
-        uuids = [u for u in uuids.tolist() if u]
+        market_orders = buy_orders.by_market(market)
+        uuids = [o.buy_uuid for o in market_orders if o.buy_uuid]
 
         if uuids:
-            print(f"🗑️ [{market}] 미체결 buy 주문 취소 요청 → {uuids}")
+            log.info(f"🗑️ [{market}] 미체결 buy 주문 취소 요청 → {uuids}")
             try:
                 cancel_orders_by_uuids(uuids, market)
             except Exception as e:
-                print(f"⚠️ [{market}] buy uuid 취소 실패 → {e}")
+                log.warning(f"⚠️ [{market}] buy uuid 취소 실패 → {e}")
 
         # 해당 market의 buy_log row 삭제
-        atomic_save(other_logs, "buy_log.csv")
-        print(f"[DEBUG][CLEAN_FULL_SELL] buy_log에서 [{market}] 관련 로그 삭제 완료")
+        if market_orders:
+            buy_orders.remove(market_orders)
+            store.set_buy_orders(buy_orders)
+        log.debug(f"[DEBUG][CLEAN_FULL_SELL] buy_log에서 [{market}] 관련 로그 삭제 완료")
 
     # 2) sell_log에서 해당 market 삭제
-    if os.path.exists("sell_log.csv"):
-        sell_df = pd.read_csv("sell_log.csv", dtype={"sell_uuid": str})
-        before_rows = len(sell_df)
-        sell_df = sell_df[sell_df["market"] != market]
-        after_rows = len(sell_df)
-        atomic_save(sell_df, "sell_log.csv")
-        print(f"[DEBUG][CLEAN_FULL_SELL] sell_log에서 [{market}] 관련 로그 {before_rows - after_rows}건 삭제")
+    sell_orders = store.sell_orders()
+    removed = sell_orders.remove_market(market)
+    if removed:
+        store.set_sell_orders(sell_orders)
+    log.debug(f"[DEBUG][CLEAN_FULL_SELL] sell_log에서 [{market}] 관련 로그 {len(removed)}건 삭제")
 
-    print(f"🧽 [{market}] 전량 매도 cleanup 완료")
+    log.info(f"🧽 [{market}] 전량 매도 cleanup 완료")
 
 
 # ------------------------------------------------------------
@@ -113,14 +80,19 @@ def get_current_holdings_for_sell(setting_df):
     매도 전용 보유 포지션 조회.
     - side == LONG 인 것만 대상으로 함.
     """
-    print("[sell_entry.py] 현재 보유 자산 조회 중")
+    log.debug("[sell_entry.py] 현재 보유 자산 조회 중")
     accounts = get_accounts()
     holdings = {}
+    setting_markets = set(setting_df["market"])
 
     for symbol, pos in accounts.items():
         if pos.get("side", "LONG") != "LONG":
             continue
 
+        # setting 대상이 아닌 종목 (워커 모드에서는 다른 워커 담당 종목)
+        if symbol not in setting_markets:
+            continue
+
         try:
             balance = float(pos.get("balance", 0) or 0)
             if balance <= 0:
@@ -136,7 +108,7 @@ def get_current_holdings_for_sell(setting_df):
                 market_code=market_code
             )
         except Exception as e:
-            print(f"❌ [sell_entry.py] {symbol} 현재가 조회 실패: {e}")
+            log.error(f"❌ [sell_entry.py] {symbol} 현재가 조회 실패: {e}")
             continue
 
         holdings[symbol] = {
@@ -149,7 +121,7 @@ def get_current_holdings_for_sell(setting_df):
             "leverage": pos.get("leverage", 1),
         }
 
-    print(f"[sell_entry.py] 현재 LONG 포지션 수: {len(holdings)}개")
+    log.debug("[sell_entry.py] 현재 LONG 포지션 수: %d개", len(holdings))
     return holdings
 
 
@@ -157,66 +129,76 @@ def get_current_holdings_for_sell(setting_df):
 # sell_log 상태 업데이트 + 전량 매도 clean
 # ------------------------------------------------------------
 
-def _load_sell_log() -> pd.DataFrame:
-    if not os.path.exists("sell_log.csv"):
-        return pd.DataFrame(columns=SELL_LOG_COLUMNS)
-    df = pd.read_csv("sell_log.csv", dtype={"sell_uuid": str})
-    for col in SELL_LOG_COLUMNS:
-        if col not in df.columns:
-            df[col] = "" if col in ["market", "sell_uuid", "filled"] else 0
-    return df
+def _load_sell_orders() -> OrderTable:
+    """메모리 StateStore의 sell_log → SellOrder 테이블 (CSV 재로드 없음)"""
+    return get_state_store().sell_orders()
 
 
-def update_sell_log_status_by_uuid(sell_log_df: pd.DataFrame) -> pd.DataFrame:
+def update_sell_log_status_by_uuid(orders: OrderTable, markets: list = None) -> OrderTable:
     """
     기존 매도 주문의 상태를 정리 (done/cancel 제거 등) +
     포지션이 0이 된 종목에 대해서는 전량 매도 clean까지 수행.
+    - markets: 지정하면 해당 종목만 처리 (종목별 워커 모드)
     """
-    print("[sell_entry.py] sell_log.csv 주문 상태 확인 및 정리 중...")
+    log.debug("[sell_entry.py] sell_log.csv 주문 상태 확인 및 정리 중...")
 
-    if sell_log_df is None or sell_log_df.empty:
-        print("[sell_entry.py] 매도 로그 없음")
-        return sell_log_df
+    if orders is None or not len(orders):
+        log.debug("[sell_entry.py] 매도 로그 없음")
+        return orders
 
-    # 문자열 정규화
-    sell_log_df["filled"] = sell_log_df["filled"].fillna("").astype(str).str.strip()
-    sell_log_df["sell_uuid_str"] = (
-        sell_log_df["sell_uuid"].fillna("").astype(str).str.strip()
-    )
+    # 잔고는 틱 스냅샷 공유 (이번 틱에 이미 받았으면 재조회 없음)
+    accounts = get_accounts()
 
-    # pending 주문만 상태 조회
-    pending_df = sell_log_df[
-        sell_log_df["sell_uuid_str"].ne("")
-        & sell_log_df["filled"].isin(["", "wait", "update"])
-    ].copy()
+    # 잔고 변경 이벤트(수량 변경/전량 정리)가 난 종목은 스케줄과 무관하게 바로 조회
+    events = get_account_snapshot().events("sell_status", markets)
+    event_markets = {e.market for e in events}
+    flattened = [e.market for e in events if e.kind == "flattened"]
+    if event_markets:
+        log.info(f"[sell_entry.py] 잔고 변경 이벤트 → 즉시 상태 조회: {sorted(event_markets)}")
 
-    if pending_df.empty:
-        print("[sell_entry.py] 확인할 매도 주문이 없습니다.")
+    # pending 주문만 상태 조회
+    pending = orders.pending()
+    if markets is not None:
+        pending = [o for o in pending if o.market in markets]
+
+    # 호가와의 거리 / 변동성 기준으로 이번 틱에 조회할 주문만
+    urgent = [o for o in pending if o.market in event_markets]
+    if urgent:
+        request_refresh()
+    pending = urgent + select_for_poll([o for o in pending if o.market not in event_markets], "sell")
+    polled = {id(o) for o in pending}
+
+    if not pending:
+        log.debug("[sell_entry.py] 확인할 매도 주문이 없습니다.")
         # 그래도 포지션 0인 종목이 있으면 clean 해주기 위해 아래 포지션 체크는 수행
-        markets_to_check = sell_log_df["market"].unique()
+        markets_to_check = [
+            m for m in orders.markets() if markets is None or m in markets
+        ]
     else:
-        markets_to_check = pending_df["market"].unique()
+        markets_to_check = list(dict.fromkeys(o.market for o in pending))
+
+    # 전량 정리된 종목은 조회 대상이 아니어도 clean 확인
+    for market in flattened:
+        if market in orders.markets() and market not in markets_to_check:
+            markets_to_check.append(market)
 
-    indices_to_drop = []
+    to_drop = []
     changed = False
 
     # 1) 상태 조회 및 done/cancel 정리
     for market in markets_to_check:
-        market_pending = pending_df[pending_df["market"] == market].copy()
-        uuid_list = market_pending["sell_uuid_str"].tolist()
+        market_orders = orders.by_market(market)
+        uuid_list = [o.sell_uuid for o in market_orders if id(o) in polled]
 
         status_map = {}
         if uuid_list:
             try:
                 status_map = get_order_results_by_uuids(uuid_list, market)
             except Exception as e:
-                print(f"❌ [sell_entry.py] 주문 상태 조회 중 오류 발생 ({market}): {e}")
+                log.error(f"❌ [sell_entry.py] 주문 상태 조회 중 오류 발생 ({market}): {e}")
 
-        for idx, row in sell_log_df.iterrows():
-            if row["market"] != market:
-                continue
-
-            uuid = row.get("sell_uuid_str", "")
+        for order in market_orders:
+            uuid = order.sell_uuid
             if not uuid:
                 continue
 
@@ -227,28 +209,31 @@ def update_sell_log_status_by_uuid(sell_log_df: pd.DataFrame) -> pd.DataFrame:
 
             # 체결 완료
             if state == "done":
-                print(f"[DEBUG][SELL_STATUS] {market} 주문 {uuid} → done 감지됨")
-                print(f"✅ [sell_entry.py] {market} 주문 체결 완료 → 로그에서 제거")
-                indices_to_drop.append(idx)
+                log.debug(f"[DEBUG][SELL_STATUS] {market} 주문 {uuid} → done 감지됨")
+                log.info(f"✅ [sell_entry.py] {market} 주문 체결 완료 → 로그에서 제거")
+                get_state_store().record_fill(
+                    "sell", market, uuid,
+                    price=order.target_sell_price, units=order.quantity,
+                )
+                count_fill("sell")
+                to_drop.append(order)
                 changed = True
 
             # 취소
             elif state == "cancel":
-                print(f"⚠️ [sell_entry.py] {market} 주문 {uuid} → cancel 감지됨 → 로그에서 제거")
-                indices_to_drop.append(idx)
+                log.warning(f"⚠️ [sell_entry.py] {market} 주문 {uuid} → cancel 감지됨 → 로그에서 제거")
+                to_drop.append(order)
                 changed = True
 
             # 그 외(wait 등)는 유지
 
-    if indices_to_drop:
-        sell_log_df.drop(index=indices_to_drop, inplace=True)
-        sell_log_df.reset_index(drop=True, inplace=True)
-        print(f"[sell_entry.py] 완료/취소된 주문 {len(indices_to_drop)}건 삭제 완료")
+    if to_drop:
+        forget_polled([o.sell_uuid for o in to_drop])
+        orders.remove(to_drop)
+        log.info(f"[sell_entry.py] 완료/취소된 주문 {len(to_drop)}건 삭제 완료")
 
-    # 보조 컬럼 제거 전, 파일 저장은 나중에 한 번만
+    # 파일 저장은 나중에 한 번만
     # 2) 포지션 0인 종목에 대해 전량 매도 clean 수행
-    accounts = get_accounts()
-
     for market in markets_to_check:
         pos_info = accounts.get(market, {})
         balance = float(pos_info.get("balance", 0) or 0)
@@ -256,77 +241,90 @@ def update_sell_log_status_by_uuid(sell_log_df: pd.DataFrame) -> pd.DataFrame:
         total_pos = balance + locked
 
         if total_pos <= 0.000001:
-            print(f"[DEBUG][SELL_STATUS] {market} 포지션=0 → 전량 매도 판단! clean_buy_and_sell_logs_after_full_sell 실행")
+            log.debug(f"[DEBUG][SELL_STATUS] {market} 포지션=0 → 전량 매도 판단! clean_buy_and_sell_logs_after_full_sell 실행")
             clean_buy_and_sell_logs_after_full_sell(market)
 
-    if "sell_uuid_str" in sell_log_df.columns:
-        sell_log_df = sell_log_df.drop(columns=["sell_uuid_str"])
-
     if changed:
-        atomic_save(sell_log_df, "sell_log.csv")
-        print("[sell_entry.py] 상태 변경 내용 저장 완료")
+        get_state_store().set_sell_orders(orders)
+        log.info("[sell_entry.py] 상태 변경 내용 반영 완료")
 
-    return sell_log_df
+    return orders
 
 
 # ------------------------------------------------------------
 # 주기적 매도 상태 체크
 # ------------------------------------------------------------
 
-def periodic_sell_status_check():
-    print("\n[sell_entry.py] ▶ 주기적 매도 주문 상태 체크 시작")
+def _execute_for_market(sub_setting, market, pos, market_orders) -> list:
+    """
+    한 종목의 매도 주문 생성(generate_sell_orders) + 실행 → 그 종목 레코드 목록
+    generate_sell_orders에는 해당 종목 레코드만 넘김 (다른 종목 행이 실행/중복되지 않게)
+    """
+    market_df = OrderTable(SellOrder, market_orders).to_frame()
+    new_sell_df = generate_sell_orders(sub_setting, {market: pos}, market_df)
+    new_orders = execute_sell_orders(OrderTable.from_frame(SellOrder, new_sell_df), {market: pos})
+    return list(new_orders)
+
+
+def periodic_sell_status_check(markets: list = None):
+    """
+    매도 주문 상태 정리 + 보유 대비 매도 주문 누락/수량 변경 보정
+    - markets: 지정하면 해당 종목만 처리 (종목별 워커 모드)
+    """
+    log.debug("[sell_entry.py] ▶ 주기적 매도 주문 상태 체크 시작")
+
+    store = get_state_store()
 
     try:
-        sell_log_df = _load_sell_log()
+        orders = _load_sell_orders()
     except Exception as e:
-        print(f"[sell_entry.py] sell_log.csv 읽기 실패: {e}")
+        log.warning(f"[sell_entry.py] sell_log.csv 읽기 실패: {e}")
         return
 
-    sell_log_df = update_sell_log_status_by_uuid(sell_log_df)
+    orders = update_sell_log_status_by_uuid(orders, markets)
 
     # ============================
     # 2) done 상태 매도 로그 삭제
     # ============================
-    sell_log_df = sell_log_df[
-        sell_log_df["filled"].astype(str).str.strip() != "done"
-        ].reset_index(drop=True)
-    atomic_save(sell_log_df, "sell_log.csv")
+    done = [
+        o for o in orders
+        if o.filled == "done" and (markets is None or o.market in markets)
+    ]
+    if done:
+        orders.remove(done)
+        store.set_sell_orders(orders)
 
     setting_df = load_setting_data()
+    if markets is not None:
+        setting_df = setting_df[setting_df["market"].isin(markets)]
     holdings = get_current_holdings_for_sell(setting_df)
 
+    # 종목별 보정은 테이블에만 반영하고, 저장은 루프가 끝난 뒤 한 번만
+    changed = False
+
     # 1) 보유 중인데 매도 주문이 없는 경우 → 신규 생성
     for market, pos in holdings.items():
-        existing = sell_log_df[sell_log_df["market"] == market]
+        existing = orders.by_market(market)
 
-        has_pending = (
-            not existing.empty
-            and existing["filled"].fillna("").astype(str).str.strip().isin(
-                ["", "wait", "update"]
-            ).any()
-        )
+        has_pending = any(o.filled in PENDING_STATES for o in existing)
 
         if has_pending:
             continue
 
-        print(f"⚠️ [sell_entry] {market} 보유 중인데 기존 매도 없음 → 신규 생성!")
+        log.warning(f"⚠️ [sell_entry] {market} 보유 중인데 기존 매도 없음 → 신규 생성!")
 
         sub_setting = setting_df[setting_df["market"] == market]
         if sub_setting.empty:
-            print(f"❌ [sell_entry] setting.csv에 {market} 설정 없음 → 매도 불가")
+            log.error(f"❌ [sell_entry] setting.csv에 {market} 설정 없음 → 매도 불가")
             continue
 
-        new_sell_df = generate_sell_orders(sub_setting, {market: pos}, sell_log_df)
-
-        new_sell_df = execute_sell_orders(new_sell_df, {market: pos})
+        new_orders = _execute_for_market(sub_setting, market, pos, existing)
 
-        sell_log_df = pd.concat(
-            [sell_log_df[sell_log_df["market"] != market], new_sell_df],
-            ignore_index=True,
-        )
+        orders.remove(existing)
+        orders.extend(new_orders)
+        changed = True
 
-        atomic_save(sell_log_df, "sell_log.csv")
-        print(f"✅ [sell_entry] {market} 신규 매도 주문 생성 완료")
+        log.info(f"✅ [sell_entry] {market} 신규 매도 주문 생성 완료")
 
     # 2) ⭐ 보유 수량 변경 감지 → 기존 매도 주문 취소 후 새로 생성
     for market, pos in holdings.items():
@@ -334,39 +332,39 @@ def periodic_sell_status_check():
         locked = round(float(pos.get("locked", 0) or 0), 8)
         total_qty = balance + locked
 
-        market_log = sell_log_df[sell_log_df["market"] == market]
+        market_orders = orders.by_market(market)
 
-        if not market_log.empty:
-            existing_qty = round(float(market_log.iloc[0]["quantity"]), 8)
+        if market_orders:
+            existing_qty = round(float(market_orders[0].quantity), 8)
 
             if abs(existing_qty - total_qty) > 1e-8:
-                print(f"⚠️ [sell_entry] {market} 보유수량 변경 감지! "
-                      f"기존={existing_qty}, 현재={total_qty}")
+                log.warning(f"⚠️ [sell_entry] {market} 보유수량 변경 감지! "
+                            f"기존={existing_qty}, 현재={total_qty}")
 
-                uuids = market_log["sell_uuid"].dropna().tolist()
+                uuids = [o.sell_uuid for o in market_orders if o.sell_uuid]
                 if uuids:
-                    print(f"🗑️ [sell_entry] 기존 매도 주문 취소 요청 → {uuids}")
+                    log.info(f"🗑️ [sell_entry] 기존 매도 주문 취소 요청 → {uuids}")
                     try:
                         cancel_orders_by_uuids(uuids, market)
                     except Exception as e:
-                        print(f"⚠️ {market} 기존 매도 취소 실패: {e}")
+                        log.warning(f"⚠️ {market} 기존 매도 취소 실패: {e}")
 
-                sell_log_df = sell_log_df[sell_log_df["market"] != market]
+                orders.remove(market_orders)
+                changed = True
 
                 sub_setting = setting_df[setting_df["market"] == market]
                 if sub_setting.empty:
-                    print(f"❌ [sell_entry] 설정 없음 → 매도 주문 생성 스킵")
+                    log.error(f"❌ [sell_entry] 설정 없음 → 매도 주문 생성 스킵")
                     continue
 
-                new_sell_df = generate_sell_orders(sub_setting, {market: pos}, sell_log_df)
-                new_sell_df = execute_sell_orders(new_sell_df, {market: pos})
+                orders.extend(_execute_for_market(sub_setting, market, pos, []))
 
-                sell_log_df = pd.concat([sell_log_df, new_sell_df], ignore_index=True)
-                atomic_save(sell_log_df, "sell_log.csv")
+                log.info(f"✅ [sell_entry] {market} 보유수량 변경 반영 → 신규 매도 주문 생성 완료")
 
-                print(f"✅ [sell_entry] {market} 보유수량 변경 반영 → 신규 매도 주문 생성 완료")
+    if changed:
+        store.set_sell_orders(orders)
 
-    print("[sell_entry.py] ▶ 주기적 매도 주문 상태 체크 종료")
+    log.debug("[sell_entry.py] ▶ 주기적 매도 주문 상태 체크 종료")
 
 
 
@@ -374,45 +372,57 @@ def periodic_sell_status_check():
 # 매수 체결 이벤트 기반 즉시 매도
 # ------------------------------------------------------------
 
-def immediate_sell_for_filled_buys(setting_df: pd.DataFrame, filled_events: list):
+def immediate_sell_for_filled_buys(setting_df: pd.DataFrame, filled_events: list,
+                                   markets: list = None):
     """
     매수 체결 이벤트가 발생했을 때 '바로' 호출되는 매도 로직.
     - filled_events: detect_filled_buy_orders() 결과 리스트
     - 현재 보유 기준으로 전량 매도 주문 생성/정정 후 바로 실행
+    - markets: 지정하면 해당 종목만 처리 (종목별 워커 모드)
     """
     if not filled_events:
         return
 
-    print("\n[sell_entry.py] ▶ 매수 체결 이벤트 기반 즉시 매도 플로우 시작")
+    log.info("[sell_entry.py] ▶ 매수 체결 이벤트 기반 즉시 매도 플로우 시작")
+
+    if markets is not None:
+        setting_df = setting_df[setting_df["market"].isin(markets)]
 
     holdings = get_current_holdings_for_sell(setting_df)
     if not holdings:
-        print("[sell_entry.py] 보유 포지션 없음 → 매도 주문 스킵")
+        log.info("[sell_entry.py] 보유 포지션 없음 → 매도 주문 스킵")
         return
 
     try:
-        sell_log_df = _load_sell_log()
+        orders = _load_sell_orders()
     except Exception:
-        sell_log_df = pd.DataFrame(columns=SELL_LOG_COLUMNS)
+        orders = OrderTable(SellOrder)
 
     # 기존 매도 주문 상태 정리
-    sell_log_df = update_sell_log_status_by_uuid(sell_log_df)
+    orders = update_sell_log_status_by_uuid(orders, markets)
 
-    # generate_sell_orders() 로 새 타겟 매도 주문 생성/정정
-    updated_sell_log_df = generate_sell_orders(setting_df, holdings, sell_log_df)
+    # generate_sell_orders() 로 새 타겟 매도 주문 생성/정정 (전략 계산 경계에서만 DataFrame)
+    updated_sell_log_df = generate_sell_orders(setting_df, holdings, orders.to_frame())
+    updated = OrderTable.from_frame(SellOrder, updated_sell_log_df)
 
-    # 실제 매도 주문 실행
+    # 실제 매도 주문 실행 (다른 워커 담당 종목 행은 실행하지 않음)
     try:
-        updated_sell_log_df = execute_sell_orders(updated_sell_log_df, holdings)
-        atomic_save(updated_sell_log_df, "sell_log.csv")
-        print("[sell_entry.py] ✅ 매도 주문 실행 및 sell_log.csv 저장 완료")
+        if markets is None:
+            updated = execute_sell_orders(updated, holdings)
+        else:
+            others = [o for o in updated if o.market not in markets]
+            updated.remove(others)
+            updated = execute_sell_orders(updated, holdings)
+            updated.extend(others)
+        get_state_store().set_sell_orders(updated)
+        log.info("[sell_entry.py] ✅ 매도 주문 실행 및 sell_log 반영 완료")
     except Exception as e:
         msg = str(e)
         if "MARKET_CLOSED" in msg:
-            print("⛔ [sell_entry] MARKET_CLOSED 감지 → entry.py로 전파")
+            log.warning("⛔ [sell_entry] MARKET_CLOSED 감지 → entry.py로 전파")
             raise
-        print(f"🚨 [sell_entry.py] 매도 주문 실행 실패: {e}")
+        log.error(f"🚨 [sell_entry.py] 매도 주문 실행 실패: {e}")
         import sys
         sys.exit(1)
 
-    print("[sell_entry.py] ▶ 매수 체결 이벤트 기반 즉시 매도 플로우 종료")
+    log.info("[sell_entry.py] ▶ 매수 체결 이벤트 기반 즉시 매도 플로우 종료")
@@ -0,0 +1,281 @@
+# strategy/threaded_entry.py
+
+import os
+import sys
+import time
+import threading
+from collections import deque
+from dotenv import load_dotenv
+
+from api.db_usstocks import get_gateway_stats
+from strategy.buy_entry import (
+    run_buy_generate_flow,
+    detect_filled_buy_orders,
+    process_sold_out_markets_for_initial,
+)
+from strategy.sell_entry import periodic_sell_status_check
+from strategy.fill_pipeline import handle_buy_fills
+from strategy.entry import EntryState, check_market_open, _flush_state
+from manager.market_close import close_market_cleanup
+from manager.order_cleanup import cleanup_untracked_buy_orders
+from data.state_store import get_state_store
+from utils.instrumentation import phase
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+load_dotenv()
+
+# 종목 워커 1바퀴 목표 주기(초)
+WORKER_TICK_SEC = float(os.getenv("WORKER_TICK_SEC", "1.0"))
+
+# 종목별 루프 지연 리포트 주기(초)
+WORKER_REPORT_SEC = float(os.getenv("WORKER_REPORT_SEC", "30"))
+
+# 지연 통계에 쓰는 최근 틱 수
+LATENCY_WINDOW = 200
+
+
+class SymbolWorker(threading.Thread):
+    """
+    종목 1개 전담 워커
+    - initial 재진입 → 1분 매수 생성 → 체결 감지/즉시 매도 → 매도 상태 체크 → 외부 주문 정리
+    - 모든 상태 변경은 market_scope 안에서 → 자기 종목 행만 저장소에 반영
+    - 다른 종목이 느리거나 예외가 나도 이 종목 루프는 계속 돈다
+    """
+
+    def __init__(self, market: str, engine):
+        super().__init__(name=f"worker-{market}", daemon=True)
+        self.market = market
+        self.engine = engine
+
+        self.last_minute_exec = time.time()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.ticks = 0
+        self.errors = 0
+        self.last_error = None
+
+    def run_tick(self, loop_start: float):
+        market = self.market
+        markets = [market]
+        setting_df = self.engine.setting_for(market)
+
+        # (1) 전량 매도 후 initial 재진입
+        with phase("process_sold_out_markets_for_initial"):
+            process_sold_out_markets_for_initial(setting_df)
+
+        # (2) 1분 단위 매수 생성
+        if loop_start - self.last_minute_exec >= 60:
+            log.info(f"[threaded_entry][{market}] 1분 경과 → run_buy_generate_flow()")
+            with phase("run_buy_generate_flow"):
+                run_buy_generate_flow(markets=markets)
+            self.last_minute_exec = loop_start
+
+        # (3) 매수 체결 감지 → 즉시 매도
+        with phase("detect_filled_buy_orders"):
+            filled_events = detect_filled_buy_orders(markets=markets)
+        if filled_events:
+            with phase("handle_buy_fills"):
+                handle_buy_fills(setting_df, filled_events, markets=markets)
+
+        with phase("periodic_sell_status_check"):
+            periodic_sell_status_check(markets=markets)
+
+        # (4) 외부 주문 정리
+        try:
+            with phase("cleanup_untracked_buy_orders"):
+                cleanup_untracked_buy_orders(markets=markets)
+        except Exception as e:
+            log.error(f"[cleanup][ERROR] {market} 외부 주문 정리 실패: {e}")
+
+    def run(self):
+        engine = self.engine
+        store = get_state_store()
+
+        while not engine.stop_event.is_set():
+            if not engine.open_event.wait(timeout=1.0):
+                continue
+
+            loop_start = time.time()
+            backoff = 0.0
+            engine.enter_tick()
+            try:
+                with store.market_scope([self.market]), phase("worker_tick"):
+                    self.run_tick(loop_start)
+
+            except SystemExit as e:
+                # 주문 실행 실패 시 기존 동기 루프처럼 프로그램 종료
+                engine.fatal(self.market, e)
+                return
+
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+
+                if "MARKET_CLOSED" in str(e):
+                    engine.report_market_closed(self.market, e)
+                else:
+                    log.warning(f"[threaded_entry][{self.market}][EXCEPTION] {e} → 1초 대기 후 재실행")
+                    backoff = 1.0
+
+            finally:
+                engine.exit_tick()
+
+            latency = time.time() - loop_start
+            self.latencies.append(latency)
+            self.ticks += 1
+
+            engine.stop_event.wait(max(backoff, engine.tick_sec - latency))
+
+    def latency_stats(self) -> dict:
+        values = sorted(self.latencies)
+        if not values:
+            return {"ticks": self.ticks, "errors": self.errors}
+        return {
+            "ticks": self.ticks,
+            "errors": self.errors,
+            "last_ms": round(self.latencies[-1] * 1000, 1),
+            "avg_ms": round(sum(values) / len(values) * 1000, 1),
+            "p95_ms": round(values[int(0.95 * (len(values) - 1))] * 1000, 1),
+            "max_ms": round(values[-1] * 1000, 1),
+        }
+
+
+class ThreadedEntry:
+    """
+    종목별 워커 스레드 실행 엔진 (ENTRY_MODE=threads)
+    - 메인 스레드: 개장/폐장 판단, 틱마다 저장소 flush, 종목별 지연 리포트
+    - 워커 스레드: 종목 1개씩 매수/체결/매도 파이프라인
+    - HTTP 세션 / rate limiter / 토큰은 api.gateway.BrokerGateway 하나를 공유
+    """
+
+    def __init__(self, tick_sec: float = WORKER_TICK_SEC, report_sec: float = WORKER_REPORT_SEC):
+        self.tick_sec = tick_sec
+        self.report_sec = report_sec
+
+        self.state = EntryState()
+        self.workers = {}
+
+        self.open_event = threading.Event()
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._active = 0
+        self._closed_reason = None
+        self._fatal = None
+
+    # ------------------------------------------
+    # 워커 관리
+    # ------------------------------------------
+    def setting_for(self, market: str):
+        setting_df = self.state.setting_df
+        return setting_df[setting_df["market"] == market]
+
+    def ensure_workers(self):
+        """setting.csv 종목마다 워커 1개 (개장 시 setting이 바뀌었으면 신규 종목 워커 추가)"""
+        for market in self.state.setting_df["market"].unique():
+            if market not in self.workers:
+                worker = SymbolWorker(market, self)
+                self.workers[market] = worker
+                worker.start()
+                log.info(f"[threaded_entry] ▶ {market} 워커 시작")
+
+    def enter_tick(self):
+        with self._lock:
+            self._active += 1
+
+    def exit_tick(self):
+        with self._lock:
+            self._active -= 1
+            if self._active == 0:
+                self._idle.notify_all()
+
+    def wait_idle(self, timeout: float = 30.0) -> bool:
+        """진행 중인 워커 틱이 모두 끝날 때까지 대기 (폐장 cleanup 전)"""
+        with self._lock:
+            return self._idle.wait_for(lambda: self._active == 0, timeout=timeout)
+
+    def report_market_closed(self, market: str, e: Exception):
+        with self._lock:
+            if self._closed_reason is None:
+                log.info(f"⏸️ [threaded_entry][{market}] 폐장 감지 → 전체 워커 일시정지 ({e})")
+                self._closed_reason = str(e)
+        self.open_event.clear()
+
+    def fatal(self, market: str, e: BaseException):
+        log.error(f"🚨 [threaded_entry][{market}] 치명적 오류 → 전체 종료: {e}")
+        with self._lock:
+            self._fatal = e
+        self.stop_event.set()
+        self.open_event.set()
+
+    # ------------------------------------------
+    # 리포트
+    # ------------------------------------------
+    def latency_report(self) -> dict:
+        return {market: worker.latency_stats() for market, worker in self.workers.items()}
+
+    def print_report(self):
+        log.info("[threaded_entry] ===== 종목별 루프 지연 =====")
+        for market, stats in self.latency_report().items():
+            log.info(f"   - {market}: {stats}")
+        try:
+            gw = get_gateway_stats()
+            log.info(f"   - gateway: in_flight={gw['in_flight']}, peak={gw['peak_in_flight']}, "
+                     f"requests={gw['connection']['requests']}")
+        except Exception as e:
+            log.warning(f"   - gateway 통계 조회 실패: {e}")
+
+    # ------------------------------------------
+    # 메인 루프
+    # ------------------------------------------
+    def run(self):
+        log.info(f"[threaded_entry.py] ▶ 카지노 매매 시스템 시작 (종목별 워커, 틱 {self.tick_sec}s)")
+
+        state = self.state
+        self.ensure_workers()
+        self.open_event.set()
+        last_report = time.time()
+
+        try:
+            while not self.stop_event.is_set():
+                if state.open_now:
+                    self.stop_event.wait(self.tick_sec)
+                    _flush_state()
+
+                    if self._closed_reason is not None:
+                        state.open_now = False
+                        self.open_event.clear()
+
+                        # ⭐ 폐장 cleanup (단 1회) – 워커 틱이 모두 멈춘 뒤 실행
+                        if not state.market_closed_cleanup_done:
+                            if not self.wait_idle():
+                                log.warning("⚠️ [threaded_entry] 워커 틱 종료 대기 시간 초과 → cleanup 진행")
+                            close_market_cleanup()
+                            state.market_closed_cleanup_done = True
+                            _flush_state()
+
+                    if time.time() - last_report >= self.report_sec:
+                        self.print_report()
+                        last_report = time.time()
+
+                elif check_market_open(state):
+                    state.market_closed_cleanup_done = False
+                    with self._lock:
+                        self._closed_reason = None
+                    self.ensure_workers()
+                    self.open_event.set()
+
+                else:
+                    self.stop_event.wait(60)
+        finally:
+            self.stop_event.set()
+            self.open_event.set()
+            _flush_state()
+
+        if self._fatal is not None:
+            sys.exit(1)
+
+
+def run_casino_entry_threaded():
+    ThreadedEntry().run()
@@ -0,0 +1,70 @@
+# tests/test_account_snapshot.py
+
+import time
+
+from api.account_snapshot import AccountSnapshot
+
+
+def pos(qty, avg=10.0):
+    return {"balance": qty, "avg_buy_price": avg, "side": "LONG"}
+
+
+def test_snapshot_shares_fetch_and_emits_diffs():
+    print("[TEST] 잔고 스냅샷 테스트 시작")
+
+    state = {"holdings": {"TQQQ": pos(2.0), "SOXL": pos(5.0)}, "calls": 0}
+
+    def fetcher():
+        state["calls"] += 1
+        return {m: dict(p) for m, p in state["holdings"].items()}
+
+    snapshot = AccountSnapshot(fetcher, ttl=60.0)
+
+    first = snapshot.get()
+    first["TQQQ"]["balance"] = 999
+    assert snapshot.get()["TQQQ"]["balance"] == 2.0, "반환값 수정이 캐시에 새면 안 됨"
+    assert state["calls"] == 1, "TTL 안에서는 1회만 조회"
+
+    # 체결 후 강제 재조회 → 수량 변경 / 전량 정리 / 신규 이벤트
+    state["holdings"] = {"TQQQ": pos(3.0, 11.0), "SHNY": pos(1.0)}
+    snapshot.get(force=True)
+    assert state["calls"] == 2
+
+    events = {e.market: e for e in snapshot.events("sell")}
+    assert events["TQQQ"].kind == "changed" and events["TQQQ"].new_qty == 3.0
+    assert events["SOXL"].kind == "flattened" and events["SOXL"].old_qty == 5.0
+    assert events["SHNY"].kind == "new"
+    assert snapshot.events("sell") == [], "읽은 이벤트는 다시 안 나옴"
+
+    # 주문 후 invalidate → 다음 get에서 재조회, 변화 없으면 이벤트 없음
+    snapshot.invalidate()
+    snapshot.get()
+    assert state["calls"] == 3
+    assert snapshot.events("sell") == []
+
+    stats = snapshot.stats()
+    assert stats["fetches"] == 3 and stats["hits"] == 1 and stats["events"] == 3
+
+    print("[TEST] 잔고 스냅샷 테스트 통과 ✅")
+
+
+def test_event_cursors_are_per_consumer_and_market():
+    holdings = {"TQQQ": pos(1.0), "SOXL": pos(1.0)}
+    snapshot = AccountSnapshot(lambda: {m: dict(p) for m, p in holdings.items()}, ttl=0.0)
+    snapshot.get()
+
+    holdings.update({"TQQQ": pos(2.0), "SOXL": pos(0.5)})
+    snapshot.prime({m: dict(p) for m, p in holdings.items()})
+
+    # 종목별 워커: TQQQ 워커가 읽어도 SOXL 워커 이벤트는 남아 있음
+    assert [e.market for e in snapshot.events("sell", ["TQQQ"])] == ["TQQQ"]
+    assert [e.market for e in snapshot.events("sell", ["SOXL"])] == ["SOXL"]
+    assert snapshot.events("sell", ["TQQQ"]) == []
+
+    # 다른 소비자는 독립 커서
+    assert len(snapshot.events("log")) == 2
+
+    # ttl=0 → 매번 조회
+    time.sleep(0.001)
+    snapshot.get()
+    assert snapshot.stats()["hits"] == 0
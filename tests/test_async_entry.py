@@ -0,0 +1,181 @@
+# tests/test_async_entry.py
+
+import time
+import asyncio
+import threading
+
+import pandas as pd
+import pytest
+
+import api.async_client as async_client
+from api import db_usstocks as db
+from api.rate_limiter import RateLimiter
+from strategy.async_entry import prefetch_tick
+
+
+class FakeResponse:
+    def __init__(self, data: dict):
+        self.status_code = 200
+        self.headers = {}
+        self.data = data
+        self.content = b"{}"
+
+    def json(self):
+        return self.data
+
+    def raise_for_status(self):
+        pass
+
+
+def test_prefetch_runs_symbols_concurrently(monkeypatch):
+    print("[TEST] async 선조회 테스트 시작")
+
+    latency = 0.1
+    calls = []
+
+    def fake_post(path, body, cont_yn="N", cont_key=""):
+        calls.append(path)
+        time.sleep(latency)
+        if path == db.PATH_BALANCE:
+            return FakeResponse({"Out2": [
+                {"SymCode": "SYM0", "AstkExecBaseQty": "3", "AstkAvrPchsPrc": "10.5"},
+            ]})
+        symbol = body["In"]["InputIscd1"]
+        return FakeResponse({"Out": {"Askp1": "11.0", "Bidp1": "10.9", "sym": symbol}})
+
+    refreshed = []
+    monkeypatch.setattr(db, "_post", fake_post)
+    monkeypatch.setattr(db, "refresh_order_history", lambda force=False: refreshed.append(force))
+    monkeypatch.setattr(async_client, "aiohttp", None)
+
+    setting_df = pd.DataFrame([
+        {"market": f"SYM{i}", "market_code": "FN"} for i in range(8)
+    ])
+
+    async def run():
+        client = async_client.AsyncDbClient(max_concurrency=16)
+        try:
+            return await prefetch_tick(client, setting_df), client.stats()
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    result, stats = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+
+    # 호가 8 + 잔고 1 (+ 체결내역 갱신) → 순차라면 0.9초 이상
+    assert result == {"requests": 10, "failed": 0, "elapsed_ms": result["elapsed_ms"]}
+    assert len(calls) == 9 and refreshed == [False]
+    assert elapsed < latency * 4, f"동시 실행되지 않음 ({elapsed:.2f}s)"
+    assert stats["mode"] == "thread" and stats["requests"] == 9
+
+    # 선조회 결과가 동기 경로 캐시에 들어가 있어야 함 (추가 호출 없음)
+    calls.clear()
+    assert db.get_current_ask_price("SYM3", "FN") == 11.0
+    assert db.get_accounts()["SYM0"]["avg_buy_price"] == 10.5
+    assert calls == [], "같은 틱 안에서 재조회 발생"
+
+    # 주문이 나가면 잔고 스냅샷은 폐기
+    db.invalidate_accounts()
+    db.get_accounts()
+    assert calls == [db.PATH_BALANCE]
+
+    print("[TEST] async 선조회 테스트 통과 ✅")
+
+
+# ==========================================
+# aiohttp 경로 (선택 의존성 – 설치된 경우에만)
+# ==========================================
+def _mock_server(broker):
+    from api.mock_broker import start_mock_broker_server
+    server, _ = start_mock_broker_server(broker, port=0)
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_aiohttp_path_goes_through_gateway(monkeypatch):
+    pytest.importorskip("aiohttp")
+    import api.gateway as gateway
+    from api.mock_broker import MockBroker
+
+    print("[TEST] aiohttp 경로 게이트웨이 테스트 시작")
+
+    broker = MockBroker(prices={"TQQQ": 50.0, "SOXL": 20.0}, volatility=0.0, latency_ms=50, jitter_ms=0)
+    server, base_url = _mock_server(broker)
+
+    token_threads, recorded = [], []
+
+    def token_loader(force=False):
+        token_threads.append(threading.current_thread() is threading.main_thread())
+        return "mock-token"
+
+    monkeypatch.setattr(db._gateway, "_token_loader", token_loader)
+    monkeypatch.setattr(db._gateway, "_limiter", RateLimiter({f: (1000, 1000) for f in ("quote", "order", "inquiry")}))
+    monkeypatch.setattr(gateway, "record_call", lambda path, ms, ok=True: recorded.append((path, ok)))
+
+    collapsed0 = db.get_single_flight_stats()["collapsed"]
+
+    async def run():
+        client = async_client.AsyncDbClient(base_url=base_url)
+        try:
+            assert client.mode == "aiohttp"
+            # 같은 호가 3건 동시 → HTTP 1회 (single-flight), 다른 종목은 따로
+            books = await asyncio.gather(
+                *(client.fetch_orderbook("TQQQ", "FN") for _ in range(3)),
+                client.fetch_orderbook("SOXL", "FN"),
+            )
+            assert len({b["Out"]["Askp1"] for b in books[:3]}) == 1
+
+            # 폐장 코드(2611) → MARKET_CLOSED
+            broker.close_market()
+            body = {"In": {"AstkIsuNo": "TQQQ", "AstkBnsTpCode": "2", "AstkOrdprcPtnCode": "1",
+                           "AstkOrdQty": 1, "AstkOrdPrc": 50.0, "OrdTrdTpCode": "0", "OrgOrdNo": 0}}
+            with pytest.raises(RuntimeError, match="MARKET_CLOSED: 2611"):
+                await client.post(db.PATH_ORDER, body)
+            return client.stats()
+        finally:
+            await client.close()
+
+    try:
+        stats = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    assert broker.stats()["by_path"][db.PATH_ORDERBOOK] == 2, "동시 중복 호가 → 1회"
+    assert db.get_single_flight_stats()["collapsed"] - collapsed0 == 2
+    assert token_threads and not any(token_threads), "토큰 발급은 워커 스레드에서"
+    assert [p for p, _ in recorded] == [db.PATH_ORDERBOOK] * 2 + [db.PATH_ORDER], "게이트웨이 계측"
+    assert db.get_gateway_stats()["peak_in_flight"] >= 2 and db.get_gateway_stats()["in_flight"] == 0
+    assert stats["requests"] == 5 and stats["errors"] == 1
+
+    print("[TEST] aiohttp 경로 게이트웨이 테스트 통과 ✅")
+
+
+def test_aiohttp_path_retries_rate_limited(monkeypatch):
+    pytest.importorskip("aiohttp")
+    from api.mock_broker import MockBroker
+
+    broker = MockBroker(prices={"A": 10.0, "B": 20.0, "C": 30.0}, volatility=0.0, latency_ms=0, jitter_ms=0,
+                        rate_limit_per_sec=2)
+    server, base_url = _mock_server(broker)
+
+    monkeypatch.setattr(db._gateway, "_token_loader", lambda force=False: "mock-token")
+    monkeypatch.setattr(db._gateway, "_limiter", RateLimiter({f: (1000, 1000) for f in ("quote", "order", "inquiry")}))
+    monkeypatch.setattr(async_client, "ASYNC_RATE_LIMIT_BACKOFF_SEC", 0.6)
+
+    async def run():
+        client = async_client.AsyncDbClient(base_url=base_url)
+        try:
+            books = await asyncio.gather(*(client.fetch_orderbook(m, "FN") for m in ("A", "B", "C")))
+            return books, client.stats()
+        finally:
+            await client.close()
+
+    try:
+        books, stats = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    # 초당 2건 제한 → 1건은 IGW00201(429) → 대기 후 재시도 성공
+    assert broker.stats()["rejected_rate"] == 1
+    assert all(b["rsp_cd"] == "00000" for b in books)
+    assert stats["rate_limited"] == 1 and stats["errors"] == 0
@@ -0,0 +1,68 @@
+# tests/test_backtest_engine.py
+
+import numpy as np
+import pytest
+
+from manager.backtest_engine import LadderParams, backtest_ladder, backtest_with_strategy
+
+PARAMS = LadderParams("TQQQ", 100.0, 0.01, 1, 0.03, 2, 0.02)
+
+
+def make_path(n: int, seed: int, drift: float = 0.0, vol: float = 0.01, start: float = 50.0):
+    rng = np.random.default_rng(seed)
+    close = start * np.exp(np.cumsum(rng.normal(drift, vol, n)))
+    open_ = np.r_[start, close[:-1]] * np.exp(rng.normal(0, vol / 3, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n)))
+    return open_, high, low, close
+
+
+def crash_and_gap_path():
+    """하락 사다리 → 급락(현재가 기준 재설정) → 반등 → 갭 상승 익절"""
+    close = np.r_[np.linspace(50, 46, 40), [40.0, 39.5, 39.8], np.linspace(40, 47, 30), [55.0, 55.5]]
+    open_ = np.r_[50.0, close[:-1]]
+    open_[-2] = 54.5        # 갭 상승 출발
+    high = np.maximum(open_, close) * 1.002
+    low = np.minimum(open_, close) * 0.998
+    return open_, high, low, close
+
+
+def assert_same(a, b):
+    assert a.trades == b.trades, "체결 내역 동일"
+    for name in ("cash", "position", "avg_price", "cost_basis", "realized_pnl", "cum_fee", "equity"):
+        assert np.array_equal(getattr(a, name), getattr(b, name)), f"{name} 동일"
+
+
+@pytest.mark.parametrize("seed,drift", [(0, 0.0), (1, -0.002), (2, 0.002)])
+def test_engine_matches_strategy_functions(seed, drift):
+    print(f"[TEST] 백테스트 엔진 = 전략 함수 (seed={seed}) 시작")
+
+    path = make_path(200, seed, drift)
+    fast = backtest_ladder(*path, PARAMS)
+    slow = backtest_with_strategy(*path, PARAMS)
+
+    assert_same(fast, slow)
+    assert fast.summary()["buys"] > 0
+
+    print(f"[TEST] 백테스트 엔진 = 전략 함수 (seed={seed}) 통과 ✅")
+
+
+def test_crash_reset_gap_up_and_speed():
+    path = crash_and_gap_path()
+    fast = backtest_ladder(*path, PARAMS)
+    slow = backtest_with_strategy(*path, PARAMS)
+    assert_same(fast, slow)
+
+    sells = [t for t in fast.trades if t.side == "sell"]
+    assert sells and sells[-1].price == 54.5, "갭 상승 봉 시가에 익절"
+    flow_prices = [t.price for t in fast.trades if t.order_type == "small_flow" and 40 <= t.index <= 45]
+    assert any(p < 40 for p in flow_prices), "급락 후 현재가 기준으로 재설정된 가격에 체결"
+
+    # 고가/저가 체결: 종가가 주문가 위여도 저가가 닿으면 체결
+    flat = np.full(5, 50.0)
+    low = flat.copy()
+    low[2] = 49.4
+    result = backtest_ladder(flat, flat, low, flat, PARAMS)
+    assert [(t.index, t.order_type) for t in result.trades] == [(1, "initial"), (2, "small_flow")]
+
+    assert slow.elapsed_sec / fast.elapsed_sec > 100, "전략 함수 기준 대비 100배 이상"
@@ -0,0 +1,97 @@
+# tests/test_candle_store.py
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from data.candle_store import CandleStore, find_missing_candles, to_epoch
+
+
+def upbit_candles(start: str, minutes: int, skip=()):
+    """업비트 분봉 응답 형식 (최신 봉이 앞)"""
+    base = pd.Timestamp(start)
+    rows = []
+    for i in range(minutes):
+        if i in skip:
+            continue
+        t = base + pd.Timedelta(minutes=i)
+        rows.append({
+            "candle_date_time_kst": t.strftime("%Y-%m-%dT%H:%M:%S"),
+            "opening_price": 100.0 + i, "high_price": 101.0 + i, "low_price": 99.0 + i,
+            "trade_price": 100.5 + i, "candle_acc_trade_volume": 1.0,
+        })
+    return rows[::-1]
+
+
+class FakeUpbit:
+    """to(exclusive) 이전 count개를 최신순으로 반환"""
+
+    def __init__(self, candles):
+        self.candles = candles
+        self.calls = []
+
+    def __call__(self, market, unit, to, count):
+        self.calls.append(to)
+        limit = to_epoch(to.replace("+09:00", ""))
+        older = [c for c in self.candles if to_epoch(c["candle_date_time_kst"]) < limit]
+        return older[:count]
+
+
+def test_fetches_only_missing_ranges_and_reloads_locally(tmp_path):
+    print("[TEST] 분봉 저장소 테스트 시작")
+
+    # 하루 넘는 구간(일자 파티션 2개) + 거래 없는 분(봉 없음) 포함
+    fake = FakeUpbit(upbit_candles("2024-01-01 23:00", 500, skip={10, 11}))
+    store = CandleStore(str(tmp_path), fetcher=fake, sleep_sec=0)
+
+    df = store.ensure("KRW-BTC", 1, "2024-01-01 23:30", "2024-01-02 02:00")
+    assert len(df) == 150 and df["time"].is_monotonic_increasing
+    assert len(fake.calls) == 1, "뒤에서부터 200개 → 1회로 구간 전체"
+    assert sorted(os.listdir(tmp_path / "KRW-BTC" / "1m")) == ["2024-01-01.npy", "2024-01-02.npy", "_coverage.json"]
+
+    # 같은 구간 재실행 → 조회 없음
+    again = store.ensure("KRW-BTC", 1, "2024-01-01 23:30", "2024-01-02 02:00")
+    assert len(fake.calls) == 1
+    pd.testing.assert_frame_equal(df, again)
+
+    # 앞쪽으로 넓히면 빈 구간만 조회 (거래 없는 분은 coverage 기준이라 재조회 안 함)
+    assert store.missing_ranges("KRW-BTC", 1, "2024-01-01 23:00", "2024-01-02 02:00") == [
+        (to_epoch("2024-01-01 23:00"), to_epoch("2024-01-01 23:30"))
+    ]
+    wide = store.ensure("KRW-BTC", 1, "2024-01-01 23:00", "2024-01-02 02:00")
+    assert len(fake.calls) == 2 and len(wide) == 178
+
+    # 200개 넘는 구간은 여러 페이지
+    paged = CandleStore(str(tmp_path / "paged"), fetcher=FakeUpbit(fake.candles), sleep_sec=0)
+    assert len(paged.ensure("KRW-BTC", 1, "2024-01-01 23:00", "2024-01-02 07:00")) == 478
+    assert paged.fetch_calls == 3
+    assert store.missing_ranges("KRW-BTC", 1, "2024-01-01 23:00", "2024-01-02 02:00") == []
+
+    holes = find_missing_candles(store.load_records("KRW-BTC", 1, "2024-01-01 23:00", "2024-01-02 00:00"), 1)
+    assert holes == [(to_epoch("2024-01-01 23:10"), to_epoch("2024-01-01 23:12"))]
+
+    print("[TEST] 분봉 저장소 테스트 통과 ✅")
+
+
+def test_csv_import_works_offline_and_overwrites(tmp_path):
+    csv_path = tmp_path / "btc.csv"
+    pd.DataFrame({
+        "시간": pd.date_range("2024-03-01 09:00", periods=5, freq="min"),
+        "시가": [1.0, 2, 3, 4, 5], "고가": [2.0, 3, 4, 5, 6], "저가": [0.5, 1, 2, 3, 4], "종가": [1.5, 2, 3, 4, 5],
+    }).to_csv(csv_path, index=False)
+
+    def offline(*args):
+        raise AssertionError("네트워크 조회 금지")
+
+    store = CandleStore(str(tmp_path / "store"), fetcher=offline, sleep_sec=0)
+    assert store.import_csv(str(csv_path), "KRW-ETH", 1) == 5
+
+    df = store.ensure("KRW-ETH", 1, "2024-03-01 09:00", "2024-03-01 09:05")
+    assert df["close"].tolist() == [1.5, 2, 3, 4, 5]
+
+    # 같은 시각 봉은 새 값으로 교체
+    store.write("KRW-ETH", 1, [{"time": "2024-03-01 09:02", "open": 9, "high": 9, "low": 9, "close": 9}])
+    records = store.load_records("KRW-ETH", 1, "2024-03-01 09:00", "2024-03-01 09:05")
+    assert len(records) == 5 and records["close"][2] == 9
+    assert np.all(np.diff(records["ts"]) == 60)
@@ -0,0 +1,81 @@
+# tests/test_fill_pipeline.py
+
+import time
+import pandas as pd
+
+import strategy.fill_pipeline as fill_pipeline
+import strategy.casino_strategy as casino_strategy
+import manager.order_executor as order_executor
+from data.order_records import FillEvent
+from data.state_store import StateStore
+
+
+def make_store(tmp_path) -> StateStore:
+    buy_path = str(tmp_path / "buy_log.csv")
+    sell_path = str(tmp_path / "sell_log.csv")
+    pd.DataFrame(columns=[
+        "time", "market", "target_price", "buy_amount", "buy_units", "buy_type", "buy_uuid", "filled"
+    ]).to_csv(buy_path, index=False)
+    pd.DataFrame([{
+        "market": "SOXL", "avg_buy_price": 20.0, "quantity": 5.0,
+        "target_sell_price": 22.0, "sell_uuid": "77", "filled": "wait",
+    }]).to_csv(sell_path, index=False)
+    return StateStore(buy_path=buy_path, sell_path=sell_path)
+
+
+def test_fill_places_take_profit_for_filled_symbol_only(monkeypatch, tmp_path):
+    print("[TEST] 체결 이벤트 → 익절 매도 테스트 시작")
+
+    store = make_store(tmp_path)
+    calls = {"accounts": 0, "quotes": [], "orders": [], "fallback": []}
+
+    def fake_accounts():
+        calls["accounts"] += 1
+        return {
+            "TQQQ": {"balance": 4.0, "avg_buy_price": 50.0, "side": "LONG"},
+            "SOXL": {"balance": 5.0, "avg_buy_price": 20.0, "side": "LONG"},
+        }
+
+    def fake_quote(market, market_code):
+        calls["quotes"].append(market)
+        return 51.0
+
+    def fake_send_order(market, side, ord_type, unit_price, volume, **kwargs):
+        calls["orders"].append((market, side, unit_price, volume))
+        return {"uuid": "9001"}
+
+    monkeypatch.setattr(fill_pipeline, "get_state_store", lambda: store)
+    monkeypatch.setattr(fill_pipeline, "get_accounts", fake_accounts)
+    monkeypatch.setattr(fill_pipeline, "invalidate_accounts", lambda: None)
+    monkeypatch.setattr(fill_pipeline, "immediate_sell_for_filled_buys",
+                        lambda setting_df, events, markets=None: calls["fallback"].extend(markets))
+    monkeypatch.setattr(casino_strategy, "get_current_ask_price", fake_quote)
+    monkeypatch.setattr(order_executor, "send_order", fake_send_order)
+
+    setting_df = pd.DataFrame([
+        {"market": "TQQQ", "take_profit_pct": 0.1, "market_code": "NASD"},
+        {"market": "SOXL", "take_profit_pct": 0.1, "market_code": "NASD"},
+        {"market": "SHNY", "take_profit_pct": 0.1, "market_code": "NASD"},
+    ])
+    events = [
+        FillEvent("buy", "TQQQ", "1", "small_flow", 100.0, 2.0, 50.0, detected_at=time.monotonic()),
+        FillEvent("buy", "SHNY", "2", "initial", 100.0, 1.0, 10.0, detected_at=time.monotonic()),
+    ]
+
+    fill_pipeline.handle_buy_fills(setting_df, events)
+
+    # 잔고 1회, 현재가는 체결 종목만, 주문은 체결 종목만
+    assert calls["accounts"] == 1
+    assert calls["quotes"] == ["TQQQ"]
+    assert calls["orders"] == [("TQQQ", "SELL", 55.0, 4)]
+    # 잔고에 아직 안 잡힌 종목은 기존 플로우로
+    assert calls["fallback"] == ["SHNY"]
+
+    sells = store.sell_orders()
+    assert sells.get("9001").market == "TQQQ" and sells.get("9001").filled == "wait"
+    assert sells.get("77").filled == "wait", "다른 종목 매도 주문은 그대로"
+
+    stats = fill_pipeline.get_fill_latency_stats()
+    assert stats["by_market"]["TQQQ"]["count"] >= 1 and stats["fallbacks"] >= 1
+
+    print("[TEST] 체결 이벤트 → 익절 매도 테스트 통과 ✅")
@@ -4,9 +4,8 @@ import pandas as pd
 from strategy.casino_strategy import generate_buy_orders
 
 
-def run_generate_buy_orders_test():
-    print("[TEST] generate_buy_orders 테스트 시작")
-
+def make_scenario():
+    """setting / buy_log / 현재가 시나리오 (tests/test_vectorized_buy_orders.py 동일성 검증에서도 사용)"""
     # -------- 1. setting.csv 시뮬레이션 --------
     setting_df = pd.DataFrame([
         {
@@ -64,6 +63,14 @@ def run_generate_buy_orders_test():
         "KRW-CCC": 700    # situation3 → next 단계 매수 준비
     }
 
+    return setting_df, buy_log_df, current_prices
+
+
+def run_generate_buy_orders_test():
+    print("[TEST] generate_buy_orders 테스트 시작")
+
+    setting_df, buy_log_df, current_prices = make_scenario()
+
     # -------- 4. 테스트 실행 --------
     updated_df = generate_buy_orders(setting_df, buy_log_df, current_prices)
 
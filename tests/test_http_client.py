@@ -0,0 +1,113 @@
+# tests/test_http_client.py
+
+import json
+import os
+import subprocess
+import sys
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from api.http_client import HttpClient
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    """keep-alive(HTTP/1.1) 서버 – 받은 헤더를 server.seen에 기록"""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.server.seen.append({k.lower(): v for k, v in self.headers.items()})
+        body = b'{"rsp_cd": "00000"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+    httpd.seen = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_connection_reuse_is_counted(server):
+    print("[TEST] HTTP 커넥션 재사용 카운트 테스트 시작")
+
+    client = HttpClient(f"http://127.0.0.1:{server.server_address[1]}/")
+    try:
+        for _ in range(5):
+            assert client.post("/ping", {"In": {}}).status_code == 200
+        stats = client.connection_stats()
+        assert (stats["requests"], stats["new_connections"], stats["reused_connections"]) == (5, 1, 4)
+        assert stats["reuse_ratio"] == 0.8 and stats["errors"] == 0
+    finally:
+        client.close()
+
+    # 세션을 닫으면 다음 요청은 새 커넥션
+    client = HttpClient(f"http://127.0.0.1:{server.server_address[1]}")
+    client.post("/ping", {})
+    client.close()
+    client.post("/ping", {})
+    assert client.connection_stats()["new_connections"] == 2
+    client.close()
+
+    print("[TEST] HTTP 커넥션 재사용 카운트 테스트 통과 ✅")
+
+
+def test_bearer_header_cached_and_removed_per_request(server):
+    client = HttpClient(f"http://127.0.0.1:{server.server_address[1]}")
+    try:
+        client.post("/a", {})
+        assert "authorization" not in server.seen[-1]
+        assert server.seen[-1]["content-type"] == "application/json; charset=utf-8"
+
+        client.set_bearer_token("t1")
+        client.post("/a", {})
+        assert server.seen[-1]["authorization"] == "Bearer t1"
+
+        client.set_bearer_token("")         # 빈 토큰은 무시 (기존 헤더 유지)
+        client.set_bearer_token("t2")
+        client.post("/a", {})
+        assert server.seen[-1]["authorization"] == "Bearer t2"
+
+        # _get_token: 토큰 발급 요청에는 캐싱된 토큰을 보내지 않음 (None → 해당 요청에서만 제거)
+        client.post("/token", data={"grant_type": "client_credentials"},
+                    headers={"Content-Type": "application/x-www-form-urlencoded", "authorization": None})
+        assert "authorization" not in server.seen[-1]
+        assert server.seen[-1]["content-type"] == "application/x-www-form-urlencoded"
+
+        client.post("/a", {})
+        assert server.seen[-1]["authorization"] == "Bearer t2", "세션 기본 헤더는 그대로"
+    finally:
+        client.close()
+
+
+def test_timeouts_and_pool_sizes_from_env():
+    # 모듈 로드 시점에 환경 변수를 읽으므로 별도 프로세스에서 확인 (.env보다 환경 변수 우선)
+    env = dict(os.environ, DB_HTTP_CONNECT_TIMEOUT="1.5", DB_HTTP_READ_TIMEOUT="7",
+               DB_HTTP_POOL_MAXSIZE="3")
+    code = (
+        "import json; from api.http_client import HttpClient;"
+        "c = HttpClient('http://127.0.0.1:1');"
+        "a = c.session.get_adapter('http://127.0.0.1:1');"
+        "print(json.dumps([list(c.timeout), a._pool_maxsize]))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), check=True)
+    assert json.loads(out.stdout.strip().splitlines()[-1]) == [[1.5, 7.0], 3]
+
+    client = HttpClient("http://127.0.0.1:1", connect_timeout=0.2, read_timeout=0.5)
+    assert client.timeout == (0.2, 0.5)
+    client.close()
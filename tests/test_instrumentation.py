@@ -0,0 +1,92 @@
+# tests/test_instrumentation.py
+
+import json
+import threading
+
+import pytest
+
+from utils.instrumentation import Instrumentation, Histogram
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_phases_count_broker_calls_and_dump_windows(tmp_path):
+    print("[TEST] 단계별 계측 테스트 시작")
+
+    clock = FakeClock()
+    path = tmp_path / "instrumentation.jsonl"
+    inst = Instrumentation(path=str(path), dump_sec=60, enabled=True, clock=clock)
+
+    @inst.timed()
+    def detect_filled_buy_orders():
+        inst.record_call("/inquiry/transaction-history", 12.0)
+
+    with inst.phase("open_tick"):
+        detect_filled_buy_orders()
+        with inst.phase("periodic_sell_status_check"):
+            inst.record_call("/quote/orderbook", 3.0)
+            inst.record_call("/quote/orderbook", 250.0, ok=False)
+
+    with pytest.raises(ValueError):
+        with inst.phase("periodic_sell_status_check"):
+            raise ValueError("boom")
+
+    snap = inst.snapshot()
+    phases = snap["phases"]
+    assert phases["open_tick"]["broker_calls"] == 3, "바깥 단계는 안쪽 호출까지 포함"
+    assert phases["detect_filled_buy_orders"]["broker_calls"] == 1
+    assert phases["periodic_sell_status_check"]["count"] == 2
+    assert phases["periodic_sell_status_check"]["broker_calls_per_run"] == 1.0
+    assert phases["periodic_sell_status_check"]["errors"] == 1
+
+    orderbook = snap["endpoints"]["/quote/orderbook"]
+    assert orderbook["count"] == 2 and orderbook["errors"] == 1
+    assert orderbook["max_ms"] == 250.0 and orderbook["p50_ms"] == 5
+
+    # 주기 전에는 덤프 안 함 → 지나면 1줄 추가 + 구간 초기화
+    assert not inst.maybe_dump()
+    clock.now = 61.0
+    assert inst.maybe_dump()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    record = json.loads(lines[0])
+    assert record["window_sec"] == 61.0
+    assert record["phases"]["open_tick"]["count"] == 1
+    assert inst.snapshot("window")["phases"] == {}
+    assert inst.snapshot()["phases"]["open_tick"]["count"] == 1, "누적은 유지"
+
+    print("[TEST] 단계별 계측 테스트 통과 ✅")
+
+
+def test_phase_stack_is_per_thread_and_disabled_is_noop(tmp_path):
+    inst = Instrumentation(path=str(tmp_path / "x.jsonl"), enabled=True)
+
+    def worker():
+        with inst.phase("worker_tick"):
+            inst.record_call("/order", 1.0)
+
+    with inst.phase("main"):
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+
+    phases = inst.snapshot()["phases"]
+    assert phases["main"]["broker_calls"] == 0, "다른 스레드 호출은 섞이지 않음"
+    assert phases["worker_tick"]["broker_calls"] == 1
+
+    off = Instrumentation(path=str(tmp_path / "y.jsonl"), enabled=False)
+    with off.phase("x"):
+        off.record_call("/order", 1.0)
+    assert off.snapshot() == {"phases": {}, "endpoints": {}}
+    assert not off.maybe_dump()
+
+    hist = Histogram()
+    for ms in (0.3, 4, 4, 4, 40, 9000):
+        hist.add(ms)
+    assert hist.quantile(0.5) == 5 and hist.quantile(1.0) == 9000
@@ -0,0 +1,73 @@
+# tests/test_journal.py
+
+import os
+import pandas as pd
+
+from data.journal import JournalStateStore, read_journal
+
+
+def test_journal_replay_and_compaction(tmp_path):
+    print("[TEST] JournalStateStore 테스트 시작")
+
+    buy_path = str(tmp_path / "buy_log.csv")
+    sell_path = str(tmp_path / "sell_log.csv")
+    journal_dir = str(tmp_path / "journal")
+
+    pd.DataFrame([{
+        "time": "2025-01-01 00:00:00", "market": "TQQQ", "target_price": 50.0,
+        "buy_amount": 100.0, "buy_units": 2, "buy_type": "small_flow",
+        "buy_uuid": "", "filled": "",
+    }]).to_csv(buy_path, index=False)
+    pd.DataFrame(columns=[
+        "market", "avg_buy_price", "quantity", "target_sell_price", "sell_uuid", "filled"
+    ]).to_csv(sell_path, index=False)
+
+    # 1) 최초 시작 → CSV에서 가져오며 insert 레코드 1건
+    store = JournalStateStore(journal_dir=journal_dir, buy_path=buy_path,
+                              sell_path=sell_path, snapshot_every=4)
+    journal_path = os.path.join(journal_dir, "journal.jsonl")
+    assert [r["op"] for r in read_journal(journal_path)] == ["insert"]
+
+    # 2) uuid 부여 → wait→done : 바뀐 컬럼만 담긴 update 레코드
+    df = store.buy_log()
+    df.loc[0, "buy_uuid"] = "101"
+    df.loc[0, "filled"] = "wait"
+    store.set_buy_log(df)
+    store.flush()
+
+    last = read_journal(journal_path)[-1]
+    assert last["op"] == "update" and last["set"] == {"buy_uuid": "101", "filled": "wait"}
+
+    df = store.buy_log()
+    df.loc[0, "filled"] = "done"
+    store.set_buy_log(df)
+    store.flush()
+    store.record_fill("buy", "TQQQ", "101", price=50.0, units=2)
+
+    # 3) 레코드 4건 → 다음 flush 때 스냅샷 + 세그먼트 보관
+    assert store.flush() == 0
+    assert os.path.exists(os.path.join(journal_dir, "snapshot.json"))
+    assert read_journal(journal_path) == []
+    assert len(os.listdir(os.path.join(journal_dir, "archive"))) == 1
+
+    # 4) 스냅샷 이후 변경 → tail에만 기록
+    df = store.buy_log()
+    df.loc[0, "filled"] = "cancel"
+    store.set_buy_log(df)
+    store.flush()
+    expected = store.buy_log()
+    store.close()
+
+    # 5) 재시작 → 스냅샷 + tail 재생 (CSV는 보지 않음)
+    os.remove(buy_path)
+    reopened = JournalStateStore(journal_dir=journal_dir, buy_path=buy_path,
+                                 sell_path=sell_path, snapshot_every=4)
+    pd.testing.assert_frame_equal(reopened.buy_log(), expected)
+    assert reopened.stats()["journal"]["replayed"] == 1
+
+    # 6) 주문번호 기준 감사 이력 (보관 세그먼트 포함)
+    ops = [r["op"] for r in reopened.history("101")]
+    assert ops == ["update", "update", "fill", "update"]
+    reopened.close()
+
+    print("✅ JournalStateStore 테스트 통과")
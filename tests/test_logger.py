@@ -0,0 +1,90 @@
+# tests/test_logger.py
+
+import json
+import logging
+from logging.handlers import RotatingFileHandler
+
+import utils.logger as logger_mod
+from utils.logger import JsonFormatter, configure_logging, shutdown_logging, get_logger, sample
+
+
+def test_json_lines_rotation_level_and_sampling(tmp_path):
+    print("[TEST] 구조화 로깅 테스트 시작")
+
+    path = tmp_path / "casino.jsonl"
+    handler = RotatingFileHandler(path, maxBytes=2000, backupCount=2, encoding="utf-8")
+    handler.setFormatter(JsonFormatter())
+
+    try:
+        configure_logging(handlers=[handler], level="INFO")
+        log = get_logger("tests.logger")
+
+        log.debug("버려짐 %s", "debug")
+        log.info("주문 접수 %s", "TQQQ", extra={"market": "TQQQ"})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.exception("❌ 실패")
+
+        shutdown_logging()      # 큐 비우고 writer 종료 → 파일에 모두 기록
+        lines = [json.loads(l) for l in path.read_text(encoding="utf-8").splitlines()]
+        assert [l["msg"] for l in lines] == ["주문 접수 TQQQ", "❌ 실패"], "INFO 미만은 기록 안 함"
+        assert lines[0]["market"] == "TQQQ" and lines[0]["logger"] == "casino.tests.logger"
+        assert "ValueError: boom" in lines[1]["exc"]
+
+        # 샘플링: 같은 key는 every건 중 1건만, 크기 초과 시 회전
+        configure_logging(handlers=[handler], level="DEBUG")
+        log = get_logger("tests.logger")
+        for i in range(250):
+            log.debug("행 %d", i, extra=sample("row"))
+        for i in range(20):
+            log.info("x" * 100)
+        shutdown_logging()
+
+        files = sorted(p.name for p in tmp_path.iterdir())
+        assert files == ["casino.jsonl", "casino.jsonl.1", "casino.jsonl.2"], "크기 기준 회전"
+        rows = []
+        for name in files:
+            for l in (tmp_path / name).read_text(encoding="utf-8").splitlines():
+                record = json.loads(l)
+                if record["msg"].startswith("행 "):
+                    rows.append(record)
+        every = logger_mod.LOG_SAMPLE_EVERY
+        assert [r["msg"] for r in rows] == [f"행 {i}" for i in range(0, 250, every)]
+        assert rows[0]["sampled_every"] == every
+    finally:
+        configure_logging()
+
+    assert logging.getLogger("casino").propagate is False
+    print("[TEST] 구조화 로깅 테스트 통과 ✅")
+
+
+def test_atomic_save_retry_goes_through_logger(tmp_path, monkeypatch, capsys):
+    import os
+    import pandas as pd
+    from utils import csv_utils
+
+    path = tmp_path / "casino.jsonl"
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(JsonFormatter())
+
+    real_replace = os.replace
+    calls = []
+
+    def locked_once(src, dst):
+        calls.append(dst)
+        if len(calls) == 1:
+            raise PermissionError("WinError 5")
+        return real_replace(src, dst)
+
+    try:
+        configure_logging(handlers=[handler], level="INFO")
+        monkeypatch.setattr(csv_utils.os, "replace", locked_once)
+        csv_utils.atomic_save(pd.DataFrame({"a": [1]}), str(tmp_path / "x.csv"), delay=0)
+        shutdown_logging()
+    finally:
+        configure_logging()
+
+    records = [json.loads(l) for l in path.read_text(encoding="utf-8").splitlines()]
+    assert [(r["logger"], r["level"]) for r in records] == [("casino.utils.csv_utils", "WARNING")]
+    assert "[atomic_save]" not in capsys.readouterr().out, "print 대신 큐 로거"
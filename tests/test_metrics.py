@@ -0,0 +1,60 @@
+# tests/test_metrics.py
+
+import urllib.request
+
+import pandas as pd
+
+import utils.metrics as metrics
+from utils.csv_utils import atomic_save
+from utils.instrumentation import get_instrumentation
+
+
+def _value(text: str, line_prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"지표 없음: {line_prefix}")
+
+
+def test_render_exposes_loop_endpoint_order_fill_and_csv_metrics(tmp_path):
+    print("[TEST] /metrics 노출 테스트 시작")
+
+    inst = get_instrumentation()
+    inst.reset()
+    with inst.phase("open_tick"):
+        inst.record_call("/quote/orderbook", 3.0)
+        inst.record_call("/quote/orderbook", 700.0, ok=False)
+
+    before_sent = metrics.ORDERS.value(side="buy", action="sent")
+    before_fill = metrics.FILLS.value(side="sell")
+    metrics.count_order("BUY", "sent")
+    metrics.count_fill("sell", 2)
+
+    atomic_save(pd.DataFrame({"a": [1]}), str(tmp_path / "buy_log.csv"))
+
+    text = metrics.render_metrics()
+
+    assert _value(text, 'casino_loop_duration_seconds_count{kind="open_tick"}') == 1
+    assert _value(text, 'casino_broker_request_duration_seconds_bucket{endpoint="/quote/orderbook",le="0.005"}') == 1
+    assert _value(text, 'casino_broker_request_duration_seconds_bucket{endpoint="/quote/orderbook",le="+Inf"}') == 2
+    assert _value(text, 'casino_broker_request_duration_seconds_sum{endpoint="/quote/orderbook"}') == 0.703
+    assert _value(text, 'casino_broker_request_errors_total{endpoint="/quote/orderbook"}') == 1
+    assert _value(text, 'casino_orders_total{side="buy",action="sent"}') == before_sent + 1
+    assert _value(text, 'casino_fills_total{side="sell"}') == before_fill + 2
+    assert _value(text, 'casino_csv_save_duration_seconds_count{file="buy_log.csv"}') >= 1
+    assert "# TYPE casino_rate_limit_wait_seconds_total counter" in text, "rate limit 지표 포함"
+
+    inst.reset()
+    print("[TEST] /metrics 노출 테스트 통과 ✅")
+
+
+def test_metrics_server_serves_text_format():
+    server = metrics.start_metrics_server(0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as res:
+            assert res.status == 200
+            assert res.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert "casino_orders_total" in res.read().decode("utf-8")
+    finally:
+        metrics.stop_metrics_server()
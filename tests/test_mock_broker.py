@@ -0,0 +1,133 @@
+# tests/test_mock_broker.py
+
+import json
+
+import pytest
+
+import api.db_usstocks as db
+from api.mock_broker import MockBroker, start_mock_broker_server
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def call(broker, path, body=None, headers=None):
+    headers = {"authorization": "Bearer t", **(headers or {})}
+    return broker.handle(path, headers, json.dumps(body or {}).encode())
+
+
+def order_body(symbol, side, price, qty, trd="0", org=0):
+    return {"In": {"AstkIsuNo": symbol, "AstkBnsTpCode": side, "AstkOrdprcPtnCode": "1",
+                   "AstkOrdQty": qty, "AstkOrdPrc": price, "OrdTrdTpCode": trd, "OrgOrdNo": org}}
+
+
+def test_matching_paging_rate_limit_and_close():
+    print("[TEST] 모의 DB증권 엔진 테스트 시작")
+
+    clock = FakeClock()
+    broker = MockBroker(prices={"TQQQ": 50.0}, volatility=0.0, latency_ms=0, jitter_ms=0,
+                        rate_limit_per_sec=0, page_size=2, clock=clock)
+
+    # 호가 아래 지정가 매수 → 대기, 가격이 내려오면 체결
+    _, _, data = call(broker, db.PATH_ORDER, order_body("TQQQ", "2", 49.0, 3))
+    ord_no = data["Out"]["OrdNo"]
+    assert len(broker.open_orders()) == 1
+
+    broker.set_price("TQQQ", 48.9)
+    assert broker.positions()["TQQQ"] == {"qty": 3.0, "avg_price": 49.0}
+
+    # 보유 수량보다 많은 매도는 거절
+    _, _, data = call(broker, db.PATH_ORDER, order_body("TQQQ", "1", 60.0, 5))
+    assert data["rsp_cd"] == "2714"
+
+    # 매도 3건 → 페이지 2행씩 연속조회
+    for price in (60.0, 61.0, 62.0):
+        call(broker, db.PATH_ORDER, order_body("TQQQ", "1", price, 1))
+
+    body = {"In": {"OrdxctTpCode": "2"}}
+    _, headers, data = call(broker, db.PATH_EXECUTION, body)
+    assert len(data["Out"]) == 2 and headers["cont_yn"] == "Y"
+    _, headers, data = call(broker, db.PATH_EXECUTION, body,
+                            {"cont_yn": "Y", "cont_key": headers["cont_key"]})
+    assert len(data["Out"]) == 1 and headers["cont_yn"] == "N"
+
+    # 취소 / 이미 끝난 주문 취소는 8819
+    open_no = broker.open_orders()[0]["OrdNo"]
+    _, _, data = call(broker, db.PATH_ORDER, order_body("TQQQ", "1", 0, 0, trd="2", org=open_no))
+    assert data["Out"]["OrdNo"]
+    _, _, data = call(broker, db.PATH_ORDER, order_body("TQQQ", "1", 0, 0, trd="2", org=ord_no))
+    assert data["rsp_cd"] == "8819"
+
+    # 잔고 응답은 parse_accounts 형식
+    _, _, data = call(broker, db.PATH_BALANCE, db.BALANCE_BODY)
+    assert db.parse_accounts(data)["TQQQ"]["balance"] == 3.0
+
+    # 토큰 없으면 401
+    status, _, _ = broker.handle(db.PATH_BALANCE, {}, b"{}")
+    assert status == 401
+
+    # 장마감 → 호가 0, 주문 2611
+    broker.close_market()
+    _, _, data = call(broker, db.PATH_ORDERBOOK, db.orderbook_body("TQQQ", "FN"))
+    assert data["Out"]["Askp1"] == "0"
+    _, _, data = call(broker, db.PATH_ORDER, order_body("TQQQ", "2", 49.0, 1))
+    assert data["rsp_cd"] == "2611"
+
+    # 초당 호출 수 초과 → 429
+    limited = MockBroker(prices={"TQQQ": 50.0}, rate_limit_per_sec=2, clock=clock)
+    statuses = [call(limited, db.PATH_ORDERBOOK, db.orderbook_body("TQQQ", "FN"))[0] for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    clock.now += 1.0
+    assert call(limited, db.PATH_ORDERBOOK, db.orderbook_body("TQQQ", "FN"))[0] == 200
+
+    print("[TEST] 모의 DB증권 엔진 테스트 통과 ✅")
+
+
+def test_db_client_round_trip_over_http(monkeypatch):
+    broker = MockBroker(prices={"MOCKA": 20.0}, volatility=0.0, latency_ms=0, jitter_ms=0,
+                        page_size=1)
+    server, _ = start_mock_broker_server(broker, port=0)
+    try:
+        monkeypatch.setattr(db._client, "base_url", f"http://127.0.0.1:{server.server_address[1]}")
+        monkeypatch.setattr(db._gateway, "_token_loader", lambda force=False: "mock-token")
+
+        bid, ask = db.get_bid_ask("MOCKA", "FN")
+        assert bid < 20.0 < ask
+
+        res = db.send_order("MOCKA", "BUY", "limit", unit_price=ask, volume=2)
+        assert res["uuid"]
+        res2 = db.send_order("MOCKA", "BUY", "limit", unit_price=1.0, volume=1)
+
+        rows, _ = db._fetch_transaction_history(open_only=False)
+        states = {str(r["OrdNo"]): r["AstkOrdStatCode"] for r in rows}
+        assert states == {res["uuid"]: "7", res2["uuid"]: "1"}, "연속조회로 전체 페이지 수집"
+
+        assert db._fetch_accounts()["MOCKA"]["balance"] == 2.0
+
+        with pytest.raises(RuntimeError, match="2611"):
+            broker.close_market()
+            db.send_order("MOCKA", "BUY", "limit", unit_price=ask, volume=1)
+    finally:
+        server.shutdown()
+
+
+def test_in_process_adapter_serves_requests_session():
+    import requests
+    from api.mock_broker import MockBrokerAdapter
+
+    broker = MockBroker(prices={"TQQQ": 50.0}, volatility=0.0)
+    session = requests.Session()
+    session.mount("https://mock.local", MockBrokerAdapter(broker))
+
+    res = session.post("https://mock.local" + db.PATH_ORDERBOOK,
+                       data=json.dumps(db.orderbook_body("TQQQ", "FN")),
+                       headers={"authorization": "Bearer t"})
+    res.raise_for_status()
+    out = res.json()["Out"]
+    assert float(out["Bidp1"]) < 50.0 < float(out["Askp1"])
+    assert broker.stats()["by_path"][db.PATH_ORDERBOOK] == 1
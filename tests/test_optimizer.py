@@ -0,0 +1,86 @@
+# tests/test_optimizer.py
+
+import numpy as np
+import pandas as pd
+
+from manager.backtest_engine import LadderParams
+from manager.optimizer import (
+    SETTING_COLUMNS, SharedCandles, grid_configs, random_configs, rank_results, run_sweep, to_setting_rows,
+)
+
+BASE = LadderParams("TQQQ", 100.0, 0.04, 2, 0.13, 7, 0.03)
+
+SPACE = {
+    "small_flow_pct": [0.01, 0.02],
+    "small_flow_units": [1, 2],
+    "large_flow_pct": [0.02, 0.04],
+    "large_flow_units": [2],
+    "take_profit_pct": [0.01, 0.02],
+}
+
+
+def make_path(n: int, seed: int = 3, vol: float = 0.01, start: float = 50.0):
+    rng = np.random.default_rng(seed)
+    close = start * np.exp(np.cumsum(rng.normal(0, vol, n)))
+    open_ = np.r_[start, close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n)))
+    return open_, high, low, close
+
+
+def test_parallel_sweep_matches_serial_and_ranks():
+    print("[TEST] 병렬 설정 탐색 테스트 시작")
+
+    configs = grid_configs(SPACE)
+    assert len(configs) == 12, "large_flow_pct <= small_flow_pct 조합 제외"
+
+    path = make_path(400)
+    serial = run_sweep(*path, BASE, configs, workers=1)
+    parallel = run_sweep(*path, BASE, configs, workers=2, chunk=3)
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert serial[["small_flow_pct", "large_flow_pct"]].to_dict("records") == [
+        {"small_flow_pct": c["small_flow_pct"], "large_flow_pct": c["large_flow_pct"]} for c in configs
+    ], "결과는 configs 순서 그대로"
+
+    ranked = rank_results(serial)
+    assert ranked["rank"].tolist() == list(range(1, len(ranked) + 1))
+    assert ranked["score"].is_monotonic_decreasing
+    assert (ranked["sells"] >= 1).all()
+
+    capped = rank_results(serial, max_capital_at_risk=ranked["capital_at_risk"].median())
+    assert len(capped) < len(ranked) and (capped["capital_at_risk"] <= ranked["capital_at_risk"].median()).all()
+
+    base_row = {"market": "TQQQ", "unit_size": 120, "leverage": 3, "market_code": "FN"}
+    rows = to_setting_rows(ranked, base_row, top=3)
+    assert list(rows.columns) == SETTING_COLUMNS and len(rows) == 3
+    assert rows.iloc[0]["take_profit_pct"] == ranked.iloc[0]["take_profit_pct"]
+    assert (rows["market_code"] == "FN").all() and (rows["unit_size"] == 120).all()
+
+    print("[TEST] 병렬 설정 탐색 테스트 통과 ✅")
+
+
+def test_random_configs_and_shared_memory():
+    configs = random_configs(50, seed=7)
+    assert len(configs) == 50
+    assert len({tuple(c.values()) for c in configs}) == 50, "중복 없음"
+    assert all(c["large_flow_pct"] > c["small_flow_pct"] for c in configs)
+    assert all(isinstance(c["small_flow_units"], int) and 1 <= c["small_flow_units"] <= 4 for c in configs)
+    assert random_configs(50, seed=7) == configs, "같은 seed → 같은 후보"
+
+    path = make_path(10)
+    with SharedCandles(*path) as shared:
+        view = np.ndarray(shared.shape, dtype=np.float64, buffer=shared.shm.buf)
+        assert np.array_equal(view[3], path[3])
+        del view
+
+
+def test_empty_sweep_ranks_to_empty_frame():
+    impossible = {"small_flow_pct": (0.10, 0.20), "small_flow_units": (1, 2), "large_flow_pct": (0.01, 0.05),
+                  "large_flow_units": (2, 3), "take_profit_pct": (0.01, 0.02)}
+    configs = random_configs(5, space=impossible, seed=0)
+    assert configs == [], "모든 추출이 _valid 탈락"
+
+    results = run_sweep(*make_path(50), BASE, configs, workers=2)
+    ranked = rank_results(results)
+    assert ranked.empty and "score" in ranked.columns
+    assert list(to_setting_rows(ranked, {"market": "TQQQ"}).columns) == SETTING_COLUMNS
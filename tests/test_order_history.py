@@ -0,0 +1,184 @@
+# tests/test_order_history.py
+
+import json
+
+import api.db_usstocks as db
+from api.mock_broker import MockBroker, MockBrokerAdapter
+from api.order_history import OrderHistoryTracker
+
+
+class FakeBroker:
+    """체결/미체결 조회 응답을 흉내내는 가짜 브로커"""
+
+    def __init__(self):
+        self.orders = {}
+        self.calls = []
+
+    def fetch(self, open_only: bool, symbol: str = "", executed_only: bool = False):
+        kind = "open" if open_only else ("executed" if executed_only else "full")
+        self.calls.append(f"{kind}:{symbol}" if symbol else kind)
+        rows = [
+            {"OrdNo": uuid, "AstkIsuNo": sym, "AstkOrdStatCode": st}
+            for uuid, (sym, st) in self.orders.items()
+            if (not open_only or st not in ("6", "7"))
+            and (not executed_only or st == "7")
+            and (not symbol or sym == symbol)
+        ]
+        return rows, 100 * len(rows)
+
+
+def test_tracker_only_refreshes_open_orders():
+    print("[TEST] OrderHistoryTracker 테스트 시작")
+
+    broker = FakeBroker()
+    broker.orders = {
+        "1": ("TQQQ", "7"),   # 체결
+        "2": ("TQQQ", "0"),   # 미체결
+        "3": ("GGLL", "6"),   # 취소
+        "4": ("GGLL", "0"),   # 미체결
+    }
+
+    tracker = OrderHistoryTracker(broker.fetch, ttl=0)
+
+    # 1) 최초 조회 → 전체 내역
+    states = tracker.states_for(["1", "2", "3", "4"])
+    assert states == {"1": "done", "2": "wait", "3": "cancel", "4": "wait"}
+    assert broker.calls == ["full"]
+    assert tracker.open_orders("tqqq") == {"2": "wait"}
+
+    # 2) 변화 없음 → 미체결 목록만 조회, 확정 주문은 다시 파싱하지 않음
+    tracker.refresh()
+    assert broker.calls[-1] == "open"
+    assert tracker.last_tick["rows"] == 2
+    assert tracker.last_tick["parsed"] == 2
+
+    # 3) 2번 체결 → 미체결 목록에서 사라짐 → 그 종목 체결 내역만으로 최종 상태 확정
+    broker.orders["2"] = ("TQQQ", "7")
+    states = tracker.states_for(["2", "4"])
+    assert states == {"2": "done", "4": "wait"}
+    assert broker.calls[-2:] == ["open", "executed:TQQQ"]
+    # 미체결 1행(4번) + 체결 내역 중 신규 파싱은 2번뿐 (1번은 확정 → 건너뜀)
+    assert tracker.last_tick["parsed"] == 1 + 1
+
+    # 4번 취소 (외부) → 체결 내역에 없음 → 그 종목 전체 내역으로 cancel 확정
+    broker.orders["4"] = ("GGLL", "6")
+    assert tracker.states_for(["4"]) == {"4": "cancel"}
+    assert broker.calls[-3:] == ["open", "executed:GGLL", "full:GGLL"]
+
+    # 5) 이후 틱 → 다시 미체결 목록만
+    tracker.refresh()
+    assert broker.calls[-1] == "open"
+    assert tracker.open_orders("TQQQ") == {}
+
+    print("✅ OrderHistoryTracker 테스트 통과")
+
+
+def test_unknown_uuid_is_rechecked_with_backoff():
+    broker = FakeBroker()
+    tracker = OrderHistoryTracker(broker.fetch, ttl=0, unknown_recheck_sec=60)
+
+    assert tracker.states_for(["999"]) == {"999": "wait"}
+    calls_after_first = len(broker.calls)
+
+    # 재확인 간격 이내 → 전체 내역 재조회 없음
+    assert tracker.states_for(["999"]) == {"999": "wait"}
+    assert broker.calls[calls_after_first:] == ["open"]
+
+
+def test_cancelled_orders_skip_history():
+    broker = FakeBroker()
+    broker.orders = {"1": ("TQQQ", "0"), "2": ("TQQQ", "0")}
+    tracker = OrderHistoryTracker(broker.fetch, ttl=0)
+    tracker.refresh()
+
+    # 직접 취소 성공 → 바로 cancel, 미체결 목록에서 사라져도 내역 재조회 없음
+    tracker.mark_cancelled(["1"], "TQQQ")
+    broker.orders["1"] = ("TQQQ", "6")
+    assert tracker.states_for(["1", "2"]) == {"1": "cancel", "2": "wait"}
+    assert broker.calls[-1] == "open"
+
+
+def test_final_orders_are_bounded():
+    broker = FakeBroker()
+    broker.orders = {str(i): ("TQQQ", "7") for i in range(1, 4)}
+    tracker = OrderHistoryTracker(broker.fetch, ttl=0, final_max=3)
+
+    assert tracker.states_for(["1", "2", "3"]) == {"1": "done", "2": "done", "3": "done"}
+
+    # 계속 조회되는 1번은 남고, 가장 오래 안 쓴 2번부터 제거
+    tracker.states_for(["1"])
+    for uuid in ("4", "5"):
+        broker.orders[uuid] = ("TQQQ", "6")
+        tracker.mark_cancelled([uuid], "TQQQ")
+    assert list(tracker._final) == ["1", "4", "5"]
+    assert tracker.stats()["totals"]["evicted"] == 2
+
+    # 제거된 주문번호를 다시 물으면 내역 조회로 다시 확정
+    assert tracker.states_for(["2"], "TQQQ") == {"2": "done"}
+    assert broker.calls[-1] == "executed:TQQQ"
+    assert len(tracker._final) == 3
+
+
+def test_rejected_cancel_leaves_stale_open_snapshot():
+    broker = FakeBroker()
+    broker.orders = {"1": ("TQQQ", "0"), "2": ("TQQQ", "0")}
+    tracker = OrderHistoryTracker(broker.fetch, ttl=3600)
+    tracker.refresh()
+
+    # 갱신이 미뤄진 사이 1번 체결 → 취소 거부 → 스냅샷에서 빠져 다시 취소 대상이 되지 않음
+    broker.orders["1"] = ("TQQQ", "7")
+    tracker.mark_not_open(["1"])
+    assert tracker.open_orders("TQQQ") == {"2": "wait"}
+    assert broker.calls == ["full"], "스냅샷만 고침 (조회 없음)"
+
+    # 최종 상태는 물어볼 때 확정
+    assert tracker.states_for(["1"], "TQQQ") == {"1": "done"}
+    assert broker.calls[-1] == "executed:TQQQ"
+
+
+def test_fill_resolves_with_few_pages(monkeypatch):
+    print("[TEST] 체결 후 내역 조회 페이지 수 테스트 시작")
+
+    symbols = ["AAA", "BBB", "CCC", "DDD"]
+    broker = MockBroker(prices={s: 50.0 for s in symbols}, volatility=0.0, latency_ms=0, jitter_ms=0,
+                        rate_limit_per_sec=0, page_size=5)
+    monkeypatch.setattr(db._client, "base_url", "https://mock.local")
+    monkeypatch.setattr(db._client.session, "adapters", db._client.session.adapters.copy())
+    db._client.session.mount("https://mock.local", MockBrokerAdapter(broker))
+    monkeypatch.setattr(db._gateway, "_token_loader", lambda force=False: "mock-token")
+
+    def order(symbol, price):
+        body = {"In": {"AstkIsuNo": symbol, "AstkBnsTpCode": "2", "AstkOrdprcPtnCode": "1",
+                       "AstkOrdQty": 1, "AstkOrdPrc": price, "OrdTrdTpCode": "0", "OrgOrdNo": 0}}
+        _, _, data = broker.handle(db.PATH_ORDER, {"authorization": "Bearer t"}, json.dumps(body).encode())
+        return str(data["Out"]["OrdNo"])
+
+    # 종목당 체결 10건 + 미체결 1건
+    for symbol in symbols:
+        for _ in range(10):
+            order(symbol, 60.0)
+    waiting = {symbol: order(symbol, 40.0) for symbol in symbols}
+
+    def pages():
+        return broker.stats()["by_path"].get(db.PATH_EXECUTION, 0)
+
+    tracker = OrderHistoryTracker(db._fetch_transaction_history, ttl=0)
+    before = pages()
+    tracker.refresh()
+    full_pages = pages() - before
+    assert full_pages == 9, "최초 1회 계좌 전체 (44행 / 5행씩)"
+
+    # BBB 미체결 주문 체결 → 미체결 1페이지 + BBB 체결 내역 3페이지 (11행)
+    broker.set_price("BBB", 39.0)
+    before = pages()
+    assert tracker.states_for([waiting["BBB"], waiting["AAA"]], "BBB") == {waiting["BBB"]: "done",
+                                                                           waiting["AAA"]: "wait"}
+    assert tracker.last_tick["mode"] == "open+resolve"
+    assert pages() - before == 1 + 3 < full_pages
+
+    # 변화 없는 틱 → 미체결 1페이지
+    before = pages()
+    tracker.refresh()
+    assert pages() - before == 1
+
+    print("[TEST] 체결 후 내역 조회 페이지 수 테스트 통과 ✅")
@@ -0,0 +1,148 @@
+# tests/test_order_records.py
+
+import pandas as pd
+
+import manager.order_executor as order_executor
+from data.order_records import BuyOrder, SellOrder, OrderTable
+from data.state_store import StateStore
+
+
+def make_buy_log():
+    return pd.DataFrame([
+        {"time": "2025-01-01 00:00:00", "market": "TQQQ", "target_price": 50.0,
+         "buy_amount": 100.0, "buy_units": 1, "buy_type": "initial",
+         "buy_uuid": "31161743.0", "filled": "done"},
+        {"time": "2025-01-01 00:01:00", "market": "TQQQ", "target_price": 49.0,
+         "buy_amount": 98.0, "buy_units": 2, "buy_type": "small_flow",
+         "buy_uuid": None, "filled": "update"},
+        {"time": "2025-01-01 00:02:00", "market": "SOXL", "target_price": 20.0,
+         "buy_amount": 40.0, "buy_units": 2, "buy_type": "small_flow",
+         "buy_uuid": "777", "filled": "wait"},
+    ])
+
+
+def test_order_table_indexes_and_round_trip():
+    print("[TEST] OrderTable 테스트 시작")
+
+    table = OrderTable.from_frame(BuyOrder, make_buy_log())
+
+    assert len(table) == 3
+    assert table.markets() == ["TQQQ", "SOXL"]
+    assert [o.buy_type for o in table.by_market("TQQQ")] == ["initial", "small_flow"]
+    # uuid 정규화 (31161743.0 → "31161743") + uuid 인덱스
+    assert table.get("31161743").buy_type == "initial", "uuid 인덱스 조회 실패"
+    assert [o.market for o in table.pending()] == ["SOXL"], "uuid 없는 update 행은 pending 아님"
+
+    # set_uuid → 인덱스 갱신
+    order = table.by_market("TQQQ")[1]
+    table.set_uuid(order, "888.0")
+    assert table.get("888") is order and order.buy_uuid == "888"
+
+    # 종목 단위 삭제
+    removed = table.remove_market("SOXL")
+    assert len(removed) == 1 and table.get("777") is None and len(table) == 2
+
+    frame = table.to_frame()
+    assert list(frame.columns) == list(make_buy_log().columns)
+    assert frame["buy_uuid"].tolist() == ["31161743", "888"]
+    assert OrderTable.from_frame(BuyOrder, frame).to_frame().equals(frame), "DataFrame 왕복 불일치"
+
+    print("[TEST] OrderTable 테스트 통과 ✅")
+
+
+def test_state_store_order_tables(tmp_path):
+    buy_path = str(tmp_path / "buy_log.csv")
+    sell_path = str(tmp_path / "sell_log.csv")
+    make_buy_log().to_csv(buy_path, index=False)
+    pd.DataFrame([{
+        "market": "TQQQ", "avg_buy_price": 50.0, "quantity": 3.0,
+        "target_sell_price": 55.0, "sell_uuid": "991", "filled": "wait",
+    }]).to_csv(sell_path, index=False)
+
+    store = StateStore(buy_path=buy_path, sell_path=sell_path)
+
+    sells = store.sell_orders()
+    assert sells.get("991").quantity == 3.0
+    sells.by_market("TQQQ")[0].filled = "done"
+    assert store.sell_orders().get("991").filled == "wait", "읽기는 복사본이어야 함"
+
+    buys = store.buy_orders()
+    buys.remove_market("SOXL")
+    store.set_buy_orders(buys)
+    assert store.is_dirty() and store.buy_log()["market"].tolist() == ["TQQQ", "TQQQ"]
+
+    store.flush()
+    reloaded = StateStore(buy_path=buy_path, sell_path=sell_path).buy_orders()
+    assert reloaded.get("31161743") is not None and len(reloaded) == 2
+
+
+def test_state_store_tables_convert_only_on_flush(tmp_path, monkeypatch):
+    buy_path = str(tmp_path / "buy_log.csv")
+    sell_path = str(tmp_path / "sell_log.csv")
+    make_buy_log().to_csv(buy_path, index=False)
+    pd.DataFrame(columns=[
+        "market", "avg_buy_price", "quantity", "target_sell_price", "sell_uuid", "filled"
+    ]).to_csv(sell_path, index=False)
+
+    store = StateStore(buy_path=buy_path, sell_path=sell_path)
+
+    conversions = []
+    to_frame = OrderTable.to_frame
+    from_frame = OrderTable.from_frame.__func__
+
+    def counted_to_frame(self):
+        conversions.append("to_frame")
+        return to_frame(self)
+
+    def counted_from_frame(cls, record_cls, df):
+        conversions.append("from_frame")
+        return from_frame(cls, record_cls, df)
+
+    monkeypatch.setattr(OrderTable, "to_frame", counted_to_frame)
+    monkeypatch.setattr(OrderTable, "from_frame", classmethod(counted_from_frame))
+
+    # 루프 경로(읽기 → 레코드 수정 → 쓰기)에서는 DataFrame 변환 없음
+    for _ in range(3):
+        buys = store.buy_orders()
+        buys.get("31161743").filled = "done"
+        store.set_buy_orders(buys)
+    assert conversions == [], f"루프 중 DataFrame 변환 발생: {conversions}"
+
+    # flush 때만 1번
+    assert store.flush() == 1
+    assert conversions == ["to_frame"]
+    assert pd.read_csv(buy_path, dtype={"buy_uuid": str})["filled"].tolist()[0] == "done"
+
+
+def test_execute_buy_orders_with_table(monkeypatch):
+    sent = []
+
+    def fake_send_order(market, side, ord_type, unit_price, volume, **kwargs):
+        sent.append((market, side, ord_type, unit_price, volume))
+        return {"uuid": "5001", "rt_cd": "0"}
+
+    monkeypatch.setattr(order_executor, "send_order", fake_send_order)
+
+    table = OrderTable.from_frame(BuyOrder, make_buy_log())
+    result = order_executor.execute_buy_orders(table)
+
+    assert result is table, "테이블을 넘기면 같은 테이블을 돌려줘야 함"
+    assert sent == [("TQQQ", "BUY", "limit", 49.0, 2)]
+    order = table.get("5001")
+    assert order is not None and order.filled == "wait" and order.buy_type == "small_flow"
+
+    # DataFrame을 넘기면 DataFrame으로 반환 (기존 호출부 호환)
+    sent.clear()
+    frame = order_executor.execute_buy_orders(make_buy_log())
+    assert isinstance(frame, pd.DataFrame)
+    assert frame.loc[1, "buy_uuid"] == "5001" and frame.loc[1, "filled"] == "wait"
+
+
+def test_sell_table_pending_states():
+    table = OrderTable(SellOrder, [
+        SellOrder("TQQQ", 50.0, 3.0, 55.0, None, "update"),
+        SellOrder("SOXL", 20.0, 1.0, 22.0, "12", ""),
+    ])
+    assert [o.market for o in table.pending()] == ["SOXL"]
+    uuids = table.to_frame()["sell_uuid"]
+    assert pd.isna(uuids[0]) and uuids[1] == "12"
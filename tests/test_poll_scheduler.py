@@ -0,0 +1,173 @@
+# tests/test_poll_scheduler.py
+
+from api.order_history import OrderHistoryTracker
+from data.order_records import BuyOrder, SellOrder
+from manager.poll_scheduler import PollScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_scheduler(clock, quotes, budget=100.0, snapshots=None):
+    calls = []
+
+    def quote_fn(market, market_code):
+        calls.append(market)
+        return quotes[market]
+
+    def snapshot_fn(market, market_code):
+        return (snapshots or {}).get(market)
+
+    scheduler = PollScheduler(
+        min_interval=1.0, max_interval=30.0, sigma=3.0, default_vol=0.0005,
+        budget_per_sec=budget, quote_refresh_sec=1.0, quote_fn=quote_fn, snapshot_fn=snapshot_fn,
+        clock=clock,
+    )
+    scheduler.set_market_codes({m: "NASD" for m in quotes})
+    return scheduler, calls
+
+
+def buy(market, price, uuid):
+    return BuyOrder("2025-01-01", market, price, 100.0, 1, "small_flow", uuid, "wait")
+
+
+def test_near_orders_polled_every_tick_far_orders_rarely():
+    print("[TEST] 상태 조회 스케줄러 테스트 시작")
+    clock = FakeClock()
+    quotes = {"TQQQ": (99.9, 100.0)}
+    scheduler, _ = make_scheduler(clock, quotes)
+
+    near = buy("TQQQ", 99.95, "1")    # 호가와 0.05%
+    far = buy("TQQQ", 87.0, "2")      # 13% 아래 large_flow
+    orders = [near, far]
+
+    # 처음 보는 주문은 모두 바로 조회
+    assert scheduler.select(orders, "buy") == orders
+
+    polled = {"1": 0, "2": 0}
+    for _ in range(29):
+        clock.now += 1.0
+        for order in scheduler.select(orders, "buy"):
+            polled[order.uuid] += 1
+
+    assert polled["1"] == 29, "호가 근처 주문은 매 틱 조회"
+    assert polled["2"] == 0, "멀리 있는 주문은 최대 간격까지 대기"
+
+    clock.now += 1.0
+    assert far in scheduler.select(orders, "buy"), "최대 간격(30초)이 지나면 반드시 조회"
+
+    # 가격이 내려와 주문가에 닿으면 바로 조회
+    quotes["TQQQ"] = (86.9, 87.0)
+    clock.now += 1.0
+    assert far in scheduler.select(orders, "buy")
+
+    print("[TEST] 상태 조회 스케줄러 테스트 통과 ✅")
+
+
+def test_interval_grows_with_distance_and_shrinks_with_volatility():
+    scheduler = PollScheduler(min_interval=1.0, max_interval=30.0, sigma=3.0)
+
+    assert scheduler.interval_for(-0.01, 0.0005) == 1.0
+    assert scheduler.interval_for(0.001, 0.0005) < scheduler.interval_for(0.003, 0.0005)
+    assert scheduler.interval_for(0.003, 0.002) < scheduler.interval_for(0.003, 0.0005)
+    assert scheduler.interval_for(0.5, 0.0005) == 30.0
+
+    # 매도는 bid 기준 거리
+    assert PollScheduler.distance("sell", 101.0, 100.0, 100.1) == 0.01
+    assert PollScheduler.distance("buy", 101.0, 100.0, 100.1) < 0
+
+
+def test_budget_and_unknown_market():
+    clock = FakeClock()
+    scheduler, calls = make_scheduler(clock, {"TQQQ": (99.9, 100.0)}, budget=1.0)
+
+    orders = [buy("TQQQ", 99.95 - i * 0.01, str(i)) for i in range(5)]
+    orders.append(buy("SHNY", 10.0, "x"))   # market_code 모름 → 최소 간격
+
+    # 추적기 갱신 1회가 모든 대상 주문 상태를 정하므로 조회 시점이 된 주문은 전부 선택
+    chosen = scheduler.select(orders, "buy")
+    assert chosen == orders
+    assert calls == ["TQQQ"], "종목당 호가 1회"
+    assert scheduler.stats()["quote_requests"] == 1, "호가 직접 조회도 예산에서 차감"
+
+    # 요청 예산(HTTP 요청 수) 소진 → 추적기 갱신 불가 → 조회 대상 전부 다음 틱으로
+    scheduler.spend_requests(4)
+    clock.now += 1.0
+    assert scheduler.select(orders, "buy") == []
+    assert scheduler.stats()["deferred"] == 6
+    assert calls == ["TQQQ"], "예산 부족 → 호가 조회 안 함"
+    assert not scheduler.allow_refresh()
+
+    clock.now += 2.0
+    sell = SellOrder("TQQQ", 90.0, 3.0, 110.0, "s1", "wait")
+    assert scheduler.select([sell], "sell") == [sell]
+    assert scheduler.allow_refresh()
+
+
+def test_quotes_from_tick_snapshot_or_budget():
+    clock = FakeClock()
+    snapshots = {}
+    scheduler, calls = make_scheduler(clock, {"TQQQ": (99.9, 100.0)}, budget=1.0, snapshots=snapshots)
+    far = [buy("TQQQ", 87.0, "1"), buy("TQQQ", 86.0, "2")]
+
+    # 이번 틱 호가 캐시 스냅샷이 있으면 네트워크 조회 없이 사용
+    snapshots["TQQQ"] = (99.9, 100.0)
+    assert scheduler.select(far, "buy") == far
+    assert calls == [] and scheduler.stats()["budget"] == 3.0
+
+    # 스냅샷이 없고 조회 시점이 된 주문도 없으면 직전 간격 유지 (호가 조회 없음)
+    snapshots.clear()
+    for _ in range(29):
+        clock.now += 1.0
+        assert scheduler.select(far, "buy") == []
+    assert calls == []
+
+    # 간격(30초)이 지나면 그때만 호가 조회 1회 (예산 차감)
+    clock.now += 1.0
+    assert scheduler.select(far, "buy") == far
+    assert calls == ["TQQQ"] and scheduler.stats()["quote_requests"] == 1
+
+
+def test_tracker_refresh_throttled_to_due_orders():
+    print("[TEST] 스케줄러 → 체결/미체결 조회 요청 수 감소 테스트 시작")
+
+    class Broker:
+        """미체결 조회 1회 = HTTP 요청 1회"""
+        def __init__(self):
+            self.requests = 0
+
+        def fetch(self, open_only, symbol="", executed_only=False):
+            self.requests += 1
+            rows = [{"OrdNo": "1", "AstkIsuNo": "TQQQ", "AstkOrdStatCode": "1"},
+                    {"OrdNo": "2", "AstkIsuNo": "TQQQ", "AstkOrdStatCode": "1"}]
+            return rows, 0
+
+    def run(throttled: bool) -> int:
+        clock = FakeClock()
+        scheduler, _ = make_scheduler(clock, {"TQQQ": (99.9, 100.0)}, budget=1.0)
+        broker = Broker()
+        tracker = OrderHistoryTracker(broker.fetch, ttl=3600, throttle=scheduler if throttled else None)
+        orders = [buy("TQQQ", 87.0, "1"), buy("TQQQ", 86.0, "2")]   # 멀리 있는 large_flow 주문
+
+        for _ in range(60):
+            clock.now += 1.0
+            tracker.invalidate()    # 1틱 = 스냅샷 TTL 1회 만료
+            # 매수 체결 감지: 이번 틱 조회 대상만 상태 조회
+            due = scheduler.select(orders, "buy") if throttled else orders
+            if due:
+                tracker.states_for([o.uuid for o in due], "TQQQ")
+            # 외부 주문 정리: 매 틱 미체결 목록 확인
+            assert set(tracker.open_orders("TQQQ")) == {"1", "2"}
+        return broker.requests
+
+    baseline, throttled = run(False), run(True)
+    assert baseline == 60, "스케줄러 없이 매 틱 미체결 조회"
+    # 최초 전체 조회(1초) + 최대 간격(30초) 뒤 1회
+    assert throttled == 2, f"조회 요청 {throttled}회"
+
+    print("[TEST] 스케줄러 → 체결/미체결 조회 요청 수 감소 테스트 통과 ✅")
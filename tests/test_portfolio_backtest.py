@@ -0,0 +1,84 @@
+# tests/test_portfolio_backtest.py
+
+import numpy as np
+import pandas as pd
+
+from manager.backtest_engine import LadderParams, backtest_ladder
+from manager.portfolio_backtest import backtest_portfolio
+
+PARAMS = [
+    LadderParams("TSLL", 100.0, 0.01, 1, 0.03, 2, 0.02),
+    LadderParams("NVDL", 105.0, 0.01, 2, 0.02, 3, 0.015),
+    LadderParams("TQQQ", 120.0, 0.015, 1, 0.03, 4, 0.02),
+]
+
+
+def make_candles(n: int, seed: int, drift: float = 0.0, vol: float = 0.01, start: float = 50.0):
+    rng = np.random.default_rng(seed)
+    close = start * np.exp(np.cumsum(rng.normal(drift, vol, n)))
+    open_ = np.r_[start, close[:-1]] * np.exp(rng.normal(0, vol / 3, n))
+    return pd.DataFrame({
+        "time": pd.date_range("2024-01-02 09:30", periods=n, freq="min"),
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n))),
+        "low": np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n))),
+        "close": close,
+    })
+
+
+def single(df: pd.DataFrame, params: LadderParams, initial_cash: float):
+    return backtest_ladder(df["open"], df["high"], df["low"], df["close"], params, initial_cash=initial_cash)
+
+
+def test_single_market_matches_backtest_ladder():
+    print("[TEST] 포트폴리오 = 단일 종목 엔진 (1종목) 시작")
+
+    df = make_candles(300, seed=0, drift=-0.001)
+    for cash in (5_000_000, 600):    # 여유 현금 / 현금 부족으로 미체결 발생
+        fast = single(df, PARAMS[0], cash)
+        result = backtest_portfolio({"TSLL": df}, PARAMS[:1], initial_cash=cash)
+
+        assert result.trades["TSLL"] == fast.trades
+        for name in ("cash", "equity", "realized_pnl", "cum_fee"):
+            assert np.array_equal(getattr(result, name), getattr(fast, name)), f"{name} 동일"
+        assert np.array_equal(result.exposure, fast.cost_basis)
+
+    assert result.by_market().iloc[0]["cash_skips"] > 0, "현금 600 → 매수 미체결 발생"
+
+    print("[TEST] 포트폴리오 = 단일 종목 엔진 (1종목) 통과 ✅")
+
+
+def test_shared_cash_and_common_time_index():
+    print("[TEST] 포트폴리오 공유 현금 / 공통 시간축 시작")
+
+    candles = {p.market: make_candles(400, seed=i + 1, drift=-0.0005) for i, p in enumerate(PARAMS)}
+    # NVDL은 거래 없는 분 + 늦게 상장 → 공통 시간축에서 빈 칸
+    candles["NVDL"] = candles["NVDL"].drop(index=[50, 51, 52, 200]).iloc[30:].reset_index(drop=True)
+
+    # 현금이 넉넉하면 종목끼리 영향 없음 → 각자 단일 엔진과 같은 체결 (인덱스만 공통 시간축 기준)
+    rich = backtest_portfolio(candles, PARAMS, initial_cash=10_000_000)
+    assert len(rich.time) == 400
+    for p in PARAMS:
+        df = candles[p.market]
+        alone = single(df, p, 10_000_000)
+        index_map = np.searchsorted(rich.time, df["time"].to_numpy().astype("datetime64[s]"))
+        mapped = [(int(index_map[t.index]), t.side, t.order_type, t.price, t.qty) for t in alone.trades]
+        assert mapped == [(t.index, t.side, t.order_type, t.price, t.qty) for t in rich.trades[p.market]], p.market
+    assert rich.summary()["cash_skips"] == 0
+    assert rich.summary()["peak_holding"] == 3
+
+    # 현금을 줄이면 large_flow끼리 매수 여력을 다툼 → 미체결 발생, 현금은 음수가 되지 않음
+    tight_cash = 1_500
+    tight = backtest_portfolio(candles, PARAMS, initial_cash=tight_cash)
+    summary = tight.summary()
+    assert summary["cash_skips"] > 0 and summary["min_cash"] >= 0
+    assert np.all(tight.exposure <= tight_cash + tight.realized_pnl + 1e-9), "물린 원금 ≤ 시작 현금 + 실현 손익"
+    assert 0 < summary["avg_utilization"] <= summary["peak_utilization"] <= 1
+    assert np.allclose(tight.equity, tight.cash + tight.market_value)
+    assert summary["buys"] < rich.summary()["buys"]
+
+    by_market = tight.by_market()
+    assert by_market["market"].tolist() == [p.market for p in PARAMS]
+    assert by_market.set_index("market").loc["NVDL", "candles"] == len(candles["NVDL"])
+
+    print("[TEST] 포트폴리오 공유 현금 / 공통 시간축 통과 ✅")
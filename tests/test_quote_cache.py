@@ -0,0 +1,78 @@
+# tests/test_quote_cache.py
+
+from types import SimpleNamespace
+
+import pytest
+
+import api.quote_cache as quote_cache
+from api.quote_cache import QuoteCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """quote_cache 모듈의 time.monotonic만 수동 시계로 교체"""
+    now = [1000.0]
+    monkeypatch.setattr(quote_cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_hit_within_ttl_and_miss_after(clock):
+    print("[TEST] 호가 캐시 TTL 테스트 시작")
+
+    cache = QuoteCache(ttl=1.0)
+    calls = []
+
+    def loader():
+        calls.append(clock[0])
+        return {"Out": {"n": len(calls)}}
+
+    assert cache.get_or_load("tqqq", "FN", loader) == {"Out": {"n": 1}}
+    clock[0] += 0.9
+    assert cache.get_or_load("TQQQ ", "fn", loader) == {"Out": {"n": 1}}, "TTL 이내 + 대소문자/공백 무관 → 캐시"
+    assert len(calls) == 1
+
+    clock[0] += 0.1     # 저장 후 정확히 TTL 경과 → 만료
+    assert cache.get_or_load("TQQQ", "FN", loader) == {"Out": {"n": 2}}
+    assert len(calls) == 2
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+
+    print("[TEST] 호가 캐시 TTL 테스트 통과 ✅")
+
+
+def test_failures_not_cached(clock):
+    cache = QuoteCache(ttl=5.0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("timeout")
+        return {"Out": "ok"}
+
+    with pytest.raises(ConnectionError):
+        cache.get_or_load("SOXL", "FN", flaky)
+    assert cache.stats()["entries"] == 0, "실패 응답은 저장 안 함"
+
+    assert cache.get_or_load("SOXL", "FN", flaky) == {"Out": "ok"}, "바로 재조회"
+    assert cache.get_or_load("SOXL", "FN", flaky) == {"Out": "ok"}
+    assert len(attempts) == 2
+
+
+def test_keys_are_per_market_and_market_code(clock):
+    cache = QuoteCache(ttl=5.0)
+    cache.put("TQQQ", "FN", {"src": "FN"})
+    cache.put("TQQQ", "FA", {"src": "FA"})
+    cache.put("SOXL", "FN", {"src": "SOXL"})
+
+    assert cache.get("TQQQ", "FN") == {"src": "FN"}
+    assert cache.get("TQQQ", "FA") == {"src": "FA"}
+    assert cache.get("TQQQ", "FA1") is None, "시장 코드가 다르면 다른 키"
+
+    cache.invalidate("TQQQ", "FA")
+    assert cache.get("TQQQ", "FA") is None and cache.get("TQQQ", "FN") == {"src": "FN"}
+    cache.invalidate("TQQQ")
+    assert cache.get("TQQQ", "FN") is None and cache.get("SOXL", "FN") == {"src": "SOXL"}
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,36 @@
+# tests/test_rate_limiter.py
+
+from api.rate_limiter import TokenBucket, RateLimiter
+
+
+def test_token_bucket_only_waits_when_budget_used():
+    print("[TEST] TokenBucket 테스트 시작")
+
+    bucket = TokenBucket(rate=20, burst=3)
+
+    # burst 이내 → 대기 없음
+    waits = [bucket.reserve() for _ in range(3)]
+    assert waits == [0.0, 0.0, 0.0], f"❌ burst 이내인데 대기 발생: {waits}"
+
+    # 예산 소진 → 1/rate 만큼 대기
+    wait = bucket.reserve()
+    assert 0.04 <= wait <= 0.06, f"❌ 예상 대기시간(0.05s)과 다름: {wait}"
+
+    stats = bucket.stats()
+    assert stats["calls"] == 4
+    assert stats["waited_calls"] == 1
+
+    print("✅ TokenBucket 테스트 통과")
+
+
+def test_rate_limiter_families_are_independent():
+    limiter = RateLimiter({"quote": (10, 1), "order": (10, 1)})
+
+    assert limiter.reserve("quote") == 0.0
+    # quote 예산을 다 써도 order는 즉시 통과
+    assert limiter.reserve("order") == 0.0
+    assert limiter.reserve("quote") > 0
+
+    stats = limiter.stats()
+    assert stats["quote"]["waited_calls"] == 1
+    assert stats["order"]["waited_calls"] == 0
@@ -0,0 +1,116 @@
+# tests/test_single_flight.py
+
+import copy
+import time
+import asyncio
+import threading
+
+import api.db_usstocks as db
+from api.single_flight import SingleFlight
+
+
+def run_concurrently(n, target):
+    results, errors = [], []
+    barrier = threading.Barrier(n)
+
+    def worker():
+        barrier.wait()
+        try:
+            results.append(target())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_identical_concurrent_calls_share_one_request():
+    print("[TEST] 동일 요청 합치기 테스트 시작")
+
+    flight = SingleFlight(share=copy.deepcopy)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"Out": {"Prpr": "50.0"}}
+
+    key = SingleFlight.make_key("/quote", {"In": {"InputIscd1": "TQQQ"}})
+    results, errors = run_concurrently(8, lambda: flight.do(key, fetch, "quote"))
+
+    assert not errors
+    assert len(calls) == 1, "동시에 들어온 같은 요청은 HTTP 1회"
+    assert len(results) == 8 and all(r == {"Out": {"Prpr": "50.0"}} for r in results)
+    assert len({id(r) for r in results}) == 8, "대기자는 복사본을 받음"
+
+    stats = flight.stats()
+    assert stats["executed"] == 1 and stats["collapsed"] == 7
+    assert stats["by_family"]["quote"] == {"executed": 1, "collapsed": 7}
+    assert stats["in_flight"] == 0
+
+    # 끝난 요청은 캐시하지 않음
+    flight.do(key, fetch, "quote")
+    assert len(calls) == 2
+
+    print("[TEST] 동일 요청 합치기 테스트 통과 ✅")
+
+
+def test_errors_are_shared_and_keys_are_order_independent():
+    flight = SingleFlight()
+
+    def fail():
+        time.sleep(0.1)
+        raise RuntimeError("boom")
+
+    _, errors = run_concurrently(4, lambda: flight.do("k", fail))
+    assert len(errors) == 4 and all("boom" in str(e) for e in errors)
+
+    assert SingleFlight.make_key("/p", {"a": 1, "b": 2}) == SingleFlight.make_key("/p", {"b": 2, "a": 1})
+    assert SingleFlight.make_key("/p", {"a": 1}) != SingleFlight.make_key("/p", {"a": 2})
+
+
+def test_db_post_never_collapses_orders(monkeypatch):
+    calls = []
+
+    def fake_post(path, body, headers=None):
+        calls.append(path)
+        time.sleep(0.1)
+        return path
+
+    monkeypatch.setattr(db._gateway, "post", fake_post)
+
+    body = {"In": {"AstkIsuNo": "TQQQ"}}
+    run_concurrently(3, lambda: db._post(db.PATH_ORDER, body))
+    assert calls.count(db.PATH_ORDER) == 3, "주문은 합치지 않음"
+
+    run_concurrently(3, lambda: db._post(db.PATH_BALANCE, db.BALANCE_BODY))
+    assert calls.count(db.PATH_BALANCE) == 1
+
+    assert db.get_single_flight_stats()["by_family"]["inquiry"]["collapsed"] >= 2
+
+
+def test_async_calls_share_one_request():
+    flight = SingleFlight(share=copy.deepcopy)
+    calls = []
+
+    async def fetch(tag):
+        calls.append(tag)
+        await asyncio.sleep(0.05)
+        return {"tag": tag}
+
+    async def run():
+        key = flight.make_key("/quote/orderbook", {"In": {"InputIscd1": "TQQQ"}})
+        same = [flight.do_async(key, lambda: fetch("TQQQ"), "quote") for _ in range(4)]
+        other = flight.do_async("other", lambda: fetch("SOXL"), "quote")
+        return await asyncio.gather(*same, other)
+
+    results = asyncio.run(run())
+    assert calls == ["TQQQ", "SOXL"]
+    assert results[:4] == [{"tag": "TQQQ"}] * 4 and results[0] is not results[1], "대기자는 복사본"
+
+    stats = flight.stats()
+    assert (stats["executed"], stats["collapsed"], stats["in_flight"]) == (2, 3, 0)
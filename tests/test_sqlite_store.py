@@ -0,0 +1,74 @@
+# tests/test_sqlite_store.py
+
+import pandas as pd
+
+from data.sqlite_store import SqliteStateStore, export_csv
+
+
+def _buy_row(minute, buy_type, price, uuid="", filled=""):
+    return {
+        "time": f"2025-01-01 00:{minute:02d}:00", "market": "TQQQ", "target_price": price,
+        "buy_amount": price * 2, "buy_units": 2, "buy_type": buy_type,
+        "buy_uuid": uuid, "filled": filled,
+    }
+
+
+def test_sqlite_store_row_level_sync(tmp_path):
+    print("[TEST] SqliteStateStore 테스트 시작")
+
+    buy_path = str(tmp_path / "buy_log.csv")
+    sell_path = str(tmp_path / "sell_log.csv")
+    db_path = str(tmp_path / "state.db")
+
+    pd.DataFrame([
+        _buy_row(0, "initial", 50.0, "100", "done"),
+        _buy_row(1, "small_flow", 49.0),
+        _buy_row(1, "large_flow", 48.0),
+    ]).to_csv(buy_path, index=False)
+    pd.DataFrame(columns=[
+        "market", "avg_buy_price", "quantity", "target_sell_price", "sell_uuid", "filled"
+    ]).to_csv(sell_path, index=False)
+
+    # 1) DB가 비어 있으면 CSV에서 최초 1회 가져옴
+    store = SqliteStateStore(db_path=db_path, buy_path=buy_path, sell_path=sell_path)
+    assert len(store.buy_log()) == 3
+
+    # 2) uuid 부여 + 1행 삭제 + 1행 추가 → 파일 재작성 없이 row 단위 반영
+    df = store.buy_log()
+    df.loc[1, "buy_uuid"] = "101"
+    df.loc[1, "filled"] = "wait"
+    df = df.drop(index=2)
+    df = pd.concat([df, pd.DataFrame([_buy_row(2, "large_flow", 47.5, "102", "wait")])], ignore_index=True)
+    store.set_buy_log(df)
+    store.flush()
+
+    assert store.row_ops == {"insert": 1, "update": 1, "delete": 1, "fills": 0}
+
+    # 3) 상태만 바뀜 → UPDATE 1건
+    df = store.buy_log()
+    df.loc[df["buy_uuid"] == "101", "filled"] = "done"
+    store.set_buy_log(df)
+    store.flush()
+    assert store.row_ops["update"] == 2
+    assert store.find_by_uuid("101")["filled"] == "done"
+    assert len(store.market_rows("TQQQ", "large_flow")) == 1
+
+    # 4) 체결 이력은 같은 uuid 중복 기록 안 함
+    assert store.record_fill("buy", "TQQQ", "101", price=49.0, units=2) == 1
+    assert store.record_fill("buy", "TQQQ", "101", price=49.0, units=2) == 0
+    assert len(store.fill_events("TQQQ")) == 1
+
+    expected = store.buy_log()
+    store.close()
+
+    # 5) 재시작 → DB에서 그대로 복원, CSV로 내보내면 같은 컬럼 구성
+    reopened = SqliteStateStore(db_path=db_path, buy_path=buy_path, sell_path=sell_path)
+    pd.testing.assert_frame_equal(reopened.buy_log(), expected)
+    reopened.close()
+
+    export_csv(db_path, buy_path=buy_path, sell_path=sell_path)
+    exported = pd.read_csv(buy_path, dtype={"buy_uuid": str})
+    assert exported.columns.tolist() == expected.columns.tolist()
+    assert exported["buy_uuid"].tolist() == ["100", "101", "102"]
+
+    print("✅ SqliteStateStore 테스트 통과")
@@ -0,0 +1,54 @@
+# tests/test_state_store.py
+
+import os
+import pandas as pd
+
+from data.state_store import StateStore
+
+
+def test_state_store_flushes_only_dirty_logs(tmp_path):
+    print("[TEST] StateStore 테스트 시작")
+
+    buy_path = str(tmp_path / "buy_log.csv")
+    sell_path = str(tmp_path / "sell_log.csv")
+
+    pd.DataFrame([{
+        "time": "2025-01-01 00:00:00", "market": "TQQQ", "target_price": 50.0,
+        "buy_amount": 100.0, "buy_units": 1, "buy_type": "initial",
+        "buy_uuid": "31161743", "filled": "done",
+    }]).to_csv(buy_path, index=False)
+    pd.DataFrame(columns=[
+        "market", "avg_buy_price", "quantity", "target_sell_price", "sell_uuid", "filled"
+    ]).to_csv(sell_path, index=False)
+
+    store = StateStore(buy_path=buy_path, sell_path=sell_path)
+    sell_mtime = os.stat(sell_path).st_mtime_ns
+
+    # 1) 읽기는 복사본 → 호출 측 수정이 저장소에 새지 않음
+    buy_df = store.buy_log()
+    buy_df.loc[0, "filled"] = "update"
+    assert store.buy_log().loc[0, "filled"] == "done"
+    assert store.flush() == 0
+
+    # 2) 쓰기 → CSV 재로드와 같은 형태로 정규화 (빈 uuid → NaN, 31161743.0 → "31161743")
+    buy_df = pd.concat([buy_df, pd.DataFrame([{
+        "time": "2025-01-01 00:01:00", "market": "TQQQ", "target_price": 49.0,
+        "buy_amount": 98.0, "buy_units": 2, "buy_type": "small_flow",
+        "buy_uuid": "", "filled": "",
+    }])], ignore_index=True)
+    buy_df.loc[0, "buy_uuid"] = "31161743.0"
+    saved = store.set_buy_log(buy_df)
+
+    assert saved.loc[0, "buy_uuid"] == "31161743"
+    assert pd.isna(saved.loc[1, "buy_uuid"]), "빈 uuid는 신규 주문(NaN)으로 보여야 함"
+    assert pd.isna(saved.loc[1, "filled"])
+
+    # 3) flush → dirty인 buy_log만 저장
+    assert store.flush() == 1
+    assert store.flush() == 0
+    assert os.stat(sell_path).st_mtime_ns == sell_mtime
+
+    reloaded = StateStore(buy_path=buy_path, sell_path=sell_path).buy_log()
+    pd.testing.assert_frame_equal(reloaded, store.buy_log())
+
+    print("✅ StateStore 테스트 통과")
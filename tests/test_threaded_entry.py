@@ -0,0 +1,87 @@
+# tests/test_threaded_entry.py
+
+import time
+import threading
+import pandas as pd
+
+import strategy.threaded_entry as threaded_entry
+from data.state_store import StateStore
+
+
+def make_store(tmp_path) -> StateStore:
+    buy_path = str(tmp_path / "buy_log.csv")
+    sell_path = str(tmp_path / "sell_log.csv")
+    pd.DataFrame([
+        {"time": "2025-01-01", "market": m, "target_price": 10.0, "buy_amount": 100.0,
+         "buy_units": 1, "buy_type": "initial", "buy_uuid": f"{i}", "filled": "wait"}
+        for i, m in enumerate(["TQQQ", "SHNY", "SOXL"])
+    ]).to_csv(buy_path, index=False)
+    pd.DataFrame(columns=[
+        "market", "avg_buy_price", "quantity", "target_sell_price", "sell_uuid", "filled"
+    ]).to_csv(sell_path, index=False)
+    return StateStore(buy_path=buy_path, sell_path=sell_path)
+
+
+def test_market_scope_keeps_other_workers_changes(tmp_path):
+    print("[TEST] market_scope 테스트 시작")
+    store = make_store(tmp_path)
+    barrier = threading.Barrier(2)
+
+    def worker(market, uuid):
+        with store.market_scope([market]):
+            orders = store.buy_orders()          # 두 스레드가 같은 시점 상태를 읽음
+            barrier.wait()
+            order = orders.by_market(market)[0]
+            order.filled = "done"
+            orders.set_uuid(order, uuid)
+            store.set_buy_orders(orders)
+
+    threads = [
+        threading.Thread(target=worker, args=("TQQQ", "100")),
+        threading.Thread(target=worker, args=("SOXL", "300")),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    orders = store.buy_orders()
+    assert orders.get("100").market == "TQQQ" and orders.get("100").filled == "done"
+    assert orders.get("300").market == "SOXL" and orders.get("300").filled == "done"
+    assert orders.by_market("SHNY")[0].filled == "wait", "담당 밖 종목 행이 바뀌면 안 됨"
+    assert len(orders) == 3
+
+    print("[TEST] market_scope 테스트 통과 ✅")
+
+
+class FakeState:
+    def __init__(self):
+        self.open_now = True
+        self.market_closed_cleanup_done = False
+        self.setting_df = pd.DataFrame([{"market": "TQQQ"}, {"market": "SHNY"}])
+
+
+def test_slow_symbol_does_not_stall_others(monkeypatch, tmp_path):
+    store = make_store(tmp_path)
+    monkeypatch.setattr(threaded_entry, "get_state_store", lambda: store)
+    monkeypatch.setattr(threaded_entry, "EntryState", FakeState)
+
+    def slow_or_failing_tick(self, loop_start):
+        if self.market == "SHNY":
+            time.sleep(0.5)
+            raise RuntimeError("spread too wide")
+
+    monkeypatch.setattr(threaded_entry.SymbolWorker, "run_tick", slow_or_failing_tick)
+
+    engine = threaded_entry.ThreadedEntry(tick_sec=0.05)
+    engine.ensure_workers()
+    engine.open_event.set()
+    time.sleep(0.6)
+    engine.stop_event.set()
+    for worker in engine.workers.values():
+        worker.join(timeout=3)
+
+    report = engine.latency_report()
+    assert report["TQQQ"]["ticks"] >= 5, f"TQQQ 루프가 SHNY에 막힘: {report}"
+    assert report["TQQQ"]["errors"] == 0
+    assert report["SHNY"]["errors"] >= 1 and report["SHNY"]["max_ms"] >= 500
@@ -0,0 +1,229 @@
+# tests/test_vectorized_buy_orders.py
+
+import random
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy.casino_strategy import generate_buy_orders
+from benchmarks.legacy_casino_strategy import generate_buy_orders_legacy
+from tests import test_generate_buy_orders
+
+COLUMNS = ["time", "market", "target_price", "buy_amount", "buy_units", "buy_type", "buy_uuid", "filled"]
+
+
+def setting(market, small_pct=0.02, large_pct=0.05, unit_size=100):
+    return {"market": market, "unit_size": unit_size, "small_flow_pct": small_pct, "small_flow_units": 1,
+            "large_flow_pct": large_pct, "large_flow_units": 2, "take_profit_pct": 0.03, "market_code": "FN"}
+
+
+def row(market, buy_type, target, uuid, filled, amount=100.0, units=1.0):
+    return {"time": "2025-01-01", "market": market, "target_price": target, "buy_amount": amount,
+            "buy_units": units, "buy_type": buy_type, "buy_uuid": uuid, "filled": filled}
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=COLUMNS).astype({"buy_uuid": object, "filled": object})
+
+
+def state(df, idx):
+    r = df.loc[idx]
+    return r["target_price"], (None if pd.isna(r["buy_uuid"]) else r["buy_uuid"]), r["filled"]
+
+
+def test_flow_state_transitions():
+    print("[TEST] flow 주문 상태 전이 (고정 기대값) 시작")
+
+    setting_df = pd.DataFrame([setting("AAA"), setting("BBB"), setting("CCC"), setting("DDD"), setting("EEE")])
+    buy_log_df = frame([
+        row("AAA", "initial", 100.0, "I1", "done"),             # 0
+        row("AAA", "small_flow", 101.0, None, ""),              # 1 개장 재산출: 현재가 < 기존가
+        row("AAA", "large_flow", 90.0, None, ""),               # 2 개장: 기존가 유지, update만
+        row("AAA", "small_flow", 97.0, "W1", "wait"),           # 3 wait: 상승 → 재조정
+        row("AAA", "large_flow", 96.0, "W2", "wait"),           # 4 wait: 트리거 미달 → 유지
+        row("AAA", "small_flow", 99.0, "D1", "done"),           # 5 done: 한 칸 아래
+        row("AAA", "large_flow", 95.0, "C1", "cancel"),         # 6 cancel: 초기화
+        row("AAA", "small_flow", 95.0, "M1", ""),               # 7 수동 주문: 그대로
+        row("BBB", "initial", 50.0, "I2", "done"),              # 8
+        row("BBB", "large_flow", 40.0, "W3", "wait"),           # 9  ┐ 뒤의 급락 row가 종목 전체를
+        row("BBB", "small_flow", 49.0, "W4", "wait"),           # 10 │ 현재가 기준으로 덮어씀
+        row("BBB", "small_flow", 60.0, "D2", "done"),           # 11 ┘ 급락: 다음 칸 58.8 > 현재가 50
+        row("DDD", "small_flow", 10.0, "W5", "wait"),           # 12 initial 없음 → 손대지 않음
+    ])
+    prices = {"AAA": 100.0, "BBB": np.float64(50.0), "CCC": 200, "DDD": 30.0}
+
+    result = generate_buy_orders(setting_df, buy_log_df, prices)
+
+    expected = {
+        0: (100.0, "I1", "done"),
+        1: (98.0, None, "update"),
+        2: (90.0, None, "update"),
+        3: (97.97, "W1", "update"),      # 97 / 0.98 × 1.01 = 99.97 < 100 → 99.97 × 0.98
+        4: (96.0, "W2", "wait"),
+        5: (97.02, None, "update"),
+        6: (95.0, None, ""),
+        7: (95.0, "M1", ""),
+        8: (50.0, "I2", "done"),
+        9: (47.5, None, "update"),
+        10: (49.0, None, "update"),
+        11: (49.0, None, "update"),
+        12: (10.0, "W5", "wait"),
+    }
+    for idx, values in expected.items():
+        assert state(result, idx) == values, f"{idx}행 기대값 {values}"
+        assert state(buy_log_df, idx) == values, f"{idx}행 제자리 수정"
+
+    # 상황1: flow 없는 종목 → 신규 small/large (정수 현재가도 float 가격), EEE는 현재가 없음 → 생성 안 함
+    new = result.iloc[len(buy_log_df):]
+    assert new[["market", "buy_type", "target_price", "buy_amount", "buy_units", "filled"]].values.tolist() == [
+        ["CCC", "small_flow", 196.0, 100, 1, "update"],
+        ["CCC", "large_flow", 190.0, 200, 2, "update"],
+    ]
+    assert all(isinstance(p, float) for p in new["target_price"])
+
+    print("[TEST] flow 주문 상태 전이 (고정 기대값) 통과 ✅")
+
+
+@pytest.mark.parametrize("price", [1.7, np.float64(1.7)])
+def test_one_rounding_rule_for_any_price_type(price):
+    """1.7 × 0.95 = 1.615 (float로는 1.61499…) → 호출 측 타입과 무관하게 round(x, 2) = 1.61"""
+    setting_df = pd.DataFrame([setting("AAA"), setting("BBB")])
+    buy_log_df = frame([
+        row("AAA", "initial", 2.0, "I1", "done"),
+        row("AAA", "large_flow", 1.9, "D1", "done"),        # 다음 칸 1.8 > 1.7 → 급락 재설정
+        row("AAA", "small_flow", 1.9, "W1", "wait"),
+    ])
+
+    result = generate_buy_orders(setting_df, buy_log_df, {"AAA": price, "BBB": price})
+
+    assert result.loc[1, "target_price"] == 1.61 and result.loc[2, "target_price"] == 1.67
+    new = result[result["market"] == "BBB"]
+    assert new["target_price"].tolist() == [1.67, 1.61]
+
+
+def test_int_columns_are_widened_and_initial_only():
+    setting_df = pd.DataFrame([setting("AAA"), setting("BBB", unit_size=250)])
+    buy_log_df = pd.DataFrame([
+        {"time": "2025-01-01", "market": "AAA", "target_price": 100, "buy_amount": 100, "buy_units": 1,
+         "buy_type": "initial", "buy_uuid": "I1", "filled": "done"},
+        {"time": "2025-01-01", "market": "AAA", "target_price": 99, "buy_amount": 100, "buy_units": 1,
+         "buy_type": "small_flow", "buy_uuid": "D1", "filled": "done"},
+    ])
+
+    result = generate_buy_orders(setting_df, buy_log_df, {"AAA": 100, "BBB": np.float64(30.5)})
+    assert buy_log_df["target_price"].dtype == float, "정수 가격 컬럼 → float64로 넓힌 뒤 제자리 수정"
+    assert result.loc[1, "target_price"] == 97.02
+
+    initial = generate_buy_orders(setting_df, result, {"AAA": 100, "BBB": np.float64(30.5)}, mode="initial_only")
+    added = initial.iloc[len(result):]
+    assert added[["market", "target_price", "buy_amount", "buy_type"]].values.tolist() == [
+        ["BBB", 30.5, 250, "initial"],
+    ], "AAA는 initial 존재 → 생성 안 함"
+    assert type(added.iloc[0]["target_price"]) is float
+
+
+def test_duplicate_settings_see_previous_updates():
+    # 같은 종목이 setting에 두 번 → 두 번째는 첫 번째가 고친 buy_log를 보고 처리
+    # (cancel → uuid/filled 초기화 → 두 번째에서 개장 재산출 대상)
+    logs = [row("AAA", "initial", 100.0, "I1", "done"), row("AAA", "small_flow", 101.0, "C1", "cancel")]
+
+    once = generate_buy_orders(pd.DataFrame([setting("AAA")]), frame(logs), {"AAA": 100.0})
+    assert state(once, 1) == (101.0, None, ""), "setting 1번이면 초기화까지만"
+
+    twice = generate_buy_orders(pd.DataFrame([setting("AAA"), setting("AAA")]), frame(logs), {"AAA": 100.0})
+    assert state(twice, 1) == (98.0, None, "update")
+
+
+@pytest.mark.parametrize("bad,message", [
+    ({"filled": "update"}, "filled 상태가 예외적입니다: 'update'"),
+    ({"target_price": np.nan}, "누락된 값"),
+    ({"target_price": "abc"}, "target_price가 숫자가 아닙니다: 'abc'"),
+    ({"buy_uuid": "M9", "buy_type": "small_flow", "market": "AAA", "buy_amount": ""}, "수동 주문에 누락된 필드"),
+])
+def test_invalid_row_raises_without_partial_updates(bad, message):
+    setting_df = pd.DataFrame([setting("AAA")])
+    rows = [
+        row("AAA", "initial", 100.0, "I1", "done"),
+        row("AAA", "small_flow", 99.0, "D1", "done"),       # 잘못된 row보다 앞 → 그래도 수정 안 됨
+        {**row("AAA", "large_flow", 90.0, "W1", "wait"), **bad},
+    ]
+    if bad.get("buy_uuid") == "M9":
+        rows[-1]["filled"] = ""
+    buy_log_df = pd.DataFrame(rows, columns=COLUMNS).astype(
+        {"buy_uuid": object, "filled": object, "target_price": object, "buy_amount": object}
+    )
+    before = buy_log_df.copy()
+
+    with pytest.raises(ValueError, match=message):
+        generate_buy_orders(setting_df, buy_log_df, {"AAA": 100.0})
+    pd.testing.assert_frame_equal(buy_log_df, before)
+
+
+# ============================================================
+# 기존 row 루프(benchmarks/legacy_casino_strategy.py)와 결과 동일성
+# - 현재가는 파이썬 int / float (np.float64 현재가의 반올림은 의도한 변경 → 위 고정 기대값 테스트)
+# - 기존 루프는 pandas 3에서 정수 가격 컬럼에 float를 못 넣으므로 기존 쪽은 float 컬럼으로 실행
+#   (정수 컬럼 처리는 test_int_columns_are_widened_and_initial_only)
+# ============================================================
+def make_random_scenario(seed: int, n_markets: int = 30, rows_per_type: int = 2):
+    """무작위 setting / buy_log / 현재가 (모든 flow 상태 + 현재가 없음 / flow 없음 / initial 없음 종목)"""
+    rng = random.Random(seed)
+    settings, logs, prices = [], [], {}
+
+    for i in range(n_markets):
+        market = f"SYM{i:03d}"
+        small_pct = rng.choice([0.01, 0.02, 0.03, 0.05])
+        large_pct = rng.choice([0.05, 0.07, 0.1])
+        settings.append({
+            "market": market, "unit_size": rng.choice([100, 250.5]),
+            "small_flow_pct": small_pct, "small_flow_units": rng.choice([1, 2]),
+            "large_flow_pct": large_pct, "large_flow_units": rng.choice([2, 3]),
+            "take_profit_pct": 0.1, "market_code": "NASD",
+        })
+
+        base = rng.uniform(5, 500)
+        kind = rng.random()
+        if kind < 0.05:
+            continue                     # 현재가 없음
+        prices[market] = round(base * rng.uniform(0.8, 1.2), 2)
+
+        if kind < 0.15:
+            continue                     # 상황1: flow 주문 없음
+
+        if kind > 0.2:
+            logs.append(row(market, "initial", base, f"I{i}", "done"))
+
+        for buy_type, pct in (("small_flow", small_pct), ("large_flow", large_pct)):
+            for k in range(rng.randint(1, rows_per_type)):
+                target = round(base * (1 - pct) * rng.uniform(0.9, 1.1), 2)
+                uuid, filled = rng.choice([
+                    (None, ""), (f"W{i}{k}", "wait"), (f"D{i}{k}", "done"),
+                    (f"C{i}{k}", "cancel"), (f"M{i}{k}", ""),
+                ])
+                logs.append(row(market, buy_type, target, uuid, filled, units=2.0))
+
+    rng.shuffle(logs)
+    return pd.DataFrame(settings), frame(logs), prices
+
+
+SCENARIOS = {
+    "test_generate_buy_orders": test_generate_buy_orders.make_scenario,
+    **{f"random-{seed}": (lambda seed=seed: make_random_scenario(seed)) for seed in range(10)},
+}
+
+
+@pytest.mark.parametrize("mode", ["normal", "initial_only"])
+@pytest.mark.parametrize("name", list(SCENARIOS))
+def test_matches_row_loop(name, mode):
+    setting_df, buy_log_df, prices = SCENARIOS[name]()
+
+    legacy_input = buy_log_df.astype({"target_price": float})
+    new_input = buy_log_df.astype({"target_price": float})
+
+    expected = generate_buy_orders_legacy(setting_df, legacy_input, prices, mode=mode)
+    actual = generate_buy_orders(setting_df, new_input, prices, mode=mode)
+
+    # 신규 row의 time은 호출 시각이라 비교 제외
+    cols = [c for c in COLUMNS if c != "time"]
+    pd.testing.assert_frame_equal(actual[cols], expected[cols])
+    pd.testing.assert_frame_equal(new_input, legacy_input, obj="제자리 수정된 buy_log")
@@ -0,0 +1,39 @@
+# utils/csv_utils.py
+
+import os
+import time
+import pandas as pd
+
+from utils.metrics import observe_csv_save
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+
+def atomic_save(df: pd.DataFrame, path: str, retry: int = 5, delay: float = 0.5):
+    """
+    CSV 저장의 atomic 버전.
+    - 파일 잠김(WinError 5)이면 delay 후 재시도
+    - retry 횟수 초과 시 예외 발생
+    """
+    start = time.perf_counter()
+    tmp = path + ".tmp"
+    df.to_csv(tmp, index=False)
+
+    for i in range(retry):
+        try:
+            os.replace(tmp, path)
+            observe_csv_save(path, (time.perf_counter() - start) * 1000)
+            return  # 성공 시 종료
+        except PermissionError as e:
+            # Windows 파일 점유 문제 → 재시도
+            if i < retry - 1:
+                log.warning(f"⚠️ [atomic_save] 파일 잠김 → 재시도 {i+1}/{retry} (대기 {delay}s) → {path}")
+                time.sleep(delay)
+                continue
+            else:
+                log.error(f"❌ [atomic_save] 재시도 실패 → 저장 불가 ({path})")
+                raise e
+        except Exception as e:
+            # 다른 예외는 그대로
+            raise e
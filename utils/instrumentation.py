@@ -0,0 +1,269 @@
+# utils/instrumentation.py
+
+import os
+import json
+import time
+import threading
+import functools
+from contextlib import contextmanager
+from datetime import datetime
+from dotenv import load_dotenv
+
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+load_dotenv()
+
+# ==========================================
+# 환경 변수
+# ==========================================
+INSTRUMENT_ENABLED = os.getenv("INSTRUMENT_ENABLED", "1").strip() not in ("0", "false", "False")
+
+# 히스토그램 덤프 파일 (JSON lines, 덤프마다 1줄 추가)
+INSTRUMENT_FILE = os.getenv("INSTRUMENT_FILE", "instrumentation.jsonl")
+
+# 덤프 주기(초) – 덤프할 때마다 구간(window) 히스토그램은 초기화, 누적(total)은 유지
+INSTRUMENT_DUMP_SEC = float(os.getenv("INSTRUMENT_DUMP_SEC", "60"))
+
+# 히스토그램 구간 상한(ms) – 마지막 칸은 그 이상 전부
+BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class Histogram:
+    """고정 구간(ms) 히스토그램 – 메모리 일정, 분위수는 구간 상한으로 근사"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms: float):
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(BUCKETS_MS[i], self.max) if i < len(BUCKETS_MS) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 3),
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max, 3),
+            "buckets": dict(zip([str(b) for b in BUCKETS_MS] + ["inf"], self.counts)),
+        }
+
+
+class _Series:
+    """구간(window) + 누적(total) 히스토그램 한 쌍 + 부가 카운터"""
+
+    __slots__ = ("window", "total", "calls", "errors")
+
+    def __init__(self):
+        self.window = Histogram()
+        self.total = Histogram()
+        self.calls = 0      # 단계: 증권사 호출 수 / 엔드포인트: 미사용
+        self.errors = 0
+
+    def add(self, ms: float):
+        self.window.add(ms)
+        self.total.add(ms)
+
+
+class Instrumentation:
+    """
+    메인 루프 단계별 계측
+    - phase(name): 단계 소요시간(벽시계) + 그 단계 안에서 나간 증권사 호출 수
+    - timed(name): phase의 데코레이터 버전
+    - record_call(endpoint, ms, ok): 증권사 호출 1건 (게이트웨이에서 호출)
+      → 엔드포인트별 지연 히스토그램 + 현재 스레드가 실행 중인 단계들의 호출 수
+    - maybe_dump(): INSTRUMENT_DUMP_SEC마다 INSTRUMENT_FILE에 1줄(JSON) 추가 후 구간 초기화
+    - 종목별 워커 스레드에서 동시에 불러도 안전 (단계 스택은 스레드별)
+    """
+
+    def __init__(self, path: str = INSTRUMENT_FILE, dump_sec: float = INSTRUMENT_DUMP_SEC,
+                 enabled: bool = INSTRUMENT_ENABLED, clock=time.monotonic):
+        self.path = path
+        self.dump_sec = dump_sec
+        self.enabled = enabled
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._phases = {}
+        self._endpoints = {}
+        self._window_started = clock()
+        self._last_dump = clock()
+        self.dumps = 0
+
+    # ------------------------------------------
+    # 기록
+    # ------------------------------------------
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        stack = self._stack()
+        frame = [name, 0]       # [단계명, 이 단계 안의 증권사 호출 수]
+        stack.append(frame)
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            stack.pop()
+            with self._lock:
+                series = self._phases.get(name)
+                if series is None:
+                    series = self._phases[name] = _Series()
+                series.add(ms)
+                series.calls += frame[1]
+                if failed:
+                    series.errors += 1
+
+    def timed(self, name: str = None):
+        def decorator(func):
+            label = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.phase(label):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record_call(self, endpoint: str, ms: float, ok: bool = True):
+        if not self.enabled:
+            return
+
+        for frame in self._stack():
+            frame[1] += 1
+
+        with self._lock:
+            series = self._endpoints.get(endpoint)
+            if series is None:
+                series = self._endpoints[endpoint] = _Series()
+            series.add(ms)
+            series.calls += 1
+            if not ok:
+                series.errors += 1
+
+    # ------------------------------------------
+    # 조회 / 덤프
+    # ------------------------------------------
+    @staticmethod
+    def _summarize(items: dict, which: str) -> dict:
+        out = {}
+        for name, series in items.items():
+            hist = getattr(series, which)
+            summary = hist.summary()
+            if not summary["count"]:
+                continue
+            summary["errors"] = series.errors
+            out[name] = summary
+        return out
+
+    def snapshot(self, which: str = "total") -> dict:
+        """which: "total"(시작 이후 누적) | "window"(마지막 덤프 이후)"""
+        with self._lock:
+            phases = self._summarize(self._phases, which)
+            for name, summary in phases.items():
+                if which == "total":
+                    series = self._phases[name]
+                    summary["broker_calls"] = series.calls
+                    summary["broker_calls_per_run"] = round(series.calls / summary["count"], 2)
+            return {
+                "phases": phases,
+                "endpoints": self._summarize(self._endpoints, which),
+            }
+
+    def dump(self) -> dict:
+        """구간 스냅샷을 파일에 1줄 추가하고 구간 히스토그램 초기화"""
+        now = self._clock()
+        record = {
+            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "window_sec": round(now - self._window_started, 3),
+            **self.snapshot("window"),
+        }
+
+        with self._lock:
+            for series in list(self._phases.values()) + list(self._endpoints.values()):
+                series.window = Histogram()
+            self._window_started = now
+            self._last_dump = now
+            self.dumps += 1
+
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            log.warning(f"⚠️ [instrumentation] 덤프 실패 ({self.path}): {e}")
+        return record
+
+    def maybe_dump(self) -> bool:
+        if not self.enabled or self.dump_sec <= 0:
+            return False
+        if self._clock() - self._last_dump < self.dump_sec:
+            return False
+        self.dump()
+        return True
+
+    def reset(self):
+        with self._lock:
+            self._phases.clear()
+            self._endpoints.clear()
+            self._window_started = self._clock()
+
+
+_INSTRUMENTATION = Instrumentation()
+
+
+def get_instrumentation() -> Instrumentation:
+    return _INSTRUMENTATION
+
+
+def phase(name: str):
+    """with phase("detect_filled_buy_orders"): ..."""
+    return _INSTRUMENTATION.phase(name)
+
+
+def timed(name: str = None):
+    """@timed() / @timed("이름")"""
+    return _INSTRUMENTATION.timed(name)
+
+
+def record_call(endpoint: str, ms: float, ok: bool = True):
+    _INSTRUMENTATION.record_call(endpoint, ms, ok)
@@ -0,0 +1,184 @@
+# utils/logger.py
+
+import os
+import sys
+import copy
+import json
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ==========================================
+# 환경 변수
+# ==========================================
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# JSON lines 로그 파일 (크기 기준 회전: casino.jsonl → casino.jsonl.1 ...)
+LOG_FILE = os.getenv("LOG_FILE", "logs/casino.jsonl")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+
+# 콘솔 출력 (기존 print와 같은 한 줄 메시지). 0이면 파일에만 기록
+LOG_CONSOLE = os.getenv("LOG_CONSOLE", "1").strip() not in ("0", "false", "False")
+LOG_CONSOLE_LEVEL = os.getenv("LOG_CONSOLE_LEVEL", LOG_LEVEL).upper()
+
+# 행 단위 debug 로그는 같은 key 기준 N건 중 1건만 기록 (1이면 전부)
+LOG_SAMPLE_EVERY = max(1, int(os.getenv("LOG_SAMPLE_EVERY", "100")))
+
+ROOT_NAME = "casino"
+
+# LogRecord 기본 속성 – 이 외의 속성(extra=...)은 JSON 필드로 기록
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "sample_key"}
+
+
+class JsonFormatter(logging.Formatter):
+    """1 record → 1 JSON 줄 (ts, level, logger, thread, msg + extra 필드)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                data[key] = value
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """
+    extra=sample(key)가 붙은 record는 key별로 every건 중 1건만 통과 (첫 건은 항상 통과)
+    - 호출 스레드에서 실행 → 버려지는 record는 큐에도 들어가지 않음
+    """
+
+    def __init__(self, every: int = LOG_SAMPLE_EVERY):
+        super().__init__()
+        self.every = every
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample_key", None)
+        if key is None or self.every <= 1:
+            return True
+        with self._lock:
+            n = self._seen.get(key, 0)
+            self._seen[key] = n + 1
+        if n % self.every:
+            return False
+        record.sampled_every = self.every
+        return True
+
+
+class _QueueHandler(QueueHandler):
+    """메시지/예외를 호출 스레드에서 문자열로 확정한 뒤 큐에 넣음 (args 객체는 넘기지 않음)"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def sample(key: str) -> dict:
+    """log.debug("...", row, extra=sample("casino_strategy.row"))"""
+    return {"sample_key": key}
+
+
+# ==========================================
+# 설정 (최초 get_logger 호출 시 1회)
+# ==========================================
+_LISTENER = None
+_CONFIG_LOCK = threading.RLock()
+
+
+def _build_handlers() -> list:
+    handlers = []
+
+    if LOG_FILE:
+        folder = os.path.dirname(LOG_FILE)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+            encoding="utf-8", delay=True,
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    if LOG_CONSOLE:
+        console = logging.StreamHandler(sys.stdout)
+        console.setLevel(LOG_CONSOLE_LEVEL)
+        console.setFormatter(logging.Formatter("%(message)s"))
+        handlers.append(console)
+
+    return handlers
+
+
+def configure_logging(handlers: list = None, level: str = LOG_LEVEL):
+    """
+    casino.* 로거 → QueueHandler → (백그라운드 스레드) QueueListener → 파일/콘솔
+    - 매매 루프 스레드는 큐에 넣고 바로 복귀 (파일/stdout I/O는 writer 스레드가 담당)
+    - 다시 호출하면 기존 listener를 멈추고 새 핸들러로 교체 (테스트용)
+    """
+    global _LISTENER
+
+    with _CONFIG_LOCK:
+        root = logging.getLogger(ROOT_NAME)
+        if _LISTENER is not None:
+            shutdown_logging()
+        for h in list(root.handlers):
+            root.removeHandler(h)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = _QueueHandler(log_queue)
+        queue_handler.addFilter(SampleFilter())
+
+        root.setLevel(level)
+        root.addHandler(queue_handler)
+        root.propagate = False
+
+        _LISTENER = QueueListener(
+            log_queue, *(handlers if handlers is not None else _build_handlers()),
+            respect_handler_level=True,
+        )
+        _LISTENER.start()
+        return _LISTENER
+
+
+def shutdown_logging():
+    """큐에 남은 로그를 모두 쓰고 writer 스레드 종료"""
+    global _LISTENER
+    with _CONFIG_LOCK:
+        if _LISTENER is not None:
+            _LISTENER.stop()
+            for h in _LISTENER.handlers:
+                h.close()
+            _LISTENER = None
+
+
+atexit.register(shutdown_logging)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """모듈별 로거 (log = get_logger(__name__)) → casino.strategy.buy_entry 등"""
+    with _CONFIG_LOCK:
+        if _LISTENER is None:
+            configure_logging()
+    if name == "__main__" or not name:
+        return logging.getLogger(ROOT_NAME)
+    return logging.getLogger(f"{ROOT_NAME}.{name}")
@@ -0,0 +1,249 @@
+# utils/metrics.py
+
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from dotenv import load_dotenv
+
+from utils.instrumentation import Histogram, BUCKETS_MS, get_instrumentation
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+load_dotenv()
+
+# ==========================================
+# 환경 변수
+# ==========================================
+# 설정 시에만 /metrics 엔드포인트 실행 (예: 9108). 비우면 사용 안 함
+METRICS_PORT = os.getenv("METRICS_PORT", "").strip()
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+PREFIX = "casino"
+
+# 루프 1틱 전체를 나타내는 계측 단계 (동기/async: open_tick, 종목 워커: worker_tick)
+LOOP_PHASES = ("open_tick", "worker_tick")
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{n}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for n, v in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _histogram_lines(name: str, label_names: tuple, label_values: tuple, hist: Histogram) -> list:
+    """ms 히스토그램 → 초 단위 누적 bucket / sum / count"""
+    lines = []
+    cumulative = 0
+    for bound, count in zip(list(BUCKETS_MS) + [None], hist.counts):
+        cumulative += count
+        le = "+Inf" if bound is None else repr(bound / 1000)
+        lines.append(f"{name}_bucket{_labels(label_names + ('le',), label_values + (le,))} {cumulative}")
+    labels = _labels(label_names, label_values)
+    lines.append(f"{name}_sum{labels} {hist.total / 1000:.6f}")
+    lines.append(f"{name}_count{labels} {hist.count}")
+    return lines
+
+
+class Counter:
+    """라벨별 누적 카운터 (inc는 락 1회 – 루프 오버헤드 무시 가능)"""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels.get(n, "")) for n in self.label_names)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.label_names, k)} {v:g}" for k, v in items]
+        return lines
+
+
+class Timer:
+    """라벨별 소요시간 히스토그램 (observe는 ms)"""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._hists = {}
+        self._lock = threading.Lock()
+
+    def observe(self, ms: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.label_names)
+        with self._lock:
+            hist = self._hists.get(key)
+            if hist is None:
+                hist = self._hists[key] = Histogram()
+            hist.add(ms)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, hist in sorted(self._hists.items()):
+                lines += _histogram_lines(self.name, self.label_names, key, hist)
+        return lines
+
+
+# ==========================================
+# 지표 (코드 곳곳에서 inc / observe)
+# ==========================================
+ORDERS = Counter(f"{PREFIX}_orders_total",
+                 "Orders by side and action (sent/replaced/cancelled/failed)", ("side", "action"))
+FILLS = Counter(f"{PREFIX}_fills_total", "Order fills detected", ("side",))
+CSV_SAVE = Timer(f"{PREFIX}_csv_save_duration_seconds", "atomic_save duration", ("file",))
+
+_OWN_METRICS = (ORDERS, FILLS, CSV_SAVE)
+
+
+def count_order(side: str, action: str, n: int = 1):
+    ORDERS.inc(n, side=side.lower(), action=action)
+
+
+def count_fill(side: str, n: int = 1):
+    FILLS.inc(n, side=side.lower())
+
+
+def observe_csv_save(path: str, ms: float):
+    CSV_SAVE.observe(ms, file=os.path.basename(path))
+
+
+# ==========================================
+# 수집 (요청 시점에만 – 서버 스레드에서 실행)
+# ==========================================
+def _instrumentation_lines() -> list:
+    """utils/instrumentation 누적 히스토그램 → 루프/단계/엔드포인트 지표"""
+    inst = get_instrumentation()
+    with inst._lock:
+        phases = {name: (s.total, s.errors) for name, s in inst._phases.items()}
+        endpoints = {name: (s.total, s.calls, s.errors) for name, s in inst._endpoints.items()}
+
+    loop_name = f"{PREFIX}_loop_duration_seconds"
+    phase_name = f"{PREFIX}_phase_duration_seconds"
+    req_name = f"{PREFIX}_broker_request_duration_seconds"
+    err_name = f"{PREFIX}_broker_request_errors_total"
+
+    lines = [f"# HELP {loop_name} Trading loop tick duration", f"# TYPE {loop_name} histogram"]
+    for name in LOOP_PHASES:
+        if name in phases:
+            lines += _histogram_lines(loop_name, ("kind",), (name,), phases[name][0])
+
+    lines += [f"# HELP {phase_name} Entry loop phase duration", f"# TYPE {phase_name} histogram"]
+    for name, (hist, _) in sorted(phases.items()):
+        if name not in LOOP_PHASES:
+            lines += _histogram_lines(phase_name, ("phase",), (name,), hist)
+
+    lines += [f"# HELP {req_name} Broker request latency by endpoint", f"# TYPE {req_name} histogram"]
+    for name, (hist, _, _) in sorted(endpoints.items()):
+        lines += _histogram_lines(req_name, ("endpoint",), (name,), hist)
+
+    lines += [f"# HELP {err_name} Broker requests that failed (HTTP >= 400 or exception)",
+              f"# TYPE {err_name} counter"]
+    for name, (_, _, errors) in sorted(endpoints.items()):
+        lines.append(f"{err_name}{_labels(('endpoint',), (name,))} {errors}")
+    return lines
+
+
+def _rate_limit_lines() -> list:
+    from api.rate_limiter import get_rate_limiter
+
+    wait_name = f"{PREFIX}_rate_limit_wait_seconds_total"
+    calls_name = f"{PREFIX}_rate_limit_requests_total"
+    waited_name = f"{PREFIX}_rate_limit_waited_requests_total"
+
+    stats = get_rate_limiter().stats()
+    lines = [f"# HELP {wait_name} Time spent waiting for rate-limit tokens", f"# TYPE {wait_name} counter"]
+    lines += [f"{wait_name}{_labels(('family',), (f,))} {s['total_wait_sec']}" for f, s in sorted(stats.items())]
+    lines += [f"# HELP {calls_name} Requests passed through the rate limiter", f"# TYPE {calls_name} counter"]
+    lines += [f"{calls_name}{_labels(('family',), (f,))} {s['calls']}" for f, s in sorted(stats.items())]
+    lines += [f"# HELP {waited_name} Requests that had to wait for a token", f"# TYPE {waited_name} counter"]
+    lines += [f"{waited_name}{_labels(('family',), (f,))} {s['waited_calls']}" for f, s in sorted(stats.items())]
+    return lines
+
+
+def render_metrics() -> str:
+    """text exposition format (0.0.4)"""
+    lines = []
+    for collect in (_instrumentation_lines, _rate_limit_lines):
+        try:
+            lines += collect()
+        except Exception as e:
+            lines.append(f"# collector {collect.__name__} failed: {e}")
+    for metric in _OWN_METRICS:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+# ==========================================
+# HTTP 엔드포인트 (백그라운드 스레드)
+# ==========================================
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_SERVER = None
+
+
+def start_metrics_server(port: int, host: str = METRICS_HOST):
+    """/metrics 서버를 데몬 스레드로 시작 (매매 루프와 별도, 요청 올 때만 집계)"""
+    global _SERVER
+    if _SERVER is not None:
+        return _SERVER
+
+    server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    _SERVER = server
+
+    log.info(f"📈 [metrics] 지표 엔드포인트 시작 → http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def maybe_start_metrics_server():
+    """METRICS_PORT가 설정된 경우에만 시작. 실패해도 매매는 계속"""
+    if not METRICS_PORT:
+        return None
+    try:
+        return start_metrics_server(int(METRICS_PORT))
+    except Exception as e:
+        log.warning(f"⚠️ [metrics] 지표 엔드포인트 시작 실패 → 지표 없이 계속: {e}")
+        return None
+
+
+def stop_metrics_server():
+    global _SERVER
+    if _SERVER is not None:
+        _SERVER.shutdown()
+        _SERVER.server_close()
+        _SERVER = None